@@ -14,6 +14,7 @@ from flask import Blueprint, request, jsonify
 from core.api_validation import handle_api_errors, create_success_response, create_error_response
 from core.secure_sessions import get_current_user_id
 from core.database_optimization import db_optimizer
+from core.event_partitions import event_table_source
 from core.jwt_auth import jwt_required, get_current_user
 from core.fikiri_stripe_manager import FikiriStripeManager
 
@@ -371,7 +372,7 @@ def get_dashboard_metrics():
         # Try to get AI response count from analytics_events
         try:
             ai_result = db_optimizer.execute_query(
-                """SELECT COUNT(*) as count FROM analytics_events
+                f"""SELECT COUNT(*) as count FROM {event_table_source('analytics_events')}
                    WHERE user_id = ? AND (event_type LIKE '%ai%' OR event_type LIKE '%llm%' OR event_type LIKE '%response%')""",
                 (user_id,)
             )
@@ -641,6 +642,8 @@ def get_dashboard_timeseries():
         start_date = today - timedelta(days=period_days - 1)
         previous_start = start_date - timedelta(days=period_days)
         previous_end = start_date - timedelta(days=1)
+        # quarter + previous quarter reach past the partitioned hot window
+        events_source = event_table_source("analytics_events")
 
         def _rows_to_daily_map(rows: Optional[List[Dict[str, Any]]]) -> Dict[str, float]:
             mapped: Dict[str, float] = {}
@@ -672,9 +675,9 @@ def get_dashboard_timeseries():
         ))
 
         responses_daily = _rows_to_daily_map(db_optimizer.execute_query(
-            """
+            f"""
             SELECT DATE(created_at) AS day, COUNT(*) AS value
-            FROM analytics_events
+            FROM {events_source}
             WHERE user_id = ? AND DATE(created_at) >= ?
               AND (event_type LIKE '%ai%' OR event_type LIKE '%llm%' OR event_type LIKE '%response%')
             GROUP BY DATE(created_at)
@@ -741,18 +744,18 @@ def get_dashboard_timeseries():
             range_params_previous
         )
         current_responses = _range_total(
-            """
+            f"""
             SELECT COUNT(*) AS value
-            FROM analytics_events
+            FROM {events_source}
             WHERE user_id = ? AND DATE(created_at) BETWEEN ? AND ?
               AND (event_type LIKE '%ai%' OR event_type LIKE '%llm%' OR event_type LIKE '%response%')
             """,
             range_params_current
         )
         previous_responses = _range_total(
-            """
+            f"""
             SELECT COUNT(*) AS value
-            FROM analytics_events
+            FROM {events_source}
             WHERE user_id = ? AND DATE(created_at) BETWEEN ? AND ?
               AND (event_type LIKE '%ai%' OR event_type LIKE '%llm%' OR event_type LIKE '%response%')
             """,
@@ -991,9 +994,9 @@ def get_ai_metrics():
         # Get AI usage from analytics_events table
         try:
             # Count AI responses/actions
-            ai_events_result = db_optimizer.execute_query("""
+            ai_events_result = db_optimizer.execute_query(f"""
                 SELECT COUNT(*) as count 
-                FROM analytics_events 
+                FROM {event_table_source('analytics_events')} 
                 WHERE user_id = ? AND (event_type LIKE '%ai%' OR event_type LIKE '%llm%' OR event_type LIKE '%response%')
             """, (user_id,))
             
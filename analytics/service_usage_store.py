@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from analytics.service_usage_constants import normalize_service_id
 from core.database_optimization import db_optimizer
+from core.event_partitions import event_table_source
 
 logger = logging.getLogger(__name__)
 
@@ -88,13 +89,15 @@ def insert_usage_event(
         if existing:
             return None
         if db_optimizer.db_type == "postgresql":
+            # No conflict target: once the table is partitioned (migration 013) the unique
+            # idempotency_key index exists per monthly partition, not on the parent.
             sql = """
                 INSERT INTO service_usage_events (
                     user_id, service_id, event_category, event_type, metric_name,
                     quantity, status, idempotency_key, correlation_id,
                     resource_type, resource_id, metadata_json, source
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT (idempotency_key) DO NOTHING
+                ON CONFLICT DO NOTHING
                 RETURNING id
             """
             return db_optimizer.execute_insert_returning_id(sql, params)
@@ -279,7 +282,7 @@ def list_usage_events(
         SELECT id, service_id, event_category, event_type, metric_name,
                quantity, status, correlation_id, resource_type, resource_id,
                source, created_at
-        FROM service_usage_events
+        FROM {event_table_source("service_usage_events")}
         WHERE {' AND '.join(clauses)}
         ORDER BY created_at DESC
         LIMIT ?
@@ -2,6 +2,7 @@
 
 import os
 from pathlib import Path
+from typing import Optional
 
 SCHEMA_VERSION = "v1"
 
@@ -26,6 +27,7 @@ HANDOFF_SECONDARY_CONTACT = "/contact"
 
 DEFAULT_GROUNDING_MIN_SCORE = 0.25
 DEFAULT_RETRIEVAL_TOP_K = 3
+DEFAULT_KB_RELOAD_SECONDS = 5.0
 
 
 def project_root() -> Path:
@@ -39,6 +41,25 @@ def kb_data_dir() -> Path:
     return project_root() / "data" / "company_chatbot"
 
 
+def kb_reload_interval_seconds() -> float:
+    """How often the KB file is stat()ed for hot reload; <= 0 disables watching."""
+    raw = os.getenv("FIKIRI_SITE_BOT_KB_RELOAD_SECONDS", "").strip()
+    if not raw:
+        return DEFAULT_KB_RELOAD_SECONDS
+    try:
+        return float(raw)
+    except ValueError:
+        return DEFAULT_KB_RELOAD_SECONDS
+
+
+def kb_index_snapshot_path() -> Optional[Path]:
+    """Optional path for the persisted corpus index snapshot (default off)."""
+    raw = os.getenv("FIKIRI_SITE_BOT_KB_INDEX_SNAPSHOT", "").strip()
+    if not raw:
+        return None
+    return Path(raw)
+
+
 def grounding_min_score() -> float:
     raw = os.getenv("FIKIRI_SITE_BOT_GROUNDING_MIN_SCORE", "").strip()
     if not raw:
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
 import math
+import os
 import re
-from dataclasses import dataclass, field
-from functools import lru_cache
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
@@ -18,6 +23,8 @@ from company_chatbot.service_families import (
     is_ambiguous_families,
 )
 
+logger = logging.getLogger(__name__)
+
 _TOKEN_RE = re.compile(r"[a-z0-9]+")
 _HYPHEN_AI_ASSISTANT_RE = re.compile(r"ai-assistant", re.I)
 
@@ -373,40 +380,265 @@ def score_chunk(
     return max(0.0, min(1.5, score))
 
 
-def load_kb_chunks(path: Path | None = None) -> List[KBChunk]:
-    kb_path = path or (config.kb_data_dir() / "fikiri_kb_chunks.jsonl")
-    if not kb_path.is_file():
-        return []
+def _kb_path() -> Path:
+    return config.kb_data_dir() / "fikiri_kb_chunks.jsonl"
+
+
+def _chunk_from_row(row: Dict[str, Any]) -> KBChunk:
+    return KBChunk(
+        id=str(row["id"]),
+        text=str(row["text"]),
+        topic=str(row.get("topic", "general")),
+        source_url=str(row.get("source_url", "")),
+        keywords=[str(k) for k in row.get("keywords", [])],
+        intent=str(row.get("intent", "") or ""),
+        aliases=[str(a) for a in row.get("aliases", [])],
+        negative_keywords=[str(n) for n in row.get("negative_keywords", [])],
+        service_families=[str(f) for f in row.get("service_families", [])],
+    )
+
 
+def _parse_kb_text(text: str) -> List[KBChunk]:
     chunks: List[KBChunk] = []
-    for line in kb_path.read_text(encoding="utf-8").splitlines():
+    for line in text.splitlines():
         line = line.strip()
         if not line:
             continue
-        row = json.loads(line)
-        chunks.append(
-            KBChunk(
-                id=str(row["id"]),
-                text=str(row["text"]),
-                topic=str(row.get("topic", "general")),
-                source_url=str(row.get("source_url", "")),
-                keywords=[str(k) for k in row.get("keywords", [])],
-                intent=str(row.get("intent", "") or ""),
-                aliases=[str(a) for a in row.get("aliases", [])],
-                negative_keywords=[str(n) for n in row.get("negative_keywords", [])],
-                service_families=[str(f) for f in row.get("service_families", [])],
-            )
-        )
+        chunks.append(_chunk_from_row(json.loads(line)))
     return chunks
 
 
-@lru_cache(maxsize=1)
+def load_kb_chunks(path: Path | None = None) -> List[KBChunk]:
+    kb_path = path or _kb_path()
+    if not kb_path.is_file():
+        return []
+    return _parse_kb_text(kb_path.read_text(encoding="utf-8"))
+
+
+# --- Versioned corpus index (hot reload + optional snapshot) -----------------
+
+_SNAPSHOT_MAGIC = b"FKKBIDX1"
+_SNAPSHOT_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class KBIndexVersion:
+    """Identity of the KB file an index was built from."""
+
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str
+    generation: int
+    built_at: float
+    from_snapshot: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "sha256": self.sha256,
+            "generation": self.generation,
+            "built_at": self.built_at,
+            "from_snapshot": self.from_snapshot,
+        }
+
+
+def _stat_signature(path: Path) -> Tuple[int, int]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return (-1, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_kb_bytes(path: Path) -> bytes:
+    try:
+        return path.read_bytes()
+    except OSError:
+        return b""
+
+
+def _snapshot_payload(sha256: str, corpus: _CorpusIndex) -> Dict[str, Any]:
+    return {
+        "format": _SNAPSHOT_FORMAT,
+        "sha256": sha256,
+        "chunks": [asdict(chunk) for chunk in corpus.chunks],
+        "idf": corpus.idf,
+        "body": {cid: sorted(tokens) for cid, tokens in corpus.chunk_body_tokens.items()},
+        "keywords": {cid: sorted(tokens) for cid, tokens in corpus.chunk_keyword_tokens.items()},
+    }
+
+
+def write_index_snapshot(path: Path, sha256: str, corpus: _CorpusIndex) -> None:
+    """Persist ``corpus`` as zlib-compressed JSON behind a magic header (atomic replace)."""
+    body = json.dumps(_snapshot_payload(sha256, corpus), separators=(",", ":")).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(_SNAPSHOT_MAGIC + zlib.compress(body, 6))
+    os.replace(tmp, path)
+
+
+def read_index_snapshot(path: Path, sha256: str) -> Optional[_CorpusIndex]:
+    """Load a snapshot if it exists and was built from KB content hashing to ``sha256``."""
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+    if not raw.startswith(_SNAPSHOT_MAGIC):
+        return None
+    try:
+        payload = json.loads(zlib.decompress(raw[len(_SNAPSHOT_MAGIC):]).decode("utf-8"))
+    except (zlib.error, ValueError, UnicodeDecodeError):
+        return None
+    if payload.get("format") != _SNAPSHOT_FORMAT or payload.get("sha256") != sha256:
+        return None
+    try:
+        return _CorpusIndex(
+            chunks=tuple(_chunk_from_row(row) for row in payload["chunks"]),
+            idf={str(k): float(v) for k, v in payload["idf"].items()},
+            chunk_body_tokens={cid: set(tokens) for cid, tokens in payload["body"].items()},
+            chunk_keyword_tokens={cid: set(tokens) for cid, tokens in payload["keywords"].items()},
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class _CorpusIndexHolder:
+    """Holds the live corpus index; rebuilds off-thread when the KB file changes.
+
+    Readers always get a complete ``_CorpusIndex`` (the reference is swapped under a
+    lock once a rebuild finishes), so a KB edit never serves a half-built index.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._index: Optional[_CorpusIndex] = None
+        self._version: Optional[KBIndexVersion] = None
+        self._signature: Tuple[int, int] = (-1, -1)
+        self._last_check = 0.0
+        self._generation = 0
+        self._rebuild_thread: Optional[threading.Thread] = None
+
+    def reset(self) -> None:
+        self.wait_for_rebuild()
+        with self._lock:
+            self._index = None
+            self._version = None
+            self._signature = (-1, -1)
+            self._last_check = 0.0
+
+    @property
+    def version(self) -> Optional[KBIndexVersion]:
+        return self._version
+
+    def get(self) -> _CorpusIndex:
+        kb_path = _kb_path()
+        index, version = self._index, self._version
+        if index is None or version is None or version.path != str(kb_path):
+            return self._rebuild(kb_path)
+
+        interval = config.kb_reload_interval_seconds()
+        now = time.monotonic()
+        if interval > 0 and now - self._last_check >= interval:
+            self._last_check = now
+            if _stat_signature(kb_path) != self._signature:
+                self._schedule_rebuild(kb_path)
+        return index
+
+    def refresh(self) -> Optional[KBIndexVersion]:
+        """Synchronously re-check the KB file and rebuild if its content changed."""
+        self._rebuild(_kb_path())
+        return self._version
+
+    def wait_for_rebuild(self, timeout: float | None = None) -> None:
+        thread = self._rebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _schedule_rebuild(self, kb_path: Path) -> None:
+        with self._lock:
+            thread = self._rebuild_thread
+            if thread is not None and thread.is_alive():
+                return
+            thread = threading.Thread(
+                target=self._rebuild_in_background,
+                args=(kb_path,),
+                name="site-bot-kb-index",
+                daemon=True,
+            )
+            self._rebuild_thread = thread
+        thread.start()
+
+    def _rebuild_in_background(self, kb_path: Path) -> None:
+        try:
+            self._rebuild(kb_path)
+        except Exception:
+            # Keep serving the previous index; the next stat check retries.
+            logger.exception("Site bot KB index rebuild failed for %s", kb_path)
+
+    def _rebuild(self, kb_path: Path) -> _CorpusIndex:
+        signature = _stat_signature(kb_path)
+        raw = _read_kb_bytes(kb_path)
+        sha256 = hashlib.sha256(raw).hexdigest()
+
+        current, version = self._index, self._version
+        if current is not None and version is not None:
+            if version.path == str(kb_path) and version.sha256 == sha256:
+                with self._lock:
+                    self._signature = signature
+                return current
+
+        snapshot_path = config.kb_index_snapshot_path()
+        corpus = read_index_snapshot(snapshot_path, sha256) if snapshot_path else None
+        from_snapshot = corpus is not None
+        if corpus is None:
+            corpus = _build_corpus_index(_parse_kb_text(raw.decode("utf-8")))
+            if snapshot_path:
+                try:
+                    write_index_snapshot(snapshot_path, sha256, corpus)
+                except OSError as exc:
+                    logger.warning("Site bot KB index snapshot not written (%s): %s", snapshot_path, exc)
+
+        with self._lock:
+            self._generation += 1
+            self._index = corpus
+            self._signature = signature
+            self._last_check = time.monotonic()
+            self._version = KBIndexVersion(
+                path=str(kb_path),
+                mtime_ns=signature[0],
+                size=signature[1],
+                sha256=sha256,
+                generation=self._generation,
+                built_at=time.time(),
+                from_snapshot=from_snapshot,
+            )
+        return corpus
+
+
+_INDEX_HOLDER = _CorpusIndexHolder()
+
+
 def _get_corpus_index() -> _CorpusIndex:
-    return _build_corpus_index(load_kb_chunks())
+    return _INDEX_HOLDER.get()
+
+
+def kb_index_version() -> Optional[KBIndexVersion]:
+    """Version of the index currently served (None before first retrieval)."""
+    return _INDEX_HOLDER.version
+
+
+def refresh_kb_index() -> Optional[KBIndexVersion]:
+    """Force a synchronous KB re-read (e.g. from an admin action or deploy hook)."""
+    return _INDEX_HOLDER.refresh()
+
+
+def wait_for_kb_rebuild_for_tests(timeout: float | None = 5.0) -> None:
+    _INDEX_HOLDER.wait_for_rebuild(timeout)
 
 
 def clear_kb_cache_for_tests() -> None:
-    _get_corpus_index.cache_clear()
+    _INDEX_HOLDER.reset()
     from company_chatbot.capabilities import clear_capability_map_cache_for_tests
 
     clear_capability_map_cache_for_tests()
@@ -3,15 +3,18 @@
 from __future__ import annotations
 
 import hashlib
+import itertools
 import json
 import logging
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from company_chatbot import config
 from company_chatbot.schemas import MessageResult
+from core.batched_purge import purge_in_batches
 from core.database_optimization import db_optimizer
+from core.streaming_export import iter_ndjson
 
 logger = logging.getLogger(__name__)
 
@@ -275,11 +278,15 @@ def count_expired_transcript_sessions() -> int:
     return int(row[0] or 0)
 
 
-def purge_expired_transcripts(*, dry_run: bool = False, batch_size: int = 500) -> int:
+def purge_expired_transcripts(
+    *, dry_run: bool = False, batch_size: int = 500, deadline: Optional[float] = None
+) -> int:
     """Delete sessions/messages older than retention window. Returns sessions removed (or count if dry_run).
 
-    Deletes in bounded batches so a large backlog does not load every session id into memory.
-    Safe to run repeatedly. Does nothing when transcript persistence is disabled.
+    Deletes in bounded id ranges (``core.batched_purge``) with a short pause between batches so
+    writers are not blocked behind one long DELETE. ``deadline`` (``time.monotonic()``) ends the
+    run early; the next run picks up the rest. Safe to run repeatedly. Does nothing when
+    transcript persistence is disabled.
     """
     if not is_persist_enabled():
         logger.info("Site chat transcript purge skipped: persistence disabled")
@@ -301,52 +308,38 @@ def purge_expired_transcripts(*, dry_run: bool = False, batch_size: int = 500) -
         )
         return count
 
-    removed = 0
-    while True:
-        batch = db_optimizer.execute_query(
-            """
-            SELECT session_id FROM site_chat_sessions
-            WHERE last_seen_at < ?
-            ORDER BY last_seen_at ASC
-            LIMIT ?
-            """,
-            (cutoff, limit),
+    def _delete_children(lo: Any, hi: Any) -> None:
+        range_sql = "id > ? AND " if lo is not None else ""
+        range_params = (lo,) if lo is not None else ()
+        expired_ids = (
+            f"SELECT session_id FROM site_chat_sessions WHERE {range_sql}id <= ? AND last_seen_at < ?"
         )
-        if not batch:
-            break
-
-        session_ids = [
-            row["session_id"] if hasattr(row, "keys") else row[0] for row in batch
-        ]
-        placeholders = ", ".join(["?"] * len(session_ids))
-        params = tuple(session_ids)
-
-        db_optimizer.execute_query(
-            f"DELETE FROM site_chat_messages WHERE session_id IN ({placeholders})",
-            params,
-            fetch=False,
-        )
-        db_optimizer.execute_query(
-            f"DELETE FROM site_chat_transcript_reads WHERE session_id IN ({placeholders})",
-            params,
-            fetch=False,
-        )
-        db_optimizer.execute_query(
-            f"DELETE FROM site_chat_sessions WHERE session_id IN ({placeholders})",
-            params,
-            fetch=False,
-        )
-        removed += len(session_ids)
-
-        if len(session_ids) < limit:
-            break
+        for child in ("site_chat_messages", "site_chat_transcript_reads"):
+            db_optimizer.execute_query(
+                f"DELETE FROM {child} WHERE session_id IN ({expired_ids})",
+                (*range_params, hi, cutoff),
+                fetch=False,
+            )
+
+    stats = purge_in_batches(
+        "site_chat_sessions",
+        "last_seen_at < ?",
+        (cutoff,),
+        batch_size=limit,
+        deadline=deadline,
+        before_delete=_delete_children,
+        db=db_optimizer,
+    )
+    removed = stats.deleted
 
     elapsed_ms = int((datetime.now(timezone.utc) - started).total_seconds() * 1000)
     logger.info(
-        "Site chat transcript purge complete: removed=%s cutoff=%s batch_size=%s elapsed_ms=%s",
+        "Site chat transcript purge %s: removed=%s cutoff=%s batch_size=%s batches=%s elapsed_ms=%s",
+        "complete" if stats.complete else "paused at time budget",
         removed,
         cutoff,
         limit,
+        stats.batches,
         elapsed_ms,
     )
     return removed
@@ -417,7 +410,7 @@ def list_transcript_sessions(
     return {"sessions": sessions, "total": total, "limit": limit, "offset": offset}
 
 
-def get_transcript_session(session_id: str) -> Optional[Dict[str, Any]]:
+def _transcript_session_row(session_id: str) -> Optional[Any]:
     ensure_site_chat_transcript_tables()
     rows = db_optimizer.execute_query(
         """
@@ -430,11 +423,11 @@ def get_transcript_session(session_id: str) -> Optional[Dict[str, Any]]:
         """,
         (session_id,),
     )
-    if not rows:
-        return None
+    return rows[0] if rows else None
 
-    session_row = rows[0]
-    messages = db_optimizer.execute_query(
+
+def _iter_transcript_messages(session_id: str) -> Iterator[Dict[str, Any]]:
+    rows = db_optimizer.iter_query(
         """
         SELECT role, content, mode, grounded, confidence, sources_json, intake_json,
                handoff_json, lead_assessment_json, created_at
@@ -444,72 +437,115 @@ def get_transcript_session(session_id: str) -> Optional[Dict[str, Any]]:
         """,
         (session_id,),
     )
+    for row in rows:
+        yield _message_row(row)
+
+
+def get_transcript_session(session_id: str) -> Optional[Dict[str, Any]]:
+    session_row = _transcript_session_row(session_id)
+    if session_row is None:
+        return None
     return {
         "session": _session_detail_row(session_row),
-        "messages": [_message_row(row) for row in (messages or [])],
+        "messages": list(_iter_transcript_messages(session_id)),
     }
 
 
-def build_transcript_export(session_id: str, export_format: str = "text") -> Optional[Dict[str, Any]]:
-    payload = get_transcript_session(session_id)
-    if not payload:
-        return None
+def _transcript_json_header(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "session_id": session["session_id"],
+        "created_at": session["first_seen_at"],
+        "last_seen_at": session["last_seen_at"],
+        "last_mode": session["last_mode"],
+        "lead_assessment": {
+            "tier": session["latest_lead_tier"],
+            "score": session["latest_lead_score"],
+            "synopsis": session["latest_lead_synopsis"],
+        },
+        "handoff_path": session["latest_handoff_path"],
+    }
 
-    session = payload["session"]
-    messages = payload["messages"]
-    if export_format == "json":
-        return {
-            "format": "json",
-            "session_id": session["session_id"],
-            "created_at": session["first_seen_at"],
-            "last_seen_at": session["last_seen_at"],
-            "last_mode": session["last_mode"],
-            "lead_assessment": {
-                "tier": session["latest_lead_tier"],
-                "score": session["latest_lead_score"],
-                "synopsis": session["latest_lead_synopsis"],
-            },
-            "handoff_path": session["latest_handoff_path"],
-            "messages": messages,
-        }
-
-    lines = [
-        "Fikiri Site Chat Transcript",
-        f"Session: {session['session_id']}",
-        f"First seen: {session['first_seen_at']}",
-        f"Last seen: {session['last_seen_at']}",
-        f"Last mode: {session.get('last_mode') or 'n/a'}",
-        (
-            "Lead: "
-            f"{session.get('latest_lead_tier') or 'n/a'} "
-            f"(score {session.get('latest_lead_score', 0)})"
-        ),
-        f"Synopsis: {session.get('latest_lead_synopsis') or ''}",
-        f"Handoff: {session.get('latest_handoff_path') or 'n/a'}",
-        "---",
-    ]
+
+def _transcript_text_lines(session: Dict[str, Any], messages: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    yield "Fikiri Site Chat Transcript"
+    yield f"Session: {session['session_id']}"
+    yield f"First seen: {session['first_seen_at']}"
+    yield f"Last seen: {session['last_seen_at']}"
+    yield f"Last mode: {session.get('last_mode') or 'n/a'}"
+    yield (
+        "Lead: "
+        f"{session.get('latest_lead_tier') or 'n/a'} "
+        f"(score {session.get('latest_lead_score', 0)})"
+    )
+    yield f"Synopsis: {session.get('latest_lead_synopsis') or ''}"
+    yield f"Handoff: {session.get('latest_handoff_path') or 'n/a'}"
+    yield "---"
     for msg in messages:
         role = msg["role"].title()
         mode_suffix = f" / {msg['mode']}" if msg.get("mode") else ""
-        lines.append(f"[{role}{mode_suffix}] {msg['content']}")
+        yield f"[{role}{mode_suffix}] {msg['content']}"
         if msg["role"] == ROLE_ASSISTANT:
             if msg.get("grounded") is not None:
-                lines.append(f"  grounded: {bool(msg['grounded'])}, confidence: {msg.get('confidence')}")
+                yield f"  grounded: {bool(msg['grounded'])}, confidence: {msg.get('confidence')}"
             if msg.get("lead_assessment"):
                 la = msg["lead_assessment"]
-                lines.append(
-                    f"  lead: {la.get('tier')} ({la.get('score')}) — {la.get('synopsis', '')}"
-                )
+                yield f"  lead: {la.get('tier')} ({la.get('score')}) — {la.get('synopsis', '')}"
             if msg.get("intake"):
-                lines.append(f"  intake: {_safe_json(msg['intake'])}")
+                yield f"  intake: {_safe_json(msg['intake'])}"
             if msg.get("handoff"):
-                lines.append(f"  handoff: {_safe_json(msg['handoff'])}")
-        lines.append("")
+                yield f"  handoff: {_safe_json(msg['handoff'])}"
+        yield ""
+
+
+def _iter_text_document(lines: Iterable[str]) -> Iterator[str]:
+    """Newline-joined ``lines`` with trailing blank lines/whitespace trimmed, emitted incrementally."""
+    held: Optional[str] = None
+    blanks = 0
+    for line in lines:
+        if not line.strip():
+            blanks += 1
+            continue
+        if held is not None:
+            yield held + "\n" * (blanks + 1)
+        held, blanks = line, 0
+    yield (held or "").rstrip() + "\n"
+
 
+def build_transcript_export(session_id: str, export_format: str = "text") -> Optional[Dict[str, Any]]:
+    payload = get_transcript_session(session_id)
+    if not payload:
+        return None
+
+    session = payload["session"]
+    messages = payload["messages"]
+    if export_format == "json":
+        return {"format": "json", **_transcript_json_header(session), "messages": messages}
+
+    return {
+        "format": "text",
+        "session_id": session["session_id"],
+        "content": "".join(_iter_text_document(_transcript_text_lines(session, messages))),
+    }
+
+
+def iter_transcript_export(session_id: str, export_format: str = "text") -> Optional[Dict[str, Any]]:
+    """
+    Streamed transcript export: ``chunks`` yields the text transcript line by line, or
+    NDJSON (session header line, then one line per message). None if the session is unknown.
+    """
+    session_row = _transcript_session_row(session_id)
+    if session_row is None:
+        return None
+    session = _session_detail_row(session_row)
+    messages = _iter_transcript_messages(session_id)
+    if export_format == "ndjson":
+        header = {"type": "session", **_transcript_json_header(session)}
+        chunks = iter_ndjson(itertools.chain([header], ({"type": "message", **m} for m in messages)))
+        return {"format": "ndjson", "session_id": session["session_id"], "chunks": chunks}
     return {
         "format": "text",
         "session_id": session["session_id"],
-        "content": "\n".join(lines).strip() + "\n",
+        "chunks": _iter_text_document(_transcript_text_lines(session, messages)),
     }
 
 
@@ -8,7 +8,7 @@ from __future__ import annotations
 import json
 import logging
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from flask import request
 
@@ -224,19 +224,12 @@ def record_admin_audit_from_request(
     )
 
 
-def list_admin_audit(
-    *,
-    limit: int = 50,
-    offset: int = 0,
-    actor_user_id: Optional[int] = None,
-    target_type: Optional[str] = None,
-    target_id: Optional[str] = None,
-    outcome: Optional[str] = None,
-) -> Dict[str, Any]:
-    ensure_admin_audit_table()
-    limit = max(1, min(limit, 100))
-    offset = max(0, offset)
-
+def _audit_filters(
+    actor_user_id: Optional[int],
+    target_type: Optional[str],
+    target_id: Optional[str],
+    outcome: Optional[str],
+) -> Tuple[str, List[Any]]:
     clauses = ["1=1"]
     params: List[Any] = []
     if actor_user_id is not None:
@@ -251,13 +244,61 @@ def list_admin_audit(
     if outcome:
         clauses.append("outcome = ?")
         params.append(outcome)
+    return " AND ".join(clauses), params
+
+
+def _audit_item(row: Any) -> Dict[str, Any]:
+    item = dict(row) if hasattr(row, "keys") else {
+        "id": row[0],
+        "actor_user_id": row[1],
+        "action": row[2],
+        "target_type": row[3],
+        "target_id": row[4],
+        "before_json": row[5],
+        "after_json": row[6],
+        "ip_address": row[7],
+        "user_agent": row[8],
+        "metadata_json": row[9],
+        "outcome": row[10] if len(row) > 10 else None,
+        "capability": row[11] if len(row) > 11 else None,
+        "correlation_id": row[12] if len(row) > 12 else None,
+        "created_at": row[13] if len(row) > 13 else None,
+    }
+    for key in ("before_json", "after_json", "metadata_json"):
+        raw = item.get(key)
+        if raw:
+            try:
+                item[key.replace("_json", "")] = json.loads(raw)
+            except Exception:
+                item[key.replace("_json", "")] = raw
+        else:
+            item[key.replace("_json", "")] = None
+        item.pop(key, None)
+    return item
+
+
+_AUDIT_COLUMNS = """id, actor_user_id, action, target_type, target_id,
+               before_json, after_json, ip_address, user_agent, metadata_json,
+               outcome, capability, correlation_id, created_at"""
+
 
-    where_sql = " AND ".join(clauses)
+def list_admin_audit(
+    *,
+    limit: int = 50,
+    offset: int = 0,
+    actor_user_id: Optional[int] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    outcome: Optional[str] = None,
+) -> Dict[str, Any]:
+    ensure_admin_audit_table()
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+
+    where_sql, params = _audit_filters(actor_user_id, target_type, target_id, outcome)
     rows = db_optimizer.execute_query(
         f"""
-        SELECT id, actor_user_id, action, target_type, target_id,
-               before_json, after_json, ip_address, user_agent, metadata_json,
-               outcome, capability, correlation_id, created_at
+        SELECT {_AUDIT_COLUMNS}
         FROM admin_audit_log
         WHERE {where_sql}
         ORDER BY created_at DESC, id DESC
@@ -274,39 +315,35 @@ def list_admin_audit(
         row = count_rows[0]
         total = int(row.get("total") if hasattr(row, "keys") else row[0])
 
-    items = []
-    for row in rows or []:
-        item = dict(row) if hasattr(row, "keys") else {
-            "id": row[0],
-            "actor_user_id": row[1],
-            "action": row[2],
-            "target_type": row[3],
-            "target_id": row[4],
-            "before_json": row[5],
-            "after_json": row[6],
-            "ip_address": row[7],
-            "user_agent": row[8],
-            "metadata_json": row[9],
-            "outcome": row[10] if len(row) > 10 else None,
-            "capability": row[11] if len(row) > 11 else None,
-            "correlation_id": row[12] if len(row) > 12 else None,
-            "created_at": row[13] if len(row) > 13 else None,
-        }
-        for key in ("before_json", "after_json", "metadata_json"):
-            raw = item.get(key)
-            if raw:
-                try:
-                    item[key.replace("_json", "")] = json.loads(raw)
-                except Exception:
-                    item[key.replace("_json", "")] = raw
-            else:
-                item[key.replace("_json", "")] = None
-            item.pop(key, None)
-        items.append(item)
-
+    items = [_audit_item(row) for row in rows or []]
     return {"items": items, "total": total, "limit": limit, "offset": offset}
 
 
+def iter_admin_audit(
+    *,
+    max_rows: int,
+    actor_user_id: Optional[int] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    outcome: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Every matching audit row (newest first, at most ``max_rows``), read in batches for streamed exports."""
+    ensure_admin_audit_table()
+    where_sql, params = _audit_filters(actor_user_id, target_type, target_id, outcome)
+    rows = db_optimizer.iter_query(
+        f"""
+        SELECT {_AUDIT_COLUMNS}
+        FROM admin_audit_log
+        WHERE {where_sql}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+        """,
+        tuple(params + [max(1, int(max_rows))]),
+    )
+    for row in rows:
+        yield _audit_item(row)
+
+
 def clear_admin_audit_for_tests() -> None:
     """Clear audit rows for test isolation.
 
@@ -5,11 +5,28 @@ from __future__ import annotations
 import csv
 import io
 import json
+import os
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from core.streaming_export import CSV_MIMETYPE, NDJSON_MIMETYPE, iter_csv, iter_ndjson
 
 REASON_CODE_RE = re.compile(r"^[A-Z][A-Z0-9_]{2,63}$")
 EXPORT_MAX_ROWS = 200
+# Streamed exports are not held in memory, so they can cover far more than one page.
+STREAM_EXPORT_MAX_ROWS = int(os.getenv("AUDIT_STREAM_EXPORT_MAX_ROWS", "100000"))
+
+AUDIT_EXPORT_FIELDNAMES = [
+    "timestamp",
+    "action",
+    "outcome",
+    "reason",
+    "actor_id",
+    "target_type",
+    "target_id",
+    "correlation_id",
+    "capability",
+]
 
 
 def controlled_reason_from_metadata(metadata: Any) -> Optional[str]:
@@ -63,19 +80,8 @@ def build_audit_export_payload(
     body: str
     content_type: str
     if fmt_norm == "csv":
-        fieldnames = [
-            "timestamp",
-            "action",
-            "outcome",
-            "reason",
-            "actor_id",
-            "target_type",
-            "target_id",
-            "correlation_id",
-            "capability",
-        ]
         buf = io.StringIO()
-        writer = csv.DictWriter(buf, fieldnames=fieldnames, extrasaction="ignore")
+        writer = csv.DictWriter(buf, fieldnames=AUDIT_EXPORT_FIELDNAMES, extrasaction="ignore")
         writer.writeheader()
         for row in rows:
             writer.writerow(row)
@@ -91,3 +97,26 @@ def build_audit_export_payload(
         "body": body,
         "items": rows if fmt_norm == "json" else None,
     }
+
+
+def iter_audit_export_chunks(items: Iterable[Dict[str, Any]], *, fmt: str = "ndjson") -> Dict[str, Any]:
+    """
+    Streamed counterpart of ``build_audit_export_payload``: ``chunks`` yields CSV or
+    NDJSON text row by row through the same allowlist.
+    """
+    fmt_norm = (fmt or "ndjson").strip().lower()
+    if fmt_norm not in ("ndjson", "csv"):
+        fmt_norm = "ndjson"
+    rows: Iterator[Dict[str, Any]] = (sanitize_audit_export_row(item) for item in items)
+    if fmt_norm == "csv":
+        chunks: Iterator[str] = iter_csv(rows, AUDIT_EXPORT_FIELDNAMES)
+        content_type = CSV_MIMETYPE
+    else:
+        chunks = iter_ndjson(rows)
+        content_type = NDJSON_MIMETYPE
+    return {
+        "format": fmt_norm,
+        "content_type": content_type,
+        "filename": f"admin-audit.{fmt_norm}",
+        "chunks": chunks,
+    }
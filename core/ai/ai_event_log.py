@@ -13,11 +13,19 @@ import uuid
 from typing import Any, Dict, Optional
 
 from core.database_optimization import db_optimizer
+from core.event_sink import enqueue_event_row
 
 logger = logging.getLogger(__name__)
 
 _MAX_PAYLOAD_BYTES = 16 * 1024
 
+_AI_EVENT_COLUMNS = (
+    "user_id", "event_type", "entity_type", "entity_id",
+    "correlation_id", "supersedes_event_id",
+    "status", "error_message", "source",
+    "payload_json", "payload_truncated",
+)
+
 _AI_EVENT_LOG_ENABLED = os.getenv("FIKIRI_AI_EVENT_LOG", "1").lower() not in ("0", "false", "no")
 
 
@@ -71,9 +79,13 @@ def record_ai_event(
     error_message: Optional[str] = None,
     source: Optional[str] = None,
     payload: Optional[Dict[str, Any]] = None,
+    buffered: bool = True,
 ) -> Optional[int]:
     """
     Persist one AI event. Swallows all errors after logging. Returns new row id or None.
+
+    With write-behind enabled (core.event_sink) the row is queued and None is returned; pass
+    ``buffered=False`` when the caller needs the row id.
     """
     if not ai_event_logging_enabled():
         return None
@@ -90,6 +102,21 @@ def record_ai_event(
             else:
                 payload_json = raw
 
+        values = (
+            user_id,
+            event_type,
+            entity_type,
+            entity_id,
+            correlation_id,
+            supersedes_event_id,
+            status,
+            error_message,
+            source,
+            payload_json,
+            truncated,
+        )
+        if buffered and enqueue_event_row("ai_events", _AI_EVENT_COLUMNS, values):
+            return None
         new_id = db_optimizer.execute_insert_returning_id(
             """
             INSERT INTO ai_events (
@@ -99,19 +126,7 @@ def record_ai_event(
                 payload_json, payload_truncated
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                user_id,
-                event_type,
-                entity_type,
-                entity_id,
-                correlation_id,
-                supersedes_event_id,
-                status,
-                error_message,
-                source,
-                payload_json,
-                truncated,
-            ),
+            values,
         )
         return new_id
     except Exception as exc:  # noqa: BLE001 — intentional best-effort sink
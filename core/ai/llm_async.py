@@ -0,0 +1,200 @@
+"""
+Fikiri Solutions - Async LLM runtime
+One background event loop per process owns the async OpenAI client (and its HTTP
+connection pool) plus the in-flight limits, so sync Flask/gevent workers and native
+asyncio callers share the same pool and the same caps.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_LLM_MAX_IN_FLIGHT = 16
+DEFAULT_LLM_TENANT_MAX_IN_FLIGHT = 4
+DEFAULT_HEDGE_AFTER_MS = 1500.0
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    try:
+        return max(1, int(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+def llm_max_in_flight() -> int:
+    """Process-wide cap on concurrent async LLM calls (FIKIRI_LLM_MAX_IN_FLIGHT)."""
+    return _env_int("FIKIRI_LLM_MAX_IN_FLIGHT", DEFAULT_LLM_MAX_IN_FLIGHT)
+
+
+def llm_tenant_max_in_flight() -> int:
+    """Per-tenant cap so one mailbox backfill cannot starve others (FIKIRI_LLM_TENANT_MAX_IN_FLIGHT)."""
+    return _env_int("FIKIRI_LLM_TENANT_MAX_IN_FLIGHT", DEFAULT_LLM_TENANT_MAX_IN_FLIGHT)
+
+
+def hedge_after_ms() -> float:
+    """Delay before a hedged duplicate request is sent; <= 0 disables hedging."""
+    raw = os.getenv("FIKIRI_LLM_HEDGE_AFTER_MS", "").strip()
+    if not raw:
+        return DEFAULT_HEDGE_AFTER_MS
+    try:
+        return float(raw)
+    except ValueError:
+        return DEFAULT_HEDGE_AFTER_MS
+
+
+class _LoopThread:
+    """Lazily started daemon thread running a private event loop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                ready = threading.Event()
+                loop = asyncio.new_event_loop()
+
+                def _run():
+                    asyncio.set_event_loop(loop)
+                    ready.set()
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=_run, name="llm-async-loop", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        return asyncio.run_coroutine_threadsafe(coro, self.loop())
+
+    def stop(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        if loop is not None and not loop.is_running():
+            loop.close()
+
+
+class LLMConcurrencyLimiter:
+    """Global + per-tenant semaphores; only touched from the runtime loop."""
+
+    def __init__(self, global_limit: int, tenant_limit: int):
+        self.global_limit = global_limit
+        self.tenant_limit = tenant_limit
+        self._global = asyncio.Semaphore(global_limit)
+        self._tenants: Dict[str, asyncio.Semaphore] = {}
+        self.in_flight = 0
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: Optional[Any] = None) -> AsyncIterator[None]:
+        key = str(tenant_id) if tenant_id not in (None, "") else "global"
+        tenant_sem = self._tenants.get(key)
+        if tenant_sem is None:
+            tenant_sem = self._tenants[key] = asyncio.Semaphore(self.tenant_limit)
+        self.waiting += 1
+        try:
+            # Tenant first: a saturated tenant queues without holding a global slot.
+            await tenant_sem.acquire()
+            try:
+                await self._global.acquire()
+            except BaseException:
+                tenant_sem.release()
+                raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._global.release()
+            tenant_sem.release()
+
+
+class AsyncLLMRuntime:
+    def __init__(self):
+        self._loop_thread = _LoopThread()
+        self._limiter: Optional[LLMConcurrencyLimiter] = None
+        self._clients: Dict[str, Any] = {}
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop_thread.loop()
+
+    def limiter(self) -> LLMConcurrencyLimiter:
+        if self._limiter is None:
+            self._limiter = LLMConcurrencyLimiter(llm_max_in_flight(), llm_tenant_max_in_flight())
+        return self._limiter
+
+    def async_client(self, api_key: Optional[str]):
+        """Shared ``AsyncOpenAI`` per API key (or the stub), created on the runtime loop."""
+        from core.ai.llm_stub import StubChatClient, is_stub_provider_enabled, stub_provider
+
+        if is_stub_provider_enabled():
+            return StubChatClient(stub_provider, is_async=True)
+        if not api_key:
+            return None
+        client = self._clients.get(api_key)
+        if client is None:
+            import openai
+
+            if not hasattr(openai, "AsyncOpenAI"):
+                return None
+            client = self._clients[api_key] = openai.AsyncOpenAI(api_key=api_key)
+        return client
+
+    def run_sync(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Block the calling (non-loop) thread until ``coro`` finishes on the runtime loop."""
+        return self._loop_thread.submit(coro).result(timeout)
+
+    async def run(self, coro: Awaitable[T]) -> T:
+        """Await ``coro`` on the runtime loop from any event loop."""
+        loop = self.loop()
+        try:
+            if asyncio.get_running_loop() is loop:
+                return await coro
+        except RuntimeError:
+            pass
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def stats(self) -> Dict[str, Any]:
+        limiter = self._limiter
+        return {
+            "global_limit": limiter.global_limit if limiter else llm_max_in_flight(),
+            "tenant_limit": limiter.tenant_limit if limiter else llm_tenant_max_in_flight(),
+            "in_flight": limiter.in_flight if limiter else 0,
+            "waiting": limiter.waiting if limiter else 0,
+        }
+
+    def reset(self) -> None:
+        self._loop_thread.stop()
+        self._limiter = None
+        self._clients.clear()
+
+
+_runtime = AsyncLLMRuntime()
+
+
+def get_async_llm_runtime() -> AsyncLLMRuntime:
+    return _runtime
+
+
+def reset_async_llm_runtime_for_tests() -> None:
+    _runtime.reset()
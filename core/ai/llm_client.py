@@ -4,14 +4,17 @@ Fikiri Solutions - LLM Client
 Handles actual LLM API calls with retry logic, error handling, and cost tracking.
 """
 
+import asyncio
 import os
 import time
 import logging
 import uuid
 import random
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from datetime import datetime, timezone
 
+from core.ai.llm_async import get_async_llm_runtime
+from core.ai.llm_stub import StubChatClient, is_stub_provider_enabled, stub_provider
 from core.ai.model_policy import FALLBACK_LLM_MODEL
 
 logger = logging.getLogger(__name__)
@@ -43,6 +46,20 @@ def _is_llm_test_mode() -> bool:
     return False
 
 
+def _classify_llm_error(error_msg: str, model: str) -> Tuple[str, str]:
+    """Map a provider exception message to (error_type, user-facing message)."""
+    error_lower = error_msg.lower()
+    if 'quota' in error_lower or 'billing' in error_lower:
+        return 'insufficient_quota', 'OpenAI API quota exceeded. Check your account balance.'
+    if '401' in error_msg or ('unauthorized' in error_lower and 'api' in error_lower):
+        return 'authentication_error', 'OpenAI API key is invalid. Check OPENAI_API_KEY.'
+    if '429' in error_msg or 'rate limit' in error_lower:
+        return 'rate_limit', 'Rate limit exceeded. Wait and retry.'
+    if 'model' in error_lower and ('not found' in error_lower or 'invalid' in error_lower):
+        return 'model_error', f'Model {model} unavailable. Falling back to {FALLBACK_LLM_MODEL}.'
+    return 'unknown', error_msg
+
+
 class LLMClient:
     """
     Centralized LLM client with exponential backoff, cost tracking, and error handling.
@@ -52,6 +69,12 @@ class LLMClient:
     def __init__(self, api_key: Optional[str] = None):
         """Initialize LLM client with OpenAI API key."""
         test_mode = _is_llm_test_mode()
+        if is_stub_provider_enabled():
+            # Local stub provider: no network, allowed in tests (FIKIRI_LLM_PROVIDER=stub).
+            self.api_key = api_key or "stub"
+            self.client = StubChatClient(stub_provider)
+            self.enabled = True
+            return
         if api_key is not None:
             self.api_key = api_key
         elif test_mode:
@@ -283,28 +306,13 @@ class LLMClient:
                 }
             except Exception as e:
                 error_msg = str(e)
-                error_lower = error_msg.lower()
                 latency_ms = (time.time() - start_time) * 1000
                 
                 # Detect error type
-                if 'quota' in error_lower or 'billing' in error_lower:
-                    error_type = 'insufficient_quota'
-                    user_msg = 'OpenAI API quota exceeded. Check your account balance.'
-                elif '401' in error_msg or ('unauthorized' in error_lower and 'api' in error_lower):
-                    error_type = 'authentication_error'
-                    user_msg = 'OpenAI API key is invalid. Check OPENAI_API_KEY.'
-                elif '429' in error_msg or 'rate limit' in error_lower:
-                    error_type = 'rate_limit'
-                    user_msg = 'Rate limit exceeded. Wait and retry.'
-                elif 'model' in error_lower and ('not found' in error_lower or 'invalid' in error_lower):
-                    error_type = 'model_error'
-                    user_msg = f'Model {model} unavailable. Falling back to {FALLBACK_LLM_MODEL}.'
-                    if model != FALLBACK_LLM_MODEL and attempt == 0:
-                        model = FALLBACK_LLM_MODEL
-                        continue
-                else:
-                    error_type = 'unknown'
-                    user_msg = error_msg
+                error_type, user_msg = _classify_llm_error(error_msg, model)
+                if error_type == 'model_error' and model != FALLBACK_LLM_MODEL and attempt == 0:
+                    model = FALLBACK_LLM_MODEL
+                    continue
                 
                 logger.error(f"LLM call failed (attempt {attempt + 1}/{max_retries}): {user_msg}")
                 
@@ -353,6 +361,416 @@ class LLMClient:
             'error': 'Max retries exceeded'
         }
     
+    async def acall_llm(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        system_message: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        trace_id: Optional[str] = None,
+        tenant_id: Optional[Any] = None,
+        hedge_after_ms: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Asyncio-native ``call_llm``: same arguments and result dict.
+
+        Runs on the shared LLM runtime loop (one async HTTP pool per process) inside the
+        global and per-tenant in-flight limits; retries back off with ``asyncio.sleep``.
+        When ``hedge_after_ms`` > 0 a duplicate request is sent if the first has not
+        answered by then, and the first success wins (``hedged`` / ``hedge_won`` in result);
+        ``tokens_used`` / ``cost_usd`` also include a losing leg that answered.
+        """
+        return await get_async_llm_runtime().run(
+            self._acall_on_runtime(
+                model=model,
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system_message=system_message,
+                messages=messages,
+                trace_id=trace_id or str(uuid.uuid4()),
+                tenant_id=tenant_id,
+                hedge_after_ms=hedge_after_ms,
+            )
+        )
+
+    def call_llm_hedged(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        system_message: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        trace_id: Optional[str] = None,
+        tenant_id: Optional[Any] = None,
+        hedge_after_ms: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Blocking wrapper over ``acall_llm`` for sync callers (router low-latency path)."""
+        trace_id = trace_id or str(uuid.uuid4())
+        try:
+            return get_async_llm_runtime().run_sync(
+                self._acall_on_runtime(
+                    model=model,
+                    prompt=prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    system_message=system_message,
+                    messages=messages,
+                    trace_id=trace_id,
+                    tenant_id=tenant_id,
+                    hedge_after_ms=hedge_after_ms,
+                ),
+                timeout=DEFAULT_OPENAI_TIMEOUT * 3 + 10,
+            )
+        except Exception as e:
+            logger.error(f"Hedged LLM call failed: {e}")
+            return self._llm_result(False, '', 0, model, trace_id, time.time(), error=str(e), error_type='unknown')
+
+    def _llm_result(
+        self,
+        success: bool,
+        content: str,
+        tokens_used: int,
+        model: str,
+        trace_id: str,
+        start_time: float,
+        error: Optional[str] = None,
+        error_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        result = {
+            'success': success,
+            'content': content,
+            'tokens_used': tokens_used if success else 0,
+            'cost_usd': self._calculate_cost(model, tokens_used) if success else 0.0,
+            'latency_ms': (time.time() - start_time) * 1000,
+            'model': model,
+            'trace_id': trace_id,
+            'error': error,
+        }
+        if error_type:
+            result['error_type'] = error_type
+        return result
+
+    async def _acall_on_runtime(
+        self,
+        *,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_message: Optional[str],
+        messages: Optional[List[Dict[str, str]]],
+        trace_id: str,
+        tenant_id: Optional[Any],
+        hedge_after_ms: Optional[float],
+    ) -> Dict[str, Any]:
+        start_time = time.time()
+        if not self.is_enabled():
+            return self._llm_result(False, '', 0, model, trace_id, start_time, error='LLM client not enabled')
+
+        runtime = get_async_llm_runtime()
+        client = runtime.async_client(self.api_key)
+        if client is None:
+            # Legacy SDK without AsyncOpenAI: keep the loop free by running the sync path in a thread.
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                lambda: self.call_llm(model, prompt, max_tokens, temperature, system_message, messages, trace_id),
+            )
+
+        if messages is None:
+            messages = []
+            if system_message:
+                messages.append({"role": "system", "content": system_message})
+            messages.append({"role": "user", "content": prompt})
+        call = dict(
+            client=client,
+            model=model,
+            messages=messages,
+            max_tokens=max(1, min(4000, max_tokens)),
+            temperature=max(0.0, min(2.0, temperature)),
+            trace_id=trace_id,
+            tenant_id=tenant_id,
+            start_time=start_time,
+        )
+
+        if not hedge_after_ms or hedge_after_ms <= 0:
+            return await self._acall_attempts(**call)
+
+        # Hedged legs make one attempt each; the second leg doubles as the retry.
+        primary = asyncio.ensure_future(self._acall_attempts(max_retries=1, **call))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after_ms / 1000.0)
+        if primary in done and primary.result().get('success'):
+            return primary.result()
+        hedge = asyncio.ensure_future(self._acall_attempts(max_retries=1, **call))
+        logger.info(
+            "LLM request hedged",
+            extra={'event': 'llm_call_hedged', 'service': 'ai', 'severity': 'INFO',
+                   'trace_id': trace_id, 'model': model,
+                   'metadata': {'hedge_after_ms': hedge_after_ms, 'primary_failed': primary in done}},
+        )
+        pending = {t for t in (primary, hedge) if not t.done()}
+        winner = None
+        while pending and winner is None:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((t for t in (primary, hedge) if t in finished and t.result().get('success')), None)
+        for task in pending:
+            task.cancel()  # a cancelled leg never returns a usage block to account for
+        chosen = winner or hedge
+        result = dict(chosen.result())
+        # A losing leg that did answer was billed too; charge it to this call.
+        for task in (primary, hedge):
+            if task is not chosen and task not in pending:
+                result['tokens_used'] += task.result()['tokens_used']
+                result['cost_usd'] += task.result()['cost_usd']
+        result['hedged'] = True
+        result['hedge_won'] = chosen is hedge
+        result['latency_ms'] = (time.time() - start_time) * 1000
+        return result
+
+    async def _acall_attempts(
+        self,
+        *,
+        client: Any,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        trace_id: str,
+        tenant_id: Optional[Any],
+        start_time: float,
+        max_retries: int = 3,
+    ) -> Dict[str, Any]:
+        breaker = None
+        if CIRCUIT_BREAKER_AVAILABLE:
+            breaker = get_circuit_breaker(
+                "openai",
+                failure_threshold=5,
+                success_threshold=2,
+                timeout_seconds=60,
+                fail_open=True
+            )
+        limiter = get_async_llm_runtime().limiter()
+        base_delay = 1.0
+        fell_back = False
+
+        attempt = 0
+        while attempt < max_retries:
+            error_type = 'unknown'
+            try:
+                if breaker:
+                    breaker.before_call()
+                async with limiter.slot(tenant_id):
+                    response = await asyncio.wait_for(
+                        client.chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            timeout=DEFAULT_OPENAI_TIMEOUT,
+                        ),
+                        timeout=DEFAULT_OPENAI_TIMEOUT + 1,
+                    )
+                content = (response.choices[0].message.content or '').strip()
+                tokens_used = response.usage.total_tokens if response.usage else 0
+                if breaker:
+                    breaker.record_success()
+                result = self._llm_result(True, content, tokens_used, model, trace_id, start_time)
+                logger.info(
+                    "✅ LLM call successful",
+                    extra={
+                        'event': 'llm_call_success',
+                        'service': 'ai',
+                        'severity': 'INFO',
+                        'trace_id': trace_id,
+                        'model': model,
+                        'tokens_used': tokens_used,
+                        'cost_usd': result['cost_usd'],
+                        'latency_ms': result['latency_ms'],
+                        'metadata': {'max_tokens': max_tokens, 'temperature': temperature, 'async': True}
+                    }
+                )
+                return result
+            except asyncio.CancelledError:
+                raise
+            except CircuitBreakerOpenError as e:
+                logger.warning(f"Circuit breaker OPEN for OpenAI: {e}")
+                return self._llm_result(
+                    False, '', 0, model, trace_id, start_time,
+                    error='Service temporarily unavailable (circuit breaker open)',
+                    error_type='circuit_breaker_open',
+                )
+            except asyncio.TimeoutError:
+                if breaker:
+                    breaker.record_failure()
+                error_msg = f"OpenAI API call timed out after {DEFAULT_OPENAI_TIMEOUT}s"
+                error_type = 'timeout'
+                logger.warning(error_msg)
+            except Exception as e:
+                if breaker:
+                    breaker.record_failure()
+                error_msg = str(e)
+                error_type, user_msg = _classify_llm_error(error_msg, model)
+                logger.error(f"Async LLM call failed (attempt {attempt + 1}/{max_retries}): {user_msg}")
+                if error_type == 'model_error' and model != FALLBACK_LLM_MODEL and not fell_back:
+                    # Switching to the fallback model does not use up an attempt.
+                    model = FALLBACK_LLM_MODEL
+                    fell_back = True
+                    continue
+                if error_type in ('insufficient_quota', 'authentication_error'):
+                    break
+            attempt += 1
+            if attempt < max_retries:
+                await asyncio.sleep(base_delay * (2 ** (attempt - 1)) + random.uniform(0, 0.5))
+
+        return self._llm_result(False, '', 0, model, trace_id, start_time, error=error_msg, error_type=error_type)
+
+    def stream_llm(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        system_message: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        trace_id: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of call_llm.
+
+        Yields ``{"type": "token", "content": str}`` frames as the model produces text,
+        then exactly one ``{"type": "done", ...}`` frame carrying the same fields as the
+        call_llm result plus ``first_token_ms``. Retries (with backoff) only happen before
+        the first token is yielded; a failure after that ends the stream with success=False
+        and the partial content.
+        """
+        trace_id = trace_id or str(uuid.uuid4())
+        start_time = time.time()
+
+        def _done(success: bool, content: str, tokens_used: int, first_token_ms: Optional[float],
+                   error: Optional[str] = None, error_type: Optional[str] = None) -> Dict[str, Any]:
+            frame = {
+                'type': 'done',
+                'success': success,
+                'content': content,
+                'tokens_used': tokens_used,
+                'cost_usd': self._calculate_cost(model, tokens_used) if tokens_used else 0.0,
+                'latency_ms': (time.time() - start_time) * 1000,
+                'first_token_ms': first_token_ms,
+                'model': model,
+                'trace_id': trace_id,
+                'error': error,
+            }
+            if error_type:
+                frame['error_type'] = error_type
+            return frame
+
+        if not self.is_enabled():
+            yield _done(False, '', 0, None, 'LLM client not enabled')
+            return
+
+        if not hasattr(self.client, 'chat'):
+            # Legacy OpenAI < 1.0.0 has no usable streaming API here; emit one frame.
+            result = self.call_llm(model, prompt, max_tokens, temperature, system_message, messages, trace_id)
+            if result.get('success') and result.get('content'):
+                yield {'type': 'token', 'content': result['content']}
+            yield {'type': 'done', 'first_token_ms': result.get('latency_ms'), **result}
+            return
+
+        temperature = max(0.0, min(2.0, temperature))
+        max_tokens = max(1, min(4000, max_tokens))
+        if messages is None:
+            messages = []
+            if system_message:
+                messages.append({"role": "system", "content": system_message})
+            messages.append({"role": "user", "content": prompt})
+
+        breaker = None
+        if CIRCUIT_BREAKER_AVAILABLE:
+            breaker = get_circuit_breaker(
+                "openai",
+                failure_threshold=5,
+                success_threshold=2,
+                timeout_seconds=60,
+                fail_open=True
+            )
+
+        def _open_stream():
+            return self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=DEFAULT_OPENAI_TIMEOUT,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+
+        max_retries = 3
+        base_delay = 1.0
+        parts: List[str] = []
+        first_token_ms: Optional[float] = None
+        usage_tokens = 0
+
+        for attempt in range(max_retries):
+            try:
+                stream = breaker.call(_open_stream) if breaker else _open_stream()
+                for chunk in stream:
+                    usage = getattr(chunk, 'usage', None)
+                    if usage is not None and getattr(usage, 'total_tokens', None):
+                        usage_tokens = int(usage.total_tokens)
+                    choices = getattr(chunk, 'choices', None) or []
+                    if not choices:
+                        continue
+                    text = getattr(choices[0].delta, 'content', None)
+                    if not text:
+                        continue
+                    if first_token_ms is None:
+                        first_token_ms = (time.time() - start_time) * 1000
+                    parts.append(text)
+                    yield {'type': 'token', 'content': text}
+                break
+            except CircuitBreakerOpenError as e:
+                logger.warning(f"Circuit breaker OPEN for OpenAI: {e}")
+                yield _done(False, ''.join(parts), 0, first_token_ms,
+                            'Service temporarily unavailable (circuit breaker open)', 'circuit_breaker_open')
+                return
+            except Exception as e:
+                error_msg = str(e)
+                logger.error(f"LLM stream failed (attempt {attempt + 1}/{max_retries}): {error_msg}")
+                error_lower = error_msg.lower()
+                fatal = 'quota' in error_lower or 'billing' in error_lower or '401' in error_msg
+                if parts or fatal or attempt == max_retries - 1:
+                    yield _done(False, ''.join(parts), usage_tokens, first_token_ms, error_msg,
+                                'stream_interrupted' if parts else None)
+                    return
+                time.sleep(base_delay * (2 ** attempt) + random.uniform(0, 0.5))
+
+        content = ''.join(parts).strip()
+        if not usage_tokens:
+            # Usage frames are optional on some deployments; estimate ~4 chars per token.
+            prompt_chars = sum(len(m.get('content') or '') for m in messages)
+            usage_tokens = (prompt_chars + len(content)) // 4
+        done = _done(True, content, usage_tokens, first_token_ms)
+        logger.info(
+            "✅ LLM stream successful",
+            extra={
+                'event': 'llm_stream_success',
+                'service': 'ai',
+                'severity': 'INFO',
+                'trace_id': trace_id,
+                'model': model,
+                'tokens_used': usage_tokens,
+                'cost_usd': done['cost_usd'],
+                'latency_ms': done['latency_ms'],
+                'metadata': {'first_token_ms': first_token_ms, 'max_tokens': max_tokens},
+            }
+        )
+        yield done
+
     def _calculate_cost(self, model: str, tokens: int) -> float:
         """
         Approximate USD cost from token counts. Rates are list-price hints aligned
@@ -8,9 +8,10 @@ import json
 import logging
 import re
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime
 
+from core.ai.llm_async import hedge_after_ms
 from core.ai.llm_client import LLMClient
 from core.ai.model_policy import (
     FALLBACK_LLM_MODEL,
@@ -22,10 +23,12 @@ from core.ai.validators import SchemaValidator
 from core.ai.ai_event_log import (
     build_router_envelope_base,
     coerce_user_id,
+    ensure_correlation_in_context,
     record_ai_event,
     sha256_hex,
     text_summary,
 )
+from core.ai.response_cache import get_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -199,6 +202,7 @@ class LLMRouter:
         1. preprocess(input)
         2. detect_intent(input) [if not provided]
         3. choose_model(intent, cost_budget, latency_requirement)
+        3b. response cache lookup (hit skips steps 4-6)
         4. call_llm(model, prompt, params)
         5. postprocess(output)
         6. validate_schema(output)
@@ -226,6 +230,7 @@ class LLMRouter:
                 - correlation_id: str (also set on context when missing)
                 - validated: bool
                 - error: Optional[str]
+                - cached: bool (only present, True, on a response cache hit)
         """
         self.trace_id = str(uuid.uuid4())
         start_time = datetime.now()
@@ -286,16 +291,52 @@ class LLMRouter:
                 status="completed",
                 source=source,
                 payload=base_envelope,
+                buffered=False,  # row id is linked from the later generation event
             )
 
-            # Step 4: Call LLM
-            llm_result = self.client.call_llm(
+            # Step 3b: Response cache (exact key, or embedding near-duplicate when enabled)
+            response_cache = get_response_cache()
+            cache_lookup = response_cache.lookup(
                 model=model,
+                intent=resolved_intent,
                 prompt=preprocessed,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                trace_id=self.trace_id,
+                output_schema=output_schema,
+                context=context,
             )
+            if cache_lookup is not None and cache_lookup.hit:
+                return self._cached_result(
+                    cache_lookup,
+                    base_envelope=base_envelope,
+                    requested_row_id=requested_row_id,
+                    start_time=start_time,
+                    resolved_intent=resolved_intent,
+                    model=model,
+                    correlation_id=correlation_id,
+                    user_row_id=user_row_id,
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    source=source,
+                )
+
+            # Step 4: Call LLM (hedged on the async runtime when latency is 'low')
+            if model_config.get("hedge_after_ms"):
+                llm_result = self.client.call_llm_hedged(
+                    model=model,
+                    prompt=preprocessed,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    trace_id=self.trace_id,
+                    tenant_id=context.get("tenant_id") or context.get("user_id"),
+                    hedge_after_ms=model_config["hedge_after_ms"],
+                )
+            else:
+                llm_result = self.client.call_llm(
+                    model=model,
+                    prompt=preprocessed,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    trace_id=self.trace_id,
+                )
             if not isinstance(llm_result, dict):
                 llm_result = {
                     "success": False,
@@ -402,6 +443,9 @@ class LLMRouter:
             gen_payload["model"]["tokens_used"] = _tu
             gen_payload["model"]["cost_usd"] = _cost
             gen_payload["model"]["latency_ms"] = total_latency
+            if llm_result.get("hedged"):
+                gen_payload["model"]["hedged"] = True
+                gen_payload["model"]["hedge_won"] = bool(llm_result.get("hedge_won"))
             gen_payload["output"] = {
                 "summary": text_summary(postprocessed, 200),
                 "content_sha256": sha256_hex(postprocessed),
@@ -409,6 +453,21 @@ class LLMRouter:
                 "raw_byte_length": len(postprocessed.encode("utf-8", errors="ignore")),
             }
             gen_payload["requested_event_id"] = requested_row_id
+            if cache_lookup is not None:
+                # Only validated output is reusable; a schema miss must be retried, not replayed.
+                stored = validated and response_cache.store(
+                    cache_lookup,
+                    model=model,
+                    intent=resolved_intent,
+                    content=postprocessed,
+                    tokens_used=_tu,
+                    cost_usd=_cost,
+                    latency_ms=total_latency,
+                    validated=validated,
+                    output_schema=output_schema,
+                    context=context,
+                )
+                gen_payload["cache"] = {"status": "miss", "stored": bool(stored)}
 
             record_ai_event(
                 "ai.response.generated",
@@ -495,6 +554,267 @@ class LLMRouter:
                 "error": error_msg,
             }
     
+    def _cached_result(
+        self,
+        cache_lookup,
+        *,
+        base_envelope: Dict[str, Any],
+        requested_row_id: Optional[int],
+        start_time: datetime,
+        resolved_intent: str,
+        model: str,
+        correlation_id: str,
+        user_row_id: Optional[int],
+        entity_type: str,
+        entity_id: Optional[int],
+        source: str,
+    ) -> Dict[str, Any]:
+        """Build the ``process`` result for a cache hit and log it as a zero-cost generation."""
+        entry = cache_lookup.entry
+        content = str(entry.get("content") or "")
+        total_latency = (datetime.now() - start_time).total_seconds() * 1000
+        cost_saved = _safe_float(entry.get("cost_usd"))
+        latency_saved = max(0.0, _safe_latency_ms(entry.get("latency_ms")) - total_latency)
+
+        cache_block: Dict[str, Any] = {
+            "status": "hit",
+            "match": cache_lookup.match,
+            "cost_saved_usd": cost_saved,
+            "latency_saved_ms": round(latency_saved, 1),
+            "tokens_saved": _safe_int(entry.get("tokens_used")),
+        }
+        if cache_lookup.similarity is not None:
+            cache_block["similarity"] = cache_lookup.similarity
+
+        gen_payload = dict(base_envelope)
+        gen_payload["model"]["tokens_used"] = 0
+        gen_payload["model"]["cost_usd"] = 0.0
+        gen_payload["model"]["latency_ms"] = total_latency
+        gen_payload["output"] = {
+            "summary": text_summary(content, 200),
+            "content_sha256": sha256_hex(content),
+            "validated": bool(entry.get("validated", True)),
+            "raw_byte_length": len(content.encode("utf-8", errors="ignore")),
+        }
+        gen_payload["requested_event_id"] = requested_row_id
+        gen_payload["cache"] = cache_block
+        record_ai_event(
+            "ai.response.generated",
+            user_id=user_row_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            correlation_id=correlation_id,
+            status="completed",
+            source=source,
+            payload=gen_payload,
+        )
+        logger.info(
+            "✅ AI response served from cache",
+            extra={
+                "event": "ai_cache_hit",
+                "service": "ai",
+                "severity": "INFO",
+                "trace_id": self.trace_id,
+                "intent": resolved_intent,
+                "model": model,
+                "match": cache_lookup.match,
+                "cost_saved_usd": cost_saved,
+            },
+        )
+        return {
+            "success": True,
+            "content": content,
+            "intent": resolved_intent,
+            "model": model,
+            "tokens_used": 0,
+            "cost_usd": 0.0,
+            "latency_ms": total_latency,
+            "trace_id": self.trace_id,
+            "correlation_id": correlation_id,
+            "validated": bool(entry.get("validated", True)),
+            "error": None,
+            "cached": True,
+        }
+
+    def process_stream(
+        self,
+        input_data: str,
+        intent: Optional[str] = None,
+        cost_budget: Optional[float] = None,
+        latency_requirement: Optional[str] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming counterpart of process() for free-text answers (no output schema).
+
+        Yields ``{"type": "token", "content": str}`` frames as the model produces them,
+        then one ``{"type": "done", ...}`` frame with the same fields as process()
+        plus ``first_token_ms``. The ai.requested / ai.response.generated events are
+        recorded as in process(); cost and latency are written after the last token.
+        """
+        self.trace_id = str(uuid.uuid4())
+        start_time = datetime.now()
+        context = ensure_correlation_in_context(context)
+        correlation_id = context["correlation_id"]
+        user_row_id = coerce_user_id(context.get("user_id"))
+        source = str(context.get("source") or "unknown")
+        entity_type = str(context.get("ai_entity_type") or "ai")
+        entity_id = coerce_user_id(context.get("ai_entity_id"))
+
+        resolved_intent = intent or "unknown"
+        model = "unknown"
+        base_envelope: Dict[str, Any] = {}
+
+        def _failed(error_msg: str, code: str, llm_done: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+            done = llm_done or {}
+            if base_envelope:
+                fail_payload = dict(base_envelope)
+                fail_payload["model"]["tokens_used"] = _safe_int(done.get("tokens_used"))
+                fail_payload["model"]["cost_usd"] = _safe_float(done.get("cost_usd"))
+                fail_payload["model"]["latency_ms"] = _safe_latency_ms(done.get("latency_ms"))
+                fail_payload["error"] = {"code": code, "message": error_msg}
+                record_ai_event(
+                    "ai.response.failed",
+                    user_id=user_row_id,
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    correlation_id=correlation_id,
+                    status="failed",
+                    error_message=error_msg,
+                    source=source,
+                    payload=fail_payload,
+                )
+            return {
+                "type": "done",
+                "success": False,
+                "content": done.get("content") or "",
+                "intent": resolved_intent,
+                "model": model,
+                "tokens_used": _safe_int(done.get("tokens_used")),
+                "cost_usd": _safe_float(done.get("cost_usd")),
+                "latency_ms": _safe_latency_ms(done.get("latency_ms")),
+                "first_token_ms": done.get("first_token_ms"),
+                "trace_id": self.trace_id,
+                "correlation_id": correlation_id,
+                "validated": False,
+                "error": error_msg,
+            }
+
+        try:
+            preprocessed = self.preprocess(input_data, context)
+            if not intent:
+                resolved_intent = self.detect_intent(preprocessed)
+            model_config = self.choose_model(resolved_intent, cost_budget, latency_requirement)
+            model = model_config["model"]
+            base_envelope = build_router_envelope_base(
+                correlation_id=correlation_id,
+                router_trace_id=self.trace_id,
+                intent=resolved_intent,
+                source=source,
+                context=context,
+                preprocessed_prompt=preprocessed,
+                model=model,
+                max_tokens=model_config["max_tokens"],
+                temperature=model_config["temperature"],
+            )
+            base_envelope["request"]["streamed"] = True
+            requested_row_id = record_ai_event(
+                "ai.requested",
+                user_id=user_row_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                correlation_id=correlation_id,
+                status="completed",
+                source=source,
+                payload=base_envelope,
+                buffered=False,  # row id is linked from the later generation event
+            )
+
+            llm_done: Dict[str, Any] = {}
+            for frame in self.client.stream_llm(
+                model=model,
+                prompt=preprocessed,
+                max_tokens=model_config["max_tokens"],
+                temperature=model_config["temperature"],
+                trace_id=self.trace_id,
+            ):
+                if frame.get("type") == "token":
+                    yield frame
+                else:
+                    llm_done = frame
+
+            if not llm_done.get("success"):
+                yield _failed(llm_done.get("error") or "LLM call failed", "llm_call_failed", llm_done)
+                return
+
+            postprocessed = self.postprocess(llm_done.get("content") or "", resolved_intent, context)
+            total_latency = (datetime.now() - start_time).total_seconds() * 1000
+            _tu = _safe_int(llm_done.get("tokens_used"))
+            _cost = _safe_float(llm_done.get("cost_usd"))
+            first_token_ms = llm_done.get("first_token_ms")
+
+            gen_payload = dict(base_envelope)
+            gen_payload["model"]["tokens_used"] = _tu
+            gen_payload["model"]["cost_usd"] = _cost
+            gen_payload["model"]["latency_ms"] = total_latency
+            gen_payload["model"]["first_token_ms"] = first_token_ms
+            gen_payload["output"] = {
+                "summary": text_summary(postprocessed, 200),
+                "content_sha256": sha256_hex(postprocessed),
+                "validated": True,
+                "raw_byte_length": len(postprocessed.encode("utf-8", errors="ignore")),
+            }
+            gen_payload["requested_event_id"] = requested_row_id
+            record_ai_event(
+                "ai.response.generated",
+                user_id=user_row_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                correlation_id=correlation_id,
+                status="completed",
+                source=source,
+                payload=gen_payload,
+            )
+            logger.info(
+                "✅ AI stream completed",
+                extra={
+                    "event": "ai_pipeline_complete",
+                    "service": "ai",
+                    "severity": "INFO",
+                    "trace_id": self.trace_id,
+                    "intent": resolved_intent,
+                    "model": model,
+                    "tokens_used": _tu,
+                    "cost_usd": _cost,
+                    "latency_ms": total_latency,
+                    "metadata": {"first_token_ms": first_token_ms, "streamed": True},
+                },
+            )
+            yield {
+                "type": "done",
+                "success": True,
+                "content": postprocessed,
+                "intent": resolved_intent,
+                "model": model,
+                "tokens_used": _tu,
+                "cost_usd": _cost,
+                "latency_ms": total_latency,
+                "first_token_ms": first_token_ms,
+                "trace_id": self.trace_id,
+                "correlation_id": correlation_id,
+                "validated": True,
+                "error": None,
+            }
+        except Exception as e:
+            logger.error("❌ AI stream failed: %s", e, extra={
+                "event": "ai_pipeline_error",
+                "service": "ai",
+                "severity": "ERROR",
+                "trace_id": self.trace_id,
+                "error": str(e),
+            })
+            yield _failed(str(e), "pipeline_exception")
+
     def preprocess(self, input_data: str, context: Optional[Dict[str, Any]] = None) -> str:
         """
         Preprocess input: sanitize, truncate if needed, add context.
@@ -563,7 +883,7 @@ class LLMRouter:
             latency_requirement: Optional latency requirement ('low', 'medium', 'high')
         
         Returns:
-            Dict with model, max_tokens, temperature
+            Dict with model, max_tokens, temperature (+ hedge_after_ms for latency 'low')
         """
         config = INTENT_MODEL_CONFIG.get(intent, INTENT_MODEL_CONFIG["general"]).copy()
         
@@ -578,6 +898,10 @@ class LLMRouter:
 
         if latency_requirement == "low":
             config["model"] = FALLBACK_LLM_MODEL
+            # Tail latency: duplicate a slow request once instead of waiting on it.
+            hedge_ms = hedge_after_ms()
+            if hedge_ms > 0:
+                config["hedge_after_ms"] = hedge_ms
         elif latency_requirement == "high":
             config["model"] = PREMIUM_LLM_MODEL
 
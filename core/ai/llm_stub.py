@@ -0,0 +1,135 @@
+"""
+Fikiri Solutions - Local LLM stub provider
+In-process stand-in for the OpenAI chat API, selected with FIKIRI_LLM_PROVIDER=stub.
+
+It mimics the response shape ``LLMClient`` reads (``choices[0].message.content`` and
+``usage.total_tokens``) for the sync, async, and streaming paths, so concurrency limits,
+hedging, and retries can be exercised without network access or an API key.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+def is_stub_provider_enabled() -> bool:
+    return os.getenv("FIKIRI_LLM_PROVIDER", "").strip().lower() == "stub"
+
+
+def _default_latency_seconds() -> float:
+    raw = os.getenv("FIKIRI_LLM_STUB_LATENCY_MS", "").strip()
+    try:
+        return max(0.0, float(raw) / 1000.0) if raw else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _last_user_message(messages: List[Dict[str, str]]) -> str:
+    for message in reversed(messages or []):
+        if message.get("role") == "user":
+            return str(message.get("content") or "")
+    return ""
+
+
+class StubLLMProvider:
+    """
+    Deterministic fake completions.
+
+    ``responder(model, messages)`` returns the reply text (or raises to simulate an API
+    error); the default echoes the user prompt. ``queue_latencies`` sets per-call delays
+    in seconds, consumed in call order, before falling back to FIKIRI_LLM_STUB_LATENCY_MS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.responder: Optional[Callable[[str, List[Dict[str, str]]], str]] = None
+            self._latencies: Deque[float] = deque()
+            self.calls: List[Dict[str, Any]] = []
+            self.in_flight = 0
+            self.peak_in_flight = 0
+
+    def queue_latencies(self, *seconds: float) -> None:
+        with self._lock:
+            self._latencies.extend(float(s) for s in seconds)
+
+    def _begin(self, model: str, messages: List[Dict[str, str]]) -> float:
+        with self._lock:
+            self.calls.append({"model": model, "messages": list(messages or [])})
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return self._latencies.popleft() if self._latencies else _default_latency_seconds()
+
+    def _end(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _reply(self, model: str, messages: List[Dict[str, str]]) -> str:
+        if self.responder is not None:
+            return self.responder(model, messages)
+        return f"[stub:{model}] {_last_user_message(messages)[:200]}"
+
+    @staticmethod
+    def _response(content: str, messages: List[Dict[str, str]]) -> SimpleNamespace:
+        prompt_tokens = max(1, sum(len(str(m.get("content") or "")) for m in messages or []) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=prompt_tokens + completion_tokens),
+        )
+
+    def complete(self, *, model: str, messages: List[Dict[str, str]], **_kwargs: Any) -> SimpleNamespace:
+        delay = self._begin(model, messages)
+        try:
+            if delay:
+                time.sleep(delay)
+            return self._response(self._reply(model, messages), messages)
+        finally:
+            self._end()
+
+    async def acomplete(self, *, model: str, messages: List[Dict[str, str]], **_kwargs: Any) -> SimpleNamespace:
+        delay = self._begin(model, messages)
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            return self._response(self._reply(model, messages), messages)
+        finally:
+            self._end()
+
+
+class _Completions:
+    def __init__(self, provider: StubLLMProvider, is_async: bool):
+        self._provider = provider
+        self._is_async = is_async
+
+    def create(self, **kwargs: Any):
+        if self._is_async:
+            return self._provider.acomplete(**kwargs)
+        if kwargs.get("stream"):
+            return self._stream(**kwargs)
+        return self._provider.complete(**kwargs)
+
+    def _stream(self, **kwargs: Any):
+        response = self._provider.complete(**kwargs)
+        content = response.choices[0].message.content
+        for start in range(0, len(content), 16):
+            delta = SimpleNamespace(content=content[start:start + 16])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=response.usage)
+
+
+class StubChatClient:
+    """Drop-in for ``openai.OpenAI`` / ``openai.AsyncOpenAI`` as used by ``LLMClient``."""
+
+    def __init__(self, provider: StubLLMProvider, *, is_async: bool = False):
+        self.chat = SimpleNamespace(completions=_Completions(provider, is_async))
+
+
+stub_provider = StubLLMProvider()
@@ -0,0 +1,422 @@
+"""
+Fikiri Solutions - LLM Response Cache
+Router-level cache for successful LLM results.
+
+Keys are sha256 over (scope, model, intent, normalized prompt, output_schema hash) so a
+cached reply never crosses tenants, models, or schemas. Entries live in Redis when it is
+configured and in a bounded per-process LRU otherwise. An optional embedding lookup serves
+near-duplicate prompts for low-temperature intents (classification / extraction) only.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from core.ai.ai_event_log import sha256_hex
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "fikiri:llm_cache:"
+CACHE_VERSION = "v1"
+
+# Seconds an entry stays valid per intent; 0 disables caching for that intent.
+INTENT_CACHE_TTL_SECONDS: Dict[str, int] = {
+    "classification": 6 * 3600,
+    "extraction": 6 * 3600,
+    "business_email_analysis": 3600,
+    "summarization": 3600,
+    "email_reply": 900,
+    "chatbot_response": 600,
+    "general": 300,
+}
+
+# Intents where a near-duplicate prompt may reuse an answer. Replies and summaries quote
+# names/amounts from the prompt, so they only ever hit on an exact key.
+SEMANTIC_INTENTS = frozenset({"classification", "extraction"})
+
+DEFAULT_MEMORY_MAX_ENTRIES = 2000
+DEFAULT_SEMANTIC_THRESHOLD = 0.97
+SEMANTIC_BUCKET_MAX = 200
+
+_TRUTHY = ("1", "true", "yes", "on")
+_FALSY = ("0", "false", "no", "off")
+
+
+def is_response_cache_enabled() -> bool:
+    """FIKIRI_LLM_RESPONSE_CACHE wins when set; otherwise on outside pytest."""
+    raw = os.getenv("FIKIRI_LLM_RESPONSE_CACHE", "").strip().lower()
+    if raw in _TRUTHY:
+        return True
+    if raw in _FALSY:
+        return False
+    return not bool(os.getenv("PYTEST_CURRENT_TEST"))
+
+
+def is_semantic_lookup_enabled() -> bool:
+    """Embedding lookup costs an embeddings call per miss, so it is opt-in."""
+    return os.getenv("FIKIRI_LLM_CACHE_SEMANTIC", "").strip().lower() in _TRUTHY
+
+
+def semantic_threshold() -> float:
+    raw = os.getenv("FIKIRI_LLM_CACHE_SEMANTIC_THRESHOLD", "").strip()
+    if not raw:
+        return DEFAULT_SEMANTIC_THRESHOLD
+    try:
+        return min(1.0, max(0.5, float(raw)))
+    except ValueError:
+        return DEFAULT_SEMANTIC_THRESHOLD
+
+
+def memory_max_entries() -> int:
+    raw = os.getenv("FIKIRI_LLM_CACHE_MAX_ENTRIES", "").strip()
+    try:
+        return max(10, int(raw)) if raw else DEFAULT_MEMORY_MAX_ENTRIES
+    except ValueError:
+        return DEFAULT_MEMORY_MAX_ENTRIES
+
+
+def ttl_for_intent(intent: Optional[str]) -> int:
+    return int(INTENT_CACHE_TTL_SECONDS.get(intent or "general", 0))
+
+
+def normalize_prompt(prompt: str) -> str:
+    """NFKC + collapsed whitespace so formatting-only differences share a key."""
+    text = unicodedata.normalize("NFKC", prompt or "")
+    return " ".join(text.split())
+
+
+def schema_fingerprint(output_schema: Optional[Dict[str, Any]]) -> str:
+    if not output_schema:
+        return "-"
+    try:
+        return sha256_hex(json.dumps(output_schema, sort_keys=True, default=str))[:16]
+    except (TypeError, ValueError):
+        return sha256_hex(repr(output_schema))[:16]
+
+
+def cache_scope(context: Optional[Dict[str, Any]]) -> str:
+    """Tenant first, then user; anonymous callers share the global scope."""
+    ctx = context or {}
+    tenant = ctx.get("tenant_id")
+    if tenant not in (None, ""):
+        return f"t:{tenant}"
+    user = ctx.get("user_id")
+    if user not in (None, ""):
+        return f"u:{user}"
+    return "global"
+
+
+def build_cache_key(
+    *,
+    scope: str,
+    model: str,
+    intent: str,
+    prompt: str,
+    output_schema: Optional[Dict[str, Any]] = None,
+) -> str:
+    material = "\x1f".join(
+        (CACHE_VERSION, scope, model, intent, schema_fingerprint(output_schema), normalize_prompt(prompt))
+    )
+    return KEY_PREFIX + sha256_hex(material)
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    if len(a) != len(b) or not a:
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    na = math.sqrt(sum(x * x for x in a))
+    nb = math.sqrt(sum(y * y for y in b))
+    if na == 0.0 or nb == 0.0:
+        return 0.0
+    return dot / (na * nb)
+
+
+class ResponseCacheBackend(Protocol):
+    def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    def set(self, key: str, entry: Dict[str, Any], ttl_seconds: int) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryResponseCacheBackend:
+    """Bounded LRU with per-entry expiry (single process)."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._max_entries = max_entries or memory_max_entries()
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return dict(entry)
+
+    def set(self, key: str, entry: Dict[str, Any], ttl_seconds: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, dict(entry))
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisResponseCacheBackend:
+    def __init__(self, client):
+        self._client = client
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.get(key)
+        if not raw:
+            return None
+        try:
+            entry = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def set(self, key: str, entry: Dict[str, Any], ttl_seconds: int) -> None:
+        self._client.setex(key, ttl_seconds, json.dumps(entry, default=str))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=KEY_PREFIX + "*", count=500):
+            self._client.delete(key)
+
+
+@dataclass
+class CacheLookup:
+    """Result of ``LLMResponseCache.lookup``; ``entry`` is None on a miss."""
+
+    key: str
+    ttl_seconds: int
+    entry: Optional[Dict[str, Any]] = None
+    match: Optional[str] = None
+    similarity: Optional[float] = None
+    embedding: Optional[List[float]] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.entry is not None
+
+
+class LLMResponseCache:
+    """Exact + optional semantic cache in front of ``LLMClient.call_llm``."""
+
+    def __init__(self, backend: Optional[ResponseCacheBackend] = None, embed_fn=None):
+        self._backend = backend
+        self._embed_fn = embed_fn
+        self._semantic_lock = threading.Lock()
+        # (scope, model, intent, schema) -> [(embedding, key, stored_at)], newest last.
+        self._semantic_index: Dict[Tuple[str, str, str, str], List[Tuple[List[float], str, float]]] = {}
+        self._stats_lock = threading.Lock()
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            "hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "errors": 0,
+            "cost_saved_usd": 0.0,
+            "latency_saved_ms": 0.0,
+        }
+
+    def _get_backend(self) -> ResponseCacheBackend:
+        if self._backend is None:
+            try:
+                from core.redis_connection_helper import get_redis_client
+
+                client = get_redis_client(decode_responses=True, db=0)
+            except Exception:
+                client = None
+            self._backend = (
+                RedisResponseCacheBackend(client) if client is not None else MemoryResponseCacheBackend()
+            )
+        return self._backend
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        embed_fn = self._embed_fn
+        if embed_fn is None:
+            from core.ai.embedding_client import get_embedding, is_embedding_available
+
+            if not is_embedding_available():
+                return None
+            embed_fn = get_embedding
+        try:
+            vector = embed_fn(text)
+        except Exception:
+            logger.debug("LLM cache embedding failed", exc_info=True)
+            return None
+        return list(vector) if vector else None
+
+    def _bump(self, **deltas: float) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                self._stats[name] = self._stats.get(name, 0) + delta
+
+    def lookup(
+        self,
+        *,
+        model: str,
+        intent: str,
+        prompt: str,
+        output_schema: Optional[Dict[str, Any]] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Optional[CacheLookup]:
+        """Return a ``CacheLookup`` (hit or miss), or None when this call is not cacheable."""
+        ttl = ttl_for_intent(intent)
+        if ttl <= 0 or not is_response_cache_enabled():
+            return None
+        scope = cache_scope(context)
+        key = build_cache_key(scope=scope, model=model, intent=intent, prompt=prompt, output_schema=output_schema)
+        result = CacheLookup(key=key, ttl_seconds=ttl)
+        try:
+            backend = self._get_backend()
+            entry = backend.get(key)
+            if entry is not None:
+                result.entry = entry
+                result.match = "exact"
+            elif intent in SEMANTIC_INTENTS and is_semantic_lookup_enabled():
+                result.embedding = self._embed(normalize_prompt(prompt))
+                if result.embedding:
+                    bucket = (scope, model, intent, schema_fingerprint(output_schema))
+                    self._semantic_match(result, bucket, backend)
+        except Exception:
+            logger.warning("LLM response cache lookup failed", exc_info=True)
+            self._bump(errors=1)
+            return result
+
+        if result.hit:
+            entry = result.entry
+            self._bump(
+                hits=1,
+                semantic_hits=1 if result.match == "semantic" else 0,
+                cost_saved_usd=float(entry.get("cost_usd") or 0.0),
+                latency_saved_ms=float(entry.get("latency_ms") or 0.0),
+            )
+        else:
+            self._bump(misses=1)
+        return result
+
+    def _semantic_match(self, result: CacheLookup, bucket, backend: ResponseCacheBackend) -> None:
+        threshold = semantic_threshold()
+        with self._semantic_lock:
+            candidates = list(self._semantic_index.get(bucket, ()))
+        best: Tuple[float, Optional[str]] = (0.0, None)
+        for vector, key, _stored_at in reversed(candidates):
+            score = _cosine(result.embedding, vector)
+            if score >= threshold and score > best[0]:
+                best = (score, key)
+        if best[1] is None:
+            return
+        entry = backend.get(best[1])
+        if entry is None:
+            return
+        result.entry = entry
+        result.match = "semantic"
+        result.similarity = round(best[0], 4)
+
+    def store(
+        self,
+        lookup: CacheLookup,
+        *,
+        model: str,
+        intent: str,
+        content: str,
+        tokens_used: int,
+        cost_usd: float,
+        latency_ms: float,
+        validated: bool,
+        output_schema: Optional[Dict[str, Any]] = None,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        entry = {
+            "content": content,
+            "model": model,
+            "intent": intent,
+            "tokens_used": int(tokens_used or 0),
+            "cost_usd": float(cost_usd or 0.0),
+            "latency_ms": float(latency_ms or 0.0),
+            "validated": bool(validated),
+            "stored_at": time.time(),
+        }
+        try:
+            self._get_backend().set(lookup.key, entry, lookup.ttl_seconds)
+        except Exception:
+            logger.warning("LLM response cache store failed", exc_info=True)
+            self._bump(errors=1)
+            return False
+        if lookup.embedding:
+            bucket = (cache_scope(context), model, intent, schema_fingerprint(output_schema))
+            with self._semantic_lock:
+                rows = self._semantic_index.setdefault(bucket, [])
+                rows.append((lookup.embedding, lookup.key, time.time()))
+                if len(rows) > SEMANTIC_BUCKET_MAX:
+                    del rows[: len(rows) - SEMANTIC_BUCKET_MAX]
+        self._bump(stores=1)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            snapshot = dict(self._stats)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+        snapshot["cost_saved_usd"] = round(snapshot["cost_saved_usd"], 6)
+        snapshot["latency_saved_ms"] = round(snapshot["latency_saved_ms"], 1)
+        return snapshot
+
+    def clear(self) -> None:
+        if self._backend is not None:
+            try:
+                self._backend.clear()
+            except Exception:
+                logger.debug("LLM response cache clear failed", exc_info=True)
+        with self._semantic_lock:
+            self._semantic_index.clear()
+        with self._stats_lock:
+            self._stats = self._empty_stats()
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache()
+    return _response_cache
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    return get_response_cache().stats()
+
+
+def reset_response_cache_for_tests(cache: Optional[LLMResponseCache] = None) -> None:
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is not None:
+            _response_cache.clear()
+        _response_cache = cache
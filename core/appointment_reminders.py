@@ -8,7 +8,7 @@ import logging
 import hashlib
 import base64
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from core.database_optimization import db_optimizer
 from core.idempotency_manager import idempotency_manager
 from core.automation_safety import automation_safety_manager
@@ -57,11 +57,131 @@ def send_appointment_reminder_email(user_id: int, to_email: str, appointment: Di
         return {"success": False, "error": str(e)}
 
 
+_REMINDER_WINDOWS = {
+    24: (REMINDER_24H_WINDOW_START_HOURS, REMINDER_24H_WINDOW_END_HOURS),
+    2: (REMINDER_2H_WINDOW_START_HOURS, REMINDER_2H_WINDOW_END_HOURS),
+}
+
+
+def appointment_reminder_due(hours: int, now: Optional[datetime] = None) -> Tuple[str, Tuple[str, str]]:
+    """Due predicate (unqualified columns) and params for the ``hours``-before reminder window."""
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    start_hours, end_hours = _REMINDER_WINDOWS[hours]
+    due_sql = (
+        "start_time >= ? AND start_time < ? AND status IN ('scheduled', 'confirmed') "
+        f"AND reminder_{hours}h_sent = 0"
+    )
+    return due_sql, (
+        (now + timedelta(hours=start_hours)).isoformat(),
+        (now + timedelta(hours=end_hours)).isoformat(),
+    )
+
+
+def _reminder_key(apt: Dict[str, Any], hours: int) -> str:
+    return hashlib.sha256(f"appointment_reminder|{hours}h|{apt['id']}".encode("utf-8")).hexdigest()
+
+
+def _send_reminder(apt: Dict[str, Any], hours: int, claimed_key: Optional[str] = None) -> bool:
+    """
+    Send one reminder and mark it sent; False when skipped (already sent) or failed.
+    ``claimed_key`` is an idempotency key the caller already holds (``claim_keys_bulk``).
+    """
+    key = claimed_key
+    try:
+        if key is None:
+            key = _reminder_key(apt, hours)
+            cached = idempotency_manager.check_key(key)
+            if cached and cached.get("status") == "completed":
+                return False
+            idempotency_manager.store_key(key, "appointment_reminder", apt["user_id"], {"appointment_id": apt["id"], "hours": hours})
+
+        safety = automation_safety_manager.check_rate_limits(
+            user_id=apt["user_id"],
+            action_type="appointment_reminder",
+            target_contact=apt.get("contact_email") or apt.get("user_email") or "unknown"
+        )
+        if not safety.get("allowed"):
+            raise ValueError("automation_blocked")
+
+        # Send email
+        to_email = apt.get('contact_email') or apt.get('user_email')
+        send_appointment_reminder_email(apt['user_id'], to_email, apt, _REMINDER_WINDOWS[hours][0])
+
+        # Mark as sent
+        db_optimizer.execute_query(f"""
+            UPDATE appointments 
+            SET reminder_{hours}h_sent = 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (apt['id'],), fetch=False)
+
+        if apt.get("contact_id"):
+            enhanced_crm_service.add_lead_activity(
+                apt["contact_id"],
+                apt["user_id"],
+                "meeting_scheduled",
+                f"Appointment reminder sent ({hours}h)",
+                metadata={"appointment_id": apt["id"], "hours_before": hours}
+            )
+
+        automation_safety_manager.log_automation_action(
+            user_id=apt["user_id"],
+            rule_id=0,
+            action_type=f"appointment_reminder_{hours}h",
+            target_contact=apt.get("contact_email") or apt.get("user_email") or "unknown",
+            idempotency_key=key,
+            status="completed"
+        )
+        idempotency_manager.update_key_result(key, "completed", {"success": True})
+        logger.info(f"✅ Sent {hours}h reminder for appointment {apt['id']}")
+        return True
+    except Exception as e:
+        if key:
+            idempotency_manager.update_key_result(key, "failed", {"success": False, "error": str(e)})
+        logger.error(f"❌ Failed to send {hours}h reminder for appointment {apt['id']}: {e}")
+        return False
+
+
+def send_due_appointment_reminders(
+    user_id: int, hours: int, now: Optional[datetime] = None, limit: Optional[int] = None
+) -> Dict[str, Any]:
+    """Claim (see core.delivery_executor) and send one user's due ``hours``-before reminders."""
+    from core.delivery_executor import claim_due_rows, new_claim_token
+
+    due_sql, due_params = appointment_reminder_due(hours, now)
+    token = new_claim_token()
+    claimed = claim_due_rows(
+        db_optimizer, "appointments", user_id, due_sql, due_params, "start_time ASC, id ASC", token, limit=limit
+    )
+    appointments = db_optimizer.execute_query(f"""
+        SELECT a.*, u.email as user_email
+        FROM appointments a
+        JOIN users u ON a.user_id = u.id
+        WHERE a.user_id = ? AND a.claimed_by = ? AND a.reminder_{hours}h_sent = 0
+    """, (user_id, token))
+    appointments = appointments or []
+    keys = {_reminder_key(apt, hours): {"appointment_id": apt["id"], "hours": hours} for apt in appointments}
+    held = idempotency_manager.claim_keys_bulk("appointment_reminder", keys, user_id) if keys else set()
+    sent_count = 0
+    for apt in appointments:
+        key = _reminder_key(apt, hours)
+        if key in held and _send_reminder(apt, hours, claimed_key=key):
+            sent_count += 1
+    return {'success': True, 'reminders_sent': sent_count, 'claimed': claimed}
+
+
 def run_reminder_job():
-    """Run reminder job - checks appointments and sends reminders"""
+    """
+    Run reminder job - checks appointments and sends reminders.
+    Manual, unsharded pass; the scheduler uses core.delivery_executor (rows it has claimed are skipped here).
+    """
     try:
+        from core.delivery_executor import _lease_cutoff
+
         # Use UTC consistently for timezone-aware datetime
         now = datetime.now(timezone.utc)
+        lease_cutoff = _lease_cutoff()
         
         # 24-hour window: appointments starting between 24h and 25h from now
         window_24h_start = now + timedelta(hours=REMINDER_24H_WINDOW_START_HOURS)
@@ -79,7 +199,8 @@ def run_reminder_job():
             WHERE a.start_time >= ? AND a.start_time < ?
             AND a.status IN ('scheduled', 'confirmed')
             AND a.reminder_24h_sent = 0
-        """, (window_24h_start.isoformat(), window_24h_end.isoformat()))
+            AND (a.claimed_by IS NULL OR a.claimed_at < ?)
+        """, (window_24h_start.isoformat(), window_24h_end.isoformat(), lease_cutoff))
         
         # Get appointments needing 2h reminder
         appointments_2h = db_optimizer.execute_query("""
@@ -89,119 +210,16 @@ def run_reminder_job():
             WHERE a.start_time >= ? AND a.start_time < ?
             AND a.status IN ('scheduled', 'confirmed')
             AND a.reminder_2h_sent = 0
-        """, (window_2h_start.isoformat(), window_2h_end.isoformat()))
+            AND (a.claimed_by IS NULL OR a.claimed_at < ?)
+        """, (window_2h_start.isoformat(), window_2h_end.isoformat(), lease_cutoff))
         
         sent_count = 0
-        
-        # Send 24h reminders
         for apt in appointments_24h:
-            try:
-                key = None
-                key = hashlib.sha256(f"appointment_reminder|24h|{apt['id']}".encode("utf-8")).hexdigest()
-                cached = idempotency_manager.check_key(key)
-                if cached and cached.get("status") == "completed":
-                    continue
-                idempotency_manager.store_key(key, "appointment_reminder", apt["user_id"], {"appointment_id": apt["id"], "hours": 24})
-
-                safety = automation_safety_manager.check_rate_limits(
-                    user_id=apt["user_id"],
-                    action_type="appointment_reminder",
-                    target_contact=apt.get("contact_email") or apt.get("user_email") or "unknown"
-                )
-                if not safety.get("allowed"):
-                    raise ValueError("automation_blocked")
-
-                # Send email
-                to_email = apt.get('contact_email') or apt.get('user_email')
-                send_appointment_reminder_email(apt['user_id'], to_email, apt, REMINDER_24H_WINDOW_START_HOURS)
-                
-                # Mark as sent
-                db_optimizer.execute_query("""
-                    UPDATE appointments 
-                    SET reminder_24h_sent = 1, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (apt['id'],), fetch=False)
-
-                if apt.get("contact_id"):
-                    enhanced_crm_service.add_lead_activity(
-                        apt["contact_id"],
-                        apt["user_id"],
-                        "meeting_scheduled",
-                        "Appointment reminder sent (24h)",
-                        metadata={"appointment_id": apt["id"], "hours_before": 24}
-                    )
-
-                automation_safety_manager.log_automation_action(
-                    user_id=apt["user_id"],
-                    rule_id=0,
-                    action_type="appointment_reminder_24h",
-                    target_contact=apt.get("contact_email") or apt.get("user_email") or "unknown",
-                    idempotency_key=key,
-                    status="completed"
-                )
-                idempotency_manager.update_key_result(key, "completed", {"success": True})
-                
+            if _send_reminder(apt, 24):
                 sent_count += 1
-                logger.info(f"✅ Sent 24h reminder for appointment {apt['id']}")
-            except Exception as e:
-                if key:
-                    idempotency_manager.update_key_result(key, "failed", {"success": False, "error": str(e)})
-                logger.error(f"❌ Failed to send 24h reminder for appointment {apt['id']}: {e}")
-        
-        # Send 2h reminders
         for apt in appointments_2h:
-            try:
-                key = None
-                key = hashlib.sha256(f"appointment_reminder|2h|{apt['id']}".encode("utf-8")).hexdigest()
-                cached = idempotency_manager.check_key(key)
-                if cached and cached.get("status") == "completed":
-                    continue
-                idempotency_manager.store_key(key, "appointment_reminder", apt["user_id"], {"appointment_id": apt["id"], "hours": 2})
-
-                safety = automation_safety_manager.check_rate_limits(
-                    user_id=apt["user_id"],
-                    action_type="appointment_reminder",
-                    target_contact=apt.get("contact_email") or apt.get("user_email") or "unknown"
-                )
-                if not safety.get("allowed"):
-                    raise ValueError("automation_blocked")
-
-                # Send email
-                to_email = apt.get('contact_email') or apt.get('user_email')
-                send_appointment_reminder_email(apt['user_id'], to_email, apt, REMINDER_2H_WINDOW_START_HOURS)
-                
-                # Mark as sent
-                db_optimizer.execute_query("""
-                    UPDATE appointments 
-                    SET reminder_2h_sent = 1, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (apt['id'],), fetch=False)
-
-                if apt.get("contact_id"):
-                    enhanced_crm_service.add_lead_activity(
-                        apt["contact_id"],
-                        apt["user_id"],
-                        "meeting_scheduled",
-                        "Appointment reminder sent (2h)",
-                        metadata={"appointment_id": apt["id"], "hours_before": 2}
-                    )
-
-                automation_safety_manager.log_automation_action(
-                    user_id=apt["user_id"],
-                    rule_id=0,
-                    action_type="appointment_reminder_2h",
-                    target_contact=apt.get("contact_email") or apt.get("user_email") or "unknown",
-                    idempotency_key=key,
-                    status="completed"
-                )
-                idempotency_manager.update_key_result(key, "completed", {"success": True})
-                
+            if _send_reminder(apt, 2):
                 sent_count += 1
-                logger.info(f"✅ Sent 2h reminder for appointment {apt['id']}")
-            except Exception as e:
-                if key:
-                    idempotency_manager.update_key_result(key, "failed", {"success": False, "error": str(e)})
-                logger.error(f"❌ Failed to send 2h reminder for appointment {apt['id']}: {e}")
         
         if sent_count > 0:
             logger.info(f"✅ Reminder job completed: {sent_count} reminders sent")
@@ -19,11 +19,18 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Iterator, Optional
 
 from core.database_optimization import db_optimizer
+from core.event_sink import enqueue_event_row
 
 logger = logging.getLogger(__name__)
 
 _MAX_PAYLOAD_BYTES = 16 * 1024
 
+_AUTOMATION_RUN_EVENT_COLUMNS = (
+    "created_at", "user_id", "run_id", "job_id", "correlation_id",
+    "event_type", "entity_type", "entity_id", "supersedes_event_id",
+    "status", "error_message", "source", "payload_json", "payload_truncated",
+)
+
 _ctx_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("automation_run_id", default=None)
 _ctx_job_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("automation_job_id", default=None)
 _ctx_correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
@@ -185,7 +192,25 @@ def record_automation_run_event(
     eff_source = source if source is not None else _ctx_source.get()
     eff_corr = correlation_id if correlation_id else _ctx_correlation_id.get()
 
+    values = (
+        created_at,
+        user_id,
+        run_id,
+        job_id,
+        eff_corr,
+        event_type,
+        entity_type,
+        entity_id,
+        supersedes_event_id,
+        status,
+        error_message,
+        eff_source,
+        payload_json,
+        truncated,
+    )
     try:
+        if enqueue_event_row("automation_run_events", _AUTOMATION_RUN_EVENT_COLUMNS, values):
+            return
         db_optimizer.execute_query(
             """
             INSERT INTO automation_run_events (
@@ -194,22 +219,7 @@ def record_automation_run_event(
                 status, error_message, source, payload_json, payload_truncated
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                created_at,
-                user_id,
-                run_id,
-                job_id,
-                eff_corr,
-                event_type,
-                entity_type,
-                entity_id,
-                supersedes_event_id,
-                status,
-                error_message,
-                eff_source,
-                payload_json,
-                truncated,
-            ),
+            values,
             fetch=False,
         )
     except Exception as exc:  # noqa: BLE001
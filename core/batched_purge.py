@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Batched retention purges.
+
+A single ``DELETE ... WHERE created_at < ?`` on a large table holds the write lock for
+the whole statement (on SQLite that blocks every other writer) and produces one huge
+WAL/transaction. ``purge_in_batches`` instead walks the table in primary-key order: each
+batch finds the next ``batch_size`` matching keys, deletes that key range in its own
+short statement, then sleeps briefly so other writers get the lock. The last key deleted
+is returned as a cursor, so a run that hits its time budget can be resumed from where it
+stopped instead of rescanning the start of the table.
+"""
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from core.database_optimization import db_optimizer
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+PURGE_PAUSE_MS = int(os.getenv("PURGE_PAUSE_MS", "50"))
+PURGE_TIME_BUDGET_SECONDS = float(os.getenv("PURGE_TIME_BUDGET_SECONDS", "300"))
+
+
+@dataclass
+class PurgeStats:
+    """Outcome of one ``purge_in_batches`` call for one table."""
+    table: str
+    deleted: int = 0
+    batches: int = 0
+    elapsed_ms: int = 0
+    complete: bool = False
+    cursor: Any = None  # last key deleted; pass back as ``cursor`` to resume an incomplete run
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def purge_deadline(budget_seconds: Optional[float] = None) -> float:
+    """``time.monotonic()`` deadline for a purge run with the given (or default) budget."""
+    budget = PURGE_TIME_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+    return time.monotonic() + max(0.0, float(budget))
+
+
+def purge_in_batches(
+    table: str,
+    where_sql: str,
+    params: Sequence[Any] = (),
+    *,
+    key: str = "id",
+    batch_size: int = PURGE_BATCH_SIZE,
+    pause_seconds: Optional[float] = None,
+    deadline: Optional[float] = None,
+    cursor: Any = None,
+    before_delete: Optional[Callable[[Any, Any], None]] = None,
+    db=None,
+) -> PurgeStats:
+    """
+    Delete rows of ``table`` matching ``where_sql`` in key-range batches.
+
+    Stops when no matching rows remain (``complete=True``, ``cursor=None``) or when
+    ``deadline`` (a ``time.monotonic()`` value) has passed, returning the cursor to resume
+    from. ``before_delete(lo, hi)`` runs before each range is deleted so callers can remove
+    dependent rows (``lo`` is exclusive and None on the first batch, ``hi`` inclusive).
+    Table, key and condition are trusted SQL from the caller; only values are bound.
+    """
+    db = db or db_optimizer
+    batch_size = max(1, int(batch_size))
+    pause = PURGE_PAUSE_MS / 1000.0 if pause_seconds is None else max(0.0, pause_seconds)
+    stats = PurgeStats(table=table, cursor=cursor)
+    started = time.monotonic()
+    cond = f"({where_sql})"
+
+    while True:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        lo = stats.cursor
+        range_sql = f"{key} > ? AND " if lo is not None else ""
+        range_params = (lo,) if lo is not None else ()
+        rows = db.execute_query(
+            f"SELECT {key} FROM {table} WHERE {range_sql}{cond} ORDER BY {key} ASC LIMIT ?",
+            (*range_params, *params, batch_size),
+        )
+        if not rows:
+            stats.complete = True
+            stats.cursor = None
+            break
+        last = rows[-1]
+        hi = last[key] if hasattr(last, "keys") else last[0]
+        if before_delete is not None:
+            before_delete(lo, hi)
+        deleted = db.execute_query(
+            f"DELETE FROM {table} WHERE {range_sql}{key} <= ? AND {cond}",
+            (*range_params, hi, *params),
+            fetch=False,
+        )
+        stats.deleted += deleted if isinstance(deleted, int) and deleted > 0 else 0
+        stats.batches += 1
+        stats.cursor = hi
+        if len(rows) < batch_size:
+            stats.complete = True
+            stats.cursor = None
+            break
+        if pause:
+            time.sleep(pause)
+
+    stats.elapsed_ms = int((time.monotonic() - started) * 1000)
+    if not stats.complete:
+        logger.info(
+            "Purge of %s paused at time budget: deleted=%s batches=%s cursor=%s",
+            table, stats.deleted, stats.batches, stats.cursor,
+        )
+    return stats
+
+
+__all__ = ["PurgeStats", "purge_deadline", "purge_in_batches"]
@@ -10,7 +10,7 @@ import json
 import logging
 import os
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from core.ai.llm_router import LLMRouter
 from core.ai.schemas import ChatbotResponseSchema
@@ -68,8 +68,17 @@ def _resolve_config(
     return load_chatbot_config(uid if isinstance(uid, int) else None, tenant_id=tenant_id)
 
 
-def build_chatbot_prompt(query: str, context_text: str, config: ChatbotConfig) -> str:
-    """Assemble LLM prompt from retrieved context and safe tenant config fields."""
+def build_chatbot_prompt(
+    query: str,
+    context_text: str,
+    config: ChatbotConfig,
+    *,
+    structured: bool = True,
+) -> str:
+    """Assemble LLM prompt from retrieved context and safe tenant config fields.
+
+    ``structured=False`` asks for a plain-text answer so it can be streamed to the widget.
+    """
     role = (
         f"You are {config.chatbot_name}, a customer support chatbot for {config.business_name}."
     )
@@ -102,9 +111,14 @@ def build_chatbot_prompt(query: str, context_text: str, config: ChatbotConfig) -
         "",
         f"User question: {query}",
         "",
-        "Return JSON with fields: answer, confidence (0-1), fallback_used (true/false), "
-        "sources (list of source ids), follow_up (optional).",
     ])
+    if structured:
+        lines.append(
+            "Return JSON with fields: answer, confidence (0-1), fallback_used (true/false), "
+            "sources (list of source ids), follow_up (optional)."
+        )
+    else:
+        lines.append("Reply with the answer text only (no JSON, no markdown headings).")
     return "\n".join(lines)
 
 
@@ -194,3 +208,91 @@ def generate_chatbot_answer(
             "chatbot_config_applied": True,
         },
     )
+
+
+def stream_chatbot_answer(
+    query: str,
+    context_text: str,
+    sources: List[Dict[str, Any]],
+    *,
+    tenant_id: Optional[str],
+    user_id: Optional[int],
+    conversation_id: Optional[str] = None,
+    correlation_id: Optional[str] = None,
+    billing_uid: Optional[int] = None,
+    fallback_needed: bool = False,
+    allow_llm: bool = True,
+    chatbot_config: Optional[ChatbotConfig] = None,
+) -> Iterator[Union[str, ChatbotAnswerResult]]:
+    """
+    Streaming variant of ``generate_chatbot_answer``.
+
+    Yields answer text fragments (``str``) as they arrive, then one ``ChatbotAnswerResult``.
+    The model is asked for plain text, so there is no LLM self-reported confidence; the
+    low-confidence gate runs on retrieval confidence *before* any tokens are sent.
+    """
+    config = _resolve_config(chatbot_config, user_id, tenant_id, billing_uid)
+    retrieval_conf = retrieval_confidence(sources)
+    combined = _combine_confidence(retrieval_conf, None)
+    threshold = _confidence_threshold()
+    llm_result: Dict[str, Any] = {}
+    llm_attempted = False
+    streamed: List[str] = []
+
+    if not allow_llm or fallback_needed:
+        answer, fallback_used = config.fallback_message, True
+    elif combined < threshold:
+        answer, fallback_used = config.low_confidence_message(), True
+    else:
+        router = LLMRouter()
+        llm_user_id = billing_uid if billing_uid is not None else user_id
+        llm_attempted = True
+        for frame in router.process_stream(
+            input_data=build_chatbot_prompt(query, context_text, config, structured=False),
+            intent="chatbot_response",
+            context={
+                "conversation_id": conversation_id,
+                "tenant_id": tenant_id,
+                "user_id": llm_user_id,
+                "source": "public_chatbot",
+                "correlation_id": correlation_id,
+            },
+        ):
+            if frame.get("type") == "token":
+                streamed.append(frame["content"])
+                yield frame["content"]
+            else:
+                llm_result = frame
+        if llm_result.get("success") and llm_result.get("content"):
+            answer, fallback_used = llm_result["content"], False
+        elif streamed:
+            # Tokens already reached the visitor; keep what they saw rather than swap text.
+            answer, fallback_used = "".join(streamed).strip(), True
+        else:
+            logger.warning("LLM stream failed: %s", llm_result.get("error"))
+            answer, fallback_used = config.fallback_message, True
+
+    if not streamed:
+        yield answer
+
+    yield ChatbotAnswerResult(
+        answer=answer,
+        confidence=combined,
+        llm_confidence=None,
+        combined_confidence=combined,
+        fallback_used=fallback_used,
+        escalation_recommended=fallback_used or combined < threshold,
+        llm_trace_id=llm_result.get("trace_id"),
+        retrieval_confidence=retrieval_conf,
+        response_metadata={
+            "llm_attempted": llm_attempted,
+            "llm_success": bool(llm_result.get("success")),
+            "llm_validated": bool(llm_result.get("validated")),
+            "confidence_threshold": threshold,
+            "chatbot_config_applied": True,
+            "streamed": True,
+            "first_token_ms": llm_result.get("first_token_ms"),
+            "tokens_used": llm_result.get("tokens_used"),
+            "cost_usd": llm_result.get("cost_usd"),
+        },
+    )
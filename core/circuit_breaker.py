@@ -85,6 +85,29 @@ class CircuitBreaker:
             CircuitBreakerOpenError: If circuit is open and fail_open=False
             Exception: Original exception if circuit is open and fail_open=True
         """
+        self.before_call()
+        
+        # Execute function
+        try:
+            result = func(*args, **kwargs)
+            self.record_success()
+            return result
+        except self.expected_exception as e:
+            self.record_failure()
+            raise
+        except Exception as e:
+            # Unexpected exception - log but don't count as circuit breaker failure
+            logger.warning(f"Circuit breaker '{self.name}' caught unexpected exception: {e}")
+            raise
+    
+    def before_call(self):
+        """
+        Gate a call made outside ``call()`` (e.g. an awaited coroutine); pair it with
+        ``record_success()`` / ``record_failure()``.
+        
+        Raises:
+            CircuitBreakerOpenError: If circuit is open and fail_open=False
+        """
         with self.lock:
             # Check if circuit should transition from OPEN to HALF_OPEN
             if self.state == CircuitState.OPEN:
@@ -101,21 +124,8 @@ class CircuitBreaker:
             # If OPEN and fail_open=True, allow request but it will likely fail
             if self.state == CircuitState.OPEN and self.fail_open:
                 logger.warning(f"Circuit breaker '{self.name}' is OPEN (fail_open=True), allowing request")
-        
-        # Execute function
-        try:
-            result = func(*args, **kwargs)
-            self._on_success()
-            return result
-        except self.expected_exception as e:
-            self._on_failure()
-            raise
-        except Exception as e:
-            # Unexpected exception - log but don't count as circuit breaker failure
-            logger.warning(f"Circuit breaker '{self.name}' caught unexpected exception: {e}")
-            raise
     
-    def _on_success(self):
+    def record_success(self):
         """Handle successful call"""
         with self.lock:
             if self.state == CircuitState.HALF_OPEN:
@@ -130,7 +140,7 @@ class CircuitBreaker:
                 # Reset failure count on success
                 self.failure_count = 0
     
-    def _on_failure(self):
+    def record_failure(self):
         """Handle failed call"""
         with self.lock:
             self.failure_count += 1
@@ -10,6 +10,7 @@ import threading
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
+from core.batched_purge import PURGE_BATCH_SIZE, PURGE_TIME_BUDGET_SECONDS, purge_deadline, purge_in_batches
 from core.database_optimization import db_optimizer
 
 logger = logging.getLogger(__name__)
@@ -27,6 +28,10 @@ class CleanupScheduler:
         self.job_retention_days = int(os.getenv('CLEANUP_JOB_RETENTION_DAYS', '30'))
         self.email_retention_days = int(os.getenv('CLEANUP_EMAIL_RETENTION_DAYS', '90'))
         self.log_retention_days = int(os.getenv('CLEANUP_LOG_RETENTION_DAYS', '30'))
+        self.purge_batch_size = int(os.getenv('CLEANUP_PURGE_BATCH_SIZE', str(PURGE_BATCH_SIZE)))
+        self.purge_time_budget = float(os.getenv('CLEANUP_TIME_BUDGET_SECONDS', str(PURGE_TIME_BUDGET_SECONDS)))
+        self._purge_cursors: Dict[str, Any] = {}  # table name -> resume key after a budget-limited run
+        self.purge_stats: Dict[str, Dict[str, Any]] = {}  # table name -> last PurgeStats
     
     def start(self):
         """Start the cleanup scheduler (idempotent: safe to call multiple times)."""
@@ -54,13 +59,20 @@ class CleanupScheduler:
                 # Delivery layer: due follow-ups and calendar reminders (e.g. every 10 min)
                 if now - self._last_follow_ups >= self.follow_up_interval:
                     try:
-                        from core.workflow_followups import run_due_follow_ups_for_all_users, process_due_calendar_reminders
-                        r = run_due_follow_ups_for_all_users()
+                        from core import delivery_executor as de
+                        kinds = [de.DELIVERY_KIND_FOLLOW_UPS, de.DELIVERY_KIND_CALENDAR]
+                        if os.getenv("DELIVERY_APPOINTMENT_REMINDERS", "").strip().lower() in ("1", "true", "yes", "on"):
+                            kinds += [de.DELIVERY_KIND_APPOINTMENT_24H, de.DELIVERY_KIND_APPOINTMENT_2H]
+                        d = de.run_due_deliveries(kinds=kinds)
+                        r = d.get(de.DELIVERY_KIND_FOLLOW_UPS, {})
                         if r.get("processed") or r.get("failed"):
-                            logger.info("Follow-ups run: users=%s processed=%s failed=%s", r.get("users_run"), r.get("processed"), r.get("failed"))
-                        c = process_due_calendar_reminders()
+                            logger.info("Follow-ups run: users=%s processed=%s failed=%s", r.get("tenants"), r.get("processed"), r.get("failed"))
+                        c = d.get(de.DELIVERY_KIND_CALENDAR, {})
                         if c.get("reminded"):
                             logger.info("Calendar reminders: reminded=%s", c.get("reminded"))
+                        for kind in (de.DELIVERY_KIND_APPOINTMENT_24H, de.DELIVERY_KIND_APPOINTMENT_2H):
+                            if d.get(kind, {}).get("reminders_sent"):
+                                logger.info("Appointment reminders %s: sent=%s", kind, d[kind]["reminders_sent"])
                         from services.automation_engine import run_due_time_based_automations
                         tb = run_due_time_based_automations()
                         if tb.get("due_count", 0) > 0:
@@ -70,91 +82,154 @@ class CleanupScheduler:
                     self._last_follow_ups = now
                 # Cleanup tasks (hourly)
                 if now - self._last_cleanup >= self.cleanup_interval:
-                    self.cleanup_old_email_jobs()
-                    self.cleanup_old_sync_records()
-                    self.cleanup_old_analytics_events()
-                    self.cleanup_old_performance_logs()
-                    self.cleanup_expired_sessions()
+                    self.run_cleanup_cycle()
                     self._last_cleanup = now
                 time.sleep(60)
             except Exception as e:
                 logger.error(f"❌ Cleanup scheduler error: {e}")
                 time.sleep(60)
     
-    def cleanup_old_email_jobs(self) -> Dict[str, Any]:
+    def _purge(self, name: str, table: str, where_sql: str, params: tuple,
+               cutoff: datetime, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Batched purge that resumes from the cursor left by a previous run that hit its budget."""
+        if deadline is None:
+            deadline = purge_deadline(self.purge_time_budget)
+        try:
+            stats = purge_in_batches(
+                table, where_sql, params,
+                batch_size=self.purge_batch_size,
+                deadline=deadline,
+                cursor=self._purge_cursors.get(name),
+                db=db_optimizer,
+            )
+        except Exception as e:
+            # One missing/locked table must not stop the remaining purges in the cycle.
+            logger.error("Cleanup of %s failed: %s", table, e)
+            return {'success': False, 'deleted_count': 0, 'cutoff_date': cutoff.isoformat(), 'error': str(e)}
+        self._purge_cursors[name] = stats.cursor
+        self.purge_stats[name] = stats.to_dict()
+        return {
+            'success': True,
+            'deleted_count': stats.deleted,
+            'cutoff_date': cutoff.isoformat(),
+            'batches': stats.batches,
+            'complete': stats.complete,
+            'elapsed_ms': stats.elapsed_ms,
+        }
+
+    def cleanup_old_email_jobs(self, deadline: Optional[float] = None) -> Dict[str, Any]:
         """Clean up old email jobs"""
         cutoff_date = datetime.utcnow() - timedelta(days=self.job_retention_days)
-        result = db_optimizer.execute_query(
-            "DELETE FROM email_jobs WHERE created_at < ? AND status IN ('sent', 'failed', 'cancelled')",
-            (cutoff_date.isoformat(),), fetch=False
+        result = self._purge(
+            'email_jobs', 'email_jobs',
+            "created_at < ? AND status IN ('sent', 'failed', 'cancelled')",
+            (cutoff_date.isoformat(),), cutoff_date, deadline,
         )
-        deleted_count = result if isinstance(result, int) else 0
-        logger.info(f"✅ Cleaned up {deleted_count} old email jobs")
-        return {'success': True, 'deleted_count': deleted_count, 'cutoff_date': cutoff_date.isoformat()}
+        logger.info(f"✅ Cleaned up {result['deleted_count']} old email jobs")
+        return result
     
-    def cleanup_old_sync_records(self) -> Dict[str, Any]:
+    def cleanup_old_sync_records(self, deadline: Optional[float] = None) -> Dict[str, Any]:
         """Clean up old email sync records"""
         cutoff_date = datetime.utcnow() - timedelta(days=self.email_retention_days)
-        result = db_optimizer.execute_query(
-            "DELETE FROM email_sync WHERE started_at < ? AND status IN ('completed', 'failed')",
-            (cutoff_date.isoformat(),), fetch=False
+        result = self._purge(
+            'sync_records', 'email_sync',
+            "started_at < ? AND status IN ('completed', 'failed')",
+            (cutoff_date.isoformat(),), cutoff_date, deadline,
         )
-        deleted_count = result if isinstance(result, int) else 0
-        logger.info(f"✅ Cleaned up {deleted_count} old sync records")
-        return {'success': True, 'deleted_count': deleted_count, 'cutoff_date': cutoff_date.isoformat()}
+        logger.info(f"✅ Cleaned up {result['deleted_count']} old sync records")
+        return result
     
-    def cleanup_old_analytics_events(self) -> Dict[str, Any]:
+    def cleanup_old_analytics_events(self, deadline: Optional[float] = None) -> Dict[str, Any]:
         """Clean up old analytics events"""
         cutoff_date = datetime.utcnow() - timedelta(days=self.log_retention_days)
-        result = db_optimizer.execute_query(
-            "DELETE FROM analytics_events WHERE created_at < ?",
-            (cutoff_date.isoformat(),), fetch=False
+        result = self._purge(
+            'analytics', 'analytics_events', "created_at < ?",
+            (cutoff_date.isoformat(),), cutoff_date, deadline,
         )
-        deleted_count = result if isinstance(result, int) else 0
-        logger.info(f"✅ Cleaned up {deleted_count} old analytics events")
-        return {'success': True, 'deleted_count': deleted_count, 'cutoff_date': cutoff_date.isoformat()}
+        logger.info(f"✅ Cleaned up {result['deleted_count']} old analytics events")
+        return result
     
-    def cleanup_old_performance_logs(self) -> Dict[str, Any]:
+    def cleanup_old_performance_logs(self, deadline: Optional[float] = None) -> Dict[str, Any]:
         """Clean up old performance logs"""
         cutoff_date = datetime.utcnow() - timedelta(days=self.log_retention_days)
-        result = db_optimizer.execute_query(
-            "DELETE FROM query_performance_log WHERE timestamp < ?",
-            (cutoff_date.isoformat(),), fetch=False
+        result = self._purge(
+            'performance', 'query_performance_log', "timestamp < ?",
+            (cutoff_date.isoformat(),), cutoff_date, deadline,
         )
-        deleted_count = result if isinstance(result, int) else 0
-        logger.info(f"✅ Cleaned up {deleted_count} old performance logs")
-        return {'success': True, 'deleted_count': deleted_count, 'cutoff_date': cutoff_date.isoformat()}
+        logger.info(f"✅ Cleaned up {result['deleted_count']} old performance logs")
+        return result
     
-    def cleanup_expired_sessions(self) -> Dict[str, Any]:
+    def cleanup_expired_sessions(self, deadline: Optional[float] = None) -> Dict[str, Any]:
         """Clean up expired user sessions"""
         now = datetime.utcnow()
         false_lit = db_optimizer.sql_false_literal()
-        result = db_optimizer.execute_query(
-            f"DELETE FROM user_sessions WHERE expires_at < ? OR is_valid = {false_lit}",
-            (now.isoformat(),), fetch=False
+        result = self._purge(
+            'sessions', 'user_sessions', f"expires_at < ? OR is_valid = {false_lit}",
+            (now.isoformat(),), now, deadline,
         )
-        deleted_count = result if isinstance(result, int) else 0
-        logger.info(f"✅ Cleaned up {deleted_count} expired sessions")
-        return {'success': True, 'deleted_count': deleted_count, 'cutoff_date': now.isoformat()}
+        logger.info(f"✅ Cleaned up {result['deleted_count']} expired sessions")
+        return result
     
-    def run_manual_cleanup(self, cleanup_type: str = 'all') -> Dict[str, Any]:
+    def run_cleanup_cycle(self) -> Dict[str, Any]:
+        """All retention purges under one shared time budget; unfinished tables resume next cycle."""
+        deadline = purge_deadline(self.purge_time_budget)
+        partitions = self.maintain_event_partitions(deadline)
+        results = self.run_manual_cleanup('all', deadline=deadline)
+        if partitions is not None:
+            results['event_partitions'] = partitions
+        try:
+            from company_chatbot.transcript_store import purge_expired_transcripts
+            results['site_chat_transcripts'] = {
+                'success': True,
+                'deleted_count': purge_expired_transcripts(deadline=deadline),
+            }
+        except Exception as e:
+            logger.error("Site chat transcript purge error: %s", e)
+        try:
+            from core.product_analytics_store import cleanup_expired_daily_metrics, cleanup_expired_product_events
+            results['product_events'] = cleanup_expired_product_events(deadline=deadline)
+            results['daily_metrics'] = cleanup_expired_daily_metrics(deadline=deadline)
+        except Exception as e:
+            logger.error("Product analytics purge error: %s", e)
+        return results
+
+    def maintain_event_partitions(self, deadline: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Create/archive monthly event partitions and drop expired ones (EVENT_TABLE_PARTITIONING only)."""
+        from core.event_partitions import maintain_event_partitions, partitioning_enabled
+
+        if not partitioning_enabled():
+            return None
+        retention = {
+            'analytics_events': self.log_retention_days,
+            'query_performance_log': self.log_retention_days,
+        }
+        try:
+            from core.product_analytics_registry import raw_retention_days
+            retention['product_events'] = raw_retention_days()
+        except Exception as e:
+            logger.debug("product_events retention unavailable: %s", e)
+        return maintain_event_partitions(retention, deadline=deadline, db=db_optimizer)
+
+    def run_manual_cleanup(self, cleanup_type: str = 'all', deadline: Optional[float] = None) -> Dict[str, Any]:
         """Run cleanup manually"""
         results = {}
+        if deadline is None:
+            deadline = purge_deadline(self.purge_time_budget)
         
         if cleanup_type == 'all' or cleanup_type == 'jobs':
-            results['email_jobs'] = self.cleanup_old_email_jobs()
+            results['email_jobs'] = self.cleanup_old_email_jobs(deadline)
         
         if cleanup_type == 'all' or cleanup_type == 'sync':
-            results['sync_records'] = self.cleanup_old_sync_records()
+            results['sync_records'] = self.cleanup_old_sync_records(deadline)
         
         if cleanup_type == 'all' or cleanup_type == 'analytics':
-            results['analytics'] = self.cleanup_old_analytics_events()
+            results['analytics'] = self.cleanup_old_analytics_events(deadline)
         
         if cleanup_type == 'all' or cleanup_type == 'performance':
-            results['performance'] = self.cleanup_old_performance_logs()
+            results['performance'] = self.cleanup_old_performance_logs(deadline)
         
         if cleanup_type == 'all' or cleanup_type == 'sessions':
-            results['sessions'] = self.cleanup_expired_sessions()
+            results['sessions'] = self.cleanup_expired_sessions(deadline)
         
         return results
 
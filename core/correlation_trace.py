@@ -8,6 +8,7 @@ import logging
 from typing import Any, Dict, List
 
 from core.database_optimization import db_optimizer
+from core.event_partitions import event_table_source
 
 logger = logging.getLogger(__name__)
 
@@ -65,9 +66,9 @@ def fetch_correlation_trace(
             (user_id, cid, lim),
         ),
         "email_events": _rows(
-            """
+            f"""
             SELECT id, created_at, event_type, provider, message_id, thread_id, lead_id, status, source, payload_truncated
-            FROM email_events
+            FROM {event_table_source("email_events")}
             WHERE user_id = ? AND correlation_id = ?
             ORDER BY created_at DESC
             LIMIT ?
@@ -75,9 +76,9 @@ def fetch_correlation_trace(
             (user_id, cid, lim),
         ),
         "ai_events": _rows(
-            """
+            f"""
             SELECT id, created_at, event_type, entity_type, entity_id, status, source, payload_truncated
-            FROM ai_events
+            FROM {event_table_source("ai_events")}
             WHERE user_id = ? AND correlation_id = ?
             ORDER BY created_at DESC
             LIMIT ?
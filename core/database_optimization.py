@@ -10,7 +10,8 @@ import logging
 import os
 import re
 import threading
-from typing import Dict, List, Any, Optional, Tuple, Union
+import uuid
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from contextlib import contextmanager
@@ -43,6 +44,9 @@ from core.postgres_compat import (
 
 logger = logging.getLogger(__name__)
 
+# Rows per fetchmany / server-side cursor round trip in DatabaseOptimizer.iter_query
+ITER_QUERY_BATCH_SIZE = int(os.getenv("ITER_QUERY_BATCH_SIZE", "500"))
+
 
 def _production_requires_postgres_uri() -> bool:
     """Production must use PostgreSQL (e.g. Supabase) unless explicitly overridden."""
@@ -456,6 +460,19 @@ class DatabaseOptimizer:
                 cursor.execute("ALTER TABLE leads ADD COLUMN withdrawn_at TIMESTAMP")
                 logger.info("✅ Added withdrawn_at column to leads table")
 
+            # Delivery claims (core.delivery_executor): lease columns on every table it shards.
+            for claim_table in ("scheduled_follow_ups", "calendar_events", "appointments"):
+                cursor.execute(f"PRAGMA table_info({claim_table})")
+                claim_columns = [row[1] for row in cursor.fetchall()]
+                if claim_columns and "claimed_by" not in claim_columns:
+                    cursor.execute(f"ALTER TABLE {claim_table} ADD COLUMN claimed_by TEXT")
+                    cursor.execute(f"ALTER TABLE {claim_table} ADD COLUMN claimed_at TIMESTAMP")
+                    logger.info("✅ Added claimed_by/claimed_at columns to %s table", claim_table)
+                if claim_columns:
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{claim_table}_claimed_by ON {claim_table} (claimed_by)"
+                    )
+
             # Email sync: run before heavier migrations — if a later step fails, inbox queries still work.
             cursor.execute("PRAGMA table_info(synced_emails)")
             synced_email_columns = [row[1] for row in cursor.fetchall()]
@@ -2455,6 +2472,9 @@ class DatabaseOptimizer:
                     logger.debug("Failed to return PostgreSQL connection to pool: %s", pool_error)
             elif conn and self.db_type != "postgresql":
                 try:
+                    # close() alone defers while a failed statement is still referenced (e.g.
+                    # from a retained traceback) and keeps its write lock; rollback resets it.
+                    conn.rollback()
                     conn.close()
                 except Exception as close_error:
                     logger.debug("Failed to close SQLite connection: %s", close_error)
@@ -2620,30 +2640,71 @@ class DatabaseOptimizer:
         msg = str(error).lower()
         return "locked" in msg or "busy" in msg
 
+    def _normalize_params(self, params: Optional[Tuple]) -> Optional[Tuple]:
+        """Validate JSON parameters if present and convert lists to JSON"""
+        if not params:
+            return params
+        converted_params = []
+        for param in params:
+            if isinstance(param, list):
+                # Convert list to JSON string for SQLite compatibility
+                param = json.dumps(param)
+            elif hasattr(param, 'keys') and hasattr(param, 'values'):
+                # Handle sqlite3.Row objects by converting to dict
+                try:
+                    param = dict(param)
+                except Exception:
+                    param = str(param)
+            elif isinstance(param, str) and param.startswith('{') and param.endswith('}'):
+                if not self.validate_json(param):
+                    raise ValueError(f"Invalid JSON parameter: {param}")
+            converted_params.append(param)
+        return tuple(converted_params)
+
+    def iter_query(self, query: str, params: Tuple = None,
+                   batch_size: int = ITER_QUERY_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a SELECT as dict rows without materializing the result set.
+
+        PostgreSQL uses a named (server-side) cursor that ships ``batch_size`` rows per
+        round trip; SQLite steps its cursor with ``fetchmany``. The connection is held
+        until the generator is exhausted or closed, so consume it promptly (no other
+        queries on the same thread need to wait, but Postgres keeps a pool slot).
+        """
+        start_time = time.time()
+        params = self._normalize_params(params)
+        batch_size = max(1, int(batch_size))
+        rows_read = 0
+        with self.get_connection() as conn:
+            if self.db_type == "postgresql":
+                from psycopg2.extras import RealDictCursor
+
+                cursor = conn.cursor(name=f"fikiri_iter_{uuid.uuid4().hex[:16]}", cursor_factory=RealDictCursor)
+                cursor.itersize = batch_size
+                cursor.execute(adapt_qmark_params_to_psycopg2(query), params or None)
+            else:
+                cursor = conn.cursor()
+                cursor.execute(query, params or ())
+            try:
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    rows_read += len(batch)
+                    for row in batch:
+                        yield dict(row)
+            finally:
+                cursor.close()
+        if self._ready:
+            self._record_query_metrics(query, time.time() - start_time, rows_read, True)
+
     def execute_query(self, query: str, params: Tuple = None, fetch: bool = True, 
                      user_id: int = None, endpoint: str = None, _retry_depth: int = 0) -> Any:
         """Execute a query with performance monitoring and JSON validation"""
         start_time = time.time()
         
         try:
-            # Validate JSON parameters if present and convert lists to JSON
-            if params:
-                converted_params = []
-                for param in params:
-                    if isinstance(param, list):
-                        # Convert list to JSON string for SQLite compatibility
-                        param = json.dumps(param)
-                    elif hasattr(param, 'keys') and hasattr(param, 'values'):
-                        # Handle sqlite3.Row objects by converting to dict
-                        try:
-                            param = dict(param)
-                        except Exception:
-                            param = str(param)
-                    elif isinstance(param, str) and param.startswith('{') and param.endswith('}'):
-                        if not self.validate_json(param):
-                            raise ValueError(f"Invalid JSON parameter: {param}")
-                    converted_params.append(param)
-                params = tuple(converted_params)
+            params = self._normalize_params(params)
             
             with self.get_connection() as conn:
                 q_strip = query.strip()
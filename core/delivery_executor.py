@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Delivery executor for scheduled follow-ups, calendar reminders and appointment reminders.
+
+Due rows are *claimed* before anything is sent: one statement stamps ``claimed_by`` /
+``claimed_at`` on at most ``batch`` due rows of one tenant, selecting them with
+``FOR UPDATE SKIP LOCKED`` on PostgreSQL (a single UPDATE is already atomic on SQLite).
+Only rows carrying this worker's claim token are processed, so any number of scheduler
+threads or processes can run side by side without double-sending. Claims are leases: a
+row that was not finalized (crashed worker, transient error) becomes claimable again
+after ``DELIVERY_CLAIM_LEASE_SECONDS``, and the per-delivery idempotency keys stop a
+re-claimed row that was already sent from going out twice.
+
+Work fans out over a bounded thread pool in rounds. Each round gives every tenant with
+due work at most one task of at most ``batch`` rows, so a tenant with thousands of due
+follow-ups (or one slow SMTP/Gmail send) occupies one worker instead of delaying everyone.
+"""
+
+import logging
+import os
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.database_optimization import db_optimizer
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_MAX_WORKERS = int(os.getenv("DELIVERY_MAX_WORKERS", "8"))
+DELIVERY_TENANT_BATCH = int(os.getenv("DELIVERY_TENANT_BATCH", "25"))
+DELIVERY_MAX_ROUNDS = int(os.getenv("DELIVERY_MAX_ROUNDS", "20"))
+DELIVERY_CLAIM_LEASE_SECONDS = int(os.getenv("DELIVERY_CLAIM_LEASE_SECONDS", "900"))
+
+DELIVERY_KIND_FOLLOW_UPS = "follow_ups"
+DELIVERY_KIND_CALENDAR = "calendar_reminders"
+DELIVERY_KIND_APPOINTMENT_24H = "appointment_reminders_24h"
+DELIVERY_KIND_APPOINTMENT_2H = "appointment_reminders_2h"
+
+_WORKER_PREFIX = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def new_claim_token() -> str:
+    return f"{_WORKER_PREFIX}:{uuid.uuid4().hex[:12]}"
+
+
+def _claimable_sql() -> str:
+    return "(claimed_by IS NULL OR claimed_at < ?)"
+
+
+def _lease_cutoff(now: Optional[datetime] = None) -> str:
+    return ((now or datetime.utcnow()) - timedelta(seconds=DELIVERY_CLAIM_LEASE_SECONDS)).isoformat()
+
+
+def claim_due_rows(
+    db,
+    table: str,
+    user_id: int,
+    due_sql: str,
+    due_params: Sequence[Any],
+    order_by: str,
+    claim_token: str,
+    limit: Optional[int] = None,
+) -> int:
+    """
+    Atomically claim up to ``limit`` due rows of ``table`` for ``user_id``; returns the claimed count.
+
+    ``db`` is the caller's ``db_optimizer`` (modules keep their own reference so tests can patch it).
+    """
+    now = datetime.utcnow()
+    cutoff = _lease_cutoff(now)
+    limit_sql = " LIMIT ?" if limit else ""
+    lock_sql = " FOR UPDATE SKIP LOCKED" if getattr(db, "db_type", "sqlite") == "postgresql" else ""
+    params: List[Any] = [claim_token, now.isoformat(), user_id, *due_params, cutoff]
+    if limit:
+        params.append(int(limit))
+    params.extend([*due_params, cutoff])
+    claimed = db.execute_query(
+        f"""
+        UPDATE {table} SET claimed_by = ?, claimed_at = ?
+        WHERE id IN (
+            SELECT id FROM {table} WHERE user_id = ? AND {due_sql} AND {_claimable_sql()}
+            ORDER BY {order_by}{limit_sql}{lock_sql}
+        ) AND {due_sql} AND {_claimable_sql()}
+        """,
+        tuple(params),
+        fetch=False,
+    )
+    return claimed if isinstance(claimed, int) else 0
+
+
+def due_tenants(db, table: str, due_sql: str, due_params: Sequence[Any]) -> List[int]:
+    """Tenants with unclaimed due rows, most backlog first."""
+    rows = db.execute_query(
+        f"""
+        SELECT user_id, COUNT(*) AS due_count FROM {table}
+        WHERE {due_sql} AND {_claimable_sql()}
+        GROUP BY user_id ORDER BY due_count DESC
+        """,
+        (*due_params, _lease_cutoff()),
+    )
+    return [int(r["user_id"]) for r in rows or []]
+
+
+class DeliveryExecutor:
+    """Claim due deliveries per tenant and run them on a bounded worker pool."""
+
+    def __init__(
+        self,
+        max_workers: int = DELIVERY_MAX_WORKERS,
+        tenant_batch: int = DELIVERY_TENANT_BATCH,
+        max_rounds: int = DELIVERY_MAX_ROUNDS,
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.tenant_batch = max(1, int(tenant_batch))
+        self.max_rounds = max(1, int(max_rounds))
+
+    def _kinds(self, now: datetime, kinds: Optional[Sequence[str]]) -> Dict[str, Tuple[str, str, Tuple, Callable[[int], Dict[str, Any]]]]:
+        """kind -> (table, due_sql, due_params, tenant task)."""
+        from core import appointment_reminders
+        from core.workflow_followups import (
+            CALENDAR_DUE_SQL,
+            FOLLOW_UP_DUE_SQL,
+            execute_due_follow_ups,
+            remind_due_calendar_events,
+        )
+
+        now_iso = now.isoformat()
+        batch = self.tenant_batch
+        table: Dict[str, Tuple[str, str, Tuple, Callable[[int], Dict[str, Any]]]] = {
+            DELIVERY_KIND_FOLLOW_UPS: (
+                "scheduled_follow_ups",
+                FOLLOW_UP_DUE_SQL,
+                (now_iso,),
+                lambda uid: execute_due_follow_ups(uid, now_iso=now_iso, limit=batch),
+            ),
+            DELIVERY_KIND_CALENDAR: (
+                "calendar_events",
+                CALENDAR_DUE_SQL,
+                (now_iso,),
+                lambda uid: remind_due_calendar_events(uid, now_iso=now_iso, limit=batch),
+            ),
+        }
+        for kind, hours in ((DELIVERY_KIND_APPOINTMENT_24H, 24), (DELIVERY_KIND_APPOINTMENT_2H, 2)):
+            due_sql, due_params = appointment_reminders.appointment_reminder_due(hours, now)
+            table[kind] = (
+                "appointments",
+                due_sql,
+                due_params,
+                lambda uid, hours=hours: appointment_reminders.send_due_appointment_reminders(
+                    uid, hours, now=now, limit=batch
+                ),
+            )
+        if kinds is not None:
+            table = {k: v for k, v in table.items() if k in kinds}
+        return table
+
+    def run_due_deliveries(
+        self,
+        now: Optional[datetime] = None,
+        kinds: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Drain due deliveries of the given kinds (default: all) in fair rounds.
+
+        Returns per-kind totals plus ``rounds``; counts come from each tenant task's result dict.
+        """
+        now = now or datetime.utcnow()
+        specs = self._kinds(now, kinds)
+        totals: Dict[str, Dict[str, int]] = {kind: {"tenants": 0} for kind in specs}
+        seen: Dict[str, set] = {kind: set() for kind in specs}
+        rounds = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="delivery") as pool:
+            while rounds < self.max_rounds:
+                futures = {}
+                for kind, (tbl, due_sql, due_params, task) in specs.items():
+                    try:
+                        tenants = due_tenants(db_optimizer, tbl, due_sql, due_params)
+                    except Exception as e:
+                        logger.error("Delivery tenant scan failed kind=%s: %s", kind, e)
+                        continue
+                    for uid in tenants:
+                        seen[kind].add(uid)
+                        futures[pool.submit(task, uid)] = (kind, uid)
+                if not futures:
+                    break
+                rounds += 1
+                progressed = False
+                for future in as_completed(futures):
+                    kind, uid = futures[future]
+                    try:
+                        result = future.result() or {}
+                    except Exception as e:
+                        logger.exception("Delivery task failed kind=%s user_id=%s: %s", kind, uid, e)
+                        totals[kind]["failed"] = totals[kind].get("failed", 0) + 1
+                        continue
+                    if result.get("claimed"):
+                        progressed = True
+                    for key, value in result.items():
+                        if key != "success" and isinstance(value, int) and not isinstance(value, bool):
+                            totals[kind][key] = totals[kind].get(key, 0) + value
+                if not progressed:
+                    # every due row is claimed by another worker (or tasks keep failing before claiming)
+                    break
+        for kind in specs:
+            totals[kind]["tenants"] = len(seen[kind])
+        return {"success": True, "rounds": rounds, **totals}
+
+
+delivery_executor = DeliveryExecutor()
+
+
+def run_due_deliveries(now: Optional[datetime] = None, kinds: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    return delivery_executor.run_due_deliveries(now=now, kinds=kinds)
@@ -11,6 +11,7 @@ from typing import Any, Dict, Optional
 from core.durable_jobs import (
     JOB_KIND_ANALYTICS_ROLLUP,
     JOB_KIND_CHATBOT_EVAL,
+    JOB_KIND_CRM_LEAD_IMPORT,
     JOB_KIND_GMAIL_SYNC,
     JOB_KIND_KB_CHUNK_CLEANUP,
     JOB_KIND_KB_VECTORIZE,
@@ -115,12 +116,28 @@ def process_chatbot_eval_durable(job: Dict[str, Any]) -> Dict[str, Any]:
     return {"success": True, "eval_id": eval_id, "status": "not_implemented"}
 
 
+def process_crm_lead_import_durable(job: Dict[str, Any]) -> Dict[str, Any]:
+    user_id = job.get("user_id")
+    if not user_id:
+        return {"success": False, "error": "user_id required", "allow_retry": False}
+    payload = job.get("payload") or {}
+    from crm.bulk_import import run_lead_import_followup
+
+    return run_lead_import_followup(
+        int(user_id),
+        payload.get("created_ids") or [],
+        payload.get("updated") or [],
+        correlation_id=job.get("correlation_id"),
+    )
+
+
 _PROCESSORS = {
     JOB_KIND_GMAIL_SYNC: process_gmail_sync_durable,
     JOB_KIND_KB_VECTORIZE: process_kb_vectorize_durable,
     JOB_KIND_KB_CHUNK_CLEANUP: process_kb_chunk_cleanup_durable,
     JOB_KIND_ANALYTICS_ROLLUP: process_analytics_rollup_durable,
     JOB_KIND_CHATBOT_EVAL: process_chatbot_eval_durable,
+    JOB_KIND_CRM_LEAD_IMPORT: process_crm_lead_import_durable,
 }
 
 
@@ -26,6 +26,7 @@ JOB_KIND_KB_VECTORIZE = "kb_vectorize"
 JOB_KIND_KB_CHUNK_CLEANUP = "kb_chunk_cleanup"
 JOB_KIND_ANALYTICS_ROLLUP = "analytics_rollup"
 JOB_KIND_CHATBOT_EVAL = "chatbot_eval"
+JOB_KIND_CRM_LEAD_IMPORT = "crm_lead_import"
 
 STATUS_PENDING = "pending"
 STATUS_RUNNING = "running"
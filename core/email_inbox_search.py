@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Any, Optional
 
 
@@ -42,3 +43,73 @@ def synced_inbox_search_sql_and_params(
         " AND (subject LIKE ? OR sender LIKE ? OR recipient LIKE ? OR COALESCE(body, '') LIKE ?)",
         (like, like, like, like),
     )
+
+
+@dataclass(frozen=True)
+class SyncedInboxSearch:
+    """
+    Pieces of the synced_emails list query for a search term.
+
+    Placed as ``FROM synced_emails{join_sql} WHERE user_id = ?{where_sql} ORDER BY {order_sql}``
+    with params ``join_params + (user_id,) + ... + where_params + order_params``.
+    """
+
+    join_sql: str = ""
+    join_params: tuple = ()
+    where_sql: str = ""
+    where_params: tuple = ()
+    order_sql: str = "date DESC"
+    order_params: tuple = ()
+    mode: str = "none"
+
+
+def synced_inbox_search(search: Optional[str]) -> SyncedInboxSearch:
+    """
+    Ranked full-text search when the index exists (FTS5 / tsvector), else the LIKE
+    fragment from ``synced_inbox_search_sql_and_params``. Every term is prefix-matched.
+    In tsvector mode rows with a NULL ``search_tsv`` fall back to LIKE and rank last.
+    """
+    term = sanitize_inbox_search_query(search)
+    if not term:
+        return SyncedInboxSearch()
+
+    from core.email_search_index import (
+        FTS5_RANK_EXPR,
+        FTS_TABLE,
+        fts5_match_query,
+        synced_emails_search_mode,
+        tsquery_text,
+    )
+
+    mode = synced_emails_search_mode()
+    if mode == "fts5":
+        match = fts5_match_query(term)
+        if match:
+            return SyncedInboxSearch(
+                join_sql=(
+                    f" JOIN (SELECT rowid AS fts_rowid, {FTS5_RANK_EXPR} AS fts_rank"  # noqa: pg-audit (SQLite FTS5 only)
+                    f" FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?) fts"
+                    " ON fts.fts_rowid = synced_emails.id"
+                ),
+                join_params=(match,),
+                order_sql="fts.fts_rank, date DESC",
+                mode=mode,
+            )
+    elif mode == "tsvector":
+        query = tsquery_text(term)
+        if query:
+            # Rows the backfill has not reached yet (search_tsv IS NULL) still match by LIKE.
+            like_sql, like_params = synced_inbox_search_sql_and_params(term)
+            return SyncedInboxSearch(
+                where_sql=(
+                    " AND (search_tsv @@ to_tsquery('simple', ?)"
+                    f" OR (search_tsv IS NULL{like_sql}))"
+                ),
+                where_params=(query, *like_params),
+                order_sql="COALESCE(ts_rank_cd(search_tsv, to_tsquery('simple', ?)), 0) DESC, date DESC",
+                order_params=(query,),
+                mode=mode,
+            )
+
+    like_sql, like_params = synced_inbox_search_sql_and_params(term)
+    return SyncedInboxSearch(where_sql=like_sql, where_params=like_params, mode="like")
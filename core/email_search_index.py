@@ -0,0 +1,201 @@
+"""
+Full-text index for synced_emails inbox search.
+
+SQLite: ``synced_emails_fts`` is an FTS5 external-content table over subject,
+sender, recipient and body, kept in sync by triggers so every writer (Gmail upsert,
+IMAP / Outlook sync) is covered. It is built outside the request path by
+scripts/backfill_synced_emails_fts.py (table, triggers and an FTS5 ``rebuild`` in one
+transaction); until then inbox search keeps using LIKE.
+
+PostgreSQL: ``synced_emails.search_tsv`` + GIN index, owned by
+scripts/migrations/011_synced_emails_fts.sql (trigger-maintained). Rows that
+predate the migration are filled by ``backfill_synced_emails_search_index``; until
+then inbox search matches them with LIKE (see ``synced_inbox_search``).
+
+When neither is available (FTS5 not compiled in, migration not applied, or
+``SYNCED_EMAILS_FTS=0``) inbox search keeps using LIKE.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from core.database_optimization import db_optimizer
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "synced_emails_fts"
+MAX_QUERY_TERMS = 8
+# bm25 column weights: subject, sender, recipient, body (lower score = better match).
+FTS5_RANK_EXPR = f"bm25({FTS_TABLE}, 10.0, 4.0, 2.0, 1.0)"
+
+_TERM_RE = re.compile(r"[\w@.+\-]*\w[\w@.+\-]*", re.UNICODE)
+
+_SQLITE_FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        subject, sender, recipient, body,
+        content='synced_emails', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS synced_emails_fts_ai AFTER INSERT ON synced_emails BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, subject, sender, recipient, body)  -- noqa: pg-audit (SQLite FTS5 trigger)
+        VALUES (new.id, new.subject, new.sender, new.recipient, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS synced_emails_fts_ad AFTER DELETE ON synced_emails BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, sender, recipient, body)  -- noqa: pg-audit (SQLite FTS5 trigger)
+        VALUES ('delete', old.id, old.subject, old.sender, old.recipient, old.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS synced_emails_fts_au
+    AFTER UPDATE OF subject, sender, recipient, body ON synced_emails BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, subject, sender, recipient, body)  -- noqa: pg-audit (SQLite FTS5 trigger)
+        VALUES ('delete', old.id, old.subject, old.sender, old.recipient, old.body);
+        INSERT INTO {FTS_TABLE}(rowid, subject, sender, recipient, body)  -- noqa: pg-audit (SQLite FTS5 trigger)
+        VALUES (new.id, new.subject, new.sender, new.recipient, new.body);
+    END
+    """,
+)
+
+# A missing index is re-checked this often so a background build is picked up without a restart.
+SEARCH_MODE_RECHECK_SECONDS = 60
+
+_mode_lock = threading.Lock()
+_mode_cache: Dict[str, tuple] = {}  # db_type -> (mode, monotonic time of the probe)
+
+
+def _fts_enabled() -> bool:
+    return os.getenv("SYNCED_EMAILS_FTS", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def ensure_synced_emails_fts() -> bool:
+    """
+    Create the SQLite FTS table + triggers and fill it, atomically (build step, not for
+    request handlers). PostgreSQL: True when migration 011's ``search_tsv`` is present.
+    """
+    if db_optimizer.db_type == "postgresql":
+        return "search_tsv" in db_optimizer.list_table_columns("synced_emails")
+    if not db_optimizer.table_exists("synced_emails"):
+        return False
+    if db_optimizer.table_exists(FTS_TABLE):
+        return True
+    try:
+        # One write transaction, so searches never see a half-filled index.
+        with db_optimizer.transaction() as (conn, cursor):
+            cursor.execute("BEGIN IMMEDIATE")
+            for ddl in _SQLITE_FTS_DDL:
+                cursor.execute(ddl)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            conn.commit()
+        logger.info("✅ Built %s full-text index", FTS_TABLE)
+        return True
+    except Exception as e:
+        # e.g. SQLite compiled without FTS5
+        logger.warning("synced_emails FTS unavailable, inbox search uses LIKE: %s", e)
+        return False
+
+
+def _search_index_present() -> bool:
+    if db_optimizer.db_type == "postgresql":
+        return "search_tsv" in db_optimizer.list_table_columns("synced_emails")
+    return db_optimizer.table_exists(FTS_TABLE)
+
+
+def synced_emails_search_mode() -> Optional[str]:
+    """
+    ``"fts5"``, ``"tsvector"`` or ``None`` (LIKE fallback). Only checks that the index
+    exists; a present index is remembered for the process, a missing one is re-checked
+    every ``SEARCH_MODE_RECHECK_SECONDS``.
+    """
+    if not _fts_enabled():
+        return None
+    key = db_optimizer.db_type
+    now = time.monotonic()
+    with _mode_lock:
+        cached = _mode_cache.get(key)
+        if cached is not None and (cached[0] is not None or now - cached[1] < SEARCH_MODE_RECHECK_SECONDS):
+            return cached[0]
+    try:
+        ready = _search_index_present()
+    except Exception as e:
+        logger.warning("synced_emails FTS probe failed: %s", e)
+        ready = False
+    mode = ("tsvector" if key == "postgresql" else "fts5") if ready else None
+    with _mode_lock:
+        _mode_cache[key] = (mode, now)
+    return mode
+
+
+def reset_search_mode_cache() -> None:
+    with _mode_lock:
+        _mode_cache.clear()
+
+
+def search_terms(term: str) -> List[str]:
+    return _TERM_RE.findall(term or "")[:MAX_QUERY_TERMS]
+
+
+def fts5_match_query(term: str) -> Optional[str]:
+    """AND of prefix phrases: ``florida atl`` -> ``"florida"* "atl"*``."""
+    terms = search_terms(term)
+    if not terms:
+        return None
+    return " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+def tsquery_text(term: str) -> Optional[str]:
+    """``to_tsquery('simple', ...)`` input with prefix matching on every term."""
+    terms = search_terms(term)
+    if not terms:
+        return None
+    return " & ".join("'" + t.replace("'", "''") + "':*" for t in terms)
+
+
+def backfill_synced_emails_search_index(*, batch_size: int = 1000, max_batches: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build the index, or re-index rows written before full-text search existed.
+
+    SQLite: creates the FTS table if needed, then one FTS5 ``rebuild`` (reads
+    synced_emails in a single pass).
+    PostgreSQL: fills ``search_tsv IS NULL`` rows ``batch_size`` at a time so each
+    UPDATE holds row locks briefly; safe to stop and re-run.
+    """
+    if db_optimizer.db_type != "postgresql":
+        existed = db_optimizer.table_exists(FTS_TABLE)
+        if not ensure_synced_emails_fts():
+            return {"mode": None, "rows": 0, "batches": 0}
+        if existed:
+            db_optimizer.execute_query(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')", fetch=False)
+        rows = db_optimizer.execute_query("SELECT COUNT(*) AS c FROM synced_emails")
+        return {"mode": "fts5", "rows": int(rows[0]["c"]) if rows else 0, "batches": 1}
+
+    if not ensure_synced_emails_fts():
+        raise RuntimeError("synced_emails.search_tsv missing; apply scripts/migrations/011_synced_emails_fts.sql")
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        updated = db_optimizer.execute_query(
+            """
+            UPDATE synced_emails
+            SET search_tsv = synced_emails_search_tsv(subject, sender, recipient, body)
+            WHERE id IN (
+                SELECT id FROM synced_emails WHERE search_tsv IS NULL ORDER BY id LIMIT ?
+            )
+            """,
+            (int(batch_size),),
+            fetch=False,
+        )
+        batches += 1
+        total += max(0, int(updated or 0))
+        if not updated or updated < batch_size:
+            break
+    return {"mode": "tsvector", "rows": total, "batches": batches}
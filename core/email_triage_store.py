@@ -276,28 +276,37 @@ def list_unclassified_synced(
     user_id: int,
     *,
     limit: int = 50,
+    before_id: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
+    """Newest-synced rows without a classification, by descending id; pass the last
+    page's smallest ``id`` as ``before_id`` for the next page."""
     limit = max(1, min(100, limit))
     ensure_email_classifications_table()
+    params: List[Any] = [user_id]
+    keyset_sql = ""
+    if before_id is not None:
+        keyset_sql = " AND s.id < ?"
+        params.append(int(before_id))
+    params.append(limit)
     return (
         db_optimizer.execute_query(
-            """
+            f"""
             SELECT
                 s.id, s.subject, s.sender, s.body,
                 COALESCE(s.external_id, s.gmail_id) AS external_id,
                 COALESCE(s.provider, 'gmail') AS provider
             FROM synced_emails s
-            WHERE s.user_id = ?
+            WHERE s.user_id = ?{keyset_sql}
               AND NOT EXISTS (
                 SELECT 1 FROM email_classifications c
                 WHERE c.user_id = s.user_id
                   AND c.external_id = COALESCE(s.external_id, s.gmail_id)
                   AND COALESCE(c.provider, 'gmail') = COALESCE(s.provider, 'gmail')
               )
-            ORDER BY s.date DESC
+            ORDER BY s.id DESC
             LIMIT ?
             """,
-            (user_id, limit),
+            tuple(params),
         )
         or []
     )
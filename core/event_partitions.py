@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Monthly partitions for the append-heavy event tables.
+
+analytics_events, query_performance_log, service_usage_events, product_events, ai_events and
+email_events only ever grow at the head and are purged at the tail. Splitting them by month
+turns retention into dropping whole partitions and keeps recent-window queries on small tables.
+
+PostgreSQL: the tables are converted once to native ``PARTITION BY RANGE`` on their time column
+by ``scripts/migrations/013_partition_event_tables.sql`` (the existing rows become one
+``<table>_legacy`` partition). ``ensure_partitions`` then keeps ``<table>_pYYYYMM`` partitions
+created ``EVENT_PARTITION_MONTHS_AHEAD`` months ahead and ``drop_expired_partitions`` drops the
+ones entirely older than the retention cutoff.
+
+SQLite has no declarative partitioning, so the base table stays the hot partition: rows older
+than ``EVENT_PARTITION_HOT_MONTHS`` are moved in batches into per-month ``<table>_pYYYYMM``
+tables, ``<table>_all`` is a UNION ALL view over the base table and its archives, and retention
+drops archive tables. Readers with no time bound (or one a caller can push past the hot window)
+go through ``event_table_source``: product_events lookups and tenant deletion in
+core/product_analytics_store.py and core/product_analytics_ops.py, the all-time and quarter
+analytics_events counts in analytics/dashboard_api.py, ``list_usage_events`` and
+core/correlation_trace.py. Everything else still reads only the base table, i.e. the last
+``EVENT_PARTITION_HOT_MONTHS`` months, which covers their windows: the 30-day rollups in
+analytics/service_activity_rollups.py and analytics/service_usage_analytics.py, the monthly and
+recent-activity dashboard reads, and the service_usage_events idempotency-key lookup (retries
+land within minutes). Keep such windows shorter than the hot window or switch the reader over.
+
+Opt-in with ``EVENT_TABLE_PARTITIONING=1``; ``CleanupScheduler.run_cleanup_cycle`` runs
+``maintain_event_partitions`` before the batched purges.
+"""
+
+import logging
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from core.database_optimization import db_optimizer
+
+logger = logging.getLogger(__name__)
+
+EVENT_PARTITION_HOT_MONTHS = int(os.getenv("EVENT_PARTITION_HOT_MONTHS", "3"))
+EVENT_PARTITION_MONTHS_AHEAD = int(os.getenv("EVENT_PARTITION_MONTHS_AHEAD", "2"))
+EVENT_PARTITION_MOVE_BATCH = int(os.getenv("EVENT_PARTITION_MOVE_BATCH", "5000"))
+
+# table -> time column partitions are ranged on
+PARTITIONED_EVENT_TABLES: Dict[str, str] = {
+    "analytics_events": "created_at",
+    "query_performance_log": "timestamp",
+    "service_usage_events": "created_at",
+    "product_events": "occurred_at",
+    "ai_events": "created_at",
+    "email_events": "created_at",
+}
+
+# Unique indexes cannot live on a partitioned parent without the partition key, so on
+# PostgreSQL they are created per monthly partition: (columns, partial predicate).
+LEAF_UNIQUE_INDEXES: Dict[str, List[tuple]] = {
+    "service_usage_events": [("idempotency_key", None)],
+    "product_events": [("tenant_id, outcome_dedupe_key", "outcome_dedupe_key IS NOT NULL")],
+}
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+_PG_BOUND = re.compile(r"FROM \((?P<lo>[^)]*)\) TO \((?P<hi>[^)]*)\)", re.IGNORECASE)
+
+
+def partitioning_enabled() -> bool:
+    return (os.getenv("EVENT_TABLE_PARTITIONING") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, n: int) -> date:
+    idx = month.year * 12 + month.month - 1 + n
+    return date(idx // 12, idx % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _column(table: str) -> str:
+    try:
+        return PARTITIONED_EVENT_TABLES[table]
+    except KeyError:
+        raise ValueError(f"{table} is not a partitioned event table") from None
+
+
+def _scalar(row: Any, key: str) -> Any:
+    return row[key] if hasattr(row, "keys") else row[0]
+
+
+def _pg_bound_date(value: str) -> Optional[date]:
+    value = value.strip().strip("'")
+    if value.upper() == "MINVALUE":
+        return None
+    return datetime.strptime(value[:10], "%Y-%m-%d").date()
+
+
+def is_partitioned(table: str, db=None) -> bool:
+    """PostgreSQL: the table is a partitioned parent. SQLite: it has monthly archive tables."""
+    db = db or db_optimizer
+    if db.db_type == "postgresql":
+        rows = db.execute_query(
+            """
+            SELECT c.relkind AS relkind FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relname = ?
+            """,
+            (table,),
+        )
+        return bool(rows) and _scalar(rows[0], "relkind") == "p"
+    return bool(list_partitions(table, db=db))
+
+
+def list_partitions(table: str, db=None) -> List[Dict[str, Any]]:
+    """
+    Partitions of ``table`` as ``{"name", "start", "end"}`` dicts ordered by start; ``start``
+    is None for the PostgreSQL legacy partition (MINVALUE). The default partition is omitted.
+    """
+    db = db or db_optimizer
+    out: List[Dict[str, Any]] = []
+    if db.db_type == "postgresql":
+        rows = db.execute_query(
+            """
+            SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = ?
+            """,
+            (table,),
+        )
+        for row in rows or []:
+            name = row["name"] if hasattr(row, "keys") else row[0]
+            bound = row["bound"] if hasattr(row, "keys") else row[1]
+            m = _PG_BOUND.search(bound or "")
+            if not m:
+                continue
+            out.append({"name": name, "start": _pg_bound_date(m.group("lo")), "end": _pg_bound_date(m.group("hi"))})
+    else:
+        rows = db.execute_query(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",  # noqa: pg-audit (SQLite branch)
+            (f"{table}_p[0-9][0-9][0-9][0-9][0-9][0-9]",),
+        )
+        for row in rows or []:
+            name = _scalar(row, "name")
+            m = _MONTH_SUFFIX.search(name)
+            start = date(int(m.group(1)), int(m.group(2)), 1)
+            out.append({"name": name, "start": start, "end": add_months(start, 1)})
+    return sorted(out, key=lambda p: p["start"] or date.min)
+
+
+def event_table_source(table: str, db=None) -> str:
+    """
+    Relation to read for the full history of ``table``: the ``<table>_all`` view once SQLite
+    archives exist, otherwise the table itself (a PostgreSQL parent already spans all partitions).
+    """
+    db = db or db_optimizer
+    if db.db_type == "postgresql" or not partitioning_enabled():
+        return table
+    try:
+        # table_exists only sees tables; the union view needs its own SQLite lookup.
+        rows = db.execute_query(
+            "SELECT name FROM sqlite_master WHERE type = 'view' AND name = ?",  # noqa: pg-audit (SQLite branch)
+            (f"{table}_all",),
+        )
+    except Exception as e:
+        logger.debug("event_table_source(%s) lookup failed: %s", table, e)
+        return table
+    return f"{table}_all" if rows else table
+
+
+def _pg_create_partition(table: str, month: date, db) -> str:
+    name = partition_name(table, month)
+    db.execute_query(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} (PRIMARY KEY (id)) "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')",
+        fetch=False,
+    )
+    for i, (columns, predicate) in enumerate(LEAF_UNIQUE_INDEXES.get(table, ())):
+        where = f" WHERE {predicate}" if predicate else ""
+        db.execute_query(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{name}_{i} ON {name} ({columns}){where}",
+            fetch=False,
+        )
+    return name
+
+
+def ensure_partitions(
+    table: str,
+    *,
+    months_ahead: int = EVENT_PARTITION_MONTHS_AHEAD,
+    hot_months: int = EVENT_PARTITION_HOT_MONTHS,
+    now: Optional[datetime] = None,
+    deadline: Optional[float] = None,
+    db=None,
+) -> Dict[str, Any]:
+    """
+    PostgreSQL: create the monthly partitions from the current month to ``months_ahead`` months
+    out that no existing partition covers (no-op until the table has been converted).
+    SQLite: move rows older than ``hot_months`` into monthly archive tables and refresh the view.
+    """
+    db = db or db_optimizer
+    column = _column(table)
+    current = month_start(now or datetime.utcnow())
+    if db.db_type == "postgresql":
+        if not is_partitioned(table, db=db):
+            return {"table": table, "partitioned": False, "created": []}
+        existing = list_partitions(table, db=db)
+        created = []
+        for n in range(max(0, int(months_ahead)) + 1):
+            month = add_months(current, n)
+            end = add_months(month, 1)
+            if any((p["start"] is None or p["start"] < end) and month < p["end"] for p in existing):
+                continue
+            try:
+                created.append(_pg_create_partition(table, month, db))
+            except Exception as e:
+                # Typically rows for that month already sit in the default partition.
+                logger.error("Could not create partition %s: %s", partition_name(table, month), e)
+        return {"table": table, "partitioned": True, "created": created}
+
+    hot_start = add_months(current, -max(1, int(hot_months)) + 1)
+    moved = _archive_cold_rows(table, column, hot_start, db, deadline)
+    if moved["archives"]:
+        _refresh_union_view(table, db)
+    return {"table": table, "partitioned": bool(moved["archives"]) or is_partitioned(table, db=db), **moved}
+
+
+def _create_archive_table(table: str, name: str, column: str, db) -> List[str]:
+    """SQLite only: clone ``table``'s DDL into the archive ``name``; returns its columns."""
+    if not db.table_exists(name):
+        rows = db.execute_query(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",  # noqa: pg-audit (SQLite only)
+            (table,),
+        )
+        ddl = _scalar(rows[0], "sql")
+        ddl = re.sub(
+            rf"^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?[\"'`]?{table}[\"'`]?",
+            f"CREATE TABLE IF NOT EXISTS {name}",
+            ddl,
+            count=1,
+            flags=re.IGNORECASE,
+        )
+        db.execute_query(ddl, fetch=False)
+        db.execute_query(f"CREATE INDEX IF NOT EXISTS idx_{name}_{column} ON {name} ({column})", fetch=False)
+    return db.list_table_columns(name)
+
+
+def _archive_cold_rows(table: str, column: str, hot_start: date, db, deadline: Optional[float]) -> Dict[str, Any]:
+    """SQLite only: move rows with ``column`` before ``hot_start`` into their month's archive, in id batches."""
+    months = db.execute_query(
+        f"SELECT DISTINCT substr({column}, 1, 7) AS ym FROM {table} WHERE {column} < ?",  # noqa: pg-audit (SQLite only)
+        (hot_start.isoformat(),),
+    )
+    base_columns = db.list_table_columns(table)
+    archives: List[str] = []
+    moved = 0
+    complete = True
+    for row in months or []:
+        try:
+            month = datetime.strptime(str(_scalar(row, "ym")), "%Y-%m").date()
+        except ValueError:
+            continue  # unparseable timestamps stay in the base table for the batched purge
+        name = partition_name(table, month)
+        columns = [c for c in _create_archive_table(table, name, column, db) if c in base_columns]
+        cols = ", ".join(columns)
+        in_month = f"{column} >= ? AND {column} < ?"
+        bounds = (month.isoformat(), add_months(month, 1).isoformat())
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                complete = False
+                break
+            ids = db.execute_query(
+                f"SELECT id FROM {table} WHERE {in_month} ORDER BY id ASC LIMIT ?",
+                (*bounds, max(1, EVENT_PARTITION_MOVE_BATCH)),
+            )
+            if not ids:
+                break
+            hi = _scalar(ids[-1], "id")
+            with db.transaction() as (conn, cursor):
+                cursor.execute(
+                    f"INSERT OR IGNORE INTO {name} ({cols})"  # noqa: pg-audit (SQLite only)
+                    f" SELECT {cols} FROM {table} WHERE id <= ? AND {in_month}",
+                    (hi, *bounds),
+                )
+                cursor.execute(f"DELETE FROM {table} WHERE id <= ? AND {in_month}", (hi, *bounds))
+                moved += cursor.rowcount if cursor.rowcount > 0 else 0
+                conn.commit()
+        archives.append(name)
+        if not complete:
+            break
+    return {"archives": archives, "moved": moved, "complete": complete}
+
+
+def _refresh_union_view(table: str, db) -> None:
+    base_columns = db.list_table_columns(table)
+    selects = [f"SELECT {', '.join(base_columns)} FROM {table}"]
+    for part in list_partitions(table, db=db):
+        have = set(db.list_table_columns(part["name"]))
+        cols = ", ".join(c if c in have else f"NULL AS {c}" for c in base_columns)
+        selects.append(f"SELECT {cols} FROM {part['name']}")
+    view = f"{table}_all"
+    with db.transaction() as (conn, cursor):
+        cursor.execute(f"DROP VIEW IF EXISTS {view}")
+        if len(selects) > 1:
+            cursor.execute(f"CREATE VIEW {view} AS " + " UNION ALL ".join(selects))
+        conn.commit()
+
+
+def drop_expired_partitions(table: str, cutoff: datetime, db=None) -> List[str]:
+    """Drop the partitions of ``table`` whose whole range is older than ``cutoff``."""
+    db = db or db_optimizer
+    _column(table)
+    limit = cutoff.date() if isinstance(cutoff, datetime) else cutoff
+    dropped = []
+    for part in list_partitions(table, db=db):
+        if part["end"] is None or part["end"] > limit:
+            continue
+        db.execute_query(f"DROP TABLE IF EXISTS {part['name']}", fetch=False)
+        dropped.append(part["name"])
+    if dropped and db.db_type != "postgresql":
+        _refresh_union_view(table, db)
+    if dropped:
+        logger.info("Dropped %s expired partitions of %s: %s", len(dropped), table, ", ".join(dropped))
+    return dropped
+
+
+def maintain_event_partitions(
+    retention_days: Optional[Dict[str, int]] = None,
+    *,
+    now: Optional[datetime] = None,
+    deadline: Optional[float] = None,
+    db=None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Create/archive partitions for every event table, then drop the expired ones for the tables
+    listed in ``retention_days``. Failures are per table so one missing table does not stop the rest.
+    """
+    db = db or db_optimizer
+    now = now or datetime.utcnow()
+    results: Dict[str, Dict[str, Any]] = {}
+    for table in PARTITIONED_EVENT_TABLES:
+        try:
+            if not db.table_exists(table):
+                continue
+            result = ensure_partitions(table, now=now, deadline=deadline, db=db)
+            days = (retention_days or {}).get(table)
+            if days is not None and result.get("partitioned"):
+                result["dropped"] = drop_expired_partitions(table, now - timedelta(days=days), db=db)
+            results[table] = {"success": True, **result}
+        except Exception as e:
+            logger.error("Partition maintenance for %s failed: %s", table, e)
+            results[table] = {"success": False, "error": str(e)}
+    return results
+
+
+__all__ = [
+    "PARTITIONED_EVENT_TABLES",
+    "drop_expired_partitions",
+    "ensure_partitions",
+    "event_table_source",
+    "is_partitioned",
+    "list_partitions",
+    "maintain_event_partitions",
+    "partition_name",
+    "partitioning_enabled",
+]
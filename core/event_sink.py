@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Write-behind sink for append-only audit/event rows.
+
+record_email_event, record_crm_event, record_ai_event and record_automation_run_event write
+observability rows that nothing on the hot path reads back. With ``EVENT_WRITE_BEHIND=1`` they
+hand the row to this sink instead of inserting it inline: rows go into a bounded in-process
+queue and a background thread writes them every ``EVENT_SINK_FLUSH_MS`` as multi-row INSERTs,
+one transaction per flush, grouped by table and column list.
+
+When the queue is full the ``EVENT_SINK_OVERFLOW`` policy applies: ``drop`` (default) discards
+the row and counts it, ``block`` waits up to ``EVENT_SINK_BLOCK_TIMEOUT_MS`` for room before
+dropping. Pending rows are flushed at interpreter exit (atexit) and by workers on shutdown
+through ``flush_event_sink``. Rows are lost only if the process is killed without either.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from core.database_optimization import db_optimizer
+
+logger = logging.getLogger(__name__)
+
+EVENT_SINK_MAX_QUEUE = int(os.getenv("EVENT_SINK_MAX_QUEUE", "10000"))
+EVENT_SINK_FLUSH_MS = int(os.getenv("EVENT_SINK_FLUSH_MS", "200"))
+EVENT_SINK_BATCH_SIZE = int(os.getenv("EVENT_SINK_BATCH_SIZE", "500"))
+EVENT_SINK_OVERFLOW = os.getenv("EVENT_SINK_OVERFLOW", "drop").strip().lower()  # drop | block
+EVENT_SINK_BLOCK_TIMEOUT_MS = int(os.getenv("EVENT_SINK_BLOCK_TIMEOUT_MS", "1000"))
+
+# Bound parameters per INSERT statement (SQLite builds before 3.32 allow 999).
+_MAX_PARAMS_PER_STATEMENT = 900
+
+_Row = Tuple[str, Tuple[str, ...], Tuple[Any, ...]]  # (table, columns, values)
+
+
+def write_behind_enabled() -> bool:
+    return (os.getenv("EVENT_WRITE_BEHIND") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class EventSink:
+    """Bounded queue + flusher thread batching event INSERTs per (table, columns)."""
+
+    def __init__(
+        self,
+        *,
+        max_queue: int = EVENT_SINK_MAX_QUEUE,
+        flush_ms: int = EVENT_SINK_FLUSH_MS,
+        batch_size: int = EVENT_SINK_BATCH_SIZE,
+        overflow: str = EVENT_SINK_OVERFLOW,
+        block_timeout_ms: int = EVENT_SINK_BLOCK_TIMEOUT_MS,
+        db=None,
+    ):
+        self._queue: "queue.Queue[_Row]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self.flush_seconds = max(1, int(flush_ms)) / 1000.0
+        self.batch_size = max(1, int(batch_size))
+        self.overflow = overflow if overflow in ("drop", "block") else "drop"
+        self.block_seconds = max(0, int(block_timeout_ms)) / 1000.0
+        self._db = db
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.stats: Dict[str, int] = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    @property
+    def db(self):
+        return self._db or db_optimizer
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+            self._thread.start()
+
+    def submit(self, table: str, columns: Sequence[str], values: Sequence[Any]) -> bool:
+        """Queue one row; False when it was dropped by the overflow policy."""
+        row = (table, tuple(columns), tuple(values))
+        try:
+            if self.overflow == "block" and self.block_seconds:
+                self._queue.put(row, timeout=self.block_seconds)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+                dropped = self.stats["dropped"]
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning("Event sink full (%s rows); dropped %s %s rows so far", self._queue.maxsize, dropped, table)
+            return False
+        with self._lock:
+            self.stats["enqueued"] += 1
+        self._ensure_thread()
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                continue
+            # Let a batch accumulate for one interval instead of writing every row on arrival.
+            self._stopping.wait(self.flush_seconds)
+            self._write_batch([first] + self._drain(self.batch_size - 1))
+
+    def _drain(self, limit: int) -> List[_Row]:
+        rows: List[_Row] = []
+        while len(rows) < limit:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush(self, timeout: Optional[float] = None) -> int:
+        """Write everything queued so far from the calling thread; returns rows written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        written = 0
+        while deadline is None or time.monotonic() < deadline:
+            rows = self._drain(self.batch_size)
+            if not rows:
+                break
+            written += self._write_batch(rows)
+        return written
+
+    def shutdown(self, timeout: Optional[float] = 10.0) -> int:
+        """Stop the flusher thread and write what is left."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+        written = self.flush(timeout)
+        if self.pending():
+            logger.warning("Event sink shutdown left %s rows unwritten", self.pending())
+        return written
+
+    def _write_batch(self, rows: List[_Row]) -> int:
+        groups: "OrderedDict[Tuple[str, Tuple[str, ...]], List[Tuple[Any, ...]]]" = OrderedDict()
+        for table, columns, row_values in rows:
+            groups.setdefault((table, columns), []).append(row_values)
+        written = 0
+        with self._write_lock:
+            for (table, columns), batch in groups.items():
+                try:
+                    self._insert_many(table, columns, batch)
+                    written += len(batch)
+                except Exception as e:
+                    logger.warning("Event sink batch insert into %s failed, retrying row by row: %s", table, e)
+                    written += self._insert_each(table, columns, batch)
+        with self._lock:
+            self.stats["written"] += written
+            self.stats["batches"] += 1
+        return written
+
+    def _insert_many(self, table: str, columns: Tuple[str, ...], values: List[Tuple[Any, ...]]) -> None:
+        per_statement = max(1, _MAX_PARAMS_PER_STATEMENT // max(1, len(columns)))
+        row_sql = "(" + ", ".join("?" for _ in columns) + ")"
+        head = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        with self.db.transaction() as (conn, cursor):
+            for i in range(0, len(values), per_statement):
+                chunk = values[i:i + per_statement]
+                cursor.execute(head + ", ".join([row_sql] * len(chunk)), [v for row in chunk for v in row])
+            conn.commit()
+
+    def _insert_each(self, table: str, columns: Tuple[str, ...], values: List[Tuple[Any, ...]]) -> int:
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        ok = 0
+        for row in values:
+            try:
+                self.db.execute_query(sql, row, fetch=False)
+                ok += 1
+            except Exception as e:  # noqa: BLE001 — same best-effort contract as the inline writers
+                with self._lock:
+                    self.stats["failed"] += 1
+                logger.warning("%s insert failed (non-fatal): %s", table, e, extra={"event": "event_sink_insert_failed"})
+        return ok
+
+
+_sink: Optional[EventSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_event_sink() -> EventSink:
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = EventSink()
+                atexit.register(_sink.shutdown)
+    return _sink
+
+
+def enqueue_event_row(table: str, columns: Sequence[str], values: Sequence[Any]) -> bool:
+    """
+    Hand one event row to the write-behind sink. Returns False when write-behind is off, so the
+    caller inserts inline as before; a row dropped by the overflow policy returns True (handled).
+    """
+    if not write_behind_enabled():
+        return False
+    get_event_sink().submit(table, columns, values)
+    return True
+
+
+def flush_event_sink(timeout: Optional[float] = 10.0) -> int:
+    """Stop the sink and write pending rows (worker shutdown hook). No-op if it never started."""
+    if _sink is None:
+        return 0
+    return _sink.shutdown(timeout)
+
+
+__all__ = ["EventSink", "enqueue_event_row", "flush_event_sink", "get_event_sink", "write_behind_enabled"]
@@ -34,6 +34,7 @@ class GmailSyncRequestParams:
     lookback_days: int = DEFAULT_LOOKBACK_DAYS
     max_messages: int = DEFAULT_MAX_MESSAGES_PER_JOB
     page_token: Optional[str] = None
+    full_resync: bool = False
 
 
 def lookback_preset_for_days(days: int) -> str:
@@ -139,6 +140,7 @@ def parse_sync_params_from_body(
 
     ``continue_sync`` / ``continue``: reuse ``page_token`` and ``lookback_days`` from
     the latest job cursor when the client does not pass a new ``page_token``.
+    ``full_resync``: skip the incremental historyId path and re-list the lookback window.
     """
     body = body if isinstance(body, dict) else {}
     continue_sync = bool(body.get("continue_sync") or body.get("continue"))
@@ -160,6 +162,7 @@ def parse_sync_params_from_body(
         lookback_days=parse_lookback_days(lookback),
         max_messages=clamp_max_messages(body.get("max_messages")),
         page_token=page_token,
+        full_resync=bool(body.get("full_resync")),
     )
 
 
@@ -170,6 +173,8 @@ def sync_params_to_job_metadata(params: GmailSyncRequestParams) -> Dict[str, Any
     }
     if params.page_token:
         meta["page_token"] = params.page_token
+    if params.full_resync:
+        meta["full_resync"] = True
     return meta
 
 
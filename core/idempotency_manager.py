@@ -2,6 +2,12 @@
 """
 Idempotency Management System
 Ensures operations can be safely retried without side effects
+
+Lookups go through three tiers: an in-process cache (terminal ``completed`` records
+only; a miss is never cached, so a key stored by another worker is seen immediately),
+Redis, then the ``idempotency_keys`` table. Batch
+callers use ``check_keys_bulk`` / ``claim_keys_bulk``: one MGET, one ``IN (...)`` query
+and one upsert per chunk instead of a GET + SELECT + INSERT per item.
 """
 
 import os
@@ -9,8 +15,9 @@ import json
 import time
 import hashlib
 import logging
+import threading
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Iterable, List, Optional, Callable, Set
 from functools import wraps
 
 # Optional Redis integration
@@ -25,6 +32,10 @@ from core.database_optimization import db_optimizer
 
 logger = logging.getLogger(__name__)
 
+IDEMPOTENCY_BULK_CHUNK_SIZE = int(os.getenv("IDEMPOTENCY_BULK_CHUNK_SIZE", "500"))
+IDEMPOTENCY_LOCAL_CACHE_SECONDS = int(os.getenv("IDEMPOTENCY_LOCAL_CACHE_SECONDS", "300"))
+IDEMPOTENCY_LOCAL_CACHE_MAX = int(os.getenv("IDEMPOTENCY_LOCAL_CACHE_MAX", "10000"))
+
 def _is_test_mode() -> bool:
     return (
         os.getenv("FIKIRI_TEST_MODE") == "1"
@@ -49,6 +60,9 @@ class IdempotencyManager:
         self.redis_client = None
         self.key_prefix = "fikiri:idempotency:"
         self.default_ttl = 24 * 60 * 60  # 24 hours
+        # key -> (monotonic deadline, completed record)
+        self._local: Dict[str, tuple] = {}
+        self._local_lock = threading.Lock()
         self._connect_redis()
         self._initialize_tables()
     
@@ -142,11 +156,17 @@ class IdempotencyManager:
     def check_key(self, key: str) -> Optional[Dict[str, Any]]:
         """Check if an idempotency key exists and return cached result"""
         try:
+            hit, record = self._local_get(key)
+            if hit:
+                return record
+
             # Try Redis first
             if self.redis_client:
                 cached_result = self.redis_client.get(f"{self.key_prefix}{key}")
                 if cached_result:
-                    return json.loads(cached_result)
+                    result = json.loads(cached_result)
+                    self._local_put(key, result)
+                    return result
             
             # Fallback to database
             # Rulepack compliance: specific columns, not SELECT *
@@ -158,18 +178,12 @@ class IdempotencyManager:
             """, (key,))
             
             if key_data:
-                key_record = key_data[0]
-                result = {
-                    'key': key,
-                    'status': key_record['status'],
-                    'response_data': json.loads(key_record['response_data']) if key_record['response_data'] else None,
-                    'created_at': key_record['created_at'],
-                    'expires_at': key_record['expires_at']
-                }
+                result = self._record_from_row(key, key_data[0])
+                self._local_put(key, result)
                 
                 # Cache in Redis
                 if self.redis_client:
-                    raw_expires_at = key_record['expires_at']
+                    raw_expires_at = result['expires_at']
                     expires_at = (
                         raw_expires_at if isinstance(raw_expires_at, datetime)
                         else datetime.fromisoformat(raw_expires_at)
@@ -179,7 +193,7 @@ class IdempotencyManager:
                         self.redis_client.setex(
                             f"{self.key_prefix}{key}",
                             ttl,
-                            json.dumps(result)
+                            json.dumps(result, default=str)
                         )
                 
                 return result
@@ -197,6 +211,8 @@ class IdempotencyManager:
             ttl = ttl or self.default_ttl
             expires_at = _utcnow_naive() + timedelta(seconds=ttl)
             
+            self._local_forget(key)
+
             # Store in database
             params = (
                 key,
@@ -241,6 +257,184 @@ class IdempotencyManager:
             logger.error(f"❌ Idempotency key storage failed: {e}")
             return False
     
+    def _local_get(self, key: str):
+        """(hit, record) from the in-process tier."""
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                self._local.pop(key, None)
+                return False, None
+            return True, entry[1]
+
+    def _local_put(self, key: str, record: Optional[Dict[str, Any]]) -> None:
+        """Cache terminal records only; misses and pending/failed keys may change under us."""
+        if record is None or record.get("status") != "completed":
+            self._local_forget(key)
+            return
+        with self._local_lock:
+            if len(self._local) >= IDEMPOTENCY_LOCAL_CACHE_MAX:
+                self._local.clear()
+            self._local[key] = (time.monotonic() + IDEMPOTENCY_LOCAL_CACHE_SECONDS, record)
+
+    def _local_forget(self, key: str) -> None:
+        with self._local_lock:
+            self._local.pop(key, None)
+
+    @staticmethod
+    def _record_from_row(key: str, key_record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'key': key,
+            'status': key_record['status'],
+            'response_data': json.loads(key_record['response_data']) if key_record['response_data'] else None,
+            'created_at': key_record['created_at'],
+            'expires_at': key_record['expires_at']
+        }
+
+    def check_keys_bulk(self, keys: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Batch ``check_key``: returns ``{key: record or None}`` for every requested key.
+        Costs at most one MGET and one ``IN (...)`` SELECT per chunk of keys not held in-process.
+        """
+        keys = list(dict.fromkeys(k for k in keys if k))
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        pending: List[str] = []
+        for key in keys:
+            hit, record = self._local_get(key)
+            if hit:
+                results[key] = record
+            else:
+                pending.append(key)
+        if not pending:
+            return results
+
+        try:
+            if self.redis_client:
+                cached = self.redis_client.mget([f"{self.key_prefix}{k}" for k in pending])
+                missing = []
+                for key, raw in zip(pending, cached):
+                    if raw:
+                        results[key] = json.loads(raw)
+                        self._local_put(key, results[key])
+                    else:
+                        missing.append(key)
+                pending = missing
+
+            alive = db_optimizer.sql_timestamp_gt_now("expires_at")
+            found: Dict[str, Dict[str, Any]] = {}
+            for start in range(0, len(pending), IDEMPOTENCY_BULK_CHUNK_SIZE):
+                chunk = pending[start:start + IDEMPOTENCY_BULK_CHUNK_SIZE]
+                rows = db_optimizer.execute_query(f"""
+                    SELECT key_hash, status, response_data, created_at, expires_at
+                    FROM idempotency_keys
+                    WHERE key_hash IN ({', '.join('?' for _ in chunk)}) AND {alive}
+                """, tuple(chunk))
+                for row in rows or []:
+                    found[row['key_hash']] = self._record_from_row(row['key_hash'], row)
+
+            pipe = self.redis_client.pipeline() if self.redis_client and found else None
+            for key in pending:
+                record = found.get(key)
+                results[key] = record
+                self._local_put(key, record)
+                if pipe is not None and record is not None:
+                    raw_expires_at = record['expires_at']
+                    expires_at = (
+                        raw_expires_at if isinstance(raw_expires_at, datetime)
+                        else datetime.fromisoformat(raw_expires_at)
+                    )
+                    ttl = int((_to_utc_naive(expires_at) - _utcnow_naive()).total_seconds())
+                    if ttl > 0:
+                        pipe.setex(f"{self.key_prefix}{key}", ttl, json.dumps(record, default=str))
+            if pipe is not None:
+                pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Idempotency bulk key check failed: {e}")
+            for key in pending:
+                results.setdefault(key, None)
+        return results
+
+    def claim_keys_bulk(self, operation_type: str, keys: Dict[str, Optional[Dict[str, Any]]],
+                        user_id: int = None, ttl: int = None) -> Set[str]:
+        """
+        Batch ``check_key`` + ``store_key`` for loops that skip already-completed work.
+
+        ``keys`` maps key -> request_data. Every key that is new, expired, ``pending`` or
+        ``failed`` is (re)stored as ``pending`` and returned; ``completed`` keys are not.
+        The database upsert is the arbiter (one statement per chunk), so concurrent
+        claimers never both win a completed key; Redis is refreshed with one pipeline.
+        """
+        ttl = ttl or self.default_ttl
+        candidates = []
+        for key in dict.fromkeys(k for k in keys if k):
+            hit, record = self._local_get(key)
+            if hit and record is not None and record.get("status") == "completed":
+                continue
+            candidates.append(key)
+        if not candidates:
+            return set()
+
+        claimed: Set[str] = set()
+        now = _utcnow_naive()
+        expires_at = now + timedelta(seconds=ttl)
+        expired = db_optimizer.sql_timestamp_lt_now("idempotency_keys.expires_at")
+        try:
+            with db_optimizer.transaction() as (conn, cursor):
+                for start in range(0, len(candidates), IDEMPOTENCY_BULK_CHUNK_SIZE):
+                    chunk = candidates[start:start + IDEMPOTENCY_BULK_CHUNK_SIZE]
+                    params = []
+                    for key in chunk:
+                        request_data = keys.get(key)
+                        params.extend((
+                            key,
+                            operation_type,
+                            user_id,
+                            json.dumps(request_data) if request_data else None,
+                            expires_at.isoformat(),
+                        ))
+                    cursor.execute(f"""
+                        INSERT INTO idempotency_keys (
+                            key_hash, operation_type, user_id, request_data, status, expires_at
+                        ) VALUES {', '.join("(?, ?, ?, ?, 'pending', ?)" for _ in chunk)}
+                        ON CONFLICT (key_hash) DO UPDATE SET
+                            operation_type = EXCLUDED.operation_type,
+                            user_id = EXCLUDED.user_id,
+                            request_data = EXCLUDED.request_data,
+                            status = 'pending',
+                            response_data = NULL,
+                            expires_at = EXCLUDED.expires_at
+                        WHERE idempotency_keys.status <> 'completed' OR {expired}
+                        RETURNING key_hash
+                    """, tuple(params))
+                    claimed.update(row['key_hash'] for row in cursor.fetchall())
+                conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Idempotency bulk key claim failed: {e}")
+            return set()
+
+        for key in candidates:
+            self._local_forget(key)
+        if self.redis_client and claimed:
+            try:
+                pipe = self.redis_client.pipeline()
+                for key in claimed:
+                    pipe.setex(
+                        f"{self.key_prefix}{key}",
+                        ttl,
+                        json.dumps({
+                            'key': key,
+                            'status': 'pending',
+                            'response_data': None,
+                            'created_at': now.isoformat(),
+                            'expires_at': expires_at.isoformat()
+                        })
+                    )
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"⚠️ Idempotency Redis refresh after bulk claim failed: {e}")
+        return claimed
+    
     def update_key_result(self, key: str, status: str, 
                          response_data: Dict[str, Any] = None) -> bool:
         """Update idempotency key with result"""
@@ -255,6 +449,7 @@ class IdempotencyManager:
                 json.dumps(response_data) if response_data else None,
                 key
             ), fetch=False)
+            self._local_forget(key)
             
             # Update Redis cache
             if self.redis_client:
@@ -5,15 +5,22 @@ from __future__ import annotations
 import email
 import imaplib
 import logging
+import re
 from email.header import decode_header
 from email.message import Message
 from email.utils import parsedate_to_datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 IMAP_MAIL_PROVIDERS = frozenset({"imap", "yahoo", "icloud", "apple", "aol"})
 
+_FETCH_START_RE = re.compile(rb"^\d+ \(")
+_FETCH_UID_RE = re.compile(rb"\bUID (\d+)")
+_FETCH_SIZE_RE = re.compile(rb"\bRFC822\.SIZE (\d+)")
+_FETCH_LITERAL_RE = re.compile(rb"(BODY\[(?:HEADER|TEXT)?\]|RFC822)(?:<\d+>)? \{\d+\}$")
+_STATUS_ITEM_RE = re.compile(rb"\b(UIDVALIDITY|UIDNEXT) (\d+)")
+
 
 def infer_provider_from_imap_settings(settings: Dict[str, Any]) -> str:
     server = (settings.get("imap_server") or "").lower()
@@ -78,6 +85,125 @@ def fetch_imap_rfc822(imap: imaplib.IMAP4, message_uid: str) -> bytes:
     raise RuntimeError(f"IMAP UID fetch returned unexpected payload for uid={message_uid}")
 
 
+def imap_mailbox_status(imap: imaplib.IMAP4, mailbox: str = "INBOX") -> Dict[str, int]:
+    """Return ``{"uidvalidity": ..., "uidnext": ...}`` for ``mailbox`` (missing keys when unsupported)."""
+    try:
+        status, data = imap.status(mailbox, "(UIDVALIDITY UIDNEXT)")
+    except imaplib.IMAP4.error as exc:
+        logger.debug("IMAP STATUS %s failed: %s", mailbox, exc)
+        return {}
+    if status != "OK" or not data:
+        return {}
+    line = data[0] if isinstance(data[0], bytes) else str(data[0]).encode()
+    return {key.decode().lower(): int(value) for key, value in _STATUS_ITEM_RE.findall(line)}
+
+
+def imap_uid_set(uids: Iterable[int]) -> str:
+    """Compact IMAP sequence-set for ``uids`` (``1:3,7,9:10``)."""
+    ordered = sorted({int(u) for u in uids})
+    ranges: List[str] = []
+    start = prev = None
+    for uid in ordered:
+        if start is None:
+            start = prev = uid
+            continue
+        if uid == prev + 1:
+            prev = uid
+            continue
+        ranges.append(f"{start}:{prev}" if prev != start else str(start))
+        start = prev = uid
+    if start is not None:
+        ranges.append(f"{start}:{prev}" if prev != start else str(start))
+    return ",".join(ranges)
+
+
+def parse_uid_fetch_response(data: List[Any]) -> Dict[int, Dict[str, Any]]:
+    """
+    Group an ``imap.uid("fetch", ...)`` response by UID.
+
+    imaplib returns each literal as a ``(prefix, bytes)`` tuple and the text between or
+    after literals (often carrying ``UID n``) as plain bytes; a prefix starting with
+    ``<seq> (`` begins the next message. Literals are keyed ``HEADER``, ``TEXT`` or
+    ``RFC822``; ``RFC822.SIZE`` is kept as ``size``.
+    """
+    messages: Dict[int, Dict[str, Any]] = {}
+    current: Optional[Dict[str, Any]] = None
+    pending: List[Dict[str, Any]] = []
+
+    def _flush(entry: Optional[Dict[str, Any]]) -> None:
+        if entry is not None and entry.get("uid") is not None:
+            messages[int(entry["uid"])] = entry
+
+    for part in data or []:
+        if isinstance(part, tuple):
+            prefix, literal = part[0] or b"", part[1]
+        else:
+            prefix, literal = part or b"", None
+        if not isinstance(prefix, bytes):
+            prefix = str(prefix).encode()
+        if _FETCH_START_RE.match(prefix):
+            _flush(current)
+            current = {}
+            pending.append(current)
+        if current is None:
+            continue
+        uid_match = _FETCH_UID_RE.search(prefix)
+        if uid_match:
+            current["uid"] = int(uid_match.group(1))
+        size_match = _FETCH_SIZE_RE.search(prefix)
+        if size_match:
+            current["size"] = int(size_match.group(1))
+        if literal is not None:
+            literal_match = _FETCH_LITERAL_RE.search(prefix.rstrip())
+            if literal_match:
+                key = literal_match.group(1).decode()
+                key = {"BODY[HEADER]": "HEADER", "BODY[TEXT]": "TEXT", "BODY[]": "RFC822"}.get(key, key)
+                current[key] = literal
+    _flush(current)
+    return messages
+
+
+def fetch_imap_uid_batch(
+    imap: imaplib.IMAP4,
+    uids: Iterable[int],
+    *,
+    body_bytes_cap: Optional[int] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Fetch several messages by UID in one round trip.
+
+    With ``body_bytes_cap`` only the header plus the first ``body_bytes_cap`` bytes of the
+    body are downloaded (``BODY.PEEK`` keeps \\Seen untouched), so large attachments stay on
+    the server. Each entry has ``raw`` (bytes to parse), ``size`` and ``complete`` (False
+    when the body was cut at the cap). Without a cap the full RFC822 message is fetched.
+    """
+    uid_list = sorted({int(u) for u in uids})
+    if not uid_list:
+        return {}
+    if body_bytes_cap is None:
+        items = "(UID RFC822.SIZE RFC822)"
+    else:
+        items = f"(UID RFC822.SIZE BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{int(body_bytes_cap)}>)"
+    status, data = imap.uid("fetch", imap_uid_set(uid_list), items)
+    if status != "OK":
+        raise RuntimeError(f"IMAP UID batch fetch failed for {len(uid_list)} uids")
+
+    out: Dict[int, Dict[str, Any]] = {}
+    for uid, entry in parse_uid_fetch_response(data).items():
+        if "RFC822" in entry:
+            raw = entry["RFC822"]
+            complete = True
+        elif "HEADER" in entry:
+            text = entry.get("TEXT") or b""
+            raw = entry["HEADER"] + text
+            size = entry.get("size")
+            complete = size is None or len(raw) >= size
+        else:
+            continue
+        out[uid] = {"raw": raw, "size": entry.get("size", len(raw)), "complete": complete}
+    return out
+
+
 def extract_body_from_imap_message(msg: Message) -> str:
     body_html = ""
     body_text = ""
@@ -6,6 +6,10 @@ Computes lead_score (0-100) and lead_quality (A/B/C/D) with configurable weights
 Technique (Scoring V1.1): deterministic weighted components in [0, 100] with explainable
 breakdown fields. This is intentionally rule-based (not ML) so results are stable and
 auditable in production.
+
+``score_leads_batch`` produces the same results as ``score_lead`` for many leads at once:
+text features are extracted once per lead into arrays, and engagement, weighting, the
+lifecycle factor and rounding run as NumPy operations over the whole batch.
 """
 
 import json
@@ -13,7 +17,9 @@ import logging
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -135,7 +141,9 @@ class LeadScoringService:
         return " ".join(pieces).lower().strip()
 
     def _intent_score(self, lead_data: Dict[str, Any]) -> int:
-        text = self._collect_text_for_intent(lead_data)
+        return self._intent_score_text(self._collect_text_for_intent(lead_data))
+
+    def _intent_score_text(self, text: str) -> int:
         if not text:
             return 35
         score = 40
@@ -167,22 +175,35 @@ class LeadScoringService:
                 score += pts
         return int(max(0, min(100, score)))
 
+    def _icp_terms(self) -> List[str]:
+        configured = os.getenv("LEAD_SCORING_ICP_KEYWORDS", "").strip()
+        if configured:
+            return [t.strip().lower() for t in configured.split(",") if t.strip()]
+        return ["automation", "crm", "ai", "workflow", "integration", "inbox", "sales"]
+
     def _icp_match_score(self, lead_data: Dict[str, Any]) -> int:
-        text = self._collect_text_for_intent(lead_data)
+        return self._icp_match_score_text(lead_data, self._collect_text_for_intent(lead_data), self._icp_terms())
+
+    def _icp_match_score_text(self, lead_data: Dict[str, Any], text: str, terms: List[str]) -> int:
         score = 30
         if lead_data.get("company"):
             score += 15
         source = str(lead_data.get("source") or "").lower()
         if source in {"referral", "partner", "website", "typeform", "tally"}:
             score += 10
-        configured = os.getenv("LEAD_SCORING_ICP_KEYWORDS", "").strip()
-        if configured:
-            terms = [t.strip().lower() for t in configured.split(",") if t.strip()]
-        else:
-            terms = ["automation", "crm", "ai", "workflow", "integration", "inbox", "sales"]
         score += sum(8 for t in terms if t in text)
         return int(max(0, min(100, score)))
 
+    @staticmethod
+    def _created_at(lead_data: Dict[str, Any]) -> Optional[datetime]:
+        created_at = lead_data.get("created_at")
+        if isinstance(created_at, str):
+            try:
+                created_at = datetime.fromisoformat(created_at)
+            except Exception:
+                created_at = None
+        return created_at
+
     def _engagement_score(
         self,
         lead_data: Dict[str, Any],
@@ -194,12 +215,7 @@ class LeadScoringService:
         if last_activity:
             delta_days = max((now - last_activity).days, 0)
             score += max(0, 40 - min(delta_days, 30) * 1.3)
-        created_at = lead_data.get("created_at")
-        if isinstance(created_at, str):
-            try:
-                created_at = datetime.fromisoformat(created_at)
-            except Exception:
-                created_at = None
+        created_at = self._created_at(lead_data)
         if created_at:
             age_days = max((now - created_at).days, 0)
             score += max(0, 20 - min(age_days, 40) * 0.5)
@@ -249,6 +265,87 @@ class LeadScoringService:
 
         return LeadScoreResult(score=score, quality=quality, breakdown=breakdown)
 
+    def score_leads_batch(
+        self,
+        leads: Sequence[Dict[str, Any]],
+        activity_counts: Optional[Sequence[int]] = None,
+        last_activities: Optional[Sequence[Optional[datetime]]] = None,
+        now: Optional[datetime] = None,
+    ) -> List[LeadScoreResult]:
+        """Score many leads at once; element ``i`` equals ``score_lead(leads[i], counts[i], last[i], now)``."""
+        n = len(leads)
+        if n == 0:
+            return []
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        terms = self._icp_terms()
+
+        identity_raw = np.empty(n)
+        intent = np.empty(n)
+        icp_match = np.empty(n)
+        lifecycle = np.empty(n)
+        last_days = np.full(n, np.nan)
+        age_days = np.full(n, np.nan)
+        counts = np.asarray(activity_counts if activity_counts is not None else np.zeros(n), dtype=float)
+        for i, lead_data in enumerate(leads):
+            text = self._collect_text_for_intent(lead_data)
+            source = (lead_data.get("source") or "").lower()
+            identity_raw[i] = (self.source_scores.get(source, 50) * 0.55) + (
+                self._domain_score(str(lead_data.get("email") or "")) * 0.45
+            )
+            intent[i] = self._intent_score_text(text)
+            icp_match[i] = self._icp_match_score_text(lead_data, text, terms)
+            lifecycle[i] = self.lifecycle_scores.get((lead_data.get("stage") or "new").lower(), 40)
+            last_activity = last_activities[i] if last_activities is not None else None
+            if last_activity:
+                last_days[i] = max((now - last_activity).days, 0)
+            created_at = self._created_at(lead_data)
+            if created_at:
+                age_days[i] = max((now - created_at).days, 0)
+
+        # Same operation order as score_lead so float results (and rounding) match exactly.
+        identity = np.round(identity_raw)
+        engagement = np.minimum(counts * 10, 60)
+        engagement = engagement + np.where(
+            np.isnan(last_days), 0.0, np.maximum(0, 40 - np.minimum(last_days, 30) * 1.3)
+        )
+        engagement = engagement + np.where(
+            np.isnan(age_days), 0.0, np.maximum(0, 20 - np.minimum(age_days, 40) * 0.5)
+        )
+        engagement = np.trunc(np.clip(engagement, 0, 100))
+
+        base_weighted = (
+            identity * self.weights["identity"]
+            + intent * self.weights["intent"]
+            + icp_match * self.weights["icp_match"]
+            + engagement * self.weights["engagement"]
+        )
+        lifecycle_factor = 1.0 + (
+            self.weights["lifecycle_modifier"] * LIFECYCLE_MAX_MULTIPLIER_DELTA * ((lifecycle - 50) / 50.0)
+        )
+        scores = np.round(np.clip(base_weighted * lifecycle_factor, 0.0, 100.0)).astype(int)
+
+        results = []
+        for i in range(n):
+            score = int(scores[i])
+            results.append(
+                LeadScoreResult(
+                    score=score,
+                    quality=self._quality_from_score(score),
+                    breakdown={
+                        "version": SCORING_VERSION,
+                        "identity": int(identity[i]),
+                        "intent": int(intent[i]),
+                        "icp_match": int(icp_match[i]),
+                        "engagement": int(engagement[i]),
+                        "lifecycle_modifier": int(lifecycle[i]),
+                        "weights": self.weights,
+                        "lifecycle_factor": round(float(lifecycle_factor[i]), 4),
+                        "base_weighted_score": round(float(base_weighted[i]), 2),
+                    },
+                )
+            )
+        return results
+
     def _quality_from_score(self, score: int) -> str:
         if score >= 80:
             return "A"
@@ -2,6 +2,7 @@
 Plain-text transactional email (SendGrid or SMTP).
 
 Used when sending as the Gmail-connected user is not required (automations fallback).
+SMTP sends reuse pooled sessions from core.mail_transport.
 Does not duplicate Flask route logic; callers must enforce auth and rate limits.
 """
 
@@ -9,10 +10,11 @@ from __future__ import annotations
 
 import logging
 import os
-import smtplib
 from email.message import EmailMessage
 from typing import Any, Dict
 
+from core.mail_transport import get_smtp_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,11 +78,14 @@ def send_plain_text_transactional(to_email: str, subject: str, body: str) -> Dic
             smtp_user = os.getenv("SMTP_USERNAME")
             smtp_pass = os.getenv("SMTP_PASSWORD")
 
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                if smtp_user and smtp_pass:
-                    server.starttls()
-                    server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
+            authenticated = bool(smtp_user and smtp_pass)
+            get_smtp_pool(
+                smtp_server,
+                smtp_port,
+                smtp_user if authenticated else None,
+                smtp_pass if authenticated else None,
+                starttls=authenticated,
+            ).send(msg)
             logger.info("Transactional email sent via SMTP to %s", to_email)
             return {"success": True, "channel": "smtp"}
         except Exception as exc:
@@ -0,0 +1,259 @@
+"""
+Pooled SMTP transport.
+
+Each pool keeps up to ``SMTP_POOL_SIZE`` authenticated connections to one provider
+(host, port, user) open between sends, so a queue drain pays the TCP + STARTTLS + AUTH
+handshake once per connection instead of once per message. Idle connections are checked
+with NOOP before reuse and replaced when the server has dropped them; a send that fails
+on a dead connection is retried once on a fresh one. ``send_batch`` pushes a list of
+messages through a single session. A per-provider limiter keeps throughput under
+``SMTP_MAX_MESSAGES_PER_SECOND`` across all threads sharing the pool.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import Message
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_TIMEOUT_SECONDS = int(os.getenv("SMTP_TIMEOUT_SECONDS", "45"))
+SMTP_KEEPALIVE_SECONDS = int(os.getenv("SMTP_KEEPALIVE_SECONDS", "30"))
+SMTP_MAX_IDLE_SECONDS = int(os.getenv("SMTP_MAX_IDLE_SECONDS", "240"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+SMTP_MAX_MESSAGES_PER_SECOND = float(os.getenv("SMTP_MAX_MESSAGES_PER_SECOND", "0"))  # 0 = unlimited
+
+_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, OSError)
+
+
+class _RateLimiter:
+    """Spacing limiter shared by every thread sending through one provider."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class SmtpConnectionPool:
+    """Bounded pool of persistent SMTP sessions for one provider/account."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        size: int = SMTP_POOL_SIZE,
+        timeout: int = SMTP_TIMEOUT_SECONDS,
+        max_per_second: float = SMTP_MAX_MESSAGES_PER_SECOND,
+    ):
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.size = max(1, int(size))
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._limiter = _RateLimiter(max_per_second)
+        self.connects = 0
+
+    def _open(self) -> _PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connects += 1
+        return _PooledConnection(smtp)
+
+    def _alive(self, conn: _PooledConnection) -> bool:
+        idle = time.monotonic() - conn.last_used
+        if idle > SMTP_MAX_IDLE_SECONDS or conn.sent >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+            return False
+        if idle < SMTP_KEEPALIVE_SECONDS:
+            return True
+        try:
+            return conn.smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if self._alive(conn):
+                return conn
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[_PooledConnection]:
+        """Borrow a live session; it goes back to the pool unless the body raised."""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+            conn = None
+        finally:
+            if conn is not None:
+                conn.close()
+            self._slots.release()
+
+    def _send_on(self, conn: _PooledConnection, msg: Message) -> None:
+        self._limiter.wait()
+        conn.smtp.send_message(msg)
+        conn.sent += 1
+        conn.last_used = time.monotonic()
+
+    def send(self, msg: Message) -> None:
+        """Send one message, retrying once on a fresh session if the pooled one was dropped."""
+        self.send_batch([msg], raise_errors=True)
+
+    def send_batch(
+        self,
+        messages: Sequence[Message],
+        raise_errors: bool = False,
+        on_result: Optional[Callable[[int, bool, Optional[str]], None]] = None,
+    ) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Send ``messages`` over one session; returns ``(success, error)`` per message.
+
+        A session dropped mid-batch is replaced and the interrupted message retried once;
+        per-message refusals (bad recipient, rejected data) do not end the batch. If no
+        session can be opened the remaining messages fail together. Authentication
+        errors always raise, since retrying cannot help. ``on_result(index, success,
+        error)`` is called as soon as each message's outcome is known; its exceptions are
+        logged and do not affect the batch.
+        """
+        results: List[Tuple[bool, Optional[str]]] = []
+
+        def record(ok: bool, err: Optional[str]) -> None:
+            results.append((ok, err))
+            if on_result is not None:
+                try:
+                    on_result(len(results) - 1, ok, err)
+                except Exception as exc:
+                    logger.error("SMTP send_batch result callback failed: %s", exc)
+
+        i = 0
+        retried = -1
+        while i < len(messages):
+            in_session = False
+            try:
+                with self.connection() as conn:
+                    in_session = True
+                    while i < len(messages):
+                        try:
+                            self._send_on(conn, messages[i])
+                            record(True, None)
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as exc:
+                            if raise_errors:
+                                raise
+                            conn.smtp.rset()
+                            record(False, str(exc)[:500])
+                        i += 1
+            except smtplib.SMTPAuthenticationError:
+                raise
+            except _RECONNECT_ERRORS as exc:
+                if in_session and retried != i:
+                    retried = i
+                    logger.info("SMTP session to %s:%s dropped; reconnecting", self.host, self.port)
+                    continue
+                if raise_errors:
+                    raise
+                logger.warning("SMTP send to %s:%s failed: %s", self.host, self.port, exc)
+                stop = i + 1 if in_session else len(messages)
+                for _ in range(i, stop):
+                    record(False, str(exc)[:500])
+                i = stop
+            except Exception as exc:
+                if raise_errors:
+                    raise
+                logger.warning("SMTP send to %s:%s failed: %s", self.host, self.port, exc)
+                for _ in range(i, len(messages)):
+                    record(False, str(exc)[:500])
+                i = len(messages)
+        return results
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools: Dict[Tuple[str, int, Optional[str], bool], SmtpConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(
+    host: str,
+    port: int = 587,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    starttls: bool = True,
+) -> SmtpConnectionPool:
+    """Process-wide pool for one provider account (credentials changes get a new pool)."""
+    key = (host, int(port), username, starttls)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.password != password:
+            if pool is not None:
+                pool.close()
+            pool = SmtpConnectionPool(host, port, username, password, starttls)
+            _pools[key] = pool
+        return pool
+
+
+def close_smtp_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
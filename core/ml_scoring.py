@@ -2,6 +2,10 @@
 """
 Fikiri Solutions - ML Scoring Service (Canonical)
 Lightweight ML scoring for CRM lead prioritization with production enhancements.
+
+``batch_score_leads`` scores a list of leads as arrays: per-lead features form one
+matrix, weights (or the fitted model) apply to it in one call, semantic similarity is a
+single query x document matrix product, and tracking rows go out in one insert.
 """
 
 import asyncio
@@ -13,8 +17,17 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+ML_SCORING_LOG_BATCH_ROWS = 500
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
 
 class MinimalMLScoring:
     """Minimal ML scoring service with production enhancements."""
@@ -127,16 +140,8 @@ class MinimalMLScoring:
                 except Exception:
                     pass
 
-            scores = {
-                "email_domain_score": self._score_email_domain(lead_data.get("email", "")),
-                "response_time_score": self._score_response_time(email_data.get("timestamp")),
-            }
             email_content = email_data.get("content", "") + " " + email_data.get("subject", "")
-            scores["email_length_score"] = self._score_email_length(email_content)
-            scores["keyword_score"] = self._score_keywords(email_content)
-            scores["subject_score"] = self._score_subject(email_data.get("subject", ""))
-            scores["contact_frequency_score"] = self._score_contact_frequency(lead_data.get("contact_count", 0))
-            scores["time_of_day_score"] = self._score_time_of_day(email_data.get("timestamp"))
+            scores = self._feature_scores(email_data, lead_data, email_content)
             if self.vector_search:
                 scores["semantic_similarity_score"] = self._score_semantic_similarity(email_content)
 
@@ -165,6 +170,17 @@ class MinimalMLScoring:
         except Exception:
             return self._default_score()
 
+    def _feature_scores(self, email_data: Dict[str, Any], lead_data: Dict[str, Any], email_content: str) -> Dict[str, float]:
+        return {
+            "email_domain_score": self._score_email_domain(lead_data.get("email", "")),
+            "response_time_score": self._score_response_time(email_data.get("timestamp")),
+            "email_length_score": self._score_email_length(email_content),
+            "keyword_score": self._score_keywords(email_content),
+            "subject_score": self._score_subject(email_data.get("subject", "")),
+            "contact_frequency_score": self._score_contact_frequency(lead_data.get("contact_count", 0)),
+            "time_of_day_score": self._score_time_of_day(email_data.get("timestamp")),
+        }
+
     def _predict_with_ml_model(self, scores: Dict[str, float]) -> float:
         try:
             feature_vector = [scores.get(feature, 0) for feature in self.feature_weights.keys()]
@@ -229,6 +245,61 @@ class MinimalMLScoring:
         except Exception:
             pass
 
+    def _track_scoring_results(
+        self,
+        results: List[Dict[str, Any]],
+        email_rows: List[Dict[str, Any]],
+        leads_data: List[Dict[str, Any]],
+    ) -> None:
+        """Batch form of ``_track_scoring_result``: one calibration extend, multi-row log inserts."""
+        try:
+            rows = [
+                {
+                    "timestamp": result["timestamp"],
+                    "email_content": email_data.get("content", "")[:200],
+                    "email_subject": email_data.get("subject", ""),
+                    "lead_email": lead_data.get("email", ""),
+                    "predicted_score": result["total_score"],
+                    "predicted_priority": result["priority"],
+                    "individual_scores": result["individual_scores"],
+                    "model_type": result["model_type"],
+                }
+                for result, email_data, lead_data in zip(results, email_rows, leads_data)
+            ]
+            self.calibration_data.extend(rows[-1000:])
+            if len(self.calibration_data) > 1000:
+                self.calibration_data = self.calibration_data[-1000:]
+            if self.db_optimizer and rows:
+                try:
+                    for start in range(0, len(rows), ML_SCORING_LOG_BATCH_ROWS):
+                        self._insert_scoring_log_rows(rows[start : start + ML_SCORING_LOG_BATCH_ROWS])
+                except Exception:
+                    pass
+        except Exception:
+            pass
+
+    def _insert_scoring_log_rows(self, rows: List[Dict[str, Any]]) -> None:
+        params: List[Any] = []
+        for row in rows:
+            params.extend((
+                row["timestamp"],
+                row["email_content"],
+                row["email_subject"],
+                row["lead_email"],
+                row["predicted_score"],
+                row["predicted_priority"],
+                json.dumps(row["individual_scores"]),
+                row["model_type"],
+            ))
+        self.db_optimizer.execute_query(
+            "INSERT INTO ml_scoring_log "
+            "(timestamp, email_content, email_subject, lead_email, predicted_score, "
+            "predicted_priority, individual_scores, model_type) VALUES "
+            + ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?)"] * len(rows)),
+            tuple(params),
+            fetch=False,
+        )
+
     def update_model_from_feedback(self, lead_id: str, actual_outcome: str, predicted_score: float):
         try:
             feedback_data = {
@@ -402,23 +473,119 @@ class MinimalMLScoring:
         }
 
     def batch_score_leads(self, leads_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not leads_data:
+            return []
+        try:
+            scored_leads = self._batch_score_leads_vectorized(leads_data)
+        except Exception as e:
+            logger.warning("Vectorized lead scoring failed, scoring one by one: %s", e)
+            scored_leads = self._batch_score_leads_serial(leads_data)
+        scored_leads.sort(key=lambda x: x["ml_score"], reverse=True)
+        return scored_leads
+
+    def _batch_score_leads_serial(self, leads_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         scored_leads = []
         for lead_data in leads_data:
             email_data = lead_data.get("last_email", {})
             score_result = self.calculate_lead_score(email_data, lead_data)
-            scored_lead = {
-                **lead_data,
-                "ml_score": score_result["total_score"],
-                "priority": score_result["priority"],
-                "recommended_action": score_result["recommended_action"],
-                "confidence": score_result["confidence"],
-                "model_type": score_result["model_type"],
-                "scored_at": score_result["timestamp"],
+            scored_leads.append(self._scored_lead(lead_data, score_result))
+        return scored_leads
+
+    @staticmethod
+    def _scored_lead(lead_data: Dict[str, Any], score_result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **lead_data,
+            "ml_score": score_result["total_score"],
+            "priority": score_result["priority"],
+            "recommended_action": score_result["recommended_action"],
+            "confidence": score_result["confidence"],
+            "model_type": score_result["model_type"],
+            "scored_at": score_result["timestamp"],
+        }
+
+    def _batch_score_leads_vectorized(self, leads_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Same features and weights as ``calculate_lead_score``, computed over the whole batch."""
+        email_rows = [lead_data.get("last_email") or {} for lead_data in leads_data]
+        contents = [e.get("content", "") + " " + e.get("subject", "") for e in email_rows]
+        feature_rows = [
+            self._feature_scores(email_data, lead_data, content)
+            for lead_data, email_data, content in zip(leads_data, email_rows, contents)
+        ]
+        columns = list(feature_rows[0])
+        x = np.array([[row[c] for c in columns] for row in feature_rows], dtype=float)
+        if self.vector_search:
+            x = np.column_stack([x, self._batch_semantic_similarity(contents)])
+            columns.append("semantic_similarity_score")
+
+        self._ensure_ml_models_initialized()
+        # Column-wise accumulation in feature order matches calculate_lead_score's sum() bit for bit.
+        totals = sum(x[:, j] * self.feature_weights.get(c, 0) for j, c in enumerate(columns))
+        if self.model_type != "rule_based" and self.scoring_model:
+            model_x = np.column_stack(
+                [x[:, columns.index(f)] if f in columns else np.zeros(len(x)) for f in self.feature_weights]
+            )
+            try:
+                if hasattr(self.scoring_model, "predict_proba"):
+                    proba = np.asarray(self.scoring_model.predict_proba(model_x))
+                    totals = proba[:, 1] if proba.shape[1] > 1 else proba[:, 0]
+                else:
+                    totals = np.asarray(self.scoring_model.predict(model_x), dtype=float)
+            except Exception:
+                pass
+        variance = sum((x[:, j] - 0.5) ** 2 for j in range(x.shape[1])) / x.shape[1]
+        confidence = np.minimum(1.0, variance * 4)
+
+        timestamp = datetime.now(timezone.utc).isoformat()
+        scored_leads = []
+        results = []
+        for i, lead_data in enumerate(leads_data):
+            total_score = float(totals[i])
+            priority = self._determine_priority(total_score)
+            result = {
+                "total_score": round(total_score, 2),
+                "priority": priority,
+                "individual_scores": dict(zip(columns, (float(v) for v in x[i]))),
+                "recommended_action": self._get_recommended_action(priority),
+                "confidence": round(float(confidence[i]), 2),
+                "model_type": self.model_type,
+                "timestamp": timestamp,
             }
-            scored_leads.append(scored_lead)
-        scored_leads.sort(key=lambda x: x["ml_score"], reverse=True)
+            results.append(result)
+            scored_leads.append(self._scored_lead(lead_data, result))
+        self._track_scoring_results(results, email_rows, leads_data)
         return scored_leads
 
+    def _batch_semantic_similarity(self, contents: List[str]) -> np.ndarray:
+        """
+        ``_score_semantic_similarity`` for every content at once: one (queries x documents)
+        cosine matrix over the local index, top-3 above 0.6 per row. Pinecone-backed search
+        has no local matrix and keeps the per-query call.
+        """
+        vs = self.vector_search
+        local = not (hasattr(vs, "_pinecone_active") and vs._pinecone_active())
+        vectors = getattr(vs, "vectors", None) if local else None
+        if not vectors or not hasattr(vs, "_generate_embedding"):
+            return np.array([self._score_semantic_similarity(c) for c in contents], dtype=float)
+
+        docs = _unit_rows(np.asarray(vectors, dtype=float))
+        queries = _unit_rows(np.asarray([vs._generate_embedding(c) for c in contents], dtype=float))
+        sims = queries @ docs.T
+
+        k = min(3, sims.shape[1])
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        hit = top_sims >= 0.6
+        metadata = list(getattr(vs, "metadata", []))
+        high_value = np.array(
+            [isinstance(m, dict) and m.get("lead_value") == "high" for m in metadata]
+            + [False] * (docs.shape[0] - len(metadata)),
+            dtype=bool,
+        )
+        hits = hit.sum(axis=1)
+        avg = np.where(hits > 0, (top_sims * hit).sum(axis=1) / np.maximum(hits, 1), 0.0)
+        boost = 0.2 * (hit & high_value[top]).sum(axis=1)
+        return np.where(hits > 0, np.minimum(1.0, avg + boost), 0.5)
+
     async def batch_score_leads_async(self, leads_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self.batch_score_leads, leads_data)
@@ -5,10 +5,12 @@ Handles user privacy settings, data retention, and consent management
 
 import json
 import logging
-from typing import Dict, Any, Optional, List
+from itertools import groupby
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from core.database_optimization import db_optimizer
+from core.streaming_export import iter_ndjson, iter_zip, ndjson_line
 
 logger = logging.getLogger(__name__)
 
@@ -402,7 +404,12 @@ class PrivacyManager:
             }
     
     def export_user_data(self, user_id: int) -> Dict[str, Any]:
-        """Export all user data for GDPR compliance"""
+        """
+        Export all user data for GDPR compliance.
+
+        ``leads`` and ``activities`` in ``export_data`` are unconsumed ``iter_query``
+        generators; write them out with ``core.streaming_export.iter_json``.
+        """
         try:
             # Get user profile (rulepack compliance: specific columns, not SELECT *)
             # Note: For GDPR export, we need all user data, but still use explicit columns
@@ -412,16 +419,18 @@ class PrivacyManager:
             )[0]
             
             # Get leads data (rulepack compliance: specific columns, not SELECT *)
-            leads_data = db_optimizer.execute_query(
-                "SELECT id, user_id, email, name, phone, company, source, stage, score, created_at, updated_at, last_contact, notes, tags, metadata FROM leads WHERE user_id = ?",
+            # Streamed: large accounts have tens of thousands of leads/activities
+            leads = db_optimizer.iter_query(
+                "SELECT id, user_id, email, name, phone, company, source, stage, score, created_at, updated_at, last_contact, notes, tags, metadata FROM leads WHERE user_id = ? ORDER BY id",
                 (user_id,)
             )
             
             # Get activities data
-            activities_data = db_optimizer.execute_query(
+            activities = db_optimizer.iter_query(
                 """SELECT la.*, l.email as lead_email FROM lead_activities la 
                    JOIN leads l ON la.lead_id = l.id 
-                   WHERE l.user_id = ?""",
+                   WHERE l.user_id = ?
+                   ORDER BY la.id""",
                 (user_id,)
             )
             
@@ -433,8 +442,8 @@ class PrivacyManager:
             
             export_data = {
                 'user_profile': dict(user_data),
-                'leads': [dict(lead) for lead in leads_data],
-                'activities': [dict(activity) for activity in activities_data],
+                'leads': leads,
+                'activities': activities,
                 'privacy_settings': privacy_settings.__dict__ if privacy_settings else None,
                 'consents': [consent.__dict__ for consent in consents],
                 'export_timestamp': datetime.now().isoformat(),
@@ -455,6 +464,71 @@ class PrivacyManager:
                 'error_code': 'EXPORT_ERROR'
             }
     
+    def iter_export_records(self, user_id: int) -> Optional[Iterator[Tuple[str, Dict[str, Any]]]]:
+        """
+        Streamed GDPR export: ``(table, record)`` pairs, one table after another.
+
+        The profile is read eagerly so a missing user returns None before any response
+        is started; leads and activities are pulled in batches through ``iter_query``.
+        """
+        rows = db_optimizer.execute_query(
+            "SELECT id, email, name, role, business_name, business_email, industry, team_size, is_active, email_verified, created_at, updated_at, last_login, onboarding_completed, onboarding_step, metadata FROM users WHERE id = ?",
+            (user_id,)
+        )
+        if not rows:
+            return None
+        profile = dict(rows[0])
+
+        def records() -> Iterator[Tuple[str, Dict[str, Any]]]:
+            yield 'user_profile', profile
+            for lead in db_optimizer.iter_query(
+                "SELECT id, user_id, email, name, phone, company, source, stage, score, created_at, updated_at, last_contact, notes, tags, metadata FROM leads WHERE user_id = ? ORDER BY id",
+                (user_id,)
+            ):
+                yield 'leads', lead
+            for activity in db_optimizer.iter_query(
+                """SELECT la.*, l.email as lead_email FROM lead_activities la 
+                   JOIN leads l ON la.lead_id = l.id 
+                   WHERE l.user_id = ?
+                   ORDER BY la.id""",
+                (user_id,)
+            ):
+                yield 'activities', activity
+            privacy_settings = self.get_privacy_settings(user_id)
+            if privacy_settings:
+                yield 'privacy_settings', privacy_settings.__dict__
+            for consent in self.get_privacy_consents(user_id):
+                yield 'consents', consent.__dict__
+
+        return records()
+
+    def iter_export_ndjson(self, user_id: int) -> Optional[Iterator[str]]:
+        """NDJSON export: a header line, then ``{"table": ..., "record": ...}`` per record."""
+        records = self.iter_export_records(user_id)
+        if records is None:
+            return None
+        header = {'table': 'export', 'record': {'user_id': user_id, 'export_timestamp': datetime.now().isoformat()}}
+
+        def lines() -> Iterator[str]:
+            yield ndjson_line(header)
+            yield from iter_ndjson({'table': table, 'record': record} for table, record in records)
+
+        return lines()
+
+    def iter_export_zip(self, user_id: int) -> Optional[Iterator[bytes]]:
+        """Zip export with one ``<table>.ndjson`` member per table plus ``export.json``."""
+        records = self.iter_export_records(user_id)
+        if records is None:
+            return None
+        manifest = {'user_id': user_id, 'export_timestamp': datetime.now().isoformat(), 'format': 'ndjson'}
+
+        def members():
+            yield 'export.json', [json.dumps(manifest, default=str)]
+            for table, group in groupby(records, key=lambda pair: pair[0]):
+                yield f'{table}.ndjson', iter_ndjson(record for _, record in group)
+
+        return iter_zip(members())
+
     def delete_user_data(self, user_id: int) -> Dict[str, Any]:
         """Delete all user data for GDPR compliance"""
         try:
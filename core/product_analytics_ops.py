@@ -157,6 +157,7 @@ def _outcome_exists(
     object_id: str,
 ) -> bool:
     from core.database_optimization import db_optimizer
+    from core.event_partitions import event_table_source
 
     if not tables_available():
         return False
@@ -164,8 +165,8 @@ def _outcome_exists(
         event_name=event_name, object_type=object_type, object_id=str(object_id)
     )
     rows = db_optimizer.execute_query(
-        """
-        SELECT id FROM product_events
+        f"""
+        SELECT id FROM {event_table_source("product_events")}
         WHERE tenant_id = ?
           AND event_name = ?
           AND event_source IN ('server', 'derived')
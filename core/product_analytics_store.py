@@ -10,9 +10,11 @@ from __future__ import annotations
 import json
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
+from core.batched_purge import purge_in_batches
 from core.database_optimization import db_optimizer
+from core.event_partitions import event_table_source, list_partitions
 from core.product_analytics_registry import SCHEMA_VERSION, aggregate_retention_days, raw_retention_days
 
 logger = logging.getLogger(__name__)
@@ -280,8 +282,8 @@ def insert_product_event(
     try:
         if outcome_dedupe_key:
             existing = db_optimizer.execute_query(
-                """
-                SELECT id FROM product_events
+                f"""
+                SELECT id FROM {event_table_source("product_events")}
                 WHERE tenant_id = ? AND outcome_dedupe_key = ?
                 LIMIT 1
                 """,
@@ -407,38 +409,19 @@ def upsert_daily_metric_counters(
         return False
 
 
-def cleanup_expired_product_events(*, batch_size: int = 500) -> Dict[str, Any]:
-    """Dialect-safe bounded cleanup: select IDs then delete by ID."""
+def cleanup_expired_product_events(*, batch_size: int = 500, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """Dialect-safe bounded cleanup: delete expired events in id-range batches until done or ``deadline``."""
     if not tables_available():
         return {"success": True, "deleted": 0, "skipped": True}
     batch_size = max(1, min(int(batch_size), 2000))
     cutoff = datetime.now(timezone.utc) - timedelta(days=raw_retention_days())
     cutoff_s = cutoff.isoformat()
     try:
-        rows = db_optimizer.execute_query(
-            """
-            SELECT id FROM product_events
-            WHERE occurred_at < ?
-            ORDER BY id ASC
-            LIMIT ?
-            """,
-            (cutoff_s, batch_size),
+        stats = purge_in_batches(
+            "product_events", "occurred_at < ?", (cutoff_s,),
+            batch_size=batch_size, deadline=deadline, db=db_optimizer,
         )
-        ids: List[int] = []
-        for row in rows or []:
-            if hasattr(row, "keys"):
-                ids.append(int(row["id"]))
-            else:
-                ids.append(int(row[0]))
-        if not ids:
-            return {"success": True, "deleted": 0}
-        placeholders = ",".join(["?"] * len(ids))
-        db_optimizer.execute_query(
-            f"DELETE FROM product_events WHERE id IN ({placeholders})",
-            tuple(ids),
-            fetch=False,
-        )
-        return {"success": True, "deleted": len(ids)}
+        return {"success": True, "deleted": stats.deleted, "batches": stats.batches, "complete": stats.complete}
     except Exception as exc:
         logger.warning(
             "product_analytics cleanup failed",
@@ -447,33 +430,17 @@ def cleanup_expired_product_events(*, batch_size: int = 500) -> Dict[str, Any]:
         return {"success": False, "deleted": 0, "error_type": type(exc).__name__}
 
 
-def cleanup_expired_daily_metrics(*, batch_size: int = 500) -> Dict[str, Any]:
+def cleanup_expired_daily_metrics(*, batch_size: int = 500, deadline: Optional[float] = None) -> Dict[str, Any]:
     if not tables_available() or not db_optimizer.table_exists("tenant_daily_metrics"):
         return {"success": True, "deleted": 0, "skipped": True}
     batch_size = max(1, min(int(batch_size), 2000))
     cutoff = (datetime.now(timezone.utc) - timedelta(days=aggregate_retention_days())).strftime("%Y-%m-%d")
     try:
-        rows = db_optimizer.execute_query(
-            """
-            SELECT id FROM tenant_daily_metrics
-            WHERE metric_date < ?
-            ORDER BY id ASC
-            LIMIT ?
-            """,
-            (cutoff, batch_size),
-        )
-        ids = []
-        for row in rows or []:
-            ids.append(int(row["id"] if hasattr(row, "keys") else row[0]))
-        if not ids:
-            return {"success": True, "deleted": 0}
-        placeholders = ",".join(["?"] * len(ids))
-        db_optimizer.execute_query(
-            f"DELETE FROM tenant_daily_metrics WHERE id IN ({placeholders})",
-            tuple(ids),
-            fetch=False,
+        stats = purge_in_batches(
+            "tenant_daily_metrics", "metric_date < ?", (cutoff,),
+            batch_size=batch_size, deadline=deadline, db=db_optimizer,
         )
-        return {"success": True, "deleted": len(ids)}
+        return {"success": True, "deleted": stats.deleted, "batches": stats.batches, "complete": stats.complete}
     except Exception as exc:
         return {"success": False, "deleted": 0, "error_type": type(exc).__name__}
 
@@ -483,11 +450,17 @@ def delete_tenant_analytics(tenant_id: int) -> Dict[str, Any]:
     if not tables_available():
         return {"success": True, "events_deleted": 0, "metrics_deleted": 0, "skipped": True}
     try:
-        db_optimizer.execute_query(
-            "DELETE FROM product_events WHERE tenant_id = ?",
-            (int(tenant_id),),
-            fetch=False,
-        )
+        tables = ["product_events"]
+        if db_optimizer.db_type != "postgresql":
+            # SQLite archives cold months into product_events_pYYYYMM tables; a PostgreSQL
+            # parent already deletes through to its partitions.
+            tables += [part["name"] for part in list_partitions("product_events")]
+        for table in tables:
+            db_optimizer.execute_query(
+                f"DELETE FROM {table} WHERE tenant_id = ?",
+                (int(tenant_id),),
+                fetch=False,
+            )
         db_optimizer.execute_query(
             "DELETE FROM tenant_daily_metrics WHERE tenant_id = ?",
             (int(tenant_id),),
@@ -521,8 +494,8 @@ def latest_event_timestamp(tenant_id: int) -> Optional[str]:
     if not tables_available():
         return None
     rows = db_optimizer.execute_query(
-        """
-        SELECT occurred_at FROM product_events
+        f"""
+        SELECT occurred_at FROM {event_table_source("product_events")}
         WHERE tenant_id = ?
         ORDER BY occurred_at DESC
         LIMIT 1
@@ -541,8 +514,8 @@ def earliest_meaningful_outcome_at(tenant_id: int) -> Optional[str]:
     if not tables_available():
         return None
     rows = db_optimizer.execute_query(
-        """
-        SELECT occurred_at FROM product_events
+        f"""
+        SELECT occurred_at FROM {event_table_source("product_events")}
         WHERE tenant_id = ?
           AND event_name IN ('outcome.lead_captured', 'outcome.sync_completed',
                              'outcome.integration_connected', 'outcome.onboarding_completed')
@@ -573,7 +546,7 @@ def count_outcome_events(
         clauses.append("occurred_at >= ?")
         params.append(since_date)
     rows = db_optimizer.execute_query(
-        f"SELECT COUNT(*) AS c FROM product_events WHERE {' AND '.join(clauses)}",
+        f"SELECT COUNT(*) AS c FROM {event_table_source('product_events')} WHERE {' AND '.join(clauses)}",
         tuple(params),
     )
     if not rows:
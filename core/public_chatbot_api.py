@@ -7,7 +7,8 @@ import json
 import logging
 import os
 import uuid
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify, g
 from functools import wraps
@@ -23,11 +24,12 @@ from core.chatbot_content_events import (
     record_chatbot_response_generated,
 )
 from core.request_correlation import get_or_create_correlation_id
+from core.sse_stream import format_sse, sse_response
 from core.user_feedback_router import get_user_feedback_router
 from core.chatbot_config import ChatbotConfig, load_chatbot_config
 from core.chatbot_lead_capture import capture_chatbot_lead
 from core.chatbot_retrieval import retrieve_chatbot_context, retrieval_metadata
-from core.chatbot_response_service import generate_chatbot_answer
+from core.chatbot_response_service import generate_chatbot_answer, stream_chatbot_answer
 from core.chatbot_usage_tracking import (
     check_chatbot_usage_allowed,
     record_chatbot_ai_usage_if_needed,
@@ -221,296 +223,393 @@ def public_chatbot_key_status():
     return jsonify({"success": True, "valid": True}), 200
 
 
-@public_chatbot_bp.route('/query', methods=['POST', 'OPTIONS'])
-@handle_api_errors
-@require_api_key
-def public_chatbot_query():
-    """
-    Public chatbot query endpoint for external clients
+@dataclass
+class _PublicQuery:
+    """Validated request state shared by the JSON and SSE query endpoints."""
 
-    Request:
-        POST /api/public/chatbot/query
-        Headers:
-            X-API-Key: fik_...
-        Body:
-            {
-                "query": "What are your business hours?",
-                "conversation_id": "optional-conversation-id",
-                "context": {"user_id": "optional", "session_id": "optional"}
-            }
+    query: str
+    conversation_id: str
+    context: Dict[str, Any]
+    lead_payload: Dict[str, Any]
+    correlation_id: str
+    tenant_id: Optional[str]
+    user_id: Optional[Any]
+    tenant_scope_uid: Optional[int]
+    billing_uid: Optional[int]
+    retrieval: Any
+    chatbot_config: ChatbotConfig
+    plan_info: Dict[str, Any]
+    allow_llm: bool
 
-    Response:
-        {
-            "success": true,
-            "query": "What are your business hours?",
-            "response": "We're open Monday-Friday 9am-5pm EST.",
-            "sources": [...],
-            "confidence": 0.95,
-            "conversation_id": "generated-or-provided-id"
-        }
-    """
-    start_time = datetime.now(timezone.utc)
 
-    try:
-        data = request.json or {}
-        query = data.get('query', '').strip()
-        conversation_id = data.get('conversation_id')
-        context = data.get('context', {})
-        lead_payload = data.get("lead") or {}
+def _prepare_public_query(data: Dict[str, Any]) -> Tuple[Optional[_PublicQuery], Optional[Any]]:
+    """Validate input, start the conversation, retrieve context and check usage.
 
-        if not query:
-            record_api_usage(response_status=400)
-            return jsonify(_public_error_payload("Query is required", "MISSING_QUERY")), 400
+    Returns ``(query_state, None)`` or ``(None, error_response)``.
+    """
+    query = data.get('query', '').strip()
+    conversation_id = data.get('conversation_id')
+    context = data.get('context', {})
+    lead_payload = data.get("lead") or {}
 
-        correlation_id = get_or_create_correlation_id(request, data)
+    if not query:
+        record_api_usage(response_status=400)
+        return None, (jsonify(_public_error_payload("Query is required", "MISSING_QUERY")), 400)
 
-        tenant_id = g.api_key_info.get('tenant_id')
-        user_id = g.api_key_info.get('user_id')
+    correlation_id = get_or_create_correlation_id(request, data)
 
-        if tenant_id:
-            context['tenant_id'] = tenant_id
+    tenant_id = g.api_key_info.get('tenant_id')
+    user_id = g.api_key_info.get('user_id')
 
-        tenant_scope_uid = _api_key_user_id_as_int(user_id)
-        billing_uid = tenant_scope_uid
-        if billing_uid is None and isinstance(user_id, int) and not isinstance(user_id, bool):
-            billing_uid = user_id
+    if tenant_id:
+        context['tenant_id'] = tenant_id
 
-        if not conversation_id:
-            conversation = context_system.start_conversation(
-                user_id=user_id,
-                initial_message=query,
-                session_id=context.get("session_id"),
-                channel='api',
-                user_context={"tenant_id": tenant_id, **context}
-            )
-            conversation_id = conversation.conversation_id
+    tenant_scope_uid = _api_key_user_id_as_int(user_id)
+    billing_uid = tenant_scope_uid
+    if billing_uid is None and isinstance(user_id, int) and not isinstance(user_id, bool):
+        billing_uid = user_id
 
-        retrieval = retrieve_chatbot_context(
-            query,
-            tenant_id,
-            tenant_scope_uid,
-            correlation_id=correlation_id,
+    if not conversation_id:
+        conversation = context_system.start_conversation(
+            user_id=user_id,
+            initial_message=query,
+            session_id=context.get("session_id"),
+            channel='api',
+            user_context={"tenant_id": tenant_id, **context}
         )
+        conversation_id = conversation.conversation_id
 
-        try:
-            chatbot_config = load_chatbot_config(billing_uid, tenant_id=tenant_id)
-        except Exception as config_exc:
-            logger.warning(
-                "chatbot_config load failed; using defaults: %s",
-                config_exc,
-                extra={
-                    "event": "chatbot_config_load_warning",
-                    "user_id": billing_uid,
-                    "tenant_id": tenant_id,
-                },
-            )
-            chatbot_config = ChatbotConfig()
+    retrieval = retrieve_chatbot_context(
+        query,
+        tenant_id,
+        tenant_scope_uid,
+        correlation_id=correlation_id,
+    )
 
-        usage_gate = check_chatbot_usage_allowed(
-            user_id=user_id,
-            billing_uid=billing_uid,
-            fallback_needed=retrieval.fallback_needed,
-            tenant_id=tenant_id,
+    try:
+        chatbot_config = load_chatbot_config(billing_uid, tenant_id=tenant_id)
+    except Exception as config_exc:
+        logger.warning(
+            "chatbot_config load failed; using defaults: %s",
+            config_exc,
+            extra={
+                "event": "chatbot_config_load_warning",
+                "user_id": billing_uid,
+                "tenant_id": tenant_id,
+            },
         )
-        if not usage_gate.allowed:
-            record_api_usage(response_status=usage_gate.http_status)
-            return jsonify(
+        chatbot_config = ChatbotConfig()
+
+    usage_gate = check_chatbot_usage_allowed(
+        user_id=user_id,
+        billing_uid=billing_uid,
+        fallback_needed=retrieval.fallback_needed,
+        tenant_id=tenant_id,
+    )
+    if not usage_gate.allowed:
+        record_api_usage(response_status=usage_gate.http_status)
+        return None, (
+            jsonify(
                 _public_error_payload(
                     usage_gate.error_message or "Plan limit exceeded",
                     usage_gate.error_code,
                     **usage_gate.error_extra,
                 )
-            ), usage_gate.http_status
+            ),
+            usage_gate.http_status,
+        )
 
-        plan_info = usage_gate.plan_info
-        allow_llm = usage_gate.allow_llm
+    return _PublicQuery(
+        query=query,
+        conversation_id=conversation_id,
+        context=context,
+        lead_payload=lead_payload,
+        correlation_id=correlation_id,
+        tenant_id=tenant_id,
+        user_id=user_id,
+        tenant_scope_uid=tenant_scope_uid,
+        billing_uid=billing_uid,
+        retrieval=retrieval,
+        chatbot_config=chatbot_config,
+        plan_info=usage_gate.plan_info,
+        allow_llm=usage_gate.allow_llm,
+    ), None
+
+
+def _answer_kwargs(pq: _PublicQuery) -> Dict[str, Any]:
+    return {
+        "tenant_id": pq.tenant_id,
+        "user_id": pq.user_id,
+        "conversation_id": pq.conversation_id,
+        "correlation_id": pq.correlation_id,
+        "billing_uid": pq.billing_uid,
+        "fallback_needed": pq.retrieval.fallback_needed,
+        "allow_llm": pq.allow_llm,
+        "chatbot_config": pq.chatbot_config,
+    }
+
+
+def _finish_public_query(pq: _PublicQuery, answer_result: Any, start_time: datetime) -> Dict[str, Any]:
+    """Lead capture, escalation, logging, persistence and usage for one answered query."""
+    query = pq.query
+    conversation_id = pq.conversation_id
+    tenant_id = pq.tenant_id
+    user_id = pq.user_id
+    correlation_id = pq.correlation_id
+    billing_uid = pq.billing_uid
+    chatbot_config = pq.chatbot_config
+
+    answer = answer_result.answer
+    confidence = answer_result.confidence
+    llm_confidence = answer_result.llm_confidence
+    fallback_used = answer_result.fallback_used
+    llm_trace_id = answer_result.llm_trace_id
+    retrieval_conf = answer_result.retrieval_confidence
+    threshold = answer_result.response_metadata.get("confidence_threshold", 0.4)
+    llm_attempted = answer_result.response_metadata.get("llm_attempted", False)
+    llm_result_meta = answer_result.response_metadata
+
+    lead_id = capture_chatbot_lead(
+        user_id=user_id,
+        query=query,
+        lead_payload=pq.lead_payload,
+        conversation_id=conversation_id,
+        tenant_id=tenant_id,
+        chatbot_config=chatbot_config,
+    )
 
-        llm_result_meta: Dict[str, Any] = {}
-        answer_result = generate_chatbot_answer(
-            query,
-            retrieval.context_text,
-            retrieval.sources,
-            tenant_id=tenant_id,
-            user_id=user_id,
+    escalation_engine = get_escalation_engine()
+    should_escalate = escalation_engine.should_escalate(confidence, fallback_used)
+    escalated_question_id = None
+
+    if should_escalate:
+        escalation_result = escalation_engine.escalate_question(
             conversation_id=conversation_id,
-            correlation_id=correlation_id,
-            billing_uid=billing_uid,
-            fallback_needed=retrieval.fallback_needed,
-            allow_llm=allow_llm,
-            chatbot_config=chatbot_config,
+            tenant_id=tenant_id or str(user_id or 'anonymous'),
+            question=query,
+            original_answer=answer,
+            confidence=confidence,
+            user_id=str(user_id) if user_id else None
         )
+        if escalation_result.get('success'):
+            escalated_question_id = escalation_result.get('escalated_question_id')
+            answer = f"{answer}\n\n{chatbot_config.escalation_message}"
+
+    message_id = str(uuid.uuid4())
+    log_metadata = {
+        "retrieval_confidence": retrieval_conf,
+        "llm_confidence": llm_confidence,
+        "confidence_threshold": threshold,
+    }
+    if llm_result_meta.get("streamed"):
+        log_metadata["streamed"] = True
+        log_metadata["first_token_ms"] = llm_result_meta.get("first_token_ms")
+    sources = pq.retrieval.sources
+    content_fp = content_fingerprint_from_sources(sources)
+    _insert_query_log(
+        conversation_id=conversation_id,
+        message_id=message_id,
+        query=query,
+        answer=answer,
+        confidence=confidence,
+        fallback_used=fallback_used,
+        sources=sources,
+        tenant_id=tenant_id,
+        user_id=user_id,
+        llm_trace_id=llm_trace_id,
+        log_metadata=log_metadata,
+        correlation_id=correlation_id,
+        content_fp=content_fp,
+    )
 
-        answer = answer_result.answer
-        confidence = answer_result.confidence
-        llm_confidence = answer_result.llm_confidence
-        fallback_used = answer_result.fallback_used
-        llm_trace_id = answer_result.llm_trace_id
-        retrieval_conf = answer_result.retrieval_confidence
-        threshold = answer_result.response_metadata.get("confidence_threshold", 0.4)
-        llm_attempted = answer_result.response_metadata.get("llm_attempted", False)
-        llm_result_meta = answer_result.response_metadata
-
-        lead_id = capture_chatbot_lead(
-            user_id=user_id,
-            query=query,
-            lead_payload=lead_payload,
+    record_chatbot_response_generated(
+        message_id=message_id,
+        conversation_id=conversation_id,
+        user_id=pq.tenant_scope_uid,
+        correlation_id=correlation_id,
+        query_excerpt=query,
+        response_excerpt=answer,
+        sources=sources,
+        content_fingerprint=content_fp,
+        llm_trace_id=llm_trace_id,
+        confidence=confidence,
+        fallback_used=fallback_used,
+    )
+
+    if is_public_persistence_enabled() and tenant_id:
+        persist_chatbot_turn(
+            tenant_id=str(tenant_id),
             conversation_id=conversation_id,
-            tenant_id=tenant_id,
-            chatbot_config=chatbot_config,
+            query=query,
+            answer=answer,
+            assistant_message_id=message_id,
+            sources=sources,
+            fallback_used=fallback_used,
+            confidence=confidence,
+            retrieval_confidence=retrieval_conf,
+            user_id=str(user_id) if user_id is not None else None,
+            session_id=str(pq.context.get("session_id")) if pq.context.get("session_id") else None,
+            channel="public_api",
+            correlation_id=correlation_id,
         )
 
-        escalation_engine = get_escalation_engine()
-        should_escalate = escalation_engine.should_escalate(confidence, fallback_used)
-        escalated_question_id = None
-
-        if should_escalate:
-            escalation_result = escalation_engine.escalate_question(
-                conversation_id=conversation_id,
-                tenant_id=tenant_id or str(user_id or 'anonymous'),
-                question=query,
-                original_answer=answer,
-                confidence=confidence,
-                user_id=str(user_id) if user_id else None
+    response_time_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
+
+    record_api_usage(response_status=200, response_time_ms=response_time_ms)
+    if billing_uid is not None:
+        record_chatbot_billing_usage(
+            billing_uid,
+            "chatbot_queries",
+            1,
+            tenant_id=str(tenant_id) if tenant_id is not None else None,
+        )
+    ai_usage_recorded = record_chatbot_ai_usage_if_needed(
+        billing_uid=billing_uid,
+        llm_attempted=llm_attempted,
+        llm_result_meta=llm_result_meta,
+        tenant_id=str(tenant_id) if tenant_id is not None else None,
+    )
+
+    retrieved_doc_ids, retrieval_scores = retrieval_metadata(sources)
+
+    response = {
+        "success": True,
+        "query": query,
+        "response": answer,
+        "sources": sources,
+        "retrieved_doc_ids": retrieved_doc_ids,
+        "retrieval_scores": retrieval_scores,
+        "confidence": confidence,
+        "retrieval_confidence": retrieval_conf,
+        "llm_confidence": llm_confidence,
+        "conversation_id": conversation_id,
+        "message_id": message_id,
+        "tenant_id": tenant_id,
+        "schema_version": "v1",
+        "fallback_used": fallback_used,
+        "plan": pq.plan_info.get("plan"),
+        "lead_id": lead_id,
+        "escalated": should_escalate,
+        "escalated_question_id": escalated_question_id,
+        "ai_usage_recorded": ai_usage_recorded,
+    }
+    if not _is_production_env():
+        response["correlation_id"] = correlation_id
+        response["llm_trace_id"] = llm_trace_id
+    return response
+
+
+def _insert_query_log(
+    *,
+    conversation_id: str,
+    message_id: str,
+    query: str,
+    answer: str,
+    confidence: float,
+    fallback_used: bool,
+    sources: List[Dict[str, Any]],
+    tenant_id: Optional[str],
+    user_id: Optional[Any],
+    llm_trace_id: Optional[str],
+    log_metadata: Dict[str, Any],
+    correlation_id: str,
+    content_fp: Optional[str],
+) -> None:
+    try:
+        if db_optimizer.table_exists("chatbot_query_log"):
+            meta_json = json.dumps(log_metadata)[:10000]
+            base_params = (
+                conversation_id,
+                message_id,
+                query[:10000] if query else "",
+                answer[:50000] if answer else "",
+                confidence,
+                fallback_used,
+                json.dumps(sources)[:50000] if sources else "[]",
+                str(tenant_id) if tenant_id is not None else None,
+                str(user_id) if user_id is not None else None,
+                llm_trace_id,
             )
-            if escalation_result.get('success'):
-                escalated_question_id = escalation_result.get('escalated_question_id')
-                answer = f"{answer}\n\n{chatbot_config.escalation_message}"
-
-        message_id = str(uuid.uuid4())
-        log_metadata = {
-            "retrieval_confidence": retrieval_conf,
-            "llm_confidence": llm_confidence,
-            "confidence_threshold": threshold,
-        }
-        sources = retrieval.sources
-        content_fp = content_fingerprint_from_sources(sources)
-        try:
-            if db_optimizer.table_exists("chatbot_query_log"):
-                meta_json = json.dumps(log_metadata)[:10000]
-                base_params = (
-                    conversation_id,
-                    message_id,
-                    query[:10000] if query else "",
-                    answer[:50000] if answer else "",
-                    confidence,
-                    fallback_used,
-                    json.dumps(sources)[:50000] if sources else "[]",
-                    str(tenant_id) if tenant_id is not None else None,
-                    str(user_id) if user_id is not None else None,
-                    llm_trace_id,
+            try:
+                db_optimizer.execute_query(
+                    """INSERT INTO chatbot_query_log
+                       (conversation_id, message_id, query, response, confidence, fallback_used, sources_json, tenant_id, user_id, llm_trace_id, metadata, correlation_id, content_fingerprint)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    base_params + (meta_json, correlation_id, content_fp or None),
+                    fetch=False,
                 )
+            except Exception:
                 try:
                     db_optimizer.execute_query(
                         """INSERT INTO chatbot_query_log
-                           (conversation_id, message_id, query, response, confidence, fallback_used, sources_json, tenant_id, user_id, llm_trace_id, metadata, correlation_id, content_fingerprint)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                        base_params + (meta_json, correlation_id, content_fp or None),
+                           (conversation_id, message_id, query, response, confidence, fallback_used, sources_json, tenant_id, user_id, llm_trace_id, metadata, correlation_id)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        base_params + (meta_json, correlation_id),
                         fetch=False,
                     )
                 except Exception:
                     try:
                         db_optimizer.execute_query(
                             """INSERT INTO chatbot_query_log
-                               (conversation_id, message_id, query, response, confidence, fallback_used, sources_json, tenant_id, user_id, llm_trace_id, metadata, correlation_id)
-                               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                            base_params + (meta_json, correlation_id),
+                               (conversation_id, message_id, query, response, confidence, fallback_used, sources_json, tenant_id, user_id, llm_trace_id, metadata)
+                               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                            base_params + (meta_json,),
                             fetch=False,
                         )
                     except Exception:
-                        try:
-                            db_optimizer.execute_query(
-                                """INSERT INTO chatbot_query_log
-                                   (conversation_id, message_id, query, response, confidence, fallback_used, sources_json, tenant_id, user_id, llm_trace_id, metadata)
-                                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                                base_params + (meta_json,),
-                                fetch=False,
-                            )
-                        except Exception:
-                            db_optimizer.execute_query(
-                                """INSERT INTO chatbot_query_log
-                                   (conversation_id, message_id, query, response, confidence, fallback_used, sources_json, tenant_id, user_id, llm_trace_id)
-                                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                                base_params,
-                                fetch=False,
-                            )
-        except Exception as log_err:
-            logger.warning("Chatbot query log insert failed: %s", log_err)
-
-        record_chatbot_response_generated(
-            message_id=message_id,
-            conversation_id=conversation_id,
-            user_id=tenant_scope_uid,
-            correlation_id=correlation_id,
-            query_excerpt=query,
-            response_excerpt=answer,
-            sources=sources,
-            content_fingerprint=content_fp,
-            llm_trace_id=llm_trace_id,
-            confidence=confidence,
-            fallback_used=fallback_used,
-        )
-
-        if is_public_persistence_enabled() and tenant_id:
-            persist_chatbot_turn(
-                tenant_id=str(tenant_id),
-                conversation_id=conversation_id,
-                query=query,
-                answer=answer,
-                assistant_message_id=message_id,
-                sources=sources,
-                fallback_used=fallback_used,
-                confidence=confidence,
-                retrieval_confidence=retrieval_conf,
-                user_id=str(user_id) if user_id is not None else None,
-                session_id=str(context.get("session_id")) if context.get("session_id") else None,
-                channel="public_api",
-                correlation_id=correlation_id,
-            )
+                        db_optimizer.execute_query(
+                            """INSERT INTO chatbot_query_log
+                               (conversation_id, message_id, query, response, confidence, fallback_used, sources_json, tenant_id, user_id, llm_trace_id)
+                               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                            base_params,
+                            fetch=False,
+                        )
+    except Exception as log_err:
+        logger.warning("Chatbot query log insert failed: %s", log_err)
 
-        response_time_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
 
-        record_api_usage(response_status=200, response_time_ms=response_time_ms)
-        if billing_uid is not None:
-            record_chatbot_billing_usage(
-                billing_uid,
-                "chatbot_queries",
-                1,
-                tenant_id=str(tenant_id) if tenant_id is not None else None,
-            )
-        ai_usage_recorded = record_chatbot_ai_usage_if_needed(
-            billing_uid=billing_uid,
-            llm_attempted=llm_attempted,
-            llm_result_meta=llm_result_meta,
-            tenant_id=str(tenant_id) if tenant_id is not None else None,
-        )
+@public_chatbot_bp.route('/query', methods=['POST', 'OPTIONS'])
+@handle_api_errors
+@require_api_key
+def public_chatbot_query():
+    """
+    Public chatbot query endpoint for external clients
 
-        retrieved_doc_ids, retrieval_scores = retrieval_metadata(sources)
+    Request:
+        POST /api/public/chatbot/query
+        Headers:
+            X-API-Key: fik_...
+        Body:
+            {
+                "query": "What are your business hours?",
+                "conversation_id": "optional-conversation-id",
+                "context": {"user_id": "optional", "session_id": "optional"}
+            }
 
-        response = {
-            "success": True,
-            "query": query,
-            "response": answer,
-            "sources": sources,
-            "retrieved_doc_ids": retrieved_doc_ids,
-            "retrieval_scores": retrieval_scores,
-            "confidence": confidence,
-            "retrieval_confidence": retrieval_conf,
-            "llm_confidence": llm_confidence,
-            "conversation_id": conversation_id,
-            "message_id": message_id,
-            "tenant_id": tenant_id,
-            "schema_version": "v1",
-            "fallback_used": fallback_used,
-            "plan": plan_info.get("plan"),
-            "lead_id": lead_id,
-            "escalated": should_escalate,
-            "escalated_question_id": escalated_question_id,
-            "ai_usage_recorded": ai_usage_recorded,
+    Response:
+        {
+            "success": true,
+            "query": "What are your business hours?",
+            "response": "We're open Monday-Friday 9am-5pm EST.",
+            "sources": [...],
+            "confidence": 0.95,
+            "conversation_id": "generated-or-provided-id"
         }
-        if not _is_production_env():
-            response["correlation_id"] = correlation_id
-            response["llm_trace_id"] = llm_trace_id
-        return jsonify(response)
+    """
+    start_time = datetime.now(timezone.utc)
+
+    try:
+        pq, error_response = _prepare_public_query(request.json or {})
+        if error_response is not None:
+            return error_response
+
+        answer_result = generate_chatbot_answer(
+            pq.query,
+            pq.retrieval.context_text,
+            pq.retrieval.sources,
+            **_answer_kwargs(pq),
+        )
+        return jsonify(_finish_public_query(pq, answer_result, start_time))
 
     except Exception as e:
         logger.error(f"❌ Public chatbot query failed: {e}", exc_info=True)
@@ -518,6 +617,64 @@ def public_chatbot_query():
         return create_error_response("Internal server error", 500, 'INTERNAL_ERROR')
 
 
+@public_chatbot_bp.route('/query/stream', methods=['POST', 'OPTIONS'])
+@handle_api_errors
+@require_api_key
+def public_chatbot_query_stream():
+    """
+    Streamed variant of /query (Server-Sent Events).
+
+    Frames, in order:
+        event: sources  -> {"sources", "retrieved_doc_ids", "retrieval_scores", "conversation_id"}
+        event: token    -> {"content": "..."} (zero or more)
+        event: done     -> same body as the /query JSON response
+        event: error    -> {"success": false, "error": "..."} (instead of done)
+
+    Validation, auth, rate-limit and plan errors are returned as JSON before the stream opens.
+    ``done.response`` is canonical: it can include an escalation note appended after streaming.
+    """
+    start_time = datetime.now(timezone.utc)
+
+    try:
+        pq, error_response = _prepare_public_query(request.json or {})
+    except Exception as e:
+        logger.error(f"❌ Public chatbot stream setup failed: {e}", exc_info=True)
+        record_api_usage(response_status=500)
+        return create_error_response("Internal server error", 500, 'INTERNAL_ERROR')
+    if error_response is not None:
+        return error_response
+
+    def _frames():
+        sources = pq.retrieval.sources
+        retrieved_doc_ids, retrieval_scores = retrieval_metadata(sources)
+        yield format_sse("sources", {
+            "sources": sources,
+            "retrieved_doc_ids": retrieved_doc_ids,
+            "retrieval_scores": retrieval_scores,
+            "conversation_id": pq.conversation_id,
+            "schema_version": "v1",
+        })
+        try:
+            answer_result = None
+            for item in stream_chatbot_answer(
+                pq.query,
+                pq.retrieval.context_text,
+                sources,
+                **_answer_kwargs(pq),
+            ):
+                if isinstance(item, str):
+                    yield format_sse("token", {"content": item})
+                else:
+                    answer_result = item
+            yield format_sse("done", _finish_public_query(pq, answer_result, start_time))
+        except Exception as e:
+            logger.error(f"❌ Public chatbot stream failed: {e}", exc_info=True)
+            record_api_usage(response_status=500)
+            yield format_sse("error", _public_error_payload("Internal server error", "INTERNAL_ERROR"))
+
+    return sse_response(_frames())
+
+
 @public_chatbot_bp.route('/feedback', methods=['POST', 'OPTIONS'])
 @handle_api_errors
 @require_api_key
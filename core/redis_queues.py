@@ -2,14 +2,27 @@
 """
 Redis Queues for Background Jobs - Fikiri Solutions
 Async task processing with Redis as message broker
+
+Reliable mode (REDIS_QUEUE_RELIABLE=1 or RedisQueue(..., reliable=True)):
+- workers BLMOVE job ids from <queue>:pending into their own <queue>:processing:<worker> list and
+  record a visibility deadline in <queue>:inflight; a job is only removed on complete/fail, so a
+  worker that dies mid-job does not lose it — the reaper pushes expired ids back to pending;
+- each worker keeps a <processing list>:alive heartbeat key (TTL = visibility timeout + reap
+  interval); the reaper requeues whatever is left in a registered list whose heartbeat expired and
+  drops that list from <queue>:processing_lists, so crashed workers do not accumulate there;
+- job state is a hash per job updated field by field instead of rewriting the whole JSON;
+- enqueue, delayed-job promotion and reaping are Lua scripts, atomic across workers.
+Delayed-job promotion uses the Lua script in both modes.
 """
 
 import json
+import os
+import socket
 import time
 import uuid
 import logging
 import random
-from typing import Dict, Any, Optional, Callable, List
+from typing import Dict, Any, Optional, Callable, List, Tuple
 from enum import Enum
 from dataclasses import dataclass
 
@@ -40,6 +53,90 @@ logger = logging.getLogger(__name__)
 # One process-wide warning instead of N lines when multiple queues init without Redis.
 _missing_redis_queue_client_logged = False
 
+REDIS_QUEUE_VISIBILITY_TIMEOUT = int(os.getenv("REDIS_QUEUE_VISIBILITY_TIMEOUT", "1800"))
+REDIS_QUEUE_PROMOTE_BATCH = int(os.getenv("REDIS_QUEUE_PROMOTE_BATCH", "100"))
+REDIS_QUEUE_REAP_INTERVAL = int(os.getenv("REDIS_QUEUE_REAP_INTERVAL", "30"))
+_HEARTBEAT_SUFFIX = ":alive"
+JOB_TTL_SECONDS = 86400
+
+
+def _reliable_queue_default() -> bool:
+    return (os.getenv("REDIS_QUEUE_RELIABLE") or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+# KEYS: delayed zset, pending list. ARGV: now, max ids to move.
+_PROMOTE_DELAYED_LUA = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('LPUSH', KEYS[2], id)
+end
+return #ids
+"""
+
+# KEYS: job hash, pending list, delayed zset. ARGV: ttl, run_at (0 = now), field/value pairs...
+_ENQUEUE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[1]))
+if tonumber(ARGV[2]) > 0 then
+    redis.call('ZADD', KEYS[3], ARGV[2], redis.call('HGET', KEYS[1], 'id'))
+else
+    redis.call('LPUSH', KEYS[2], redis.call('HGET', KEYS[1], 'id'))
+end
+return 1
+"""
+
+# KEYS: inflight zset, pending list, processing-list registry set.
+# ARGV: now, max ids to requeue, job key prefix, visibility timeout, heartbeat key suffix.
+# A registered list whose heartbeat key expired belongs to a dead worker: its ids are requeued and
+# the list is dropped from the registry. Ids sitting in a live worker's list without a deadline
+# (worker died between BLMOVE and ZADD) are adopted first with a fresh deadline, so a live worker
+# finishing that ZADD is never raced.
+_REQUEUE_EXPIRED_LUA = """
+local function requeue(id)
+    local kind = redis.call('TYPE', ARGV[3] .. id).ok
+    if kind == 'hash' then
+        redis.call('HSET', ARGV[3] .. id, 'status', 'pending')
+        redis.call('HINCRBY', ARGV[3] .. id, 'reclaimed', 1)
+    end
+    if kind ~= 'none' then
+        redis.call('RPUSH', KEYS[2], id)
+    end
+end
+local live = {}
+local reclaimed = 0
+for _, list in ipairs(redis.call('SMEMBERS', KEYS[3])) do
+    if redis.call('EXISTS', list .. ARGV[5]) == 1 then
+        table.insert(live, list)
+        for _, id in ipairs(redis.call('LRANGE', list, 0, -1)) do
+            redis.call('ZADD', KEYS[1], 'NX', tonumber(ARGV[1]) + tonumber(ARGV[4]), id)
+        end
+    else
+        for _, id in ipairs(redis.call('LRANGE', list, 0, -1)) do
+            redis.call('ZREM', KEYS[1], id)
+            requeue(id)
+            reclaimed = reclaimed + 1
+        end
+        redis.call('DEL', list)
+        redis.call('SREM', KEYS[3], list)
+    end
+end
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    for _, list in ipairs(live) do
+        redis.call('LREM', list, 0, id)
+    end
+    requeue(id)
+end
+return reclaimed + #ids
+"""
+
 
 class JobStatus(Enum):
     """Job status enumeration"""
@@ -67,6 +164,46 @@ class Job:
     retry_after: Optional[float] = None
     dead_letter: bool = False
 
+
+_JOB_JSON_FIELDS = ("args", "result")
+_JOB_FLOAT_FIELDS = ("created_at", "started_at", "completed_at", "retry_after")
+_JOB_INT_FIELDS = ("retry_count", "max_retries")
+
+
+def _job_hash_fields(job: Job, names: Optional[List[str]] = None) -> Dict[str, str]:
+    """Hash field values for ``names`` (default: every Job field). None is stored as ''."""
+    out: Dict[str, str] = {}
+    for name in names or list(job.__dataclass_fields__):
+        value = getattr(job, name)
+        if name in _JOB_JSON_FIELDS:
+            out[name] = json.dumps(value, default=str)
+        elif name == "status":
+            out[name] = value.value if isinstance(value, JobStatus) else str(value)
+        elif name == "dead_letter":
+            out[name] = "1" if value else "0"
+        else:
+            out[name] = "" if value is None else str(value)
+    return out
+
+
+def _job_from_hash(data: Dict[str, str]) -> Job:
+    fields: Dict[str, Any] = {}
+    for name in Job.__dataclass_fields__:
+        raw = data.get(name)
+        if name in _JOB_JSON_FIELDS:
+            fields[name] = json.loads(raw) if raw else ({} if name == "args" else None)
+        elif name == "status":
+            fields[name] = JobStatus(raw) if raw in JobStatus._value2member_map_ else raw
+        elif name == "dead_letter":
+            fields[name] = raw == "1"
+        elif name in _JOB_FLOAT_FIELDS:
+            fields[name] = float(raw) if raw else None
+        elif name in _JOB_INT_FIELDS:
+            fields[name] = int(raw) if raw else 0
+        else:
+            fields[name] = raw or None
+    return Job(**fields)
+
 def _is_brpop_idle_timeout(exc: BaseException) -> bool:
     """True when BRPOP finished with no job (socket/read timeout), not a real failure."""
     if not REDIS_AVAILABLE or redis is None:
@@ -108,14 +245,23 @@ def _log_dequeue_reconnect(queue_name: str, error: str) -> None:
 
 class RedisQueue:
     """Redis-based job queue system"""
+
+    reliable = False
+    _scripts: Optional[Dict[str, Any]] = None
+    _scripts_client = None
     
-    def __init__(self, queue_name: str = "fikiri:jobs"):
+    def __init__(self, queue_name: str = "fikiri:jobs", reliable: Optional[bool] = None):
         self.config = get_config()
         self.redis_client = None
         self._blocking_redis_client = None
         self.queue_name = queue_name
         self.job_prefix = f"fikiri:job:"
         self.result_prefix = f"fikiri:result:"
+        self.reliable = _reliable_queue_default() if reliable is None else bool(reliable)
+        self.visibility_timeout = REDIS_QUEUE_VISIBILITY_TIMEOUT
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.processing_list = f"{queue_name}:processing:{self.worker_id}"
+        self._last_reap = 0.0
         self._connect()
         self._registered_tasks = {}
     
@@ -197,6 +343,104 @@ class RedisQueue:
             logger.debug("Redis queue ping failed: %s", ping_error)
             return False
     
+    def _script(self, name: str, source: str):
+        """Lua script bound to the current client (re-registered after a reconnect)."""
+        if self._scripts is None or self._scripts_client is not self.redis_client:
+            self._scripts = {}
+            self._scripts_client = self.redis_client
+        if name not in self._scripts:
+            self._scripts[name] = self.redis_client.register_script(source)
+        return self._scripts[name]
+
+    def _promote_delayed_jobs(self) -> None:
+        """Move due delayed jobs to pending in one atomic script call."""
+        self._script("promote", _PROMOTE_DELAYED_LUA)(
+            keys=[f"{self.queue_name}:delayed", f"{self.queue_name}:pending"],
+            args=[time.time(), REDIS_QUEUE_PROMOTE_BATCH],
+        )
+
+    @property
+    def heartbeat_key(self) -> str:
+        return f"{self.processing_list}{_HEARTBEAT_SUFFIX}"
+
+    def _heartbeat_ttl(self, seconds: Optional[int] = None) -> int:
+        # Outlives the visibility deadline of any job this worker holds, plus one reap interval.
+        return int(seconds or self.visibility_timeout) + REDIS_QUEUE_REAP_INTERVAL
+
+    def requeue_expired_jobs(self, limit: int = REDIS_QUEUE_PROMOTE_BATCH) -> int:
+        """Reliable mode: push jobs whose visibility timeout passed, or whose worker died, back to pending."""
+        if not self.reliable or not self.is_connected():
+            return 0
+        moved = self._script("requeue_expired", _REQUEUE_EXPIRED_LUA)(
+            keys=[f"{self.queue_name}:inflight", f"{self.queue_name}:pending", f"{self.queue_name}:processing_lists"],
+            args=[time.time(), limit, self.job_prefix, self.visibility_timeout, _HEARTBEAT_SUFFIX],
+        )
+        self._last_reap = time.time()
+        if isinstance(moved, int) and moved:
+            logger.warning(
+                "Requeued jobs past their visibility timeout",
+                extra={
+                    "event": "job.visibility_timeout",
+                    "service": "background_job",
+                    "severity": "WARN",
+                    "queue_name": self.queue_name,
+                    "requeued": moved,
+                },
+            )
+        return moved if isinstance(moved, int) else 0
+
+    def touch_job(self, job_id: str, seconds: Optional[int] = None) -> bool:
+        """Reliable mode: extend a running job's visibility deadline (call from long tasks)."""
+        if not self.reliable or not self.is_connected():
+            return False
+        deadline = time.time() + (seconds or self.visibility_timeout)
+        self.redis_client.set(self.heartbeat_key, 1, ex=self._heartbeat_ttl(seconds))
+        return bool(self.redis_client.zadd(f"{self.queue_name}:inflight", {job_id: deadline}, xx=True))
+
+    def release_processing_jobs(self) -> int:
+        """Reliable mode: on worker shutdown, hand this worker's unfinished jobs back to pending."""
+        if not self.reliable or not self.is_connected():
+            return 0
+        released = 0
+        while self.redis_client.lmove(self.processing_list, f"{self.queue_name}:pending", "LEFT", "RIGHT"):
+            released += 1
+        pipe = self.redis_client.pipeline()
+        pipe.srem(f"{self.queue_name}:processing_lists", self.processing_list)
+        pipe.delete(self.processing_list, self.heartbeat_key)
+        pipe.execute()
+        return released
+
+    def _ack(self, pipe, job_id: str) -> None:
+        pipe.lrem(self.processing_list, 0, job_id)
+        pipe.zrem(f"{self.queue_name}:inflight", job_id)
+
+    def _read_job(self, job_id: str) -> Tuple[Optional[Job], bool]:
+        """(job, stored_as_hash). Reliable mode still reads JSON jobs enqueued before it was enabled."""
+        job_key = f"{self.job_prefix}{job_id}"
+        if self.reliable:
+            try:
+                data = self.redis_client.hgetall(job_key)
+            except Exception as e:
+                if "WRONGTYPE" not in str(e):
+                    raise
+                data = None
+            if data:
+                return _job_from_hash(data), True
+        job_data = self.redis_client.get(job_key)
+        if job_data:
+            return Job(**json.loads(job_data)), False
+        return None, False
+
+    def _save_job(self, job: Job, fields: List[str], as_hash: bool, client=None) -> None:
+        """Persist ``fields`` of ``job`` with one HSET, or rewrite the legacy JSON record."""
+        client = client if client is not None else self.redis_client
+        job_key = f"{self.job_prefix}{job.id}"
+        if as_hash:
+            client.hset(job_key, mapping=_job_hash_fields(job, fields))
+            client.expire(job_key, JOB_TTL_SECONDS)
+        else:
+            client.setex(job_key, JOB_TTL_SECONDS, json.dumps(job.__dict__, default=str))
+
     def register_task(self, task_name: str, task_func: Callable):
         """Register a task function"""
         self._registered_tasks[task_name] = task_func
@@ -224,10 +468,23 @@ class RedisQueue:
                 created_at=time.time(),
                 max_retries=max_retries
             )
+            if self.reliable:
+                # Create the hash and queue the id in one script: no partially written jobs.
+                pairs = [v for kv in _job_hash_fields(job).items() for v in kv]
+                created = self._script("enqueue", _ENQUEUE_LUA)(
+                    keys=[job_key, f"{self.queue_name}:pending", f"{self.queue_name}:delayed"],
+                    args=[JOB_TTL_SECONDS, time.time() + delay if delay > 0 else 0, *pairs],
+                )
+                if not created:
+                    logger.info(f"ℹ️ Queue job {job_id} already present; reusing")
+                else:
+                    logger.info(f"✅ Enqueued job {job_id}: {task}")
+                return job_id
+
             payload = json.dumps(job.__dict__, default=str)
 
             # Atomic claim of the stable queue id (prevents multi-worker duplicate LPUSH).
-            created = self.redis_client.set(job_key, payload, nx=True, ex=86400)
+            created = self.redis_client.set(job_key, payload, nx=True, ex=JOB_TTL_SECONDS)
             if not created:
                 logger.info(f"ℹ️ Queue job {job_id} already present; reusing")
                 return job_id
@@ -257,17 +514,9 @@ class RedisQueue:
         
         try:
             # Check for delayed jobs first
-            now = time.time()
-            delayed_jobs = self.redis_client.zrangebyscore(
-                f"{self.queue_name}:delayed",
-                0, now
-            )
-            
-            if delayed_jobs:
-                # Move delayed jobs to pending queue
-                for job_id in delayed_jobs:
-                    self.redis_client.lpush(f"{self.queue_name}:pending", job_id)
-                    self.redis_client.zrem(f"{self.queue_name}:delayed", job_id)
+            self._promote_delayed_jobs()
+            if self.reliable:
+                return self._dequeue_reliable(timeout)
             
             # Get next pending job (blocking client avoids socket_timeout vs BRPOP race)
             if timeout > 0:
@@ -304,7 +553,7 @@ class RedisQueue:
                 
                 self.redis_client.setex(
                     job_key,
-                    86400,
+                    JOB_TTL_SECONDS,
                     json.dumps(job.__dict__, default=str)
                 )
                 
@@ -334,37 +583,70 @@ class RedisQueue:
             )
             return None
     
+    def _dequeue_reliable(self, timeout: int) -> Optional[Job]:
+        """BLMOVE into this worker's processing list; the job stays there until acked."""
+        if time.time() - self._last_reap >= REDIS_QUEUE_REAP_INTERVAL:
+            pipe = self.redis_client.pipeline()
+            pipe.set(self.heartbeat_key, 1, ex=self._heartbeat_ttl())
+            pipe.sadd(f"{self.queue_name}:processing_lists", self.processing_list)
+            pipe.execute()
+            self.requeue_expired_jobs()
+        pending = f"{self.queue_name}:pending"
+        if timeout > 0:
+            blocking = self._get_blocking_redis_client()
+            if not blocking:
+                return None
+            job_id = blocking.blmove(pending, self.processing_list, timeout, "RIGHT", "LEFT")
+        else:
+            job_id = self.redis_client.lmove(pending, self.processing_list, "RIGHT", "LEFT")
+        if not job_id:
+            return None
+
+        now = time.time()
+        self.redis_client.zadd(f"{self.queue_name}:inflight", {job_id: now + self.visibility_timeout})
+        job, as_hash = self._read_job(job_id)
+        if job is None:
+            # Job record expired while queued; drop the orphaned id.
+            pipe = self.redis_client.pipeline()
+            self._ack(pipe, job_id)
+            pipe.execute()
+            return None
+        job.status = JobStatus.PROCESSING
+        job.started_at = now
+        pipe = self.redis_client.pipeline()
+        self._save_job(job, ["status", "started_at"], as_hash, pipe)
+        if as_hash:
+            pipe.hincrby(f"{self.job_prefix}{job_id}", "deliveries", 1)
+        pipe.set(self.heartbeat_key, 1, ex=self._heartbeat_ttl())
+        pipe.execute()
+        logger.info(f"✅ Dequeued job {job_id}: {job.task}")
+        return job
+
     def complete_job(self, job_id: str, result: Any = None):
         """Mark job as completed"""
         if not self.is_connected():
             return False
         
         try:
-            job_key = f"{self.job_prefix}{job_id}"
-            job_data = self.redis_client.get(job_key)
+            job, as_hash = self._read_job(job_id)
             
-            if job_data:
-                job_dict = json.loads(job_data)
-                job = Job(**job_dict)
-                
+            if job:
                 job.status = JobStatus.COMPLETED
                 job.completed_at = time.time()
                 job.result = result
                 
-                # Update job data
-                self.redis_client.setex(
-                    job_key,
-                    86400,
-                    json.dumps(job.__dict__, default=str)
-                )
-                
-                # Store result
+                # Update job data, store result and (reliable mode) ack in one round trip
+                pipe = self.redis_client.pipeline() if self.reliable else self.redis_client
+                self._save_job(job, ["status", "completed_at", "result"], as_hash, pipe)
                 result_key = f"{self.result_prefix}{job_id}"
-                self.redis_client.setex(
+                pipe.setex(
                     result_key,
-                    86400,
+                    JOB_TTL_SECONDS,
                     json.dumps(result, default=str)
                 )
+                if self.reliable:
+                    self._ack(pipe, job_id)
+                    pipe.execute()
                 
                 logger.info(f"✅ Completed job {job_id}")
                 if job.retry_count > 0:
@@ -405,13 +687,9 @@ class RedisQueue:
             return False
         
         try:
-            job_key = f"{self.job_prefix}{job_id}"
-            job_data = self.redis_client.get(job_key)
+            job, as_hash = self._read_job(job_id)
             
-            if job_data:
-                job_dict = json.loads(job_data)
-                job = Job(**job_dict)
-                
+            if job:
                 job.error = error
                 job.retry_count += 1
                 now = time.time()
@@ -422,10 +700,6 @@ class RedisQueue:
                     delay = self._retry_delay_seconds(job.retry_count)
                     job.retry_after = now + delay
                     job.dead_letter = False
-                    self.redis_client.zadd(
-                        f"{self.queue_name}:delayed",
-                        {job_id: job.retry_after},
-                    )
                     logger.warning(
                         "Queue job retry scheduled",
                         extra={
@@ -462,12 +736,24 @@ class RedisQueue:
                         },
                     )
                 
-                # Update job data
-                self.redis_client.setex(
-                    job_key,
-                    86400,
-                    json.dumps(job.__dict__, default=str)
+                # Update job data; in reliable mode the ack and the retry schedule go in one
+                # MULTI so the retry can't be promoted while this worker still holds the job.
+                pipe = self.redis_client.pipeline() if self.reliable else self.redis_client
+                self._save_job(
+                    job,
+                    ["error", "retry_count", "status", "retry_after", "dead_letter", "completed_at"],
+                    as_hash,
+                    pipe,
                 )
+                if self.reliable:
+                    self._ack(pipe, job_id)
+                if will_retry:
+                    pipe.zadd(
+                        f"{self.queue_name}:delayed",
+                        {job_id: job.retry_after},
+                    )
+                if self.reliable:
+                    pipe.execute()
                 
                 return True
             
@@ -483,14 +769,7 @@ class RedisQueue:
             return None
         
         try:
-            job_key = f"{self.job_prefix}{job_id}"
-            job_data = self.redis_client.get(job_key)
-            
-            if job_data:
-                job_dict = json.loads(job_data)
-                return Job(**job_dict)
-            
-            return None
+            return self._read_job(job_id)[0]
             
         except Exception as e:
             logger.error(f"❌ Job status retrieval failed: {e}")
@@ -526,6 +805,8 @@ class RedisQueue:
                 'total_jobs': len(self.redis_client.keys(f"{self.job_prefix}*")),
                 'total_results': len(self.redis_client.keys(f"{self.result_prefix}*"))
             }
+            if self.reliable:
+                stats['inflight_jobs'] = self.redis_client.zcard(f"{self.queue_name}:inflight")
             
             logger.info(f"✅ Queue stats: {stats}")
             return stats
@@ -545,6 +826,15 @@ class RedisQueue:
             
             if queue_type in ["all", "delayed"]:
                 self.redis_client.delete(f"{self.queue_name}:delayed")
+
+            if queue_type in ["all", "processing"]:
+                lists = self.redis_client.smembers(f"{self.queue_name}:processing_lists") or []
+                self.redis_client.delete(
+                    f"{self.queue_name}:inflight",
+                    f"{self.queue_name}:processing_lists",
+                    *lists,
+                    *[f"{name}{_HEARTBEAT_SUFFIX}" for name in lists],
+                )
             
             if queue_type in ["all", "jobs"]:
                 job_keys = self.redis_client.keys(f"{self.job_prefix}*")
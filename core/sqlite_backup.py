@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Online SQLite backups.
+
+``online_backup`` copies a live database with ``sqlite3.Connection.backup``: pages are
+copied in steps of ``SQLITE_BACKUP_PAGES_PER_STEP`` and the copier sleeps between steps,
+so writers keep getting the lock and the result is a transactionally consistent image
+(a plain file copy can catch a half-checkpointed WAL). The image is then gzip-compressed
+in fixed-size chunks rather than read into memory.
+
+``snapshot`` adds incremental snapshots on top: every snapshot records a compact page map
+(one short digest per page) and, when a previous snapshot of the same database exists,
+stores only the pages whose digest changed. Restoring replays the chain from the last full
+snapshot. Each snapshot is described by a ``<name>.manifest.json`` next to its data file.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import struct
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SQLITE_BACKUP_PAGES_PER_STEP = int(os.getenv("SQLITE_BACKUP_PAGES_PER_STEP", "256"))
+SQLITE_BACKUP_STEP_SLEEP_MS = int(os.getenv("SQLITE_BACKUP_STEP_SLEEP_MS", "10"))
+SQLITE_BACKUP_FULL_EVERY = int(os.getenv("SQLITE_BACKUP_FULL_EVERY", "7"))  # max deltas per chain
+COPY_CHUNK_BYTES = 1024 * 1024
+
+_DIGEST_SIZE = 8
+_DELTA_RECORD = struct.Struct(">I")  # page number, followed by page_size bytes
+
+ProgressCallback = Callable[[int, int], None]  # (pages_done, pages_total)
+
+
+def online_backup(
+    source_path: str,
+    dest_path: str,
+    *,
+    pages_per_step: int = SQLITE_BACKUP_PAGES_PER_STEP,
+    sleep_seconds: Optional[float] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Consistent copy of the live database at ``source_path`` into a new file ``dest_path``.
+
+    Runs alongside production writers: each step copies ``pages_per_step`` pages and then
+    sleeps ``sleep_seconds`` (default ``SQLITE_BACKUP_STEP_SLEEP_MS``). WAL databases are
+    copied from one pinned read snapshot; in rollback-journal mode SQLite restarts the copy
+    whenever another connection commits mid-backup.
+    """
+    pause = SQLITE_BACKUP_STEP_SLEEP_MS / 1000.0 if sleep_seconds is None else max(0.0, sleep_seconds)
+    started = time.monotonic()
+    state = {"steps": 0, "total": 0}
+
+    def _on_step(status: int, remaining: int, total: int) -> None:
+        state["steps"] += 1
+        state["total"] = total
+        if progress is not None:
+            progress(total - remaining, total)
+        if remaining and pause:
+            time.sleep(pause)
+
+    src = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True, isolation_level=None)
+    dst = sqlite3.connect(dest_path)
+    try:
+        wal = str(src.execute("PRAGMA journal_mode").fetchone()[0]).lower() == "wal"
+        if wal:
+            # Pin one read snapshot for the whole copy. In WAL mode this never blocks writers,
+            # and without it every commit by another connection restarts the backup from page 1.
+            src.execute("BEGIN")
+            src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            src.backup(dst, pages=max(1, int(pages_per_step)), progress=_on_step)
+            src.execute("COMMIT")
+        else:
+            # Rollback journal: a held read lock would block writers, so copy in unlocked steps
+            # and accept restarts.
+            src.backup(dst, pages=max(1, int(pages_per_step)), progress=_on_step)
+        page_size = dst.execute("PRAGMA page_size").fetchone()[0]
+        # The copy inherits WAL mode; switch it off so the image is a single self-contained file.
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+        src.close()
+    return {
+        "pages": state["total"],
+        "page_size": page_size,
+        "steps": state["steps"],
+        "bytes": os.path.getsize(dest_path),
+        "elapsed_ms": int((time.monotonic() - started) * 1000),
+    }
+
+
+def _iter_pages(path: str, page_size: int) -> Iterator[bytes]:
+    with open(path, "rb") as fh:
+        while True:
+            page = fh.read(page_size)
+            if not page:
+                return
+            yield page
+
+
+def _page_digest(page: bytes) -> bytes:
+    return hashlib.blake2b(page, digest_size=_DIGEST_SIZE).digest()
+
+
+def _read_pagemap(path: Path) -> List[bytes]:
+    data = path.read_bytes()
+    return [data[i:i + _DIGEST_SIZE] for i in range(0, len(data), _DIGEST_SIZE)]
+
+
+def _load_manifest(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def latest_manifest(backup_dir: Path, prefix: str = "sqlite") -> Optional[Path]:
+    manifests = sorted(Path(backup_dir).glob(f"{prefix}_*.manifest.json"))
+    return manifests[-1] if manifests else None
+
+
+def _write_full(image: str, out_path: Path, page_size: int) -> Tuple[List[bytes], int]:
+    digests: List[bytes] = []
+    with gzip.open(out_path, "wb") as out:
+        for page in _iter_pages(image, page_size):
+            digests.append(_page_digest(page))
+            out.write(page)
+    return digests, len(digests)
+
+
+def _write_delta(image: str, out_path: Path, page_size: int, base: List[bytes]) -> Tuple[List[bytes], int]:
+    digests: List[bytes] = []
+    changed = 0
+    with gzip.open(out_path, "wb") as out:
+        for page_no, page in enumerate(_iter_pages(image, page_size)):
+            digest = _page_digest(page)
+            digests.append(digest)
+            if page_no >= len(base) or base[page_no] != digest:
+                out.write(_DELTA_RECORD.pack(page_no))
+                out.write(page)
+                changed += 1
+    return digests, changed
+
+
+def snapshot(
+    source_path: str,
+    backup_dir: Path,
+    *,
+    incremental: bool = True,
+    prefix: str = "sqlite",
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Take an online backup of ``source_path`` and store it in ``backup_dir`` as a full or
+    delta snapshot; returns the manifest (``path`` is the manifest file).
+
+    A delta is written when ``incremental`` is set and the newest snapshot has the same page
+    size and a chain shorter than ``SQLITE_BACKUP_FULL_EVERY``; otherwise a full snapshot.
+
+    The backup API needs a real database file as its destination, so the copy first lands as
+    an uncompressed temporary image inside ``backup_dir`` and is compressed from there; expect
+    up to one database size of extra free space there while a snapshot runs. The temporary
+    image is always removed afterwards.
+    """
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    name = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    fd, image = tempfile.mkstemp(suffix=".db", dir=str(backup_dir))
+    os.close(fd)
+    os.remove(image)  # the backup API creates the destination itself
+    try:
+        copy = online_backup(source_path, image, progress=progress)
+        page_size = copy["page_size"]
+
+        parent_path = latest_manifest(backup_dir, prefix) if incremental else None
+        parent = _load_manifest(parent_path) if parent_path else None
+        use_delta = bool(
+            parent
+            and parent.get("page_size") == page_size
+            and int(parent.get("chain_length", 0)) < SQLITE_BACKUP_FULL_EVERY
+            and (backup_dir / parent["pagemap"]).exists()
+        )
+        if use_delta:
+            data_name = f"{name}.delta.gz"
+            base_digests = _read_pagemap(backup_dir / parent["pagemap"])
+            digests, pages_written = _write_delta(image, backup_dir / data_name, page_size, base_digests)
+        else:
+            data_name = f"{name}.db.gz"
+            digests, pages_written = _write_full(image, backup_dir / data_name, page_size)
+
+        pagemap_name = f"{name}.pagemap"
+        (backup_dir / pagemap_name).write_bytes(b"".join(digests))
+        manifest = {
+            "type": "delta" if use_delta else "full",
+            "created_at": datetime.now().isoformat(),
+            "source": os.path.abspath(source_path),
+            "data": data_name,
+            "pagemap": pagemap_name,
+            "page_size": page_size,
+            "page_count": len(digests),
+            "pages_written": pages_written,
+            "base": parent_path.name if use_delta else None,
+            "chain_length": int(parent.get("chain_length", 0)) + 1 if use_delta else 0,
+            "compressed_bytes": (backup_dir / data_name).stat().st_size,
+            "backup_elapsed_ms": copy["elapsed_ms"],
+        }
+        manifest_path = backup_dir / f"{name}.manifest.json"
+        with open(manifest_path, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=2)
+    finally:
+        if os.path.exists(image):
+            os.remove(image)
+
+    logger.info(
+        "SQLite %s snapshot %s: pages=%s written=%s compressed_bytes=%s",
+        manifest["type"], manifest_path.name, manifest["page_count"], pages_written, manifest["compressed_bytes"],
+    )
+    return {**manifest, "path": str(manifest_path)}
+
+
+def snapshot_chain(manifest_path: Path) -> List[Path]:
+    """Manifests needed to restore ``manifest_path``, full snapshot first."""
+    manifest_path = Path(manifest_path)
+    chain = [manifest_path]
+    manifest = _load_manifest(manifest_path)
+    while manifest.get("base"):
+        base_path = manifest_path.parent / manifest["base"]
+        chain.append(base_path)
+        manifest = _load_manifest(base_path)
+    return list(reversed(chain))
+
+
+def restore_snapshot(manifest_path: str, dest_path: str) -> Dict[str, Any]:
+    """Rebuild the database image described by ``manifest_path`` into ``dest_path``."""
+    chain = snapshot_chain(Path(manifest_path))
+    target = _load_manifest(chain[-1])
+    page_size = target["page_size"]
+    tmp_path = f"{dest_path}.restore"
+    with open(tmp_path, "wb") as out:
+        full = chain[0].parent / _load_manifest(chain[0])["data"]
+        with gzip.open(full, "rb") as src:
+            while True:
+                chunk = src.read(COPY_CHUNK_BYTES)
+                if not chunk:
+                    break
+                out.write(chunk)
+        for delta_path in chain[1:]:
+            delta = delta_path.parent / _load_manifest(delta_path)["data"]
+            with gzip.open(delta, "rb") as src:
+                while True:
+                    header = src.read(_DELTA_RECORD.size)
+                    if not header:
+                        break
+                    (page_no,) = _DELTA_RECORD.unpack(header)
+                    out.seek(page_no * page_size)
+                    out.write(src.read(page_size))
+        out.truncate(target["page_count"] * page_size)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        ok = conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    finally:
+        conn.close()
+    if not ok:
+        os.remove(tmp_path)
+        raise sqlite3.DatabaseError(f"Restored image from {Path(manifest_path).name} failed integrity_check")
+    os.replace(tmp_path, dest_path)
+    return {"restored_from": [p.name for p in chain], "pages": target["page_count"], "path": dest_path}
+
+
+__all__ = ["latest_manifest", "online_backup", "restore_snapshot", "snapshot", "snapshot_chain"]
@@ -0,0 +1,30 @@
+"""
+Server-Sent Events helpers for streamed chatbot replies.
+
+Frames follow the ``event:`` / ``data:`` wire format; ``data`` is always one JSON line.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable
+
+from flask import Response, stream_with_context
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one SSE frame. JSON is compact and never contains raw newlines."""
+    payload = json.dumps(data, default=str, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(frames: Iterable[str]) -> Response:
+    """Wrap a frame generator in a non-buffered ``text/event-stream`` response."""
+    response = Response(stream_with_context(frames), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # nginx / Render proxies buffer by default, which defeats time-to-first-token.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+__all__ = ["format_sse", "sse_response"]
@@ -0,0 +1,321 @@
+"""
+Streamed export helpers (NDJSON, CSV, zip) and background export jobs.
+
+Exports are produced by generators that pull rows through ``db_optimizer.iter_query`` and
+emit encoded chunks as they go, so worker memory stays flat no matter how large the tenant
+is. ``streaming_download_response`` turns a chunk generator into a chunked HTTP download;
+``start_background_export`` drains the same generator into a file under ``EXPORT_DIR`` on
+a worker thread for exports too large to hold a request open for; its job state is kept
+in the ``export_jobs`` table.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import uuid
+import zipfile
+from collections.abc import Iterator as IteratorABC
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Response, stream_with_context
+
+from core.database_optimization import db_optimizer
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.getenv("FIKIRI_EXPORT_DIR", os.path.join("data", "exports"))
+EXPORT_JOB_TTL_SECONDS = int(os.getenv("EXPORT_JOB_TTL_SECONDS", "86400"))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", "65536"))
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+CSV_MIMETYPE = "text/csv; charset=utf-8"
+ZIP_MIMETYPE = "application/zip"
+
+
+def ndjson_line(record: Any) -> str:
+    """One compact JSON document per line; ``default=str`` covers datetimes and Decimals."""
+    return json.dumps(record, default=str, separators=(",", ":")) + "\n"
+
+
+def iter_ndjson(records: Iterable[Any]) -> Iterator[str]:
+    for record in records:
+        yield ndjson_line(record)
+
+
+def iter_json(value: Any) -> Iterator[str]:
+    """
+    Encode ``value`` as one JSON document, a piece at a time.
+
+    Dicts are walked key by key; an iterator value (e.g. an ``iter_query`` generator) is
+    written as a JSON array one element at a time, so it is never held in memory.
+    """
+    if isinstance(value, dict):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield ("," if i else "") + json.dumps(str(key)) + ":"
+            yield from iter_json(item)
+        yield "}"
+    elif isinstance(value, IteratorABC):
+        yield "["
+        for i, item in enumerate(value):
+            yield ("," if i else "") + json.dumps(item, default=str, separators=(",", ":"))
+        yield "]"
+    else:
+        yield json.dumps(value, default=str, separators=(",", ":"))
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], fieldnames: Sequence[str]) -> Iterator[str]:
+    """Header, then one CSV line per row (extra keys ignored, missing keys blank)."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(fieldnames), extrasaction="ignore")
+    writer.writeheader()
+    yield buf.getvalue()
+    for row in rows:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerow(row)
+        yield buf.getvalue()
+
+
+def coalesce_chunks(chunks: Iterable[Any], size: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """Group small text/bytes chunks into ~``size`` byte writes to keep per-chunk overhead low."""
+    pending: List[bytes] = []
+    pending_len = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        if not data:
+            continue
+        pending.append(data)
+        pending_len += len(data)
+        if pending_len >= size:
+            yield b"".join(pending)
+            pending, pending_len = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable sink that ``zipfile`` writes into and the generator drains after each write."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buf.extend(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+def iter_zip(members: Iterable[Tuple[str, Iterable[Any]]]) -> Iterator[bytes]:
+    """
+    Stream a zip archive of ``(member name, chunk iterable)`` pairs.
+
+    ``zipfile`` writes data descriptors when the target cannot seek, so each member is
+    compressed and emitted as its chunks arrive; nothing is held beyond one deflate window.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, chunks in members:
+            with zf.open(name, mode="w", force_zip64=True) as member:
+                for data in coalesce_chunks(chunks):
+                    member.write(data)
+                    out = sink.drain()
+                    if out:
+                        yield out
+            out = sink.drain()
+            if out:
+                yield out
+    out = sink.drain()
+    if out:
+        yield out
+
+
+def streaming_json_response(value: Any) -> Response:
+    """``application/json`` response streamed through ``iter_json``."""
+    return Response(stream_with_context(coalesce_chunks(iter_json(value))), mimetype="application/json")
+
+
+def streaming_download_response(chunks: Iterable[Any], mimetype: str, filename: str) -> Response:
+    """Chunked attachment response; proxies are told not to buffer it."""
+    response = Response(stream_with_context(coalesce_chunks(chunks)), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Background exports
+# ---------------------------------------------------------------------------
+
+EXPORT_JOBS_TABLE = "export_jobs"
+_JOB_COLUMNS = (
+    "job_id", "owner_id", "kind", "status", "filename", "mimetype", "path",
+    "size_bytes", "error", "created_at", "finished_at",
+)
+
+
+def ensure_export_jobs_table() -> None:
+    db_optimizer.execute_query(f"""
+        CREATE TABLE IF NOT EXISTS {EXPORT_JOBS_TABLE} (
+            job_id TEXT PRIMARY KEY,
+            owner_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            mimetype TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size_bytes BIGINT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            finished_at TEXT
+        )
+    """, fetch=False)
+    db_optimizer.execute_query(
+        f"CREATE INDEX IF NOT EXISTS idx_export_jobs_created ON {EXPORT_JOBS_TABLE} (created_at)", fetch=False
+    )
+
+
+def _public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in job.items() if k not in ("path", "owner_id") and not (k == "error" and v is None)}
+
+
+def _update_job(job_id: str, **fields: Any) -> None:
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    db_optimizer.execute_query(
+        f"UPDATE {EXPORT_JOBS_TABLE} SET {assignments} WHERE job_id = ?",
+        (*fields.values(), job_id),
+        fetch=False,
+    )
+
+
+def _prune_jobs(now: datetime) -> None:
+    cutoff = (now - timedelta(seconds=EXPORT_JOB_TTL_SECONDS)).isoformat()
+    stale = db_optimizer.execute_query(
+        f"SELECT job_id, path FROM {EXPORT_JOBS_TABLE} WHERE created_at < ?", (cutoff,)
+    )
+    for row in stale or []:
+        try:
+            os.remove(row["path"])
+        except OSError:
+            pass
+    if stale:
+        db_optimizer.execute_query(f"DELETE FROM {EXPORT_JOBS_TABLE} WHERE created_at < ?", (cutoff,), fetch=False)
+
+
+def _run_export_job(job_id: str, kind: str, path: str, chunks_factory: Callable[[], Iterable[Any]]) -> None:
+    tmp_path = f"{path}.part"
+    size = 0
+    try:
+        _update_job(job_id, status="running")
+        with open(tmp_path, "wb") as fh:
+            for data in coalesce_chunks(chunks_factory()):
+                fh.write(data)
+                size += len(data)
+        os.replace(tmp_path, path)
+        update: Dict[str, Any] = {"status": "completed", "size_bytes": size}
+    except Exception as e:
+        logger.error("Background export %s (%s) failed: %s", job_id, kind, e)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        update = {"status": "failed", "error": "Export generation failed"}
+    update["finished_at"] = datetime.utcnow().isoformat()
+    try:
+        _update_job(job_id, **update)
+    except Exception as e:
+        logger.error("Could not record background export %s result: %s", job_id, e)
+
+
+def start_background_export(
+    owner_id: Any,
+    kind: str,
+    filename: str,
+    mimetype: str,
+    chunks_factory: Callable[[], Iterable[Any]],
+) -> Dict[str, Any]:
+    """
+    Generate an export into ``EXPORT_DIR`` on a worker thread; returns the job (status ``queued``).
+
+    Job state lives in the ``export_jobs`` table, so any worker process can report it.
+    ``chunks_factory`` is called on the worker thread, so it must not depend on request
+    context; callers check that the export source exists before starting the job.
+    """
+    now = datetime.utcnow()
+    ensure_export_jobs_table()
+    _prune_jobs(now)
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "owner_id": str(owner_id),
+        "kind": kind,
+        "status": "queued",
+        "filename": filename,
+        "mimetype": mimetype,
+        "path": os.path.abspath(os.path.join(EXPORT_DIR, f"{job_id}-{filename}")),
+        "size_bytes": None,
+        "error": None,
+        "created_at": now.isoformat(),
+        "finished_at": None,
+    }
+    db_optimizer.execute_query(
+        f"INSERT INTO {EXPORT_JOBS_TABLE} ({', '.join(_JOB_COLUMNS)}) VALUES ({', '.join('?' for _ in _JOB_COLUMNS)})",
+        tuple(job[name] for name in _JOB_COLUMNS),
+        fetch=False,
+    )
+    threading.Thread(
+        target=_run_export_job,
+        args=(job_id, kind, job["path"], chunks_factory),
+        name=f"export-{job_id[:8]}",
+        daemon=True,
+    ).start()
+    return _public_job(job)
+
+
+def get_background_export(job_id: str, owner_id: Any) -> Optional[Dict[str, Any]]:
+    """Job status for its owner, or None; completed jobs include the on-disk ``path``."""
+    ensure_export_jobs_table()
+    rows = db_optimizer.execute_query(
+        f"SELECT {', '.join(_JOB_COLUMNS)} FROM {EXPORT_JOBS_TABLE} WHERE job_id = ? AND owner_id = ?",
+        (job_id, str(owner_id)),
+    )
+    if not rows:
+        return None
+    job = dict(rows[0])
+    out = _public_job(job)
+    if job["status"] == "completed":
+        out["path"] = job["path"]
+    return out
+
+
+__all__ = [
+    "CSV_MIMETYPE",
+    "NDJSON_MIMETYPE",
+    "ZIP_MIMETYPE",
+    "coalesce_chunks",
+    "ensure_export_jobs_table",
+    "get_background_export",
+    "iter_csv",
+    "iter_json",
+    "iter_ndjson",
+    "iter_zip",
+    "ndjson_line",
+    "start_background_export",
+    "streaming_download_response",
+    "streaming_json_response",
+]
@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 
 from core.database_optimization import db_optimizer
+from core.delivery_executor import claim_due_rows, new_claim_token
 from core.automation_run_events import record_automation_cancelled
 from core.idempotency_manager import idempotency_manager
 from core.automation_safety import automation_safety_manager
@@ -18,6 +19,10 @@ from crm.service import enhanced_crm_service
 
 logger = logging.getLogger(__name__)
 
+# Due predicates shared with core.delivery_executor (tenant scan + claim).
+FOLLOW_UP_DUE_SQL = "status = 'scheduled' AND follow_up_date <= ?"
+CALENDAR_DUE_SQL = "status = 'scheduled' AND event_date <= ?"
+
 # Extra local-part patterns for newsletter/marketing senders (follow-up guard only).
 _FOLLOW_UP_NEWSLETTER_LOCAL_RE = re.compile(
     r"(newsletter|unsubscribe|digest|recap|community|memberinfo|^news$)",
@@ -279,276 +284,302 @@ def _send_email(user_id: int, to_email: str, subject: str, body: str) -> Dict[st
     return gmail_client.send_plain_text_as_user(user_id, to_email, subject, body)
 
 
-def execute_due_follow_ups(user_id: int, now_iso: Optional[str] = None) -> Dict[str, Any]:
+def execute_due_follow_ups(user_id: int, now_iso: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Claim (see core.delivery_executor) and send this user's due follow-ups, oldest first.
+    Rows claimed by another worker are left alone; ``limit`` caps one call's batch.
+    """
     now_iso = now_iso or datetime.utcnow().isoformat()
+    token = new_claim_token()
+    claimed = claim_due_rows(
+        db_optimizer,
+        "scheduled_follow_ups",
+        user_id,
+        FOLLOW_UP_DUE_SQL,
+        (now_iso,),
+        "follow_up_date ASC, id ASC",
+        token,
+        limit=limit,
+    )
     follow_ups = db_optimizer.execute_query(
         """
         SELECT id, user_id, lead_id, follow_up_date, follow_up_type, message
         FROM scheduled_follow_ups
-        WHERE user_id = ? AND status = 'scheduled' AND follow_up_date <= ?
+        WHERE user_id = ? AND claimed_by = ? AND status = 'scheduled'
         ORDER BY follow_up_date ASC
         """,
-        (user_id, now_iso)
+        (user_id, token)
     )
 
+    follow_ups = follow_ups or []
+    keys = {_follow_up_key(user_id, item): {"follow_up_id": item["id"]} for item in follow_ups}
+    held = idempotency_manager.claim_keys_bulk("workflow_followup", keys, user_id) if keys else set()
+
     processed = 0
     failed = 0
-
     for item in follow_ups:
-        follow_up_id = item["id"]
-        follow_up_type = item.get("follow_up_type", "email")
-        lead_id = item.get("lead_id")
-        message = item.get("message") or ""
-
-        key = hashlib.sha256(
-            f"workflow_followup|{user_id}|{follow_up_id}|{follow_up_type}".encode("utf-8")
-        ).hexdigest()
-        cached = idempotency_manager.check_key(key)
-        if cached and cached.get("status") == "completed":
-            logger.info("Skipping already processed follow-up id=%s user_id=%s", follow_up_id, user_id)
+        key = _follow_up_key(user_id, item)
+        if key not in held:
+            logger.info("Skipping already processed follow-up id=%s user_id=%s", item["id"], user_id)
             continue
-        idempotency_manager.store_key(key, "workflow_followup", user_id, {"follow_up_id": follow_up_id})
+        outcome = _execute_follow_up(user_id, item, key)
+        if outcome == "processed":
+            processed += 1
+        elif outcome == "failed":
+            failed += 1
 
-        target_contact = ""
-        result = {"success": False}
-        try:
-            if follow_up_type == "email":
-                if not lead_id:
-                    raise ValueError("lead_id required for email follow-up")
-                lead = db_optimizer.execute_query(
-                    "SELECT id, email, name FROM leads WHERE id = ? AND user_id = ?",
-                    (lead_id, user_id)
+    return {"success": True, "processed": processed, "failed": failed, "claimed": claimed}
+
+
+def _follow_up_key(user_id: int, item: Dict[str, Any]) -> str:
+    follow_up_type = item.get("follow_up_type", "email")
+    return hashlib.sha256(
+        f"workflow_followup|{user_id}|{item['id']}|{follow_up_type}".encode("utf-8")
+    ).hexdigest()
+
+
+def _execute_follow_up(user_id: int, item: Dict[str, Any], key: str) -> str:
+    """Send one claimed follow-up whose idempotency ``key`` this run holds; returns ``processed``, ``failed`` or ``skipped``."""
+    follow_up_id = item["id"]
+    follow_up_type = item.get("follow_up_type", "email")
+    lead_id = item.get("lead_id")
+    message = item.get("message") or ""
+
+    target_contact = ""
+    result = {"success": False}
+    try:
+        if follow_up_type == "email":
+            if not lead_id:
+                raise ValueError("lead_id required for email follow-up")
+            lead = db_optimizer.execute_query(
+                "SELECT id, email, name FROM leads WHERE id = ? AND user_id = ?",
+                (lead_id, user_id)
+            )
+            if not lead:
+                raise ValueError("Lead not found")
+            to_email = lead[0]["email"]
+            target_contact = to_email
+            from core.reserved_email_recipients import recipient_domain
+
+            skip, skip_reason = should_skip_scheduled_follow_up_email(to_email)
+            if skip:
+                _finalize_skipped_email_follow_up(
+                    user_id=user_id,
+                    follow_up_id=follow_up_id,
+                    lead_id=lead_id,
+                    follow_up_type=follow_up_type,
+                    idempotency_key=key,
+                    skip_reason=skip_reason,
+                    recipient_domain=recipient_domain(to_email),
+                    target_contact=target_contact,
                 )
-                if not lead:
-                    raise ValueError("Lead not found")
-                to_email = lead[0]["email"]
-                target_contact = to_email
-                from core.reserved_email_recipients import recipient_domain
-
-                skip, skip_reason = should_skip_scheduled_follow_up_email(to_email)
-                if skip:
-                    _finalize_skipped_email_follow_up(
-                        user_id=user_id,
-                        follow_up_id=follow_up_id,
-                        lead_id=lead_id,
-                        follow_up_type=follow_up_type,
-                        idempotency_key=key,
-                        skip_reason=skip_reason,
-                        recipient_domain=recipient_domain(to_email),
-                        target_contact=target_contact,
+                return "skipped"
+            safety = automation_safety_manager.check_rate_limits(
+                user_id=user_id,
+                action_type=f"follow_up_{follow_up_type}",
+                target_contact=target_contact or "unknown"
+            )
+            if not safety.get("allowed"):
+                logger.warning("Follow-up rate limited user_id=%s lead_id=%s", user_id, lead_id)
+                raise ValueError("automation_blocked")
+            subject = "Follow-up"
+            body = message or "Just checking in to see if you have any questions."
+            result = _send_email(user_id, to_email, subject, body)
+        else:
+            # SMS follow-up via Twilio
+            if not lead_id:
+                raise ValueError("lead_id required for sms follow-up")
+            lead = db_optimizer.execute_query(
+                "SELECT id, phone, metadata FROM leads WHERE id = ? AND user_id = ?",
+                (lead_id, user_id)
+            )
+            if not lead or not lead[0].get("phone"):
+                raise ValueError("Lead phone not found")
+            phone = lead[0]["phone"]
+            target_contact = phone
+            allowed, consent_reason = lead_row_allows_sms(lead[0])
+            if not allowed:
+                logger.warning(
+                    "SMS follow-up blocked (no consent) user_id=%s lead_id=%s reason=%s",
+                    user_id,
+                    lead_id,
+                    consent_reason,
+                )
+                try:
+                    db_optimizer.execute_query(
+                        """INSERT INTO sms_messages (user_id, lead_id, phone_number, message, status, sent_at)
+                           VALUES (?, ?, ?, ?, ?, ?)""",
+                        (
+                            user_id,
+                            lead_id,
+                            phone,
+                            message or "",
+                            "blocked_no_consent",
+                            datetime.utcnow().isoformat(),
+                        ),
+                        fetch=False,
                     )
-                    continue
+                except Exception as log_err:
+                    logger.debug("sms_messages log skipped: %s", log_err)
+                result = sms_consent_denial_payload(consent_reason)
+            else:
                 safety = automation_safety_manager.check_rate_limits(
                     user_id=user_id,
                     action_type=f"follow_up_{follow_up_type}",
                     target_contact=target_contact or "unknown"
                 )
                 if not safety.get("allowed"):
-                    logger.warning("Follow-up rate limited user_id=%s lead_id=%s", user_id, lead_id)
+                    logger.warning("SMS follow-up rate limited user_id=%s lead_id=%s", user_id, lead_id)
                     raise ValueError("automation_blocked")
-                subject = "Follow-up"
-                body = message or "Just checking in to see if you have any questions."
-                result = _send_email(user_id, to_email, subject, body)
-            else:
-                # SMS follow-up via Twilio
-                if not lead_id:
-                    raise ValueError("lead_id required for sms follow-up")
-                lead = db_optimizer.execute_query(
-                    "SELECT id, phone, metadata FROM leads WHERE id = ? AND user_id = ?",
-                    (lead_id, user_id)
-                )
-                if not lead or not lead[0].get("phone"):
-                    raise ValueError("Lead phone not found")
-                phone = lead[0]["phone"]
-                target_contact = phone
-                allowed, consent_reason = lead_row_allows_sms(lead[0])
-                if not allowed:
-                    logger.warning(
-                        "SMS follow-up blocked (no consent) user_id=%s lead_id=%s reason=%s",
-                        user_id,
-                        lead_id,
-                        consent_reason,
-                    )
-                    try:
-                        db_optimizer.execute_query(
-                            """INSERT INTO sms_messages (user_id, lead_id, phone_number, message, status, sent_at)
-                               VALUES (?, ?, ?, ?, ?, ?)""",
-                            (
-                                user_id,
-                                lead_id,
-                                phone,
-                                message or "",
-                                "blocked_no_consent",
-                                datetime.utcnow().isoformat(),
-                            ),
-                            fetch=False,
-                        )
-                    except Exception as log_err:
-                        logger.debug("sms_messages log skipped: %s", log_err)
-                    result = sms_consent_denial_payload(consent_reason)
-                else:
-                    safety = automation_safety_manager.check_rate_limits(
-                        user_id=user_id,
-                        action_type=f"follow_up_{follow_up_type}",
-                        target_contact=target_contact or "unknown"
-                    )
-                    if not safety.get("allowed"):
-                        logger.warning("SMS follow-up rate limited user_id=%s lead_id=%s", user_id, lead_id)
-                        raise ValueError("automation_blocked")
-                    result = _send_sms(user_id, lead_id, phone, message or "Follow-up reminder from Fikiri.")
+                result = _send_sms(user_id, lead_id, phone, message or "Follow-up reminder from Fikiri.")
 
-            logger.info("Executed follow-up id=%s user_id=%s type=%s success=%s", follow_up_id, user_id, follow_up_type, result.get("success"))
-            status = "completed" if result.get("success") else "failed"
-            idempotency_manager.update_key_result(key, status, result)
+        logger.info("Executed follow-up id=%s user_id=%s type=%s success=%s", follow_up_id, user_id, follow_up_type, result.get("success"))
+        status = "completed" if result.get("success") else "failed"
+        idempotency_manager.update_key_result(key, status, result)
 
-            db_optimizer.execute_query(
-                """
-                UPDATE scheduled_follow_ups
-                SET status = ?, sent_at = ?
-                WHERE id = ?
-                """,
-                ("sent" if result.get("success") else "failed", datetime.utcnow().isoformat(), follow_up_id),
-                fetch=False
-            )
+        db_optimizer.execute_query(
+            """
+            UPDATE scheduled_follow_ups
+            SET status = ?, sent_at = ?
+            WHERE id = ?
+            """,
+            ("sent" if result.get("success") else "failed", datetime.utcnow().isoformat(), follow_up_id),
+            fetch=False
+        )
 
-            try:
-                from email_automation.email_event_log import record_email_event
+        try:
+            from email_automation.email_event_log import record_email_event
 
-                fu_corr = f"followup:{user_id}:{follow_up_id}"
-                if result.get("success"):
-                    if follow_up_type == "email":
-                        record_email_event(
-                            user_id,
-                            "email.reply_sent",
-                            provider="gmail",
-                            lead_id=lead_id,
-                            correlation_id=fu_corr,
-                            payload={
-                                "channel": "scheduled_follow_up",
-                                "follow_up_id": follow_up_id,
-                                "gmail_message_id": result.get("message_id"),
-                            },
-                            status="applied",
-                            source="workflow_followups",
-                        )
-                    else:
-                        record_email_event(
-                            user_id,
-                            "ai.action_executed",
-                            lead_id=lead_id,
-                            correlation_id=fu_corr,
-                            payload={
-                                "channel": "scheduled_follow_up_sms",
-                                "follow_up_id": follow_up_id,
-                            },
-                            status="applied",
-                            source="workflow_followups",
-                        )
-                else:
+            fu_corr = f"followup:{user_id}:{follow_up_id}"
+            if result.get("success"):
+                if follow_up_type == "email":
                     record_email_event(
                         user_id,
-                        "email.failed",
+                        "email.reply_sent",
+                        provider="gmail",
                         lead_id=lead_id,
                         correlation_id=fu_corr,
                         payload={
                             "channel": "scheduled_follow_up",
                             "follow_up_id": follow_up_id,
-                            "follow_up_type": follow_up_type,
+                            "gmail_message_id": result.get("message_id"),
                         },
-                        status="failed",
-                        error_message=(result.get("error") or "follow_up_failed")[:2000],
+                        status="applied",
                         source="workflow_followups",
                     )
-            except Exception as ev_err:
-                logger.debug("follow-up email_events: %s", ev_err)
-
-            if lead_id and result.get("success") and not result.get("skipped"):
-                enhanced_crm_service.add_lead_activity(
-                    lead_id,
+                else:
+                    record_email_event(
+                        user_id,
+                        "ai.action_executed",
+                        lead_id=lead_id,
+                        correlation_id=fu_corr,
+                        payload={
+                            "channel": "scheduled_follow_up_sms",
+                            "follow_up_id": follow_up_id,
+                        },
+                        status="applied",
+                        source="workflow_followups",
+                    )
+            else:
+                record_email_event(
                     user_id,
-                    "follow_up",
-                    f"Workflow follow-up sent ({follow_up_type})",
-                    metadata={"follow_up_id": follow_up_id, "result": result}
+                    "email.failed",
+                    lead_id=lead_id,
+                    correlation_id=fu_corr,
+                    payload={
+                        "channel": "scheduled_follow_up",
+                        "follow_up_id": follow_up_id,
+                        "follow_up_type": follow_up_type,
+                    },
+                    status="failed",
+                    error_message=(result.get("error") or "follow_up_failed")[:2000],
+                    source="workflow_followups",
                 )
+        except Exception as ev_err:
+            logger.debug("follow-up email_events: %s", ev_err)
 
-            automation_safety_manager.log_automation_action(
-                user_id=user_id,
-                rule_id=0,
-                action_type=f"follow_up_{follow_up_type}",
-                target_contact=target_contact or "unknown",
-                idempotency_key=key,
-                status="completed" if result.get("success") else "failed",
-                error_message=None if result.get("success") else result.get("error")
+        if lead_id and result.get("success") and not result.get("skipped"):
+            enhanced_crm_service.add_lead_activity(
+                lead_id,
+                user_id,
+                "follow_up",
+                f"Workflow follow-up sent ({follow_up_type})",
+                metadata={"follow_up_id": follow_up_id, "result": result}
             )
 
-            if result.get("success"):
-                processed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            logger.error("Follow-up execution failed id=%s user_id=%s error=%s", follow_up_id, user_id, e)
-            idempotency_manager.update_key_result(key, "failed", {"success": False, "error": str(e)})
-            db_optimizer.execute_query(
-                "UPDATE scheduled_follow_ups SET status = ?, sent_at = ? WHERE id = ?",
-                ("failed", datetime.utcnow().isoformat(), follow_up_id),
-                fetch=False
-            )
-            automation_safety_manager.log_automation_action(
-                user_id=user_id,
-                rule_id=0,
-                action_type=f"follow_up_{follow_up_type}",
-                target_contact=target_contact or "unknown",
-                idempotency_key=key,
-                status="failed",
-                error_message=str(e)
-            )
-            failed += 1
+        automation_safety_manager.log_automation_action(
+            user_id=user_id,
+            rule_id=0,
+            action_type=f"follow_up_{follow_up_type}",
+            target_contact=target_contact or "unknown",
+            idempotency_key=key,
+            status="completed" if result.get("success") else "failed",
+            error_message=None if result.get("success") else result.get("error")
+        )
 
-    return {"success": True, "processed": processed, "failed": failed}
+        return "processed" if result.get("success") else "failed"
+    except Exception as e:
+        logger.error("Follow-up execution failed id=%s user_id=%s error=%s", follow_up_id, user_id, e)
+        idempotency_manager.update_key_result(key, "failed", {"success": False, "error": str(e)})
+        db_optimizer.execute_query(
+            "UPDATE scheduled_follow_ups SET status = ?, sent_at = ? WHERE id = ?",
+            ("failed", datetime.utcnow().isoformat(), follow_up_id),
+            fetch=False
+        )
+        automation_safety_manager.log_automation_action(
+            user_id=user_id,
+            rule_id=0,
+            action_type=f"follow_up_{follow_up_type}",
+            target_contact=target_contact or "unknown",
+            idempotency_key=key,
+            status="failed",
+            error_message=str(e)
+        )
+        return "failed"
 
 
 def run_due_follow_ups_for_all_users(now_iso: Optional[str] = None) -> Dict[str, Any]:
-    """Run due follow-ups for every user that has scheduled_follow_ups due. Called by the delivery scheduler."""
-    now_iso = now_iso or datetime.utcnow().isoformat()
-    rows = db_optimizer.execute_query(
-        """
-        SELECT DISTINCT user_id -- noqa: pg-audit (no ORDER BY — portable)
-        FROM scheduled_follow_ups
-        WHERE status = 'scheduled' AND follow_up_date <= ?
-        """,
-        (now_iso,),
-    )
-    user_ids = [r["user_id"] for r in rows] if rows else []
-    total_processed = 0
-    total_failed = 0
-    for uid in user_ids:
-        try:
-            result = execute_due_follow_ups(uid, now_iso=now_iso)
-            total_processed += result.get("processed", 0)
-            total_failed += result.get("failed", 0)
-        except Exception as e:
-            logger.exception("run_due_follow_ups_for_all_users user_id=%s error=%s", uid, e)
-            total_failed += 1
-    return {"success": True, "users_run": len(user_ids), "processed": total_processed, "failed": total_failed}
+    """Run due follow-ups for every user, sharded per tenant on the delivery executor."""
+    from core.delivery_executor import DELIVERY_KIND_FOLLOW_UPS, run_due_deliveries
+
+    now = datetime.fromisoformat(now_iso) if now_iso else None
+    result = run_due_deliveries(now=now, kinds=[DELIVERY_KIND_FOLLOW_UPS])
+    totals = result.get(DELIVERY_KIND_FOLLOW_UPS, {})
+    return {
+        "success": True,
+        "users_run": totals.get("tenants", 0),
+        "processed": totals.get("processed", 0),
+        "failed": totals.get("failed", 0),
+    }
 
 
-def process_due_calendar_reminders(now_iso: Optional[str] = None) -> Dict[str, Any]:
-    """Mark due calendar_events as reminded and add lead_activity so they show up in CRM. No external calendar sync yet."""
+def remind_due_calendar_events(user_id: int, now_iso: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Claim this user's due calendar_events, mark them reminded and add a lead_activity for each."""
     now_iso = now_iso or datetime.utcnow().isoformat()
+    token = new_claim_token()
+    claimed = claim_due_rows(
+        db_optimizer,
+        "calendar_events",
+        user_id,
+        CALENDAR_DUE_SQL,
+        (now_iso,),
+        "event_date ASC, id ASC",
+        token,
+        limit=limit,
+    )
     rows = db_optimizer.execute_query(
         """
         SELECT id, user_id, lead_id, title, event_date, description
         FROM calendar_events
-        WHERE status = 'scheduled' AND event_date <= ?
+        WHERE user_id = ? AND claimed_by = ? AND status = 'scheduled'
         ORDER BY event_date ASC
         """,
-        (now_iso,),
+        (user_id, token),
     )
     reminded = 0
-    for row in rows:
+    for row in rows or []:
         try:
             event_id = row["id"]
-            user_id = row["user_id"]
             lead_id = row.get("lead_id")
             title = row.get("title") or "Calendar event"
             event_date = row.get("event_date", "")
@@ -567,8 +598,17 @@ def process_due_calendar_reminders(now_iso: Optional[str] = None) -> Dict[str, A
                 )
             reminded += 1
         except Exception as e:
-            logger.exception("process_due_calendar_reminders event_id=%s error=%s", row.get("id"), e)
-    return {"success": True, "reminded": reminded}
+            logger.exception("remind_due_calendar_events event_id=%s error=%s", row.get("id"), e)
+    return {"success": True, "reminded": reminded, "claimed": claimed}
+
+
+def process_due_calendar_reminders(now_iso: Optional[str] = None) -> Dict[str, Any]:
+    """Mark due calendar_events as reminded and add lead_activity so they show up in CRM. No external calendar sync yet."""
+    from core.delivery_executor import DELIVERY_KIND_CALENDAR, run_due_deliveries
+
+    now = datetime.fromisoformat(now_iso) if now_iso else None
+    result = run_due_deliveries(now=now, kinds=[DELIVERY_KIND_CALENDAR])
+    return {"success": True, "reminded": result.get(DELIVERY_KIND_CALENDAR, {}).get("reminded", 0)}
 
 
 def cancel_pending_work_for_lead(user_id: int, lead_id: int, reason: str = "withdrawn_by_client") -> Dict[str, Any]:
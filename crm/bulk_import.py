@@ -0,0 +1,604 @@
+"""
+Streaming bulk lead import.
+
+Rows are consumed from any iterable in chunks of ``LEAD_IMPORT_CHUNK_SIZE``. Per chunk:
+
+1. normalize email/name and fold repeated emails in memory (``skip`` keeps the first);
+2. resolve existing leads with one ``lower(email) IN (...)`` lookup;
+3. write reactivations, updates, inserts and activity notes in a single transaction.
+
+Scoring, CRM events, analytics and LEAD_CREATED / LEAD_STAGE_CHANGED automations are
+deferred to one ``crm_lead_import`` durable job per import (see
+``run_lead_import_followup``) so the import itself never waits on them.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from core.database_optimization import db_optimizer
+from crm.event_log import record_crm_event
+
+logger = logging.getLogger(__name__)
+
+LEAD_IMPORT_CHUNK_SIZE = 500
+LEAD_IMPORT_DUPLICATE_MODES = ("skip", "update", "merge")
+LEAD_IMPORT_UPDATE_FIELDS = ("name", "phone", "company", "source", "stage", "notes", "tags", "metadata")
+_JSON_FIELDS = ("tags", "metadata")
+_LEAD_COLUMNS = (
+    "id, user_id, email, name, phone, company, source, stage, score, created_at, updated_at, "
+    "last_contact, notes, tags, metadata"
+)
+
+
+@dataclass
+class LeadImportProgress:
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped_duplicate: int = 0
+    merged_in_file: int = 0
+    chunks: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "skipped_duplicate": self.skipped_duplicate,
+            "merged_in_file": self.merged_in_file,
+            "chunks": self.chunks,
+            "errors": len(self.errors),
+        }
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _placeholders(values: List[Any]) -> str:
+    return ",".join("?" for _ in values)
+
+
+def _normalize_row(item: Any) -> Tuple[Dict[str, Any], Optional[str]]:
+    from crm.service import normalize_lead_email
+
+    item = dict(item or {})
+    email = normalize_lead_email(item.get("email"))
+    if email:
+        item["email"] = email
+    name = item.get("name")
+    if isinstance(name, str):
+        name = name.strip()
+        item["name"] = name
+    if not email or not name:
+        return item, "Missing required field: email/name"
+    return item, None
+
+
+def _fold_chunk(
+    items: List[Dict[str, Any]], on_duplicate: str, progress: LeadImportProgress
+) -> Dict[str, Dict[str, Any]]:
+    """email -> row; later rows for the same email overwrite (update) or fill (merge) earlier ones."""
+    folded: Dict[str, Dict[str, Any]] = {}
+    for raw in items:
+        item, error = _normalize_row(raw)
+        if error:
+            progress.errors.append({"lead": item, "error": error})
+            continue
+        email = item["email"]
+        prior = folded.get(email)
+        if prior is None:
+            folded[email] = item
+            continue
+        if on_duplicate == "skip":
+            progress.skipped_duplicate += 1
+            continue
+        progress.merged_in_file += 1
+        if on_duplicate == "merge":
+            prior.update({k: v for k, v in item.items() if v is not None and v != ""})
+        else:
+            prior.update(item)
+    return folded
+
+
+def resolve_lead_ids_by_email(user_id: int, emails: Iterable[str]) -> Dict[str, int]:
+    """Normalized email -> lead id for the given emails, one IN lookup per chunk."""
+    from crm.service import normalize_lead_email
+
+    wanted = list(dict.fromkeys(e for e in (normalize_lead_email(x) for x in emails) if e))
+    found: Dict[str, int] = {}
+    for start in range(0, len(wanted), LEAD_IMPORT_CHUNK_SIZE):
+        chunk = wanted[start : start + LEAD_IMPORT_CHUNK_SIZE]
+        rows = db_optimizer.execute_query(
+            f"SELECT id, lower(email) AS email FROM leads WHERE user_id = ? AND lower(email) IN ({_placeholders(chunk)})",
+            (user_id, *chunk),
+        )
+        for row in rows or []:
+            found[str(row["email"])] = int(row["id"])
+    return found
+
+
+def _existing_leads(user_id: int, emails: List[str]) -> Dict[str, Dict[str, Any]]:
+    if not emails:
+        return {}
+    rows = db_optimizer.execute_query(
+        f"""
+        SELECT id, lower(email) AS email, stage, score, metadata, withdrawn_at
+        FROM leads WHERE user_id = ? AND lower(email) IN ({_placeholders(emails)})
+        """,
+        (user_id, *emails),
+    )
+    return {str(r["email"]): dict(r) for r in rows or []}
+
+
+def _update_values(item: Dict[str, Any], existing: Dict[str, Any], on_duplicate: str) -> Dict[str, Any]:
+    """Column -> value for an existing lead, mirroring EnhancedCRMService.update_lead."""
+    if on_duplicate == "merge":
+        item = {k: v for k, v in item.items() if k != "email" and v is not None and v != ""}
+    values = {k: item[k] for k in LEAD_IMPORT_UPDATE_FIELDS if k in item}
+    if "sms_consent" in item:
+        from core.sms_consent import apply_lead_sms_consent_to_metadata
+        from crm.service import _crm_meta_dict
+
+        consent_flag = item["sms_consent"] is True
+        meta = apply_lead_sms_consent_to_metadata(
+            _crm_meta_dict(existing.get("metadata")), consent_flag, source="manual_crm"
+        )
+        if isinstance(values.get("metadata"), dict):
+            meta.update(values["metadata"])
+            meta = apply_lead_sms_consent_to_metadata(meta, consent_flag, source="manual_crm")
+        values["metadata"] = meta
+    return values
+
+
+def _insert_values(user_id: int, item: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Row for INSERT INTO leads; score stays 0 until the follow-up job rescores it."""
+    from core.sms_consent import apply_lead_sms_consent_to_metadata
+
+    meta = item.get("metadata") if isinstance(item.get("metadata"), dict) else {}
+    meta = apply_lead_sms_consent_to_metadata(dict(meta), item.get("sms_consent") is True, source="manual_crm")
+    return (
+        user_id,
+        item["email"],
+        item["name"],
+        item.get("phone"),
+        item.get("company"),
+        item.get("source", "manual"),
+        item.get("stage", "new"),
+        0,
+        item.get("notes"),
+        json.dumps(item.get("tags", [])),
+        json.dumps(meta),
+    )
+
+
+def _import_chunk(
+    user_id: int,
+    items: List[Dict[str, Any]],
+    on_duplicate: str,
+    progress: LeadImportProgress,
+    created_ids: List[int],
+    updated: List[Dict[str, Any]],
+) -> None:
+    folded = _fold_chunk(items, on_duplicate, progress)
+    existing = _existing_leads(user_id, list(folded))
+
+    reactivate: List[int] = []
+    updates: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+    inserts: List[Tuple[Any, ...]] = []
+    for email, item in folded.items():
+        row = existing.get(email)
+        if row is None:
+            inserts.append(_insert_values(user_id, item))
+            continue
+        if on_duplicate == "skip":
+            progress.skipped_duplicate += 1
+            continue
+        if row.get("withdrawn_at"):
+            reactivate.append(int(row["id"]))
+        values = _update_values(item, row, on_duplicate)
+        if not values:
+            progress.skipped_duplicate += 1
+            continue
+        updates.append((row, values))
+
+    new_ids: List[int] = []
+    with db_optimizer.transaction() as (conn, cursor):
+        if reactivate:
+            cursor.execute(
+                f"UPDATE leads SET withdrawn_at = NULL, updated_at = CURRENT_TIMESTAMP "
+                f"WHERE user_id = ? AND id IN ({_placeholders(reactivate)})",
+                (user_id, *reactivate),
+            )
+        for row, values in updates:
+            cols = sorted(values)
+            cursor.execute(
+                f"UPDATE leads SET {', '.join(f'{c} = ?' for c in cols)}, updated_at = CURRENT_TIMESTAMP "
+                "WHERE id = ? AND user_id = ?",
+                (
+                    *[json.dumps(values[c]) if c in _JSON_FIELDS else values[c] for c in cols],
+                    row["id"],
+                    user_id,
+                ),
+            )
+        if inserts:
+            cursor.execute(
+                "INSERT INTO leads (user_id, email, name, phone, company, source, stage, score, notes, tags, metadata) "
+                f"VALUES {', '.join('(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)' for _ in inserts)} "
+                "ON CONFLICT (user_id, email) DO NOTHING RETURNING id",
+                tuple(v for row in inserts for v in row),
+            )
+            # Only rows this statement inserted; a lead another writer created since the
+            # lookup hits the conflict and is reported as a duplicate instead.
+            new_ids = sorted(int(r["id"]) for r in cursor.fetchall())
+            progress.skipped_duplicate += len(inserts) - len(new_ids)
+        activities = [(lid, "note_added", "Lead imported", "{}") for lid in new_ids] + [
+            (int(row["id"]), "note_added", f"Lead updated: {', '.join(sorted(values))}", "{}")
+            for row, values in updates
+        ]
+        if activities:
+            cursor.execute(
+                "INSERT INTO lead_activities (lead_id, activity_type, description, metadata) "
+                f"VALUES {', '.join('(?, ?, ?, ?)' for _ in activities)}",
+                tuple(v for a in activities for v in a),
+            )
+        conn.commit()
+
+    progress.created += len(new_ids)
+    progress.updated += len(updates)
+    created_ids.extend(new_ids)
+    updated.extend(
+        {
+            "id": int(row["id"]),
+            "fields": sorted(values),
+            "old_stage": row.get("stage") or "new",
+            "old_score": int(row.get("score") or 0),
+        }
+        for row, values in updates
+    )
+
+
+def bulk_import_leads(
+    user_id: int,
+    rows: Iterable[Dict[str, Any]],
+    *,
+    on_duplicate: str = "update",
+    chunk_size: int = LEAD_IMPORT_CHUNK_SIZE,
+    progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None,
+    correlation_id: Optional[str] = None,
+    background_followup: bool = True,
+) -> Dict[str, Any]:
+    """
+    Import ``rows`` (any iterable, consumed once) for ``user_id``.
+
+    on_duplicate: skip | update (overwrite given fields) | merge (only non-empty fields).
+    ``progress_cb`` receives ``LeadImportProgress.as_dict()`` after every chunk. A chunk
+    that fails is rolled back and reported in ``errors``; earlier chunks stay committed.
+    Without a connected RQ worker the follow-up job runs in a daemon thread, or inline
+    when ``background_followup`` is False (CLI imports that exit right after).
+    """
+    if on_duplicate not in LEAD_IMPORT_DUPLICATE_MODES:
+        on_duplicate = "update"
+    correlation_id = str(correlation_id or uuid4())
+    progress = LeadImportProgress()
+    created_ids: List[int] = []
+    updated: List[Dict[str, Any]] = []
+
+    for chunk in _chunks(rows, max(1, int(chunk_size))):
+        try:
+            _import_chunk(user_id, chunk, on_duplicate, progress, created_ids, updated)
+        except Exception as exc:
+            logger.error(
+                "Lead import chunk failed user=%s chunk=%s: %s",
+                user_id,
+                progress.chunks + 1,
+                exc,
+                extra={"event": "crm_lead_import_chunk_failed", "service": "crm", "severity": "ERROR"},
+            )
+            progress.errors.append({"chunk": progress.chunks + 1, "rows": len(chunk), "error": str(exc)})
+        progress.processed += len(chunk)
+        progress.chunks += 1
+        if progress_cb:
+            progress_cb(progress.as_dict())
+
+    followup_job_id = schedule_lead_import_followup(
+        user_id, created_ids, updated, correlation_id=correlation_id, background=background_followup
+    )
+    logger.info(
+        "Lead import user=%s processed=%s created=%s updated=%s",
+        user_id,
+        progress.processed,
+        progress.created,
+        progress.updated,
+        extra={"event": "crm_lead_import_completed", "service": "crm", "severity": "INFO"},
+    )
+    return {
+        "created": progress.created,
+        "updated": progress.updated,
+        "skipped_duplicate": progress.skipped_duplicate,
+        "merged_in_file": progress.merged_in_file,
+        "errors": progress.errors,
+        "total": progress.processed,
+        "chunks": progress.chunks,
+        "followup_job_id": followup_job_id,
+        "correlation_id": correlation_id,
+    }
+
+
+def schedule_lead_import_followup(
+    user_id: int,
+    created_ids: List[int],
+    updated: List[Dict[str, Any]],
+    *,
+    correlation_id: Optional[str] = None,
+    background: bool = True,
+) -> Optional[str]:
+    """Enqueue the scoring/automation follow-up; runs on the RQ worker, else in-process."""
+    if not created_ids and not updated:
+        return None
+    from core.durable_jobs import JOB_KIND_CRM_LEAD_IMPORT, enqueue_durable_job
+
+    job_id = enqueue_durable_job(
+        JOB_KIND_CRM_LEAD_IMPORT,
+        user_id=user_id,
+        payload={"created_ids": created_ids, "updated": updated},
+        correlation_id=correlation_id,
+    )
+    if not job_id:
+        return None
+    try:
+        from core.redis_queues import email_queue
+
+        if email_queue.is_connected():
+            email_queue.enqueue_job("process_durable_background_job", {"job_id": job_id})
+            return job_id
+    except Exception as exc:
+        logger.warning("Lead import follow-up enqueue failed, running in-process: %s", exc)
+
+    from core.durable_job_processors import process_durable_background_job
+
+    if not background:
+        process_durable_background_job(job_id)
+        return job_id
+    threading.Thread(
+        target=process_durable_background_job, args=(job_id,), daemon=True, name="crm-lead-import"
+    ).start()
+    return job_id
+
+
+def _activity_metrics(lead_ids: List[int]) -> Dict[int, Tuple[int, Any]]:
+    from crm.service import _coerce_dt
+
+    rows = db_optimizer.execute_query(
+        f"""
+        SELECT lead_id, COUNT(*) AS count, MAX(timestamp) AS last_activity
+        FROM lead_activities WHERE lead_id IN ({_placeholders(lead_ids)}) GROUP BY lead_id
+        """,
+        tuple(lead_ids),
+    )
+    return {int(r["lead_id"]): (int(r["count"] or 0), _coerce_dt(r["last_activity"])) for r in rows or []}
+
+
+def _rescore_chunk(user_id: int, lead_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Score a chunk of leads as one batch and write every changed row with a single UPDATE."""
+    from core.lead_scoring_service import get_lead_scoring_service
+    from crm.service import _crm_meta_dict
+
+    rows = db_optimizer.execute_query(
+        f"SELECT {_LEAD_COLUMNS} FROM leads WHERE user_id = ? AND id IN ({_placeholders(lead_ids)})",
+        (user_id, *lead_ids),
+    )
+    leads = [dict(row) for row in rows or []]
+    if not leads:
+        return {}
+    metrics = _activity_metrics(lead_ids)
+    lead_metrics = [metrics.get(int(lead["id"]), (0, None)) for lead in leads]
+    results = get_lead_scoring_service().score_leads_batch(
+        leads, [m[0] for m in lead_metrics], [m[1] for m in lead_metrics]
+    )
+    scored: Dict[int, Dict[str, Any]] = {}
+    changed: List[Tuple[int, int, str]] = []
+    for lead, result in zip(leads, results):
+        meta = dict(_crm_meta_dict(lead.get("metadata")))
+        before = (lead.get("score"), meta.get("lead_quality"), meta.get("score_breakdown"))
+        meta["lead_quality"] = result.quality
+        meta["score_breakdown"] = result.breakdown
+        lead["score"] = int(result.score)
+        lead["metadata"] = meta
+        scored[int(lead["id"])] = lead
+        if before != (lead["score"], meta["lead_quality"], json.loads(json.dumps(result.breakdown))):
+            changed.append((int(lead["id"]), lead["score"], json.dumps(meta)))
+    if changed:
+        ids = [c[0] for c in changed]
+        score_case = " ".join("WHEN ? THEN ?" for _ in changed)
+        meta_case = " ".join("WHEN ? THEN ?" for _ in changed)
+        params: List[Any] = [v for lead_id, score, _ in changed for v in (lead_id, score)]
+        params += [v for lead_id, _, meta_json in changed for v in (lead_id, meta_json)]
+        with db_optimizer.transaction() as (conn, cursor):
+            cursor.execute(
+                f"UPDATE leads SET score = CASE id {score_case} END, metadata = CASE id {meta_case} END, "
+                f"updated_at = CURRENT_TIMESTAMP WHERE user_id = ? AND id IN ({_placeholders(ids)})",
+                (*params, user_id, *ids),
+            )
+            conn.commit()
+    return scored
+
+
+def rescore_user_leads(user_id: int, *, chunk_size: int = LEAD_IMPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Rescore every lead of a user (e.g. after LEAD_SCORING_WEIGHTS changes), walking ids with a
+    keyset cursor. Only rows whose score or breakdown changed are rewritten.
+    """
+    chunk_size = max(1, int(chunk_size))
+    last_id = 0
+    scored_total = 0
+    chunks = 0
+    while True:
+        rows = db_optimizer.execute_query(
+            "SELECT id FROM leads WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+            (user_id, last_id, chunk_size),
+        )
+        lead_ids = [int(r["id"]) for r in rows or []]
+        if not lead_ids:
+            break
+        scored_total += len(_rescore_chunk(user_id, lead_ids))
+        chunks += 1
+        last_id = lead_ids[-1]
+    return {"success": True, "scored": scored_total, "chunks": chunks}
+
+
+def _after_lead_created(user_id: int, lead: Dict[str, Any], correlation_id: str) -> None:
+    lead_id = int(lead["id"])
+    source = lead.get("source")
+    try:
+        from services.automation_engine import TriggerType, automation_engine
+
+        automation_engine.execute_automation_rules(
+            TriggerType.LEAD_CREATED,
+            {
+                "lead_id": lead_id,
+                "email": lead["email"],
+                "name": lead["name"],
+                "source": source,
+                "score": lead["score"],
+                "correlation_id": correlation_id,
+            },
+            user_id,
+            automation_source="crm_import",
+        )
+    except Exception as auto_error:
+        logger.warning("Automation trigger failed for imported lead %s: %s", lead_id, auto_error)
+    record_crm_event(
+        user_id=user_id,
+        event_type="lead.created",
+        entity_type="lead",
+        entity_id=lead_id,
+        payload={
+            "email": lead["email"],
+            "name": lead["name"],
+            "source": source,
+            "stage": lead.get("stage") or "new",
+            "score": lead["score"],
+        },
+        correlation_id=correlation_id,
+        source="import",
+    )
+    record_crm_event(
+        user_id=user_id,
+        event_type="contact.created",
+        entity_type="contact",
+        entity_id=lead_id,
+        payload={"email": lead["email"], "name": lead["name"], "source": source},
+        correlation_id=correlation_id,
+        source="import",
+    )
+    try:
+        from analytics.service_usage_recorders import record_crm_lead_created
+
+        record_crm_lead_created(
+            user_id,
+            lead_id=lead_id,
+            source=source,
+            created=True,
+            has_email=bool(lead.get("email")),
+            has_phone=bool(lead.get("phone")),
+            correlation_id=correlation_id,
+        )
+    except Exception:
+        pass
+
+
+def _after_lead_updated(user_id: int, lead: Dict[str, Any], change: Dict[str, Any], correlation_id: str) -> None:
+    lead_id = int(lead["id"])
+    old_stage = change.get("old_stage") or "new"
+    new_stage = lead.get("stage") or "new"
+    record_crm_event(
+        user_id=user_id,
+        event_type="lead.updated",
+        entity_type="lead",
+        entity_id=lead_id,
+        payload={
+            "fields_changed": change.get("fields") or [],
+            "stage": {"from": old_stage, "to": new_stage},
+            "score": {"from": int(change.get("old_score") or 0), "to": lead["score"]},
+        },
+        correlation_id=correlation_id,
+        source="import",
+    )
+    record_crm_event(
+        user_id=user_id,
+        event_type="contact.updated",
+        entity_type="contact",
+        entity_id=lead_id,
+        payload={"fields_changed": change.get("fields") or [], "stage": {"from": old_stage, "to": new_stage}},
+        correlation_id=correlation_id,
+        source="import",
+    )
+    if new_stage == old_stage:
+        return
+    record_crm_event(
+        user_id=user_id,
+        event_type="lead.stage_changed",
+        entity_type="lead",
+        entity_id=lead_id,
+        payload={"from": old_stage, "to": new_stage},
+        correlation_id=correlation_id,
+        source="import",
+    )
+    try:
+        from services.automation_engine import TriggerType, automation_engine
+
+        automation_engine.execute_automation_rules(
+            TriggerType.LEAD_STAGE_CHANGED,
+            {
+                "lead_id": lead_id,
+                "old_stage": old_stage,
+                "new_stage": new_stage,
+                "email": lead["email"],
+                "correlation_id": correlation_id,
+            },
+            user_id,
+            automation_source="crm_import",
+        )
+    except Exception as auto_error:
+        logger.warning("Automation trigger failed for imported lead %s: %s", lead_id, auto_error)
+
+
+def run_lead_import_followup(
+    user_id: int,
+    created_ids: List[int],
+    updated: List[Dict[str, Any]],
+    *,
+    correlation_id: Optional[str] = None,
+    chunk_size: int = LEAD_IMPORT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Rescore imported leads chunk by chunk, then emit the events/automations create/update_lead would."""
+    correlation_id = str(correlation_id or uuid4())
+    created = [int(i) for i in created_ids or []]
+    changes = {int(u["id"]): u for u in updated or []}
+    lead_ids = created + [i for i in changes if i not in set(created)]
+    created = set(created)
+    scored_total = 0
+    for start in range(0, len(lead_ids), max(1, int(chunk_size))):
+        scored = _rescore_chunk(user_id, lead_ids[start : start + chunk_size])
+        scored_total += len(scored)
+        for lead_id, lead in scored.items():
+            if lead_id in created:
+                _after_lead_created(user_id, lead, correlation_id)
+            else:
+                _after_lead_updated(user_id, lead, changes[lead_id], correlation_id)
+    return {"success": True, "scored": scored_total, "created": len(created), "updated": len(changes)}
@@ -14,6 +14,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
 from core.database_optimization import db_optimizer
+from core.event_sink import enqueue_event_row
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,13 @@ _MAX_PAYLOAD_BYTES = 16 * 1024
 
 _schema_mode: Optional[str] = None
 
+_CRM_EVENT_COLUMNS = (
+    "user_id", "event_type", "entity_type", "entity_id",
+    "correlation_id", "supersedes_event_id",
+    "payload_json", "payload_truncated",
+    "status", "error_message", "source", "created_at",
+)
+
 
 def _crm_events_schema_mode() -> str:
     """
@@ -101,6 +109,22 @@ def record_crm_event(
                 fetch=False,
             )
         else:
+            values = (
+                user_id,
+                event_type,
+                entity_type,
+                entity_id,
+                correlation_id,
+                supersedes_event_id,
+                payload_json,
+                truncated,
+                status,
+                error_message,
+                source,
+                created_at,
+            )
+            if enqueue_event_row("crm_events", _CRM_EVENT_COLUMNS, values):
+                return
             db_optimizer.execute_query(
                 """
                 INSERT INTO crm_events (
@@ -110,20 +134,7 @@ def record_crm_event(
                     status, error_message, source, created_at
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    user_id,
-                    event_type,
-                    entity_type,
-                    entity_id,
-                    correlation_id,
-                    supersedes_event_id,
-                    payload_json,
-                    truncated,
-                    status,
-                    error_message,
-                    source,
-                    created_at,
-                ),
+                values,
                 fetch=False,
             )
     except Exception as exc:  # noqa: BLE001 — intentional best-effort sink
@@ -0,0 +1,173 @@
+"""
+Search and keyset-pagination indexes for CRM lead lists.
+
+SQLite: ``leads_fts`` is an FTS5 external-content table over name, email, company and
+phone using the ``trigram`` tokenizer, so ``q`` keeps its substring (``LIKE '%q%'``)
+semantics while reading the index instead of scanning every lead. Triggers keep it in
+sync with all writers. It is built outside the request path by
+scripts/backfill_leads_fts.py (table, triggers and an FTS5 ``rebuild`` in one
+transaction, plus the keyset indexes below); until then lead search uses LIKE. Terms
+shorter than three characters cannot use trigrams and stay on LIKE.
+
+PostgreSQL: scripts/migrations/012_leads_search_keyset.sql adds ``pg_trgm`` GIN
+indexes on the exact ``LOWER(COALESCE(col, ''))`` expressions the LIKE filter uses, so
+the query text does not change there.
+
+Both backends get ``(user_id, <sort column>, id)`` indexes for keyset pagination
+(``crm.service._CRM_LEAD_SORT_COLUMNS``).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from core.database_optimization import db_optimizer
+
+logger = logging.getLogger(__name__)
+
+LEADS_FTS_TABLE = "leads_fts"
+LEADS_FTS_MIN_TERM = 3
+
+_SQLITE_FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {LEADS_FTS_TABLE} USING fts5(
+        name, email, company, phone,
+        content='leads', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leads_fts_ai AFTER INSERT ON leads BEGIN
+        INSERT INTO {LEADS_FTS_TABLE}(rowid, name, email, company, phone)  -- noqa: pg-audit (SQLite FTS5 trigger)
+        VALUES (new.id, new.name, new.email, new.company, new.phone);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leads_fts_ad AFTER DELETE ON leads BEGIN
+        INSERT INTO {LEADS_FTS_TABLE}({LEADS_FTS_TABLE}, rowid, name, email, company, phone)  -- noqa: pg-audit (SQLite FTS5 trigger)
+        VALUES ('delete', old.id, old.name, old.email, old.company, old.phone);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leads_fts_au AFTER UPDATE OF name, email, company, phone ON leads BEGIN
+        INSERT INTO {LEADS_FTS_TABLE}({LEADS_FTS_TABLE}, rowid, name, email, company, phone)  -- noqa: pg-audit (SQLite FTS5 trigger)
+        VALUES ('delete', old.id, old.name, old.email, old.company, old.phone);
+        INSERT INTO {LEADS_FTS_TABLE}(rowid, name, email, company, phone)  -- noqa: pg-audit (SQLite FTS5 trigger)
+        VALUES (new.id, new.name, new.email, new.company, new.phone);
+    END
+    """,
+)
+
+# Keyset pagination: one (user_id, sort expression, id) index per allowlisted sort.
+_SQLITE_KEYSET_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_leads_user_created_id ON leads (user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_user_updated_id ON leads (user_id, updated_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_user_last_contact_id ON leads (user_id, last_contact, id)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_user_score_id ON leads (user_id, score, id)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_user_lower_name_id ON leads (user_id, LOWER(name), id)",
+    "CREATE INDEX IF NOT EXISTS idx_leads_user_lower_email ON leads (user_id, LOWER(email))",
+)
+
+# A missing index is re-checked this often so a background build is picked up without a restart.
+SEARCH_MODE_RECHECK_SECONDS = 60
+
+_mode_lock = threading.Lock()
+_mode_cache: Dict[str, tuple] = {}  # db_type -> (mode, monotonic time of the probe)
+
+
+def _fts_enabled() -> bool:
+    return os.getenv("CRM_LEADS_FTS", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def ensure_lead_list_indexes() -> None:
+    """Keyset indexes (SQLite only; PostgreSQL gets them from migration 012)."""
+    if db_optimizer.db_type == "postgresql" or not db_optimizer.table_exists("leads"):
+        return
+    for ddl in _SQLITE_KEYSET_INDEXES:
+        try:
+            db_optimizer.execute_query(ddl, fetch=False)
+        except Exception as e:
+            logger.warning("Could not create lead list index: %s", e)
+
+
+def ensure_leads_fts() -> bool:
+    """
+    Create the SQLite trigram FTS table + triggers and fill it, atomically (build step,
+    not for request handlers). PostgreSQL: False.
+    """
+    if db_optimizer.db_type == "postgresql" or not db_optimizer.table_exists("leads"):
+        return False
+    if db_optimizer.table_exists(LEADS_FTS_TABLE):
+        return True
+    try:
+        # One write transaction, so searches never see a half-filled index.
+        with db_optimizer.transaction() as (conn, cursor):
+            cursor.execute("BEGIN IMMEDIATE")
+            for ddl in _SQLITE_FTS_DDL:
+                cursor.execute(ddl)
+            cursor.execute(f"INSERT INTO {LEADS_FTS_TABLE}({LEADS_FTS_TABLE}) VALUES ('rebuild')")
+            conn.commit()
+        logger.info("✅ Built %s trigram index", LEADS_FTS_TABLE)
+        return True
+    except Exception as e:
+        # e.g. SQLite older than 3.34 (no trigram tokenizer) or built without FTS5
+        logger.warning("leads trigram FTS unavailable, lead search uses LIKE: %s", e)
+        return False
+
+
+def leads_search_mode() -> Optional[str]:
+    """
+    ``"fts5"`` when the SQLite trigram index exists, else ``None`` (LIKE). Only checks
+    that the index exists; a present index is remembered for the process, a missing one
+    is re-checked every ``SEARCH_MODE_RECHECK_SECONDS``.
+    """
+    if not _fts_enabled():
+        return None
+    key = db_optimizer.db_type
+    now = time.monotonic()
+    with _mode_lock:
+        cached = _mode_cache.get(key)
+        if cached is not None and (cached[0] is not None or now - cached[1] < SEARCH_MODE_RECHECK_SECONDS):
+            return cached[0]
+    try:
+        ready = key != "postgresql" and db_optimizer.table_exists(LEADS_FTS_TABLE)
+    except Exception as e:
+        logger.warning("leads FTS probe failed: %s", e)
+        ready = False
+    mode = "fts5" if ready else None
+    with _mode_lock:
+        _mode_cache[key] = (mode, now)
+    return mode
+
+
+def reset_search_mode_cache() -> None:
+    with _mode_lock:
+        _mode_cache.clear()
+
+
+def leads_fts_match_query(term: str) -> Optional[str]:
+    """Trigram phrase for a substring search; ``None`` when the term is too short for trigrams."""
+    term = (term or "").strip()
+    if len(term) < LEADS_FTS_MIN_TERM:
+        return None
+    return '"' + term.replace('"', '""') + '"'
+
+
+def backfill_leads_search_index() -> Dict[str, Any]:
+    """
+    SQLite: create the keyset indexes and build (or rebuild) the trigram FTS table in
+    one pass over leads. PostgreSQL: nothing to do; migration 012 owns both.
+    """
+    if db_optimizer.db_type == "postgresql":
+        return {"mode": None, "rows": 0}
+    ensure_lead_list_indexes()
+    existed = db_optimizer.table_exists(LEADS_FTS_TABLE)
+    if not ensure_leads_fts():
+        return {"mode": None, "rows": 0}
+    if existed:
+        db_optimizer.execute_query(f"INSERT INTO {LEADS_FTS_TABLE}({LEADS_FTS_TABLE}) VALUES ('rebuild')", fetch=False)
+    rows = db_optimizer.execute_query("SELECT COUNT(*) AS c FROM leads")
+    return {"mode": "fts5", "rows": int(rows[0]["c"]) if rows else 0}
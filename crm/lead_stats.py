@@ -0,0 +1,269 @@
+"""
+Incrementally maintained lead totals for CRM list pages.
+
+``lead_stats`` holds one row per (user_id, stage, source) with the count, scored
+count (non-NULL ``score``) and score sum of active (non-withdrawn) leads; the average
+divides by the scored count so NULL scores are ignored exactly as ``AVG(score)`` does.
+Triggers on ``leads`` adjust it on every insert,
+delete, withdraw/reactivate and stage/source/score change, so the unfiltered (or
+stage-only) lead list reads totals and analytics from a handful of rows instead of
+running COUNT/GROUP BY/AVG over every lead. On SQLite the table, triggers and seed
+are built outside the request path by scripts/backfill_lead_stats.py (one
+transaction); until then list totals use SQL aggregates. PostgreSQL gets them from
+scripts/migrations/012_leads_search_keyset.sql.
+
+Other filters (q, company, time_period) keep exact SQL aggregates, cached per filter
+for ``LEAD_SUMMARY_CACHE_TTL_SECONDS`` so later pages of the same list reuse them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.database_optimization import db_optimizer
+
+logger = logging.getLogger(__name__)
+
+LEAD_STATS_TABLE = "lead_stats"
+LEAD_SUMMARY_CACHE_TTL_SECONDS = 60
+LEAD_SUMMARY_CACHE_MAX_ENTRIES = 2048
+RECENT_LEADS_DAYS = 7
+
+_SQLITE_STATS_DDL = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {LEAD_STATS_TABLE} (
+        user_id INTEGER NOT NULL,
+        stage TEXT NOT NULL DEFAULT '',
+        source TEXT NOT NULL DEFAULT '',
+        lead_count INTEGER NOT NULL DEFAULT 0,
+        scored_count INTEGER NOT NULL DEFAULT 0,
+        score_sum INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, stage, source)
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lead_stats_ai AFTER INSERT ON leads
+    WHEN new.withdrawn_at IS NULL BEGIN
+        INSERT INTO {LEAD_STATS_TABLE} (user_id, stage, source, lead_count, scored_count, score_sum)
+        VALUES (new.user_id, COALESCE(new.stage, ''), COALESCE(new.source, ''), 1,
+                new.score IS NOT NULL, COALESCE(new.score, 0))
+        ON CONFLICT (user_id, stage, source) DO UPDATE SET
+            lead_count = lead_count + 1, scored_count = scored_count + excluded.scored_count,
+            score_sum = score_sum + excluded.score_sum;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lead_stats_ad AFTER DELETE ON leads
+    WHEN old.withdrawn_at IS NULL BEGIN
+        UPDATE {LEAD_STATS_TABLE}
+        SET lead_count = lead_count - 1, scored_count = scored_count - (old.score IS NOT NULL),
+            score_sum = score_sum - COALESCE(old.score, 0)
+        WHERE user_id = old.user_id AND stage = COALESCE(old.stage, '') AND source = COALESCE(old.source, '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lead_stats_au
+    AFTER UPDATE OF user_id, stage, source, score, withdrawn_at ON leads BEGIN
+        UPDATE {LEAD_STATS_TABLE}
+        SET lead_count = lead_count - 1, scored_count = scored_count - (old.score IS NOT NULL),
+            score_sum = score_sum - COALESCE(old.score, 0)
+        WHERE old.withdrawn_at IS NULL
+          AND user_id = old.user_id AND stage = COALESCE(old.stage, '') AND source = COALESCE(old.source, '');
+        INSERT INTO {LEAD_STATS_TABLE} (user_id, stage, source, lead_count, scored_count, score_sum)
+        SELECT new.user_id, COALESCE(new.stage, ''), COALESCE(new.source, ''), 1,
+               new.score IS NOT NULL, COALESCE(new.score, 0)
+        WHERE new.withdrawn_at IS NULL
+        ON CONFLICT (user_id, stage, source) DO UPDATE SET
+            lead_count = lead_count + 1, scored_count = scored_count + excluded.scored_count,
+            score_sum = score_sum + excluded.score_sum;
+    END
+    """,
+)
+
+_SQLITE_TRIGGERS = ("lead_stats_ai", "lead_stats_ad", "lead_stats_au")
+
+_REBUILD_SQL = f"""
+    INSERT INTO {LEAD_STATS_TABLE} (user_id, stage, source, lead_count, scored_count, score_sum)
+    SELECT user_id, COALESCE(stage, ''), COALESCE(source, ''), COUNT(*), COUNT(score), COALESCE(SUM(score), 0)
+    FROM leads WHERE withdrawn_at IS NULL
+    GROUP BY user_id, COALESCE(stage, ''), COALESCE(source, '')
+"""
+
+# A missing rollup is re-checked this often so a background build is picked up without a restart.
+LEAD_STATS_RECHECK_SECONDS = 60
+
+_ready_lock = threading.Lock()
+_ready_cache: Dict[str, Tuple[bool, float]] = {}  # db_type -> (ready, monotonic time of the probe)
+_summary_lock = threading.Lock()
+_summary_cache: Dict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]] = {}
+
+
+def _stats_enabled() -> bool:
+    return os.getenv("CRM_LEAD_STATS", "true").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _lead_stats_present() -> bool:
+    if db_optimizer.db_type == "postgresql":
+        return db_optimizer.table_exists(LEAD_STATS_TABLE)
+    return db_optimizer.table_exists(LEAD_STATS_TABLE) and "scored_count" in db_optimizer.list_table_columns(
+        LEAD_STATS_TABLE
+    )
+
+
+def ensure_lead_stats() -> bool:
+    """
+    Create the SQLite rollup + triggers and seed it from ``leads``, atomically (build
+    step, not for request handlers). PostgreSQL: True when migration 012 ran.
+    """
+    if db_optimizer.db_type == "postgresql":
+        return db_optimizer.table_exists(LEAD_STATS_TABLE)
+    if not db_optimizer.table_exists("leads"):
+        return False
+    if "withdrawn_at" not in db_optimizer.list_table_columns("leads"):
+        return False
+    if _lead_stats_present():
+        return True
+    try:
+        # One write transaction: no lead write lands between the seed and the triggers.
+        with db_optimizer.transaction() as (conn, cursor):
+            cursor.execute("BEGIN IMMEDIATE")
+            # A rollup from before scored_count is recreated with its triggers.
+            for trigger in _SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {LEAD_STATS_TABLE}")
+            for ddl in _SQLITE_STATS_DDL:
+                cursor.execute(ddl)
+            cursor.execute(_REBUILD_SQL)
+            conn.commit()
+        logger.info("✅ Seeded %s from leads", LEAD_STATS_TABLE)
+        return True
+    except Exception as e:
+        logger.warning("lead_stats unavailable, lead totals use COUNT(*): %s", e)
+        return False
+
+
+def rebuild_lead_stats() -> None:
+    """Recompute every row from ``leads`` (repair / first seed)."""
+    with db_optimizer.transaction() as (conn, cursor):
+        cursor.execute(f"DELETE FROM {LEAD_STATS_TABLE}")
+        cursor.execute(_REBUILD_SQL)
+        conn.commit()
+
+
+def backfill_lead_stats() -> Dict[str, Any]:
+    """
+    SQLite: build the rollup + triggers, or recompute an existing rollup from ``leads``.
+    PostgreSQL: recompute the rollup created by migration 012.
+    """
+    existed = _lead_stats_present()
+    if not ensure_lead_stats():
+        return {"ready": False, "rows": 0}
+    if existed:
+        rebuild_lead_stats()
+    rows = db_optimizer.execute_query(f"SELECT COUNT(*) AS c FROM {LEAD_STATS_TABLE}")
+    return {"ready": True, "rows": int(rows[0]["c"]) if rows else 0}
+
+
+def lead_stats_ready() -> bool:
+    """
+    Whether the rollup exists. Only checks; a present rollup is remembered for the
+    process, a missing one is re-checked every ``LEAD_STATS_RECHECK_SECONDS``.
+    """
+    if not _stats_enabled():
+        return False
+    key = db_optimizer.db_type
+    now = time.monotonic()
+    with _ready_lock:
+        cached = _ready_cache.get(key)
+        if cached is not None and (cached[0] or now - cached[1] < LEAD_STATS_RECHECK_SECONDS):
+            return cached[0]
+    try:
+        ready = _lead_stats_present()
+    except Exception as e:
+        logger.warning("lead_stats probe failed: %s", e)
+        ready = False
+    with _ready_lock:
+        _ready_cache[key] = (ready, now)
+    return ready
+
+
+def reset_lead_stats_cache() -> None:
+    with _ready_lock:
+        _ready_cache.clear()
+    with _summary_lock:
+        _summary_cache.clear()
+
+
+def lead_stats_summary(user_id: int, *, stage: Optional[str] = None) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """``(total, analytics)`` for active leads (optionally one stage) from the rollup; ``None`` if unavailable."""
+    if not lead_stats_ready():
+        return None
+    params: list = [user_id]
+    stage_sql = ""
+    if stage:
+        stage_sql = " AND stage = ?"
+        params.append(stage)
+    rows = db_optimizer.execute_query(
+        f"SELECT stage, source, lead_count, scored_count, score_sum FROM {LEAD_STATS_TABLE} "
+        f"WHERE user_id = ? AND lead_count > 0{stage_sql}",
+        tuple(params),
+    )
+    total = 0
+    scored = 0
+    score_sum = 0
+    by_stage: Dict[str, int] = {}
+    by_source: Dict[str, int] = {}
+    for row in rows or []:
+        count = int(row["lead_count"] or 0)
+        total += count
+        scored += int(row["scored_count"] or 0)
+        score_sum += int(row["score_sum"] or 0)
+        stage_key = row["stage"] or "unknown"
+        source_key = (row["source"] or "").strip() or "unknown"
+        by_stage[stage_key] = by_stage.get(stage_key, 0) + count
+        by_source[source_key] = by_source.get(source_key, 0) + count
+    if total <= 0:
+        return 0, {"total_leads": 0, "leads_by_stage": {}, "leads_by_source": {}, "avg_score": 0, "recent_leads": 0}
+
+    recent_cutoff = datetime.now() - timedelta(days=RECENT_LEADS_DAYS)
+    recent = db_optimizer.execute_query(
+        f"SELECT COUNT(*) AS cnt FROM leads WHERE user_id = ? AND withdrawn_at IS NULL{stage_sql} AND created_at >= ?",
+        (*params, recent_cutoff.isoformat()),
+    )
+    return total, {
+        "total_leads": total,
+        "leads_by_stage": by_stage,
+        "leads_by_source": by_source,
+        "avg_score": round(score_sum / scored, 1) if scored else 0,
+        "recent_leads": int(recent[0]["cnt"]) if recent else 0,
+    }
+
+
+def cached_lead_summary(
+    key: Tuple[Any, ...],
+    compute: Callable[[], Dict[str, Any]],
+    *,
+    refresh: bool,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Return ``(value, from_cache)`` for a filtered list's totals. ``refresh`` (first page)
+    always recomputes; later pages reuse the value while it is younger than the TTL.
+    """
+    now = time.monotonic()
+    if not refresh:
+        with _summary_lock:
+            hit = _summary_cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1], True
+    value = compute()
+    with _summary_lock:
+        if len(_summary_cache) >= LEAD_SUMMARY_CACHE_MAX_ENTRIES:
+            for stale in [k for k, (exp, _) in _summary_cache.items() if exp <= now] or list(_summary_cache)[:1]:
+                _summary_cache.pop(stale, None)
+        _summary_cache[key] = (now + LEAD_SUMMARY_CACHE_TTL_SECONDS, value)
+    return value, False
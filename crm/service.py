@@ -3,16 +3,19 @@ Enhanced CRM Service with Real-time Gmail Sync
 Manages leads, contacts, and activities with automatic Gmail integration
 """
 
+import base64
 import json
 import logging
 import re
 from email.utils import parseaddr
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass, asdict, is_dataclass
 from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 from core.database_optimization import db_optimizer
 from crm.event_log import record_crm_event
+from crm.lead_search_index import LEADS_FTS_TABLE, leads_fts_match_query, leads_search_mode
+from crm.lead_stats import cached_lead_summary, lead_stats_summary
 from core.lead_scoring_service import get_lead_scoring_service
 # Gmail OAuth functionality - disabled pending OAuth refactor
 # from core.gmail_oauth import gmail_oauth_manager, gmail_sync_manager
@@ -31,6 +34,10 @@ _CRM_LEAD_SORT_COLUMNS = {
 }
 _CRM_LEAD_DEFAULT_SORT = "created_at"
 _CRM_LEAD_DEFAULT_DIRECTION = "DESC"
+# Sort columns that may be NULL; ordered NULLS LAST so keyset cursors stay stable on both backends.
+_CRM_LEAD_NULLABLE_SORTS = frozenset({"last_contact", "score", "name"})
+# Filters lead_stats can answer; anything else falls back to cached SQL aggregates.
+_CRM_LEAD_STATS_FILTERS = frozenset({"stage"})
 
 
 def normalize_lead_email(value: Any) -> str:
@@ -43,6 +50,34 @@ def normalize_lead_email(value: Any) -> str:
     return str(value or "").strip().lower()
 
 
+def _encode_lead_cursor(sort_key: str, direction: str, value: Any, lead_id: int) -> str:
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort_key, "d": direction, "v": value, "id": int(lead_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_lead_cursor(cursor: str, sort_key: str, direction: str) -> Optional[Tuple[Any, int]]:
+    """(sort value, id) from a next_cursor; None when malformed or issued for another sort."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if data.get("s") != sort_key or data.get("d") != direction:
+            return None
+        return data.get("v"), int(data["id"])
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+def _lead_keyset_predicate(sort_sql: str, direction: str, nullable: bool, value: Any, lead_id: int) -> Tuple[str, List[Any]]:
+    """Rows strictly after (value, id) in ``ORDER BY sort_sql direction [NULLS LAST], id DESC``."""
+    if value is None:
+        return f"({sort_sql} IS NULL AND id < ?)", [lead_id]
+    op = "<" if direction == "DESC" else ">"
+    null_tail = f" OR {sort_sql} IS NULL" if nullable else ""
+    return f"({sort_sql} {op} ? OR ({sort_sql} = ? AND id < ?){null_tail})", [value, value, lead_id]
+
+
 def _crm_tags_list(raw: Any) -> List[str]:
     if raw is None:
         return []
@@ -212,14 +247,21 @@ class EnhancedCRMService:
                 parts.append("LOWER(COALESCE(company, '')) LIKE ?")
                 params.append(f"%{str(filters['company']).strip().lower()}%")
             if filters.get('q'):
-                search = f"%{str(filters['q']).strip().lower()}%"
-                parts.append(
-                    "(LOWER(COALESCE(name, '')) LIKE ? OR "
-                    "LOWER(COALESCE(email, '')) LIKE ? OR "
-                    "LOWER(COALESCE(company, '')) LIKE ? OR "
-                    "LOWER(COALESCE(phone, '')) LIKE ?)"
-                )
-                params.extend([search, search, search, search])
+                term = str(filters['q']).strip()
+                # Trigram index on SQLite (substring semantics); LIKE otherwise / for short terms.
+                match = leads_fts_match_query(term) if leads_search_mode() == "fts5" else None
+                if match:
+                    parts.append(f"id IN (SELECT rowid FROM {LEADS_FTS_TABLE} WHERE {LEADS_FTS_TABLE} MATCH ?)")  # noqa: pg-audit (SQLite FTS5 only)
+                    params.append(match)
+                else:
+                    search = f"%{term.lower()}%"
+                    parts.append(
+                        "(LOWER(COALESCE(name, '')) LIKE ? OR "
+                        "LOWER(COALESCE(email, '')) LIKE ? OR "
+                        "LOWER(COALESCE(company, '')) LIKE ? OR "
+                        "LOWER(COALESCE(phone, '')) LIKE ?)"
+                    )
+                    params.extend([search, search, search, search])
         return " AND ".join(parts), params
 
     def _lead_sort_clause(self, sort: Optional[str], direction: Optional[str]) -> Tuple[str, str]:
@@ -239,24 +281,55 @@ class EnhancedCRMService:
         offset: int = 0,
         sort: str = _CRM_LEAD_DEFAULT_SORT,
         direction: str = _CRM_LEAD_DEFAULT_DIRECTION,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Get comprehensive leads summary with analytics and pagination"""
+        """Get comprehensive leads summary with analytics and pagination.
+
+        ``cursor`` (a previous page's ``next_cursor`` for the same sort) switches to keyset
+        pagination and ``offset`` is ignored. Totals come from lead_stats for the unfiltered
+        and stage-only lists, otherwise from aggregates computed on the first page and reused
+        by later pages (crm/lead_stats.py)."""
         where_sql, params = self._leads_where_clause(user_id, filters)
         sort_sql, direction_sql = self._lead_sort_clause(sort, direction)
+        sort_key = next(k for k, v in _CRM_LEAD_SORT_COLUMNS.items() if v == sort_sql)
+        nullable = sort_key in _CRM_LEAD_NULLABLE_SORTS
+
+        after = None
+        if cursor:
+            after = _decode_lead_cursor(cursor, sort_key, direction_sql)
+            if after is None:
+                return {'success': False, 'error': 'Invalid or stale cursor', 'error_code': 'INVALID_CURSOR'}
+        page_where, page_params = where_sql, list(params)
+        if after is not None:
+            seek_sql, seek_params = _lead_keyset_predicate(sort_sql, direction_sql, nullable, *after)
+            page_where = f"{where_sql} AND {seek_sql}"
+            page_params.extend(seek_params)
+            offset = 0
 
         base_query = f"""SELECT id, user_id, email, name, phone, company, source, stage, score,
-                       created_at, updated_at, last_contact, notes, tags, metadata
-                       FROM leads WHERE {where_sql}
-                       ORDER BY {sort_sql} {direction_sql}, id DESC LIMIT ? OFFSET ?"""
-        list_params = list(params) + [limit, offset]
-        leads_data = db_optimizer.execute_query(base_query, tuple(list_params))
+                       created_at, updated_at, last_contact, notes, tags, metadata, {sort_sql} AS sort_key
+                       FROM leads WHERE {page_where}
+                       ORDER BY {sort_sql} {direction_sql}{' NULLS LAST' if nullable else ''}, id DESC LIMIT ? OFFSET ?"""
+        # Keyset pages fetch one extra row to know whether another page exists.
+        list_params = page_params + [limit + 1 if after is not None else limit, offset]
+        leads_data = list(db_optimizer.execute_query(base_query, tuple(list_params)) or [])
+
+        totals, totals_cached = self._leads_totals(
+            user_id, filters, where_sql, params, refresh=after is None and offset == 0
+        )
+        total_count = totals['total_count']
 
-        count_query = f"SELECT COUNT(*) as total FROM leads WHERE {where_sql}"
-        total_count_result = db_optimizer.execute_query(count_query, tuple(params))
-        total_count = total_count_result[0]['total'] if total_count_result else 0
+        if after is not None:
+            has_more = len(leads_data) > limit
+            leads_data = leads_data[:limit]
+        else:
+            has_more = (offset + len(leads_data)) < total_count
+        next_cursor = None
+        if has_more and leads_data:
+            last = leads_data[-1]
+            next_cursor = _encode_lead_cursor(sort_key, direction_sql, last.get('sort_key'), last['id'])
 
         leads = [self._format_lead(lead_data) for lead_data in leads_data]
-        analytics = self._get_leads_analytics_filtered(where_sql, params, total_count)
         
         return {
             'success': True,
@@ -266,11 +339,41 @@ class EnhancedCRMService:
                 'returned_count': len(leads),
                 'limit': limit,
                 'offset': offset,
-                'has_more': (offset + len(leads)) < total_count,
-                'analytics': analytics,
+                'has_more': has_more,
+                'next_cursor': next_cursor,
+                'totals_cached': totals_cached,
+                'analytics': totals['analytics'],
                 'filters_applied': filters or {}
             }
         }
+
+    def _leads_totals(
+        self,
+        user_id: int,
+        filters: Optional[Dict[str, Any]],
+        where_sql: str,
+        params: List[Any],
+        *,
+        refresh: bool,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """({total_count, analytics}, from_cache) for a lead list; see get_leads_summary."""
+        active = {k: v for k, v in (filters or {}).items() if v}
+        if set(active) <= _CRM_LEAD_STATS_FILTERS:
+            stats = lead_stats_summary(user_id, stage=active.get('stage'))
+            if stats is not None:
+                return {'total_count': stats[0], 'analytics': stats[1]}, False
+
+        def _compute() -> Dict[str, Any]:
+            count_query = f"SELECT COUNT(*) as total FROM leads WHERE {where_sql}"
+            total_count_result = db_optimizer.execute_query(count_query, tuple(params))
+            total_count = total_count_result[0]['total'] if total_count_result else 0
+            return {
+                'total_count': total_count,
+                'analytics': self._get_leads_analytics_filtered(where_sql, params, total_count),
+            }
+
+        key = (user_id, tuple(sorted((k, str(v)) for k, v in active.items())))
+        return cached_lead_summary(key, _compute, refresh=refresh)
     
     def create_lead(self, user_id: int, lead_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new lead"""
@@ -896,36 +999,40 @@ class EnhancedCRMService:
                 (user_id,),
             )
             
-            synced_leads = []
-            for activity in activities_data:
-                # Check if this is a new lead or existing
-                existing_lead = db_optimizer.execute_query(
-                    "SELECT id FROM leads WHERE user_id = ? AND email = ?",
-                    (user_id, activity['email'])
+            # One row per lead already; resolve and create set-wise instead of per activity.
+            from crm.bulk_import import bulk_import_leads, resolve_lead_ids_by_email
+
+            by_email: Dict[str, Dict[str, Any]] = {}
+            for activity in activities_data or []:
+                email = normalize_lead_email(activity.get('email'))
+                if email and email not in by_email:
+                    by_email[email] = activity
+
+            existing = resolve_lead_ids_by_email(user_id, by_email)
+            missing = [email for email in by_email if email not in existing]
+            created: set = set()
+            if missing:
+                bulk_import_leads(
+                    user_id,
+                    (
+                        {
+                            'email': email,
+                            'name': by_email[email].get('name') or email.split('@')[0],
+                            'company': by_email[email].get('company'),
+                            'source': 'gmail',
+                            'stage': 'new',
+                        }
+                        for email in missing
+                    ),
+                    on_duplicate='skip',
                 )
-                
-                if not existing_lead:
-                    # Create new lead from email
-                    lead_data = {
-                        'email': activity['email'],
-                        'name': activity['name'] or activity['email'].split('@')[0],
-                        'company': activity['company'],
-                        'source': 'gmail',
-                        'stage': 'new'
-                    }
-                    
-                    result = self.create_lead(user_id, lead_data)
-                    if result['success']:
-                        synced_leads.append({
-                            'email': activity['email'],
-                            'action': 'created'
-                        })
-                else:
-                    # Update existing lead activity
-                    synced_leads.append({
-                        'email': activity['email'],
-                        'action': 'updated'
-                    })
+                created = set(resolve_lead_ids_by_email(user_id, missing))
+
+            synced_leads = [
+                {'email': email, 'action': 'created' if email in created else 'updated'}
+                for email in by_email
+                if email in existing or email in created
+            ]
             
             return {
                 'success': True,
@@ -1244,68 +1351,18 @@ class EnhancedCRMService:
     def import_leads(
         self,
         user_id: int,
-        leads: List[Dict[str, Any]],
+        leads: Iterable[Dict[str, Any]],
         on_duplicate: str = 'update',
+        progress_cb: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Dict[str, Any]:
         """Import leads. on_duplicate: 'skip' | 'update' | 'merge'.
-        skip: do not update existing, count as skipped; update: overwrite; merge: update only non-empty fields."""
-        created = 0
-        updated = 0
-        skipped_duplicate = 0
-        errors = []
-        allowed_dup = ('skip', 'update', 'merge')
-        if on_duplicate not in allowed_dup:
-            on_duplicate = 'update'
-        for item in leads:
-            item = dict(item or {})
-            email = normalize_lead_email(item.get('email'))
-            if email:
-                item['email'] = email
-            name = item.get('name')
-            if isinstance(name, str):
-                name = name.strip()
-                item['name'] = name
-            if not email or not name:
-                errors.append({'lead': item, 'error': 'Missing required field: email/name'})
-                continue
-            existing = db_optimizer.execute_query(
-                "SELECT id, withdrawn_at FROM leads WHERE user_id = ? AND lower(email) = lower(?)",
-                (user_id, email)
-            )
-            if existing:
-                lead_id = existing[0]["id"]
-                if on_duplicate == 'skip':
-                    skipped_duplicate += 1
-                    continue
-                if existing[0].get("withdrawn_at"):
-                    db_optimizer.execute_query(
-                        "UPDATE leads SET withdrawn_at = NULL, updated_at = CURRENT_TIMESTAMP "
-                        "WHERE id = ? AND user_id = ?",
-                        (lead_id, user_id),
-                        fetch=False,
-                    )
-                if on_duplicate == 'merge':
-                    updates = {k: v for k, v in item.items() if k != 'email' and v is not None and v != ''}
-                    if not updates:
-                        skipped_duplicate += 1
-                        continue
-                    self.update_lead(lead_id, user_id, updates)
-                else:
-                    self.update_lead(lead_id, user_id, item)
-                updated += 1
-            else:
-                self.create_lead(user_id, item)
-                created += 1
-        return {
-            'success': True,
-            'data': {
-                'created': created,
-                'updated': updated,
-                'skipped_duplicate': skipped_duplicate,
-                'errors': errors,
-                'total': len(leads)
-            }
-        }
+        skip: do not update existing, count as skipped; update: overwrite; merge: update only non-empty fields.
+        Runs the chunked bulk path (crm/bulk_import.py); scoring, events and automations follow
+        in the durable job returned as followup_job_id."""
+        from crm.bulk_import import bulk_import_leads
+
+        data = bulk_import_leads(user_id, leads, on_duplicate=on_duplicate, progress_cb=progress_cb)
+        return {'success': True, 'data': data}
     
     def _get_cutoff_date(self, time_period: str) -> datetime:
         """Get cutoff date for time period filter"""
@@ -13,11 +13,20 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
 from core.database_optimization import db_optimizer
+from core.event_sink import enqueue_event_row
 
 logger = logging.getLogger(__name__)
 
 _MAX_PAYLOAD_BYTES = 16 * 1024
 
+_EMAIL_EVENT_COLUMNS = (
+    "created_at", "user_id", "event_type", "provider",
+    "message_id", "thread_id", "synced_email_id", "lead_id",
+    "correlation_id", "supersedes_event_id", "idempotency_key",
+    "payload_json", "payload_truncated",
+    "status", "error_message", "source",
+)
+
 
 def record_email_event(
     user_id: int,
@@ -50,6 +59,26 @@ def record_email_event(
             else:
                 payload_json = raw
 
+        values = (
+            created_at,
+            user_id,
+            event_type,
+            provider,
+            message_id,
+            thread_id,
+            synced_email_id,
+            lead_id,
+            correlation_id,
+            supersedes_event_id,
+            idempotency_key,
+            payload_json,
+            truncated,
+            status,
+            error_message,
+            source,
+        )
+        if enqueue_event_row("email_events", _EMAIL_EVENT_COLUMNS, values):
+            return
         db_optimizer.execute_query(
             """
             INSERT INTO email_events (
@@ -60,24 +89,7 @@ def record_email_event(
                 status, error_message, source
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                created_at,
-                user_id,
-                event_type,
-                provider,
-                message_id,
-                thread_id,
-                synced_email_id,
-                lead_id,
-                correlation_id,
-                supersedes_event_id,
-                idempotency_key,
-                payload_json,
-                truncated,
-                status,
-                error_message,
-                source,
-            ),
+            values,
             fetch=False,
         )
     except Exception as exc:  # noqa: BLE001
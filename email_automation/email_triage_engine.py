@@ -7,9 +7,12 @@ Never auto-deletes mail; cleanup_action is a recommendation for user-approved bu
 from __future__ import annotations
 
 import logging
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 from core.ai.email_triage_taxonomy import (
     category_from_intent,
@@ -34,6 +37,9 @@ logger = logging.getLogger(__name__)
 RULE_CONFIDENCE_HIGH = 0.82
 RULE_CONFIDENCE_LOW = 0.55
 
+DEFAULT_TRIAGE_AI_CONCURRENCY = 8
+DEFAULT_TRIAGE_AI_TENANT_CONCURRENCY = 4
+
 _LIST_UNSUB_RE = re.compile(r"list-unsubscribe|unsubscribe", re.I)
 _NOREPLY_RE = re.compile(r"noreply|no-reply|donotreply|do-not-reply|mailer-daemon", re.I)
 _MARKETING_RE = re.compile(
@@ -298,6 +304,65 @@ def _enrich_from_analysis(analysis: Dict[str, Any], base: TriageResult) -> Triag
     )
 
 
+def _cap_automated(result: TriageResult, *, subject: str, body: str, sender_email: str) -> TriageResult:
+    capped = cap_lead_if_automated(
+        category=result.category,
+        subject=subject,
+        body=body,
+        sender_email=sender_email,
+    )
+    if capped != result.category:
+        result.category = normalize_triage_category(capped)
+        result.lead_score = min(result.lead_score, 25)
+        result.needs_ai = False
+    return result
+
+
+def _finalize_rule_result(base: TriageResult, *, subject: str, body: str, sender_email: str) -> Dict[str, Any]:
+    capped = cap_lead_if_automated(
+        category=base.category,
+        subject=subject,
+        body=body,
+        sender_email=sender_email,
+    )
+    if capped != base.category:
+        out = base.to_dict()
+        out["category"] = normalize_triage_category(capped)
+        out["lead_score"] = min(int(out.get("lead_score") or 0), 25)
+        out["cleanup_action"] = default_cleanup_for_category(
+            out["category"], lead_score=out["lead_score"]
+        )
+        out["needs_ai"] = False
+        return out
+    return base.to_dict()
+
+
+def _offline_enrich(
+    base: TriageResult,
+    *,
+    subject: str,
+    body: str,
+    sender_email: str,
+    sender_name: str,
+    user_id: Optional[int],
+) -> Dict[str, Any]:
+    """Heuristic (no LLM) enrichment for uncertain rule results; falls back to rules on error."""
+    try:
+        offline = classify_with_fallback(
+            subject=subject,
+            body=body,
+            sender_email=sender_email,
+            sender_name=sender_name,
+            user_id=user_id,
+        )
+        result = _enrich_from_analysis(offline, base)
+        result.classification_source = "rules+fallback"
+        return _cap_automated(result, subject=subject, body=body, sender_email=sender_email).to_dict()
+    except Exception as exc:
+        logger.warning("triage fallback analysis failed: %s", exc)
+    return _finalize_rule_result(base, subject=subject, body=body, sender_email=sender_email)
+
+
 def classify_email_triage(
     *,
     subject: str,
@@ -331,43 +396,209 @@ def classify_email_triage(
         return result.to_dict()
 
     if allow_ai and base.needs_ai:
-        try:
-            offline = classify_with_fallback(
-                subject=subject,
-                body=body,
-                sender_email=sender_email,
-                sender_name=sender_name,
-                user_id=user_id,
+        return _offline_enrich(
+            base,
+            subject=subject,
+            body=body,
+            sender_email=sender_email,
+            sender_name=sender_name,
+            user_id=user_id,
+        )
+
+    return _finalize_rule_result(base, subject=subject, body=body, sender_email=sender_email)
+
+
+def triage_ai_concurrency() -> int:
+    """Worker threads per batch for LLM triage (FIKIRI_TRIAGE_AI_CONCURRENCY)."""
+    raw = os.getenv("FIKIRI_TRIAGE_AI_CONCURRENCY", "").strip()
+    try:
+        return max(1, int(raw)) if raw else DEFAULT_TRIAGE_AI_CONCURRENCY
+    except ValueError:
+        return DEFAULT_TRIAGE_AI_CONCURRENCY
+
+
+def triage_ai_tenant_concurrency() -> int:
+    """In-flight LLM triage calls per tenant across all batches in this process."""
+    raw = os.getenv("FIKIRI_TRIAGE_AI_TENANT_CONCURRENCY", "").strip()
+    try:
+        return max(1, int(raw)) if raw else DEFAULT_TRIAGE_AI_TENANT_CONCURRENCY
+    except ValueError:
+        return DEFAULT_TRIAGE_AI_TENANT_CONCURRENCY
+
+
+_tenant_slots: Dict[Any, threading.BoundedSemaphore] = {}
+_tenant_slots_lock = threading.Lock()
+
+
+def _tenant_slot(user_id: Optional[int]) -> threading.BoundedSemaphore:
+    key = user_id if user_id is not None else "anonymous"
+    with _tenant_slots_lock:
+        slot = _tenant_slots.get(key)
+        if slot is None:
+            slot = threading.BoundedSemaphore(triage_ai_tenant_concurrency())
+            _tenant_slots[key] = slot
+        return slot
+
+
+def _budget_allowance(user_id: Optional[int], wanted: int) -> int:
+    """
+    How many of ``wanted`` LLM calls AIBudgetGuardrails allows right now.
+
+    One evaluate() covers the common case; when the whole batch does not fit, a quiet
+    binary search finds the largest increment that still passes (cap or soft stop).
+    """
+    if wanted <= 0 or not user_id:
+        return max(0, wanted)
+    try:
+        from core.ai_budget_guardrails import ai_budget_guardrails
+
+        if ai_budget_guardrails.evaluate(user_id, projected_increment=wanted).allowed:
+            return wanted
+        lo, hi = 0, wanted - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if ai_budget_guardrails.evaluate(user_id, projected_increment=mid, emit_alerts=False).allowed:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+    except Exception as exc:
+        logger.warning("triage batch budget check failed user=%s (fail-open): %s", user_id, exc)
+        return wanted
+
+
+def _record_batch_ai_usage(user_id: Optional[int], quantity: int) -> None:
+    if not user_id or quantity <= 0:
+        return
+    try:
+        from core.ai_budget_guardrails import ai_budget_guardrails
+
+        ai_budget_guardrails.record_ai_usage(user_id, quantity)
+    except Exception as exc:
+        logger.debug("triage batch usage record skipped: %s", exc)
+
+
+def classify_email_triage_batch(
+    emails: Sequence[Dict[str, Any]],
+    *,
+    user_id: Optional[int] = None,
+    allow_ai: bool = False,
+    analyze_fn: Optional[Callable[..., Dict[str, Any]]] = None,
+    max_concurrency: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Triage many messages for one tenant; results are returned in input order.
+
+    Each item takes the keys of ``classify_email_triage`` (subject, body, sender_email,
+    sender_name, headers, analysis). Rules run for every item first, reusing one client
+    config load. When ``allow_ai`` is set, only items the rules are unsure about go
+    further: through ``analyze_fn`` (e.g. ``MinimalAIEmailAssistant.analyze_incoming_email``)
+    on a bounded thread pool when given, capped by the tenant's AI budget and
+    per-tenant concurrency, and through the offline heuristic path otherwise.
+    """
+    if not emails:
+        return []
+    cfg = load_client_email_config(user_id)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(emails)
+    bases: Dict[int, TriageResult] = {}
+    pending: List[int] = []
+
+    for idx, item in enumerate(emails):
+        base = _rule_only_triage(
+            subject=item.get("subject") or "",
+            body=item.get("body") or "",
+            sender_email=item.get("sender_email") or "",
+            sender_name=item.get("sender_name") or "",
+            headers=item.get("headers"),
+            client_config=cfg,
+        )
+        analysis = item.get("analysis")
+        if analysis and isinstance(analysis, dict):
+            results[idx] = _enrich_from_analysis(analysis, base).to_dict()
+        elif allow_ai and base.needs_ai:
+            bases[idx] = base
+            pending.append(idx)
+        else:
+            results[idx] = _finalize_rule_result(
+                base,
+                subject=item.get("subject") or "",
+                body=item.get("body") or "",
+                sender_email=item.get("sender_email") or "",
             )
-            result = _enrich_from_analysis(offline, base)
-            result.classification_source = "rules+fallback"
-            capped = cap_lead_if_automated(
-                category=result.category,
+
+    llm_indexes: List[int] = []
+    if analyze_fn is not None and pending:
+        llm_indexes = pending[: _budget_allowance(user_id, len(pending))]
+        if len(llm_indexes) < len(pending):
+            logger.info(
+                "triage batch budget limited LLM calls user=%s allowed=%s wanted=%s",
+                user_id,
+                len(llm_indexes),
+                len(pending),
+            )
+    llm_set = set(llm_indexes)
+
+    def _offline(idx: int) -> Dict[str, Any]:
+        item = emails[idx]
+        return _offline_enrich(
+            bases[idx],
+            subject=item.get("subject") or "",
+            body=item.get("body") or "",
+            sender_email=item.get("sender_email") or "",
+            sender_name=item.get("sender_name") or "",
+            user_id=user_id,
+        )
+
+    def _with_llm(idx: int) -> Dict[str, Any]:
+        item = emails[idx]
+        subject = item.get("subject") or ""
+        body = item.get("body") or ""
+        sender_email = item.get("sender_email") or ""
+        with _tenant_slot(user_id):
+            analysis = analyze_fn(
+                sender_email=sender_email,
+                sender_name=item.get("sender_name") or "",
                 subject=subject,
                 body=body,
-                sender_email=sender_email,
+                user_id=user_id,
             )
-            if capped != result.category:
-                result.category = normalize_triage_category(capped)
-                result.lead_score = min(result.lead_score, 25)
-                result.needs_ai = False
-            return result.to_dict()
-        except Exception as exc:
-            logger.warning("triage fallback analysis failed: %s", exc)
-
-    capped = cap_lead_if_automated(
-        category=base.category,
-        subject=subject,
-        body=body,
-        sender_email=sender_email,
+        if not isinstance(analysis, dict):
+            raise ValueError("analyze_fn returned no analysis")
+        result = _enrich_from_analysis(analysis, bases[idx])
+        return _cap_automated(result, subject=subject, body=body, sender_email=sender_email).to_dict()
+
+    for idx in pending:
+        if idx not in llm_set:
+            results[idx] = _offline(idx)
+
+    llm_calls = 0
+    if llm_indexes:
+        workers = max(1, min(max_concurrency or triage_ai_concurrency(), len(llm_indexes)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="triage-ai") as pool:
+            futures = {pool.submit(_with_llm, idx): idx for idx in llm_indexes}
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    results[idx] = future.result()
+                    llm_calls += 1
+                except Exception as exc:
+                    logger.warning("triage batch AI analysis failed user=%s: %s", user_id, exc)
+                    results[idx] = _offline(idx)
+        _record_batch_ai_usage(user_id, llm_calls)
+
+    logger.info(
+        "email triage batch classified",
+        extra={
+            "event": "email_triage.batch.classified",
+            "service": "email",
+            "severity": "INFO",
+            "user_id": user_id,
+            "metadata": {
+                "total": len(emails),
+                "needs_ai": len(pending),
+                "llm_calls": llm_calls,
+                "budget_limited": len(pending) - len(llm_indexes) if analyze_fn is not None else 0,
+            },
+        },
     )
-    if capped != base.category:
-        out = base.to_dict()
-        out["category"] = normalize_triage_category(capped)
-        out["lead_score"] = min(int(out.get("lead_score") or 0), 25)
-        out["cleanup_action"] = default_cleanup_for_category(
-            out["category"], lead_score=out["lead_score"]
-        )
-        out["needs_ai"] = False
-        return out
-    return base.to_dict()
+    return [r if r is not None else {} for r in results]
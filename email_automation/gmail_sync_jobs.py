@@ -12,7 +12,7 @@ import uuid
 import logging
 import threading
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 from dataclasses import dataclass
 from enum import Enum
 
@@ -49,6 +49,29 @@ logger = logging.getLogger(__name__)
 _gmail_sync_tables_lock = threading.Lock()
 _gmail_sync_tables_ready = False
 
+# users.history.list record types that can change what we store for a message.
+GMAIL_HISTORY_TYPES = ("messageAdded", "labelAdded", "labelRemoved")
+
+# Max bound parameters per synced_emails existence probe (SQLite's default limit is 999).
+KNOWN_ID_PROBE_CHUNK = 500
+
+# Times a message id that failed to fetch or store is retried by later incremental syncs.
+GMAIL_SYNC_MAX_MESSAGE_RETRIES = int(os.getenv("GMAIL_SYNC_MAX_MESSAGE_RETRIES", "3"))
+
+
+class GmailHistoryExpired(Exception):
+    """Gmail no longer has history for the stored startHistoryId (HTTP 404)."""
+
+
+def _is_history_expired_error(exc: Exception) -> bool:
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    if status is None:
+        status = getattr(exc, "status_code", None)
+    try:
+        return int(status) == 404
+    except (TypeError, ValueError):
+        return False
+
 
 def should_process_gmail_sync_inline() -> bool:
     """
@@ -156,6 +179,14 @@ class GmailSyncJobManager:
             )
             self.gmail_fetch_mode = 'serial'
         self.sync_days = int(os.getenv('GMAIL_SYNC_DAYS', str(DEFAULT_LOOKBACK_DAYS)))
+        # Staged sync pipeline: body fetch chunk, triage worker pool, hand-off queue depth.
+        self.fetch_chunk_size = max(1, int(os.getenv('GMAIL_SYNC_FETCH_CHUNK', '25')))
+        self.triage_workers = max(1, int(os.getenv('GMAIL_SYNC_TRIAGE_WORKERS', '4')))
+        self.pipeline_queue_size = max(1, int(os.getenv('GMAIL_SYNC_PIPELINE_QUEUE', '50')))
+        # Poll only Gmail history since the stored historyId when a cursor exists.
+        self.incremental_sync = os.getenv('GMAIL_SYNC_INCREMENTAL', 'true').strip().lower() in {
+            '1', 'true', 'yes', 'on'
+        }
         self._connect_redis()
         self._initialize_tables()
     
@@ -379,6 +410,40 @@ class GmailSyncJobManager:
             logger.debug("get_latest_sync_cursor failed for user %s: %s", user_id, exc)
             return {}
 
+    def get_history_cursor(self, user_id: int) -> Dict[str, Any]:
+        """
+        Return the Gmail ``historyId`` stored by the most recent completed sync job.
+
+        ``lookback_days`` is the widest window the cursor already covers, so a request
+        for a longer lookback still runs a full listing. ``retry_ids`` maps message ids
+        that failed to fetch or store in that job to their attempt count.
+        """
+        try:
+            rows = db_optimizer.execute_query(
+                """
+                SELECT metadata FROM gmail_sync_jobs
+                WHERE user_id = ? AND status = 'completed'
+                ORDER BY completed_at DESC, created_at DESC
+                LIMIT 5
+                """,
+                (user_id,),
+            )
+            for row in rows or []:
+                meta = parse_job_metadata(row.get("metadata") if isinstance(row, dict) else row)
+                history_id = meta.get("history_id")
+                if history_id:
+                    retry_ids = meta.get("pending_retry_ids")
+                    return {
+                        "history_id": str(history_id),
+                        "lookback_days": int(
+                            meta.get("history_lookback_days") or meta.get("lookback_days") or 0
+                        ),
+                        "retry_ids": dict(retry_ids) if isinstance(retry_ids, dict) else {},
+                    }
+        except Exception as exc:
+            logger.debug("get_history_cursor failed for user %s: %s", user_id, exc)
+        return {}
+
     def queue_sync_job(
         self,
         user_id: int,
@@ -562,7 +627,13 @@ class GmailSyncJobManager:
             service = gmail_client.get_gmail_service_for_user(user_id)
             
             # Sync emails
-            sync_result = self._sync_emails(service, user_id, job_id, job_meta)
+            sync_result = self._sync_emails(
+                service,
+                user_id,
+                job_id,
+                job_meta,
+                service_factory=lambda: gmail_client.get_gmail_service_for_user(user_id),
+            )
 
             completed_meta = dict(job_meta)
             completed_meta["last_batch_count"] = sync_result.get("emails_synced", 0)
@@ -574,6 +645,19 @@ class GmailSyncJobManager:
                 completed_meta["has_more"] = False
             lookback_days = job_meta.get("lookback_days", self.sync_days)
             completed_meta["lookback_days"] = lookback_days
+            if sync_result.get("history_id"):
+                completed_meta["history_id"] = str(sync_result["history_id"])
+                completed_meta["history_lookback_days"] = (
+                    sync_result.get("history_lookback_days") or lookback_days
+                )
+            if sync_result.get("pending_retry_ids"):
+                completed_meta["pending_retry_ids"] = sync_result["pending_retry_ids"]
+            else:
+                completed_meta.pop("pending_retry_ids", None)
+            if sync_result.get("sync_type"):
+                completed_meta["sync_type"] = sync_result["sync_type"]
+            if sync_result.get("pipeline"):
+                completed_meta["pipeline"] = sync_result["pipeline"]
             from core.gmail_sync_options import GMAIL_LOOKBACK_PRESETS
 
             for preset_id, days in GMAIL_LOOKBACK_PRESETS.items():
@@ -767,8 +851,20 @@ class GmailSyncJobManager:
         user_id: int,
         job_id: str,
         job_meta: Optional[Dict[str, Any]] = None,
+        *,
+        service_factory: Optional[Callable[[], Any]] = None,
     ) -> Dict[str, Any]:
-        """Sync emails from Gmail for one batch (lookback window + optional page token)."""
+        """
+        Sync emails from Gmail for one batch (lookback window + optional page token).
+
+        Messages flow through a staged pipeline (see ``email_automation.sync_pipeline``):
+        full-message fetch → parse + store → triage (worker pool) → automations/contacts/
+        progress. The next fetch chunk downloads while earlier messages are processed, and
+        each message is parsed once and shared by triage and orchestration.
+
+        ``service_factory`` builds a second Gmail service for the fetch thread when mailbox
+        automation also uses ``service``; without one, bodies are fetched up front.
+        """
         try:
             meta = job_meta if isinstance(job_meta, dict) else {}
             lookback_days = int(meta.get("lookback_days") or self.sync_days)
@@ -783,29 +879,40 @@ class GmailSyncJobManager:
             """, (job_id,), fetch=False)
             logger.info(f"📊 Sync job {job_id} started - progress set to 5%")
             
-            # Get messages from Gmail
-            fetch_result = self._get_gmail_messages(
+            # List messages (history since the stored cursor, or the lookback window); bodies
+            # for new ids are fetched by the pipeline's fetch stage.
+            fetch_result = self._get_sync_batch(
                 service,
+                user_id,
                 lookback_days=lookback_days,
                 max_messages=max_messages,
                 page_token=page_token if isinstance(page_token, str) else None,
+                full_resync=bool(meta.get("full_resync")),
+                defer_fetch=True,
             )
-            messages = fetch_result.get("messages") or []
+            messages = list(fetch_result.get("messages") or [])
+            pending_ids = list(fetch_result.get("pending_ids") or [])
+            labels_updated = self._apply_gmail_label_changes(
+                user_id, fetch_result.get("label_changes") or {}
+            )
+            total_messages = len(messages) + len(pending_ids)
             
             # Update progress after fetching message list
-            if messages:
+            if total_messages:
                 db_optimizer.execute_query("""
                     UPDATE gmail_sync_jobs 
                     SET progress = 10, emails_synced = 0
                     WHERE job_id = ?
                 """, (job_id,), fetch=False)
-                logger.info(f"📊 Sync job {job_id} - {len(messages)} messages found, progress set to 10%")
+                logger.info(f"📊 Sync job {job_id} - {total_messages} messages found, progress set to 10%")
+            elif fetch_result.get("skipped_known"):
+                logger.info(
+                    f"📊 Sync job {job_id} - no new messages "
+                    f"({fetch_result['skipped_known']} already synced, labels refreshed)"
+                )
             else:
                 logger.warning(f"⚠️ Sync job {job_id} - No messages found")
             
-            emails_synced = 0
-            contacts_found = 0
-            leads_identified = 0
             mailbox_automation_enabled = os.getenv("MAILBOX_AUTOMATION_ENABLED", "").lower() in {
                 "1",
                 "true",
@@ -841,249 +948,409 @@ class GmailSyncJobManager:
             except Exception:
                 owner_email = None
 
-            total_messages = len(messages)
+            # The mailbox stack shares ``service``; googleapiclient services are not
+            # thread-safe, so the fetch thread needs its own or bodies are fetched now.
+            fetch_service = service
+            if pending_ids and sync_runtime is not None:
+                fetch_service = None
+                if service_factory is not None:
+                    try:
+                        fetch_service = service_factory()
+                    except Exception as factory_err:
+                        logger.debug("Gmail fetch service factory failed: %s", factory_err)
+                if fetch_service is None:
+                    messages.extend(self._fetch_full_gmail_messages(service, pending_ids))
+                    pending_ids = []
+
+            if sync_runtime is not None and sync_runtime.parser:
+                parser = sync_runtime.parser
+            else:
+                from email_automation.parser import MinimalEmailParser
+
+                parser = MinimalEmailParser()
+
+            stored_ids: set = set()
+            stage_state = {
+                "emails_synced": 0,
+                "processed": 0,
+                "contacts_found": 0,
+                "leads_identified": 0,
+            }
             progress_update_every = max(
                 1, int(getattr(self, "progress_update_every", 10) or 10)
             )
-            
-            for message in messages:
+            fetch_chunk = max(1, int(getattr(self, "fetch_chunk_size", 25) or 25))
+
+            def fetch_stage():
+                yield from messages
+                for start in range(0, len(pending_ids), fetch_chunk):
+                    yield from self._fetch_full_gmail_messages(
+                        fetch_service, pending_ids[start:start + fetch_chunk]
+                    )
+
+            def store_stage(message: Dict[str, Any]) -> Dict[str, Any]:
+                item: Dict[str, Any] = {"message": message, "synced_email_id": None, "error": None}
                 try:
-                    # Store email
                     email_id = self._store_email(user_id, message)
                     if email_id:
-                        synced_email_id = int(email_id)
-                        emails_synced += 1
-                        try:
-                            from email_automation.email_event_log import record_email_event
-
-                            record_email_event(
-                                user_id,
-                                "email.received",
-                                provider="gmail",
-                                message_id=message.get("id"),
-                                thread_id=message.get("threadId"),
-                                synced_email_id=synced_email_id,
-                                payload={"gmail_sync_job_id": job_id},
-                                status="applied",
-                                source="gmail_sync",
-                            )
-                        except Exception as ev_err:
-                            logger.debug("email.received event skipped: %s", ev_err)
+                        item["synced_email_id"] = int(email_id)
+                        stored_ids.add(str(message.get("id")))
+                        stage_state["emails_synced"] += 1
+                        self._record_received_event(user_id, job_id, message, item["synced_email_id"])
+                except Exception as e:
+                    item["error"] = e
+                    return item
+                if item["synced_email_id"]:
+                    # Parsed once here; triage and orchestration both read this dict.
+                    try:
+                        item["parsed"] = parser.parse_message(message)
+                    except Exception as parse_err:
+                        logger.debug("Parse failed for message %s: %s", message.get("id"), parse_err)
+                return item
+
+            def triage_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+                if item["synced_email_id"] and item["error"] is None:
+                    self._triage_synced_message(user_id, parser, item)
+                return item
+
+            def automation_stage(item: Dict[str, Any]) -> None:
+                message = item["message"]
+                try:
+                    if item["error"] is not None:
+                        raise item["error"]
+                    if item["synced_email_id"]:
+                        self._run_inbound_pipeline(
+                            user_id,
+                            item,
+                            sync_runtime=sync_runtime,
+                            mailbox_automation_enabled=mailbox_automation_enabled,
+                            owner_email=owner_email,
+                        )
+                        stage_state["processed"] += 1
 
-                        try:
-                            from email_automation.email_workflow_state import (
-                                mark_classification_failed,
-                                should_classify_email,
-                            )
-                            from services.email_triage_service import triage_and_store_synced_message
-
-                            _ext_id = str(message.get("id") or "")
-                            if _ext_id and should_classify_email(
-                                user_id, _ext_id, "gmail", force=False
-                            ):
-                                from email_automation.parser import MinimalEmailParser
-
-                                _tp = (
-                                    sync_runtime.parser
-                                    if sync_runtime and sync_runtime.parser
-                                    else MinimalEmailParser()
-                                )
-                                _parsed_triage = _tp.parse_message(message)
-                                _subj = _tp.get_subject(_parsed_triage)
-                                _body = _tp.get_body_text(_parsed_triage) or ""
-                                _from = _tp.get_sender(_parsed_triage) or ""
-                                _addr = _from
-                                if "<" in _from and ">" in _from:
-                                    _addr = _from.split("<")[1].split(">")[0].strip()
-                                try:
-                                    triage_and_store_synced_message(
-                                        user_id,
-                                        external_id=_ext_id,
-                                        subject=_subj or "",
-                                        body=_body,
-                                        sender_email=_addr,
-                                        sender_name=_from.split("<")[0].strip()
-                                        if "<" in _from
-                                        else _from,
-                                        provider="gmail",
-                                        synced_email_id=synced_email_id,
-                                    )
-                                except Exception as triage_inner:
-                                    logger.debug(
-                                        "email triage failed user=%s id=%s: %s",
-                                        user_id,
-                                        _ext_id,
-                                        triage_inner,
-                                    )
-                                    try:
-                                        mark_classification_failed(
-                                            user_id,
-                                            _ext_id,
-                                            provider="gmail",
-                                            synced_email_id=synced_email_id,
-                                            source="gmail_sync",
-                                        )
-                                    except Exception as wf_err:
-                                        logger.debug(
-                                            "mark_classification_failed skipped: %s",
-                                            wf_err,
-                                        )
-                        except Exception as triage_err:
-                            logger.debug("email triage skipped: %s", triage_err)
-
-                        # Unified: orchestrate_incoming always runs inbound capture + automations;
-                        # classify/process runs only when MAILBOX_AUTOMATION_ENABLED.
-                        try:
-                            from email_automation.parser import MinimalEmailParser
-                            from email_automation.pipeline import orchestrate_incoming
-                            from core.request_correlation import get_or_create_correlation_id
-
-                            try:
-                                from core.trace_context import get_trace_id
-                            except ImportError:
-                                get_trace_id = lambda: None
-
-                            from email_automation.parser import MinimalEmailParser
-
-                            _msg_parser = (
-                                sync_runtime.parser
-                                if sync_runtime and sync_runtime.parser
-                                else MinimalEmailParser()
-                            )
-                            parsed_msg = _msg_parser.parse_message(message)
-                            corr_body = {
-                                "message_id": message.get("id"),
-                                "provider": "gmail",
-                                "user_id": user_id,
-                            }
-                            correlation_id = get_or_create_correlation_id(
-                                None, corr_body
-                            )
-                            trace_id = (
-                                get_trace_id()
-                                if mailbox_automation_enabled
-                                and "core.trace_context" in sys.modules
-                                else None
-                            )
-                            orch_result = orchestrate_incoming(
-                                parsed_msg,
-                                user_id=user_id,
-                                actions=(
-                                    sync_runtime.actions
-                                    if sync_runtime and sync_runtime.actions
-                                    else None
-                                ),
-                                trace_id=trace_id,
-                                correlation_id=correlation_id,
-                                synced_email_row_id=synced_email_id,
-                                external_message_id=str(message.get("id") or email_id or ""),
-                                mailbox_owner_email=owner_email,
-                                provider="gmail",
-                                run_mailbox_ai=bool(
-                                    mailbox_automation_enabled
-                                    and sync_runtime
-                                    and sync_runtime.mailbox_stack_ready
-                                ),
-                                runtime_context=sync_runtime,
-                            )
-                            if sync_runtime is not None:
-                                auto_ran = bool(
-                                    isinstance(orch_result, dict)
-                                    and orch_result.get("inbound_workflow")
-                                )
-                                sync_runtime.record_message_processed(
-                                    automation_ran=auto_ran
-                                )
-                        except Exception as automation_error:
-                            if sync_runtime is not None:
-                                sync_runtime.record_message_failed()
-                            logger.warning(
-                                "Inbound pipeline failed for message %s: %s",
-                                message.get("id"),
-                                automation_error,
-                            )
-                    
                     # Extract and store contacts
                     contacts = self._extract_contacts(message)
                     for contact in contacts:
                         if self._store_contact(user_id, contact):
-                            contacts_found += 1
-                    
+                            stage_state["contacts_found"] += 1
+
                     # Calculate lead score
                     lead_score = self._calculate_lead_score(message, contacts)
                     if lead_score > 50:  # Threshold for lead identification
-                        leads_identified += 1
-                    
+                        stage_state["leads_identified"] += 1
+
                     # Throttle progress/status writes. The final job completion path still
                     # writes 100%, so this only reduces intermediate DB churn.
-                    should_update_progress = emails_synced > 0 and (
-                        emails_synced == 1
-                        or emails_synced == total_messages
-                        or emails_synced % progress_update_every == 0
+                    processed = stage_state["processed"]
+                    should_update_progress = bool(item["synced_email_id"]) and (
+                        processed == 1
+                        or processed == total_messages
+                        or processed % progress_update_every == 0
                     )
                     if should_update_progress:
-                        progress = (
-                            int((emails_synced / total_messages) * 100)
-                            if total_messages > 0
-                            else 0
+                        self._write_sync_progress(
+                            user_id, job_id, meta, processed, total_messages, pipeline.snapshot()
                         )
-                        if progress < 10 and emails_synced > 0:
-                            progress = 10
-                        db_optimizer.execute_query("""
-                            UPDATE gmail_sync_jobs
-                            SET progress = ?, emails_synced = ?
-                            WHERE job_id = ?
-                        """, (progress, emails_synced, job_id), fetch=False)
-
-                        try:
-                            total_count_result = db_optimizer.execute_query(
-                                "SELECT COUNT(*) as total FROM synced_emails WHERE user_id = ?",
-                                (user_id,)
-                            )
-                            total_emails = (
-                                total_count_result[0]['total']
-                                if total_count_result and total_count_result[0]
-                                else emails_synced
-                            )
-
-                            db_optimizer.upsert_user_sync_status_merge(
-                                user_id,
-                                last_sync=_utcnow_naive().isoformat(),
-                                sync_status="in_progress",
-                                syncing=1,
-                                total_emails=total_emails,
-                            )
-                        except Exception as status_update_error:
-                            logger.warning(
-                                "Could not update sync status during progress: %s",
-                                status_update_error,
-                            )
-                    
                 except Exception as e:
                     if sync_runtime is not None:
                         sync_runtime.record_message_failed()
                     logger.warning(f"Failed to process email {message.get('id', 'unknown')}: {e}")
-                    continue
+                return None
+
+            from email_automation.sync_pipeline import PipelineStage, StagedPipeline
+
+            pipeline = StagedPipeline(
+                [
+                    PipelineStage("store", store_stage),
+                    PipelineStage(
+                        "triage",
+                        triage_stage,
+                        workers=max(1, int(getattr(self, "triage_workers", 4) or 4)),
+                    ),
+                    PipelineStage("automations", automation_stage),
+                ],
+                queue_size=max(1, int(getattr(self, "pipeline_queue_size", 50) or 50)),
+                name="gmail_sync",
+            )
+            pipeline_stats = pipeline.run(fetch_stage())
 
             if sync_runtime is not None:
                 sync_runtime.log_job_summary()
-            
+
+            pending_retry_ids = self._next_retry_ids(user_id, fetch_result, stored_ids)
+
             return {
-                'emails_synced': emails_synced,
-                'contacts_found': contacts_found,
-                'leads_identified': leads_identified,
+                'emails_synced': stage_state["emails_synced"],
+                'contacts_found': stage_state["contacts_found"],
+                'leads_identified': stage_state["leads_identified"],
                 'has_more': bool(fetch_result.get("has_more")),
                 'next_page_token': fetch_result.get("next_page_token"),
+                'history_id': fetch_result.get("history_id"),
+                'history_lookback_days': fetch_result.get("history_lookback_days"),
+                'sync_type': fetch_result.get("sync_type"),
+                'labels_updated': labels_updated,
+                'skipped_known': int(fetch_result.get("skipped_known") or 0),
+                'pending_retry_ids': pending_retry_ids,
+                'pipeline': pipeline_stats,
             }
             
         except Exception as e:
             logger.error(f"❌ Email sync failed: {e}")
             raise
-    
+
+    def _next_retry_ids(
+        self, user_id: int, fetch_result: Dict[str, Any], stored_ids: set
+    ) -> Dict[str, int]:
+        """
+        Message ids to retry on the next incremental sync, with their attempt counts.
+
+        The history cursor still advances past a message whose fetch or store failed, so
+        those ids ride along in the job metadata instead. Ids carried from the previous
+        job but not retried here (page-token continuations) are kept as they were; ids
+        that exhausted ``GMAIL_SYNC_MAX_MESSAGE_RETRIES`` are dropped with a warning.
+        """
+        max_retries = getattr(self, "max_message_retries", GMAIL_SYNC_MAX_MESSAGE_RETRIES)
+        prior = {
+            str(mid): int(attempts)
+            for mid, attempts in (fetch_result.get("retry_attempts") or {}).items()
+        }
+        retried = set(fetch_result.get("retried_ids") or [])
+        pending = {mid: attempts for mid, attempts in prior.items() if mid not in retried}
+        for mid in fetch_result.get("new_ids") or []:
+            if mid in stored_ids:
+                continue
+            attempts = prior.get(mid, 0) + 1
+            if attempts > max_retries:
+                logger.warning(
+                    "Giving up on Gmail message %s for user %s after %s failed attempts",
+                    mid,
+                    user_id,
+                    attempts - 1,
+                )
+                continue
+            pending[mid] = attempts
+        if pending:
+            logger.warning(
+                "⚠️ %s Gmail message(s) failed to sync for user %s; retrying next sync",
+                len(pending),
+                user_id,
+            )
+        return pending
+
+    def _write_sync_progress(
+        self,
+        user_id: int,
+        job_id: str,
+        job_meta: Dict[str, Any],
+        emails_synced: int,
+        total_messages: int,
+        pipeline_stats: Dict[str, Any],
+    ) -> None:
+        """Persist job progress (with per-stage throughput) and the user's sync status."""
+        progress = (
+            int((emails_synced / total_messages) * 100)
+            if total_messages > 0
+            else 0
+        )
+        if progress < 10 and emails_synced > 0:
+            progress = 10
+        db_optimizer.execute_query("""
+            UPDATE gmail_sync_jobs
+            SET progress = ?, emails_synced = ?, metadata = ?
+            WHERE job_id = ?
+        """, (
+            progress,
+            emails_synced,
+            json.dumps({**job_meta, "pipeline": pipeline_stats}),
+            job_id,
+        ), fetch=False)
+
+        try:
+            total_count_result = db_optimizer.execute_query(
+                "SELECT COUNT(*) as total FROM synced_emails WHERE user_id = ?",
+                (user_id,)
+            )
+            total_emails = (
+                total_count_result[0]['total']
+                if total_count_result and total_count_result[0]
+                else emails_synced
+            )
+
+            db_optimizer.upsert_user_sync_status_merge(
+                user_id,
+                last_sync=_utcnow_naive().isoformat(),
+                sync_status="in_progress",
+                syncing=1,
+                total_emails=total_emails,
+            )
+        except Exception as status_update_error:
+            logger.warning(
+                "Could not update sync status during progress: %s",
+                status_update_error,
+            )
+
+    def _record_received_event(
+        self, user_id: int, job_id: str, message: Dict[str, Any], synced_email_id: int
+    ) -> None:
+        try:
+            from email_automation.email_event_log import record_email_event
+
+            record_email_event(
+                user_id,
+                "email.received",
+                provider="gmail",
+                message_id=message.get("id"),
+                thread_id=message.get("threadId"),
+                synced_email_id=synced_email_id,
+                payload={"gmail_sync_job_id": job_id},
+                status="applied",
+                source="gmail_sync",
+            )
+        except Exception as ev_err:
+            logger.debug("email.received event skipped: %s", ev_err)
+
+    def _triage_synced_message(self, user_id: int, parser, item: Dict[str, Any]) -> None:
+        """Classify one stored message from its already-parsed dict (triage stage)."""
+        message = item["message"]
+        synced_email_id = item["synced_email_id"]
+        try:
+            from email_automation.email_workflow_state import (
+                mark_classification_failed,
+                should_classify_email,
+            )
+            from services.email_triage_service import triage_and_store_synced_message
+
+            _ext_id = str(message.get("id") or "")
+            if _ext_id and should_classify_email(
+                user_id, _ext_id, "gmail", force=False
+            ):
+                _parsed_triage = item.get("parsed") or parser.parse_message(message)
+                _subj = parser.get_subject(_parsed_triage)
+                _body = parser.get_body_text(_parsed_triage) or ""
+                _from = parser.get_sender(_parsed_triage) or ""
+                _addr = _from
+                if "<" in _from and ">" in _from:
+                    _addr = _from.split("<")[1].split(">")[0].strip()
+                try:
+                    triage_and_store_synced_message(
+                        user_id,
+                        external_id=_ext_id,
+                        subject=_subj or "",
+                        body=_body,
+                        sender_email=_addr,
+                        sender_name=_from.split("<")[0].strip()
+                        if "<" in _from
+                        else _from,
+                        provider="gmail",
+                        synced_email_id=synced_email_id,
+                    )
+                except Exception as triage_inner:
+                    logger.debug(
+                        "email triage failed user=%s id=%s: %s",
+                        user_id,
+                        _ext_id,
+                        triage_inner,
+                    )
+                    try:
+                        mark_classification_failed(
+                            user_id,
+                            _ext_id,
+                            provider="gmail",
+                            synced_email_id=synced_email_id,
+                            source="gmail_sync",
+                        )
+                    except Exception as wf_err:
+                        logger.debug(
+                            "mark_classification_failed skipped: %s",
+                            wf_err,
+                        )
+        except Exception as triage_err:
+            logger.debug("email triage skipped: %s", triage_err)
+
+    def _run_inbound_pipeline(
+        self,
+        user_id: int,
+        item: Dict[str, Any],
+        *,
+        sync_runtime,
+        mailbox_automation_enabled: bool,
+        owner_email: Optional[str],
+    ) -> None:
+        """Unified inbound capture + automations for one stored message (automations stage).
+
+        orchestrate_incoming always runs inbound capture + automations; classify/process
+        runs only when MAILBOX_AUTOMATION_ENABLED.
+        """
+        message = item["message"]
+        try:
+            from email_automation.pipeline import orchestrate_incoming
+            from core.request_correlation import get_or_create_correlation_id
+
+            try:
+                from core.trace_context import get_trace_id
+            except ImportError:
+                get_trace_id = lambda: None
+
+            parsed_msg = item.get("parsed")
+            if parsed_msg is None:
+                raise ValueError("message was not parsed")
+            corr_body = {
+                "message_id": message.get("id"),
+                "provider": "gmail",
+                "user_id": user_id,
+            }
+            correlation_id = get_or_create_correlation_id(
+                None, corr_body
+            )
+            trace_id = (
+                get_trace_id()
+                if mailbox_automation_enabled
+                and "core.trace_context" in sys.modules
+                else None
+            )
+            orch_result = orchestrate_incoming(
+                parsed_msg,
+                user_id=user_id,
+                actions=(
+                    sync_runtime.actions
+                    if sync_runtime and sync_runtime.actions
+                    else None
+                ),
+                trace_id=trace_id,
+                correlation_id=correlation_id,
+                synced_email_row_id=item["synced_email_id"],
+                external_message_id=str(message.get("id") or item["synced_email_id"] or ""),
+                mailbox_owner_email=owner_email,
+                provider="gmail",
+                run_mailbox_ai=bool(
+                    mailbox_automation_enabled
+                    and sync_runtime
+                    and sync_runtime.mailbox_stack_ready
+                ),
+                runtime_context=sync_runtime,
+            )
+            if sync_runtime is not None:
+                auto_ran = bool(
+                    isinstance(orch_result, dict)
+                    and orch_result.get("inbound_workflow")
+                )
+                sync_runtime.record_message_processed(
+                    automation_ran=auto_ran
+                )
+        except Exception as automation_error:
+            if sync_runtime is not None:
+                sync_runtime.record_message_failed()
+            logger.warning(
+                "Inbound pipeline failed for message %s: %s",
+                message.get("id"),
+                automation_error,
+            )
+
     def _fetch_full_gmail_messages_serial(
         self,
         service,
         message_ids: List[str],
+        message_format: str = 'full',
     ) -> List[Dict[str, Any]]:
         """Fetch full Gmail messages serially in list order."""
         full_messages: List[Dict[str, Any]] = []
@@ -1092,7 +1359,7 @@ class GmailSyncJobManager:
                 msg = service.users().messages().get(
                     userId='me',
                     id=mid,
-                    format='full',
+                    format=message_format,
                 ).execute()
                 full_messages.append(msg)
             except Exception as e:
@@ -1104,6 +1371,7 @@ class GmailSyncJobManager:
         self,
         service,
         message_ids: List[str],
+        message_format: str = 'full',
     ) -> Optional[List[Dict[str, Any]]]:
         """Fetch full Gmail messages with google-api-python-client batch support.
 
@@ -1134,7 +1402,7 @@ class GmailSyncJobManager:
                 request = messages_resource.get(
                     userId='me',
                     id=mid,
-                    format='full',
+                    format=message_format,
                 )
                 batch.add(request, callback=handle_response, request_id=mid)
             batch.execute()
@@ -1153,8 +1421,12 @@ class GmailSyncJobManager:
         message_ids: List[str],
         *,
         mode: Optional[str] = None,
+        message_format: str = 'full',
     ) -> List[Dict[str, Any]]:
-        """Fetch full Gmail messages in list order using the configured safe mode."""
+        """Fetch Gmail messages in list order using the configured safe mode.
+
+        ``message_format='minimal'`` returns only ids and ``labelIds`` (label refreshes).
+        """
         normalized_mode = (
             mode or getattr(self, 'gmail_fetch_mode', 'serial') or 'serial'
         ).strip().lower()
@@ -1165,10 +1437,13 @@ class GmailSyncJobManager:
             )
             normalized_mode = 'serial'
 
+        format_kwargs = {} if message_format == 'full' else {'message_format': message_format}
         if normalized_mode == 'serial':
-            return self._fetch_full_gmail_messages_serial(service, message_ids)
+            return self._fetch_full_gmail_messages_serial(service, message_ids, **format_kwargs)
 
-        batch_messages = self._fetch_full_gmail_messages_batch(service, message_ids)
+        batch_messages = self._fetch_full_gmail_messages_batch(
+            service, message_ids, **format_kwargs
+        )
         if batch_messages is not None:
             return batch_messages
 
@@ -1176,7 +1451,84 @@ class GmailSyncJobManager:
             logger.warning(
                 "Gmail batch full-message fetch unavailable; falling back to serial"
             )
-        return self._fetch_full_gmail_messages_serial(service, message_ids)
+        return self._fetch_full_gmail_messages_serial(service, message_ids, **format_kwargs)
+
+    def _known_synced_message_ids(self, user_id: int, message_ids: List[str]) -> set:
+        """Return the subset of ``message_ids`` already stored in synced_emails (chunked IN probe)."""
+        known: set = set()
+        unique_ids = list(dict.fromkeys(str(mid) for mid in message_ids if mid))
+        for start in range(0, len(unique_ids), KNOWN_ID_PROBE_CHUNK):
+            chunk = unique_ids[start:start + KNOWN_ID_PROBE_CHUNK]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = db_optimizer.execute_query(
+                f"""
+                SELECT external_id FROM synced_emails
+                WHERE user_id = ? AND provider = 'gmail' AND external_id IN ({placeholders})
+                """,
+                tuple([user_id, *chunk]),
+            )
+            for row in rows or []:
+                external_id = row.get("external_id") if isinstance(row, dict) else row[0]
+                if external_id:
+                    known.add(str(external_id))
+        return known
+
+    def _fetch_new_and_refresh_known(
+        self,
+        service,
+        user_id: Optional[int],
+        message_ids: List[str],
+        *,
+        defer_fetch: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Fetch bodies only for messages not yet in synced_emails.
+
+        Known ids are re-read with ``format='minimal'`` and returned as ``label_changes``
+        so their labels/read state stay current without downloading the body again.
+        Without a ``user_id`` (or if the probe fails) every id is fetched in full.
+        ``defer_fetch`` returns the new ids as ``pending_ids`` instead of fetching them;
+        ``new_ids`` always lists them so callers can tell which ones never got stored.
+        """
+        known: set = set()
+        if user_id is not None and message_ids:
+            try:
+                known = self._known_synced_message_ids(user_id, message_ids)
+            except Exception as exc:
+                logger.warning("synced_emails existence probe failed; fetching all: %s", exc)
+                known = set()
+        if not known:
+            return {
+                **self._full_or_pending(service, message_ids, defer_fetch),
+                "new_ids": list(message_ids),
+                "label_changes": {},
+                "skipped_known": 0,
+            }
+
+        new_ids = [mid for mid in message_ids if mid not in known]
+        known_ids = [mid for mid in message_ids if mid in known]
+        label_changes = {
+            str(msg["id"]): list(msg.get("labelIds") or [])
+            for msg in self._fetch_full_gmail_messages(
+                service, known_ids, message_format='minimal'
+            )
+            if msg.get("id")
+        }
+        return {
+            **self._full_or_pending(service, new_ids, defer_fetch),
+            "new_ids": new_ids,
+            "label_changes": label_changes,
+            "skipped_known": len(known_ids),
+        }
+
+    def _full_or_pending(
+        self, service, message_ids: List[str], defer_fetch: bool
+    ) -> Dict[str, Any]:
+        if defer_fetch:
+            return {"messages": [], "pending_ids": list(message_ids)}
+        return {
+            "messages": self._fetch_full_gmail_messages(service, message_ids) if message_ids else [],
+        }
 
     def _get_gmail_messages(
         self,
@@ -1185,11 +1537,14 @@ class GmailSyncJobManager:
         lookback_days: int,
         max_messages: int,
         page_token: Optional[str] = None,
+        user_id: Optional[int] = None,
+        defer_fetch: bool = False,
     ) -> Dict[str, Any]:
         """
         List then fetch full Gmail messages for one batch.
 
         Uses Gmail ``nextPageToken`` so callers can run multiple jobs over large inboxes.
+        With ``user_id``, ids already in synced_emails only get a minimal label refresh.
         """
         empty: Dict[str, Any] = {
             "messages": [],
@@ -1229,17 +1584,238 @@ class GmailSyncJobManager:
 
             has_more = bool(next_list_page_token) and len(message_ids) >= max_messages
 
-            full_messages = self._fetch_full_gmail_messages(service, message_ids)
+            if user_id is None and not defer_fetch:
+                fetched: Dict[str, Any] = {
+                    "messages": self._fetch_full_gmail_messages(service, message_ids),
+                    "new_ids": list(message_ids),
+                }
+            else:
+                fetched = self._fetch_new_and_refresh_known(
+                    service, user_id, message_ids, defer_fetch=defer_fetch
+                )
 
             return {
-                "messages": full_messages,
+                **fetched,
                 "next_page_token": next_list_page_token if has_more else None,
                 "has_more": has_more,
             }
 
         except Exception as e:
             logger.error(f"❌ Gmail message retrieval failed: {e}")
-            return empty
+            return {**empty, "failed": True}
+
+    def _current_history_id(self, service) -> Optional[str]:
+        """Mailbox ``historyId`` from ``users.getProfile`` (read before listing so nothing is missed)."""
+        try:
+            profile = service.users().getProfile(userId='me').execute() or {}
+            history_id = profile.get("historyId") if isinstance(profile, dict) else None
+            if isinstance(history_id, (str, int)) and str(history_id):
+                return str(history_id)
+        except Exception as exc:
+            logger.debug("Gmail getProfile historyId unavailable: %s", exc)
+        return None
+
+    def _get_gmail_history_messages(
+        self,
+        service,
+        *,
+        start_history_id: str,
+        max_messages: int,
+        user_id: Optional[int] = None,
+        defer_fetch: bool = False,
+        retry_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetch messages added or relabelled since ``start_history_id`` via ``users.history.list``.
+
+        Added messages are fetched in full; label-only changes return the message's
+        current ``labelIds`` in ``label_changes`` so stored rows can be updated without a
+        refetch. When ``max_messages`` is reached the returned ``history_id`` is the last
+        fully consumed record, so the next job resumes there. ``retry_ids`` (messages an
+        earlier job failed to fetch or store) are fetched again alongside the new ones.
+
+        Raises ``GmailHistoryExpired`` when Gmail returns 404 for the cursor.
+        """
+        history_resource = service.users().history()
+        added_ids: List[str] = []
+        added: set = set()
+        label_changes: Dict[str, List[str]] = {}
+        next_history_id = str(start_history_id)
+        list_page_token: Optional[str] = None
+        has_more = False
+
+        while True:
+            list_params: Dict[str, Any] = {
+                'userId': 'me',
+                'startHistoryId': str(start_history_id),
+                'historyTypes': list(GMAIL_HISTORY_TYPES),
+                'maxResults': getattr(self, 'sync_page_size', 100),
+            }
+            if list_page_token:
+                list_params['pageToken'] = list_page_token
+            try:
+                results = history_resource.list(**list_params).execute() or {}
+            except Exception as exc:
+                if _is_history_expired_error(exc):
+                    raise GmailHistoryExpired(str(exc)) from exc
+                raise
+
+            for record in results.get('history') or []:
+                if len(added_ids) >= max_messages:
+                    has_more = True
+                    break
+                for item in record.get('messagesAdded') or []:
+                    mid = (item.get('message') or {}).get('id')
+                    if mid and mid not in added:
+                        added.add(mid)
+                        added_ids.append(mid)
+                        label_changes.pop(mid, None)
+                for key in ('labelsAdded', 'labelsRemoved'):
+                    for item in record.get(key) or []:
+                        msg = item.get('message') or {}
+                        mid = msg.get('id')
+                        if mid and mid not in added:
+                            label_changes[mid] = list(msg.get('labelIds') or [])
+                if record.get('id'):
+                    next_history_id = str(record['id'])
+
+            if has_more:
+                break
+            list_page_token = results.get('nextPageToken')
+            if not list_page_token:
+                if results.get('historyId'):
+                    next_history_id = str(results['historyId'])
+                break
+
+        for mid in retry_ids or []:
+            if mid not in added:
+                added.add(mid)
+                added_ids.append(mid)
+                label_changes.pop(mid, None)
+
+        fetched = self._fetch_new_and_refresh_known(
+            service, user_id, added_ids, defer_fetch=defer_fetch
+        )
+        return {
+            "messages": fetched["messages"],
+            "pending_ids": fetched.get("pending_ids") or [],
+            "new_ids": fetched.get("new_ids") or [],
+            "retried_ids": list(retry_ids or []),
+            "next_page_token": None,
+            "has_more": has_more,
+            "history_id": next_history_id,
+            "label_changes": {**label_changes, **fetched["label_changes"]},
+            "skipped_known": fetched["skipped_known"],
+            "sync_type": "incremental",
+        }
+
+    def _get_sync_batch(
+        self,
+        service,
+        user_id: int,
+        *,
+        lookback_days: int,
+        max_messages: int,
+        page_token: Optional[str] = None,
+        full_resync: bool = False,
+        defer_fetch: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Pick the cheapest Gmail listing for this job.
+
+        With a stored ``historyId`` covering the requested lookback, only history since
+        that cursor is read. Otherwise (first sync, wider lookback, ``full_resync``, or an
+        expired cursor) the bounded lookback listing runs and the mailbox ``historyId``
+        read just before it becomes the new cursor. Page-token continuations keep the
+        existing cursor. ``defer_fetch`` leaves new bodies to the caller as ``pending_ids``.
+        Ids earlier jobs failed to sync are retried with the history read and carried
+        through page-token continuations as ``retry_attempts``.
+        """
+        probe_user_id = None if full_resync else user_id
+        if page_token:
+            result = self._get_gmail_messages(
+                service,
+                lookback_days=lookback_days,
+                max_messages=max_messages,
+                page_token=page_token,
+                user_id=probe_user_id,
+                defer_fetch=defer_fetch,
+            )
+            cursor = self.get_history_cursor(user_id)
+            if cursor:
+                result["history_id"] = cursor["history_id"]
+                result["history_lookback_days"] = cursor["lookback_days"]
+                result["retry_attempts"] = cursor.get("retry_ids") or {}
+            return result
+
+        sync_type = "full"
+        if getattr(self, 'incremental_sync', True) and not full_resync:
+            cursor = self.get_history_cursor(user_id)
+            if cursor and lookback_days <= cursor["lookback_days"]:
+                try:
+                    result = self._get_gmail_history_messages(
+                        service,
+                        start_history_id=cursor["history_id"],
+                        max_messages=max_messages,
+                        user_id=user_id,
+                        defer_fetch=defer_fetch,
+                        retry_ids=list(cursor.get("retry_ids") or {}),
+                    )
+                    result["history_lookback_days"] = cursor["lookback_days"]
+                    result["retry_attempts"] = cursor.get("retry_ids") or {}
+                    return result
+                except GmailHistoryExpired as exc:
+                    sync_type = "full_fallback"
+                    logger.info(
+                        "Gmail history cursor expired for user %s; running bounded full sync",
+                        user_id,
+                        extra={
+                            "event": "gmail_sync_history_expired",
+                            "service": "email",
+                            "severity": "INFO",
+                            "user_id": user_id,
+                            "error": str(exc)[:200],
+                        },
+                    )
+
+        history_id = self._current_history_id(service)
+        result = self._get_gmail_messages(
+            service,
+            lookback_days=lookback_days,
+            max_messages=max_messages,
+            user_id=probe_user_id,
+            defer_fetch=defer_fetch,
+        )
+        if history_id and not result.get("failed"):
+            result["history_id"] = history_id
+            result["history_lookback_days"] = lookback_days
+        result["sync_type"] = sync_type
+        return result
+
+    def _apply_gmail_label_changes(
+        self, user_id: int, label_changes: Dict[str, List[str]]
+    ) -> int:
+        """Update labels/read state on already-synced rows for label-only history records."""
+        updated = 0
+        for gmail_id, labels in label_changes.items():
+            try:
+                db_optimizer.execute_query(
+                    """
+                    UPDATE synced_emails SET labels = ?, is_read = ?
+                    WHERE user_id = ? AND external_id = ? AND provider = 'gmail'
+                    """,
+                    (
+                        json.dumps(labels),
+                        db_optimizer.bind_boolean_column(0 if 'UNREAD' in labels else 1),
+                        user_id,
+                        gmail_id,
+                    ),
+                    fetch=False,
+                )
+                updated += 1
+            except Exception as exc:
+                logger.warning("Label refresh failed for Gmail message %s: %s", gmail_id, exc)
+        return updated
     
     def _store_email(self, user_id: int, message: Dict[str, Any]) -> Optional[int]:
         """Store email in database"""
@@ -1542,7 +2118,8 @@ class GmailSyncJobManager:
                     'created_at': job['created_at'],
                     'started_at': job['started_at'],
                     'completed_at': job['completed_at'],
-                    'error_message': job['error_message']
+                    'error_message': job['error_message'],
+                    'pipeline': parse_job_metadata(job.get('metadata')).get('pipeline'),
                 }
             
             return None
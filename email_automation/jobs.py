@@ -10,7 +10,7 @@ import time
 import logging
 import threading
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 from config import config as app_config
 from core.email_branding import wrap_html_email_body
@@ -515,7 +515,7 @@ class EmailJobManager:
             return 0
 
     def process_jobs(self, max_jobs: int = 10) -> int:
-        """Process pending email jobs (batch; use process_job_by_id from HTTP-triggered sends)."""
+        """Process pending email jobs (batch over one SMTP session; use process_job_by_id from HTTP-triggered sends)."""
         if not EMAIL_AVAILABLE:
             logger.warning("Email functionality not available")
             return 0
@@ -536,16 +536,20 @@ class EmailJobManager:
                 (max_jobs,),
             )
 
-            for job_record in jobs:
+            jobs = jobs or []
+
+            def record(idx: int, outcome: Tuple[bool, bool, Optional[str]]) -> None:
+                nonlocal processed
+                job_record = jobs[idx]
+                success, allow_retry, err = outcome
                 try:
-                    success, allow_retry, err = self._try_send_job(job_record)
                     self._record_job_send_outcome(job_record, success, allow_retry, err)
                     if success:
                         processed += 1
                 except Exception as e:
                     logger.error("❌ Error processing email job %s: %s", job_record['id'], e)
-                    continue
 
+            self._send_jobs_batch(jobs, on_outcome=record)
             return processed
 
         except Exception as e:
@@ -708,46 +712,104 @@ class EmailJobManager:
         """
         return wrap_html_email_body(inner)
     
+    def _smtp_pool(self):
+        from core.mail_transport import get_smtp_pool
+
+        return get_smtp_pool(self.smtp_host, self.smtp_port, self.smtp_username, self.smtp_password)
+
+    def _build_message(self, to_email: str, subject: str, content: str) -> "MIMEMultipart":
+        msg = MIMEMultipart('alternative')
+        msg['From'] = f"{self.from_name} <{self.from_email}>"
+        msg['To'] = to_email
+        msg['Subject'] = subject
+
+        html_part = MIMEText(content, 'html')
+        msg.attach(html_part)
+        return msg
+
+    def _precheck_send(self, to_email: str) -> Optional[Tuple[bool, bool, Optional[str]]]:
+        """Outcome for sends that never reach SMTP (reserved recipient, missing credentials)."""
+        if _should_skip_smtp_delivery(to_email):
+            logger.info("Skipping SMTP to non-deliverable/placeholder address: %s", to_email)
+            return True, False, None
+
+        if not self.smtp_username or not self.smtp_password:
+            logger.warning("SMTP credentials not configured")
+            return False, False, "smtp_not_configured"
+        return None
+
+    @staticmethod
+    def _smtp_auth_failed(e: Exception) -> Tuple[bool, bool, Optional[str]]:
+        logger.error(
+            "❌ SMTP authentication failed (535): use a valid SMTP user/password. "
+            "For Gmail, use an App Password and SMTP_USERNAME=full email: %s",
+            e,
+        )
+        return False, False, "smtp_authentication_failed"
+
     def _send_email(self, to_email: str, subject: str, content: str) -> Tuple[bool, bool, Optional[str]]:
         """
-        Send email via SMTP.
+        Send email via SMTP (pooled session, see core.mail_transport).
         Returns (success, allow_retry, error_message).
         """
         try:
-            if _should_skip_smtp_delivery(to_email):
-                logger.info("Skipping SMTP to non-deliverable/placeholder address: %s", to_email)
-                return True, False, None
-
-            if not self.smtp_username or not self.smtp_password:
-                logger.warning("SMTP credentials not configured")
-                return False, False, "smtp_not_configured"
-
-            msg = MIMEMultipart('alternative')
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            msg['Subject'] = subject
-
-            html_part = MIMEText(content, 'html')
-            msg.attach(html_part)
-
-            smtp_timeout = int(os.getenv("SMTP_TIMEOUT_SECONDS", "45"))
-            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=smtp_timeout) as server:
-                server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            skipped = self._precheck_send(to_email)
+            if skipped:
+                return skipped
 
+            self._smtp_pool().send(self._build_message(to_email, subject, content))
             return True, True, None
 
         except smtplib.SMTPAuthenticationError as e:
-            logger.error(
-                "❌ SMTP authentication failed (535): use a valid SMTP user/password. "
-                "For Gmail, use an App Password and SMTP_USERNAME=full email: %s",
-                e,
-            )
-            return False, False, "smtp_authentication_failed"
+            return self._smtp_auth_failed(e)
         except Exception as e:
             logger.error("❌ Email sending failed: %s", e)
             return False, True, str(e)[:500]
+
+    def _send_jobs_batch(
+        self,
+        jobs: List[Dict[str, Any]],
+        on_outcome: Optional[Callable[[int, Tuple[bool, bool, Optional[str]]], None]] = None,
+    ) -> List[Tuple[bool, bool, Optional[str]]]:
+        """
+        Send a list of job rows through one pooled SMTP session; one outcome per job, in order.
+
+        ``on_outcome(index, outcome)`` runs as soon as each job's outcome is known (right
+        after its message is sent), so a crash mid-batch does not lose earlier results.
+        """
+        outcomes: List[Optional[Tuple[bool, bool, Optional[str]]]] = [None] * len(jobs)
+
+        def settle(idx: int, outcome: Tuple[bool, bool, Optional[str]]) -> None:
+            outcomes[idx] = outcome
+            if on_outcome is not None:
+                on_outcome(idx, outcome)
+
+        batch: List[Tuple[int, "MIMEMultipart"]] = []
+        for idx, job_record in enumerate(jobs):
+            try:
+                precheck = self._precheck_send(job_record['recipient'])
+                if precheck is not None:
+                    settle(idx, precheck)
+                    continue
+                data = json.loads(job_record.get('data', '{}'))
+                content = self._generate_email_content(job_record.get('template', 'default'), data)
+                batch.append((idx, self._build_message(job_record['recipient'], job_record['subject'], content)))
+            except Exception as e:
+                logger.error("❌ Single email job processing failed: %s", e)
+                settle(idx, (False, True, str(e)[:500]))
+
+        if batch:
+            def on_sent(pos: int, ok: bool, err: Optional[str]) -> None:
+                settle(batch[pos][0], (True, True, None) if ok else (False, True, err))
+
+            try:
+                self._smtp_pool().send_batch([msg for _, msg in batch], on_result=on_sent)
+            except smtplib.SMTPAuthenticationError as e:
+                failed = self._smtp_auth_failed(e)
+                for idx, _ in batch:
+                    if outcomes[idx] is None:
+                        settle(idx, failed)
+        return outcomes  # type: ignore[return-value]
     
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get email job status"""
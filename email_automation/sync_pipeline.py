@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Staged executor for mailbox sync jobs.
+
+A source thread feeds items through a chain of stages connected by bounded queues.
+Each stage has its own worker count, so a slow stage applies back-pressure to the
+source instead of the whole batch being buffered, and the source (Gmail fetch) keeps
+working while earlier items are parsed, stored, triaged and automated. Per-stage
+counters are exposed through ``snapshot()`` for job progress records.
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStage:
+    """One stage: ``handler(item)`` returns the item for the next stage (``None`` drops it)."""
+
+    name: str
+    handler: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    items: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+
+    def as_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        capacity = max(wall_seconds * self.workers, 1e-9)
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+            "utilization": round(min(1.0, self.busy_seconds / capacity), 3),
+        }
+
+
+class StagedPipeline:
+    """
+    Run ``source`` through ``stages`` with bounded hand-off queues.
+
+    Handler exceptions are logged and counted against the stage; the item is dropped so
+    one bad message cannot stall the job. An exception raised by the source iterator is
+    re-raised from ``run()`` after the stages have drained what was already produced.
+    """
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        *,
+        queue_size: int = 32,
+        source_name: str = "fetch",
+        name: str = "sync",
+    ):
+        if not stages:
+            raise ValueError("StagedPipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.name = name
+        self._lock = threading.Lock()
+        self._stats: Dict[str, StageStats] = {source_name: StageStats(source_name, 1)}
+        for stage in stages:
+            self._stats[stage.name] = StageStats(stage.name, max(1, int(stage.workers)))
+        self._source_name = source_name
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-stage throughput so far (safe to call from any stage handler)."""
+        with self._lock:
+            started = self._started_at or time.monotonic()
+            ended = self._finished_at or time.monotonic()
+            wall = max(0.0, ended - started)
+            return {
+                "wall_seconds": round(wall, 3),
+                "stages": {name: stats.as_dict(wall) for name, stats in self._stats.items()},
+            }
+
+    def _record(self, stage_name: str, busy: float, *, error: bool = False) -> None:
+        with self._lock:
+            stats = self._stats[stage_name]
+            stats.busy_seconds += busy
+            if error:
+                stats.errors += 1
+            else:
+                stats.items += 1
+
+    def run(self, source: Iterable[Any]) -> Dict[str, Any]:
+        queues: List["queue.Queue[Any]"] = [
+            queue.Queue(maxsize=self.queue_size) for _ in self.stages
+        ]
+        remaining = [max(1, int(stage.workers)) for stage in self.stages]
+        source_error: List[BaseException] = []
+        threads: List[threading.Thread] = []
+        self._started_at = time.monotonic()
+        self._finished_at = None
+
+        def _close_stage(index: int) -> None:
+            # The last worker of stage ``index`` tells every worker downstream to stop.
+            with self._lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(remaining[index + 1]):
+                    queues[index + 1].put(_DONE)
+
+        def _produce() -> None:
+            iterator = iter(source)
+            try:
+                while True:
+                    started = time.monotonic()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        break
+                    self._record(self._source_name, time.monotonic() - started)
+                    queues[0].put(item)
+            except BaseException as exc:  # re-raised by run()
+                source_error.append(exc)
+            finally:
+                for _ in range(remaining[0]):
+                    queues[0].put(_DONE)
+
+        def _work(index: int) -> None:
+            stage = self.stages[index]
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                started = time.monotonic()
+                try:
+                    result = stage.handler(item)
+                except Exception as exc:
+                    self._record(stage.name, time.monotonic() - started, error=True)
+                    logger.warning("%s pipeline stage %s failed: %s", self.name, stage.name, exc)
+                    continue
+                self._record(stage.name, time.monotonic() - started)
+                if outbox is not None and result is not None:
+                    outbox.put(result)
+            _close_stage(index)
+
+        def _spawn(target: Callable[..., None], thread_name: str, *args: Any) -> None:
+            # Each thread gets a copy of the caller's context (trace / correlation ids).
+            ctx = contextvars.copy_context()
+            thread = threading.Thread(
+                target=ctx.run, args=(target, *args), name=thread_name, daemon=True
+            )
+            threads.append(thread)
+            thread.start()
+
+        for index, stage in enumerate(self.stages):
+            for worker in range(max(1, int(stage.workers))):
+                _spawn(_work, f"{self.name}-{stage.name}-{worker}", index)
+        _spawn(_produce, f"{self.name}-{self._source_name}")
+
+        for thread in threads:
+            thread.join()
+        self._finished_at = time.monotonic()
+
+        if source_error:
+            raise source_error[0]
+        return self.snapshot()
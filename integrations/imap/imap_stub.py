@@ -0,0 +1,252 @@
+"""
+In-process IMAP4rev1 stub for local development and tests.
+
+Serves one INBOX over plain TCP with just the commands ``imaplib`` and
+``integrations.imap.imap_sync`` use: CAPABILITY, LOGIN, SELECT, STATUS, UID SEARCH
+(``UID n:m``, ``SINCE``, ``ALL``), UID FETCH (``UID``, ``RFC822.SIZE``, ``RFC822``,
+``BODY.PEEK[HEADER]``, ``BODY.PEEK[TEXT]<0.n>``), NOOP and LOGOUT. Every client command
+is recorded in ``commands`` and the bytes sent for message literals are summed in
+``literal_bytes_sent`` so tests can assert on round trips and download size.
+
+    with ImapStubServer() as server:
+        server.add_message(raw_bytes)
+        settings = server.settings()   # feed to connect_imap()
+"""
+
+import email
+import re
+import socketserver
+import threading
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\([^)]*\)|\S+')
+_FETCH_ITEM_RE = re.compile(r"BODY(?:\.PEEK)?\[(HEADER|TEXT)?\](?:<(\d+)\.(\d+)>)?|RFC822\.SIZE|RFC822|UID|FLAGS")
+
+
+class ImapStubServer:
+    """Threaded single-mailbox IMAP server bound to 127.0.0.1 on a free port."""
+
+    def __init__(self, *, username: str = "stub@example.test", password: str = "secret", uidvalidity: int = 1):
+        self.username = username
+        self.password = password
+        self.uidvalidity = uidvalidity
+        self.messages: List[Dict[str, Any]] = []
+        self.uidnext = 1
+        self.commands: List[str] = []
+        self.literal_bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -- mailbox -----------------------------------------------------------------
+    def add_message(self, raw: bytes, *, uid: Optional[int] = None) -> int:
+        with self._lock:
+            uid = int(uid or self.uidnext)
+            self.messages.append({"uid": uid, "raw": raw})
+            self.messages.sort(key=lambda m: m["uid"])
+            self.uidnext = max(self.uidnext, uid + 1)
+            return uid
+
+    def reset_mailbox(self, *, uidvalidity: int) -> None:
+        """Drop all messages and renumber from 1 (what a recreated mailbox looks like)."""
+        with self._lock:
+            self.messages = []
+            self.uidnext = 1
+            self.uidvalidity = uidvalidity
+
+    def settings(self) -> Dict[str, Any]:
+        host, port = self.address
+        return {
+            "imap_server": host,
+            "imap_port": port,
+            "imap_ssl": False,
+            "username": self.username,
+            "password": self.password,
+            "service_name": "Custom IMAP",
+        }
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        if self._server is None:
+            raise RuntimeError("ImapStubServer is not running")
+        return self._server.server_address[:2]
+
+    # -- lifecycle ---------------------------------------------------------------
+    def start(self) -> "ImapStubServer":
+        stub = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                _ImapSession(stub, self.rfile, self.wfile).run()
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="imap-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "ImapStubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+class _ImapSession:
+    def __init__(self, stub: ImapStubServer, rfile: Any, wfile: Any):
+        self.stub = stub
+        self.rfile = rfile
+        self.wfile = wfile
+
+    def send(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def run(self) -> None:
+        self.send("* OK IMAP4rev1 stub ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            tag, _, rest = line.partition(" ")
+            command, _, args = rest.partition(" ")
+            command = command.upper()
+            with self.stub._lock:
+                self.stub.commands.append(rest if command != "LOGIN" else "LOGIN")
+            if command == "UID":
+                sub, _, args = args.partition(" ")
+                command = f"UID {sub.upper()}"
+            handler = {
+                "CAPABILITY": self._capability,
+                "LOGIN": self._login,
+                "SELECT": self._select,
+                "EXAMINE": self._select,
+                "STATUS": self._status,
+                "UID SEARCH": self._uid_search,
+                "UID FETCH": self._uid_fetch,
+                "NOOP": lambda _a: "OK NOOP completed",
+                "LOGOUT": self._logout,
+            }.get(command)
+            if handler is None:
+                self.send(f"{tag} BAD unsupported command {command}")
+                continue
+            result = handler(args)
+            self.send(f"{tag} {result}")
+            if command == "LOGOUT":
+                return
+
+    def _capability(self, _args: str) -> str:
+        self.send("* CAPABILITY IMAP4rev1")
+        return "OK CAPABILITY completed"
+
+    def _login(self, args: str) -> str:
+        parts = [p.strip('"') for p in _TOKEN_RE.findall(args)]
+        if parts[:2] != [self.stub.username, self.stub.password]:
+            return "NO [AUTHENTICATIONFAILED] invalid credentials"
+        return "OK LOGIN completed"
+
+    def _select(self, _args: str) -> str:
+        with self.stub._lock:
+            self.send(f"* {len(self.stub.messages)} EXISTS")
+            self.send(f"* OK [UIDVALIDITY {self.stub.uidvalidity}] UIDs valid")
+            self.send(f"* OK [UIDNEXT {self.stub.uidnext}] next UID")
+        return "OK [READ-WRITE] SELECT completed"
+
+    def _status(self, args: str) -> str:
+        mailbox = args.split(" ", 1)[0]
+        with self.stub._lock:
+            self.send(
+                f"* STATUS {mailbox} (UIDVALIDITY {self.stub.uidvalidity} UIDNEXT {self.stub.uidnext} "
+                f"MESSAGES {len(self.stub.messages)})"
+            )
+        return "OK STATUS completed"
+
+    def _uid_search(self, args: str) -> str:
+        tokens = [t.strip("()") for t in args.split()]
+        with self.stub._lock:
+            matches = list(self.stub.messages)
+            max_uid = matches[-1]["uid"] if matches else 0
+        i = 0
+        while i < len(tokens):
+            key = tokens[i].upper()
+            if key == "UID" and i + 1 < len(tokens):
+                wanted = _expand_uid_set(tokens[i + 1], max_uid)
+                matches = [m for m in matches if m["uid"] in wanted]
+                i += 2
+            elif key == "SINCE" and i + 1 < len(tokens):
+                since = datetime.strptime(tokens[i + 1], "%d-%b-%Y").date()
+                matches = [m for m in matches if _message_date(m["raw"]) >= since]
+                i += 2
+            else:
+                i += 1
+        self.send("* SEARCH " + " ".join(str(m["uid"]) for m in matches))
+        return "OK SEARCH completed"
+
+    def _uid_fetch(self, args: str) -> str:
+        uid_set, _, items = args.partition(" ")
+        with self.stub._lock:
+            messages = list(self.stub.messages)
+        max_uid = messages[-1]["uid"] if messages else 0
+        wanted = _expand_uid_set(uid_set, max_uid)
+        for seq, message in enumerate(messages, start=1):
+            if message["uid"] not in wanted:
+                continue
+            raw = message["raw"]
+            header, sep, text = raw.partition(b"\r\n\r\n")
+            header += sep
+            out: List[bytes] = [f"* {seq} FETCH (UID {message['uid']}".encode()]
+            for match in _FETCH_ITEM_RE.finditer(items.upper()):
+                item = match.group(0)
+                if item == "RFC822.SIZE":
+                    out.append(f" RFC822.SIZE {len(raw)}".encode())
+                elif item == "RFC822":
+                    out.append(self._literal("RFC822", raw))
+                elif item.startswith("BODY"):
+                    section = match.group(1) or ""
+                    data = {"HEADER": header, "TEXT": text}.get(section, raw)
+                    label = f"BODY[{section}]"
+                    if match.group(2) is not None:
+                        start, length = int(match.group(2)), int(match.group(3))
+                        data = data[start : start + length]
+                        label += f"<{start}>"
+                    out.append(self._literal(label, data))
+            out.append(b")")
+            self.wfile.write(b"".join(out) + b"\r\n")
+        return "OK FETCH completed"
+
+    def _literal(self, label: str, data: bytes) -> bytes:
+        with self.stub._lock:
+            self.stub.literal_bytes_sent += len(data)
+        return f" {label} {{{len(data)}}}\r\n".encode() + data
+
+    def _logout(self, _args: str) -> str:
+        self.send("* BYE stub logging out")
+        return "OK LOGOUT completed"
+
+
+def _expand_uid_set(uid_set: str, max_uid: int) -> set:
+    wanted = set()
+    for part in uid_set.split(","):
+        lo, _, hi = part.partition(":")
+        lo_n = max_uid if lo == "*" else int(lo)
+        hi_n = lo_n if not hi else (max_uid if hi == "*" else int(hi))
+        lo_n, hi_n = min(lo_n, hi_n), max(lo_n, hi_n)
+        wanted.update(range(lo_n, hi_n + 1))
+    return wanted
+
+
+def _message_date(raw: bytes):
+    msg = email.message_from_bytes(raw)
+    try:
+        return parsedate_to_datetime(msg.get("Date")).date()
+    except (TypeError, ValueError):
+        return datetime.utcnow().date()
@@ -1,4 +1,12 @@
-"""Sync Yahoo, Apple iCloud, and other IMAP mailboxes into synced_emails."""
+"""Sync Yahoo, Apple iCloud, and other IMAP mailboxes into synced_emails.
+
+Each account keeps a ``(UIDVALIDITY, last_uid)`` cursor in ``imap_sync_cursors`` so a
+repeat sync only asks the server for UIDs above the cursor. When the server reports a
+different UIDVALIDITY (mailbox recreated, UIDs renumbered) the cursor is discarded and
+the ``days`` window is used again. New messages are fetched in UID-set batches with
+``BODY.PEEK`` and a body byte cap, so large attachments stay on the server until the
+user opens them (``core.email_attachments.fetch_imap_attachments``).
+"""
 
 from __future__ import annotations
 
@@ -6,29 +14,168 @@ import email
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Set
 
 from core.database_optimization import db_optimizer
 from core.imap_mail_helpers import (
     connect_imap,
     extract_attachments_from_imap_message,
     extract_body_from_imap_message,
-    fetch_imap_rfc822,
+    fetch_imap_uid_batch,
     get_user_imap_settings,
+    imap_mailbox_status,
     infer_provider_from_imap_settings,
     parse_imap_message_date,
 )
 
 logger = logging.getLogger(__name__)
 
+IMAP_SYNC_MAILBOX = "INBOX"
+IMAP_FETCH_BATCH_SIZE = 50
+IMAP_BODY_BYTES_CAP = 256 * 1024
+IMAP_EXISTING_PROBE_CHUNK = 500
+
+
+def ensure_imap_sync_cursor_table() -> None:
+    db_optimizer.execute_query(
+        """
+        CREATE TABLE IF NOT EXISTS imap_sync_cursors (
+            user_id INTEGER NOT NULL,
+            account_key TEXT NOT NULL,
+            uidvalidity INTEGER NOT NULL,
+            last_uid INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (user_id, account_key)
+        )
+        """,
+        fetch=False,
+    )
+
+
+def imap_account_key(settings: Dict[str, Any], mailbox: str = IMAP_SYNC_MAILBOX) -> str:
+    """Stable per-mailbox key: ``username@server/mailbox``."""
+    username = (settings.get("username") or "").strip().lower()
+    server = (settings.get("imap_server") or "").strip().lower()
+    return f"{username}@{server}/{mailbox}"
+
+
+def get_imap_sync_cursor(user_id: int, account_key: str) -> Optional[Dict[str, int]]:
+    ensure_imap_sync_cursor_table()
+    rows = db_optimizer.execute_query(
+        "SELECT uidvalidity, last_uid FROM imap_sync_cursors WHERE user_id = ? AND account_key = ?",
+        (user_id, account_key),
+    )
+    if not rows:
+        return None
+    row = rows[0]
+    return {"uidvalidity": int(row["uidvalidity"]), "last_uid": int(row["last_uid"] or 0)}
+
+
+def save_imap_sync_cursor(user_id: int, account_key: str, *, uidvalidity: int, last_uid: int) -> None:
+    ensure_imap_sync_cursor_table()
+    db_optimizer.execute_query(
+        """
+        INSERT INTO imap_sync_cursors (user_id, account_key, uidvalidity, last_uid, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (user_id, account_key) DO UPDATE SET
+            uidvalidity = excluded.uidvalidity,
+            last_uid = excluded.last_uid,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (user_id, account_key, int(uidvalidity), int(last_uid)),
+        fetch=False,
+    )
+
+
+def _existing_synced_uids(user_id: int, provider: str, uids: Iterable[int]) -> Dict[str, Dict[str, Any]]:
+    """external_id -> row for uids already in synced_emails (one query per chunk)."""
+    uid_strs = [str(u) for u in uids]
+    found: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(uid_strs), IMAP_EXISTING_PROBE_CHUNK):
+        chunk = uid_strs[start : start + IMAP_EXISTING_PROBE_CHUNK]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = db_optimizer.execute_query(
+            f"""
+            SELECT external_id, attachments FROM synced_emails
+            WHERE user_id = ? AND provider = ? AND external_id IN ({placeholders})
+            """,
+            (user_id, provider, *chunk),
+        )
+        for row in rows or []:
+            found[str(row["external_id"])] = dict(row)
+    return found
+
+
+def _search_uids(imap: Any, criteria: str) -> List[int]:
+    status, data = imap.uid("search", None, criteria)
+    if status != "OK":
+        raise RuntimeError("IMAP search failed")
+    raw = data[0].split() if data and data[0] else []
+    return sorted({int(u) for u in raw})
+
 
-def sync_imap_emails(user_id: int, *, limit: int = 50, days: int = 30) -> Dict[str, Any]:
+def _store_imap_message(
+    user_id: int,
+    uid_str: str,
+    provider: str,
+    recipient: str,
+    fetched: Dict[str, Any],
+) -> None:
+    msg = email.message_from_bytes(fetched["raw"])
+    subject = msg.get("Subject", "No Subject") or "No Subject"
+    sender = msg.get("From", "Unknown") or "Unknown"
+    db_optimizer.execute_query(
+        """
+        INSERT INTO synced_emails
+        (user_id, external_id, provider, subject, sender, recipient, date, body, labels, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT DO NOTHING
+        """,
+        (
+            user_id,
+            uid_str,
+            provider,
+            subject,
+            sender,
+            recipient,
+            parse_imap_message_date(msg),
+            extract_body_from_imap_message(msg),
+            json.dumps(["UNREAD"]),
+        ),
+        fetch=False,
+    )
+    # A capped fetch may have cut attachment parts short; those are fetched on demand.
+    if fetched.get("complete"):
+        attachments = extract_attachments_from_imap_message(msg)
+        if attachments:
+            from core.email_attachments import cache_attachments
+
+            cache_attachments(user_id, uid_str, attachments, provider=provider)
+
+
+def sync_imap_emails(
+    user_id: int,
+    *,
+    limit: int = 50,
+    days: int = 30,
+    include_attachments: bool = False,
+) -> Dict[str, Any]:
+    """
+    Sync new INBOX messages for ``user_id``.
+
+    ``limit`` caps messages fetched per call; with a valid cursor the oldest unseen UIDs
+    are taken first so ``has_more`` callers can page forward without gaps. With
+    ``include_attachments`` full messages are downloaded and attachment metadata is
+    cached (also backfilled for already-synced rows).
+    """
     settings = get_user_imap_settings(user_id)
     if not settings:
         return {"success": False, "error": "IMAP not configured. Save Yahoo, iCloud, or IMAP settings first."}
 
     provider = infer_provider_from_imap_settings(settings)
+    account_key = imap_account_key(settings)
     emails_synced = 0
+    has_more = False
 
     try:
         imap = connect_imap(settings)
@@ -37,75 +184,104 @@ def sync_imap_emails(user_id: int, *, limit: int = 50, days: int = 30) -> Dict[s
         return {"success": False, "error": "Failed to connect to IMAP server"}
 
     try:
-        since = (datetime.utcnow() - timedelta(days=max(1, days))).strftime("%d-%b-%Y")
-        status, data = imap.uid("search", None, f"(SINCE {since})")
-        if status != "OK":
+        mailbox_status = imap_mailbox_status(imap, IMAP_SYNC_MAILBOX)
+        uidvalidity = mailbox_status.get("uidvalidity")
+        cursor = get_imap_sync_cursor(user_id, account_key) if uidvalidity is not None else None
+        incremental = bool(cursor and cursor["uidvalidity"] == uidvalidity)
+        if cursor and not incremental:
+            logger.info(
+                "IMAP UIDVALIDITY changed user=%s account=%s (%s -> %s); resyncing window",
+                user_id,
+                account_key,
+                cursor["uidvalidity"],
+                uidvalidity,
+            )
+
+        try:
+            if incremental:
+                last_uid = cursor["last_uid"]
+                # "n:*" always matches the highest UID, even when it is below n.
+                uids = [u for u in _search_uids(imap, f"UID {last_uid + 1}:*") if u > last_uid]
+            else:
+                since = (datetime.utcnow() - timedelta(days=max(1, days))).strftime("%d-%b-%Y")
+                uids = _search_uids(imap, f"(SINCE {since})")
+        except RuntimeError:
             return {"success": False, "error": "IMAP search failed"}
 
-        uids = data[0].split() if data and data[0] else []
         if limit > 0 and len(uids) > limit:
-            uids = uids[-limit:]
+            has_more = incremental
+            uids = uids[:limit] if incremental else uids[-limit:]
+
+        existing = _existing_synced_uids(user_id, provider, uids)
+        new_uids = [u for u in uids if str(u) not in existing]
+        backfill: Set[int] = set()
+        if include_attachments:
+            from core.email_attachments import synced_email_needs_attachment_backfill
 
-        for uid in uids:
-            uid_str = uid.decode() if isinstance(uid, bytes) else str(uid)
+            backfill = {
+                int(ext_id)
+                for ext_id, row in existing.items()
+                if synced_email_needs_attachment_backfill(row.get("attachments"))
+            }
+
+        body_cap = None if include_attachments else IMAP_BODY_BYTES_CAP
+        recipient = settings.get("username", "")
+        to_fetch = sorted(set(new_uids) | backfill)
+        # Lowest new UID that did not get stored; the cursor stays below it.
+        failed_from: Optional[int] = None
+        batch_failed = False
+        for start in range(0, len(to_fetch), IMAP_FETCH_BATCH_SIZE):
+            batch = to_fetch[start : start + IMAP_FETCH_BATCH_SIZE]
             try:
-                existing = db_optimizer.execute_query(
-                    """
-                    SELECT id, attachments FROM synced_emails
-                    WHERE user_id = ? AND external_id = ? AND provider = ?
-                    """,
-                    (user_id, uid_str, provider),
+                fetched = fetch_imap_uid_batch(imap, batch, body_bytes_cap=body_cap)
+            except Exception as batch_exc:
+                logger.warning(
+                    "IMAP batch fetch failed user=%s uids=%s..%s: %s", user_id, batch[0], batch[-1], batch_exc
                 )
-                if existing:
-                    from core.email_attachments import cache_attachments, synced_email_needs_attachment_backfill
-
-                    row = existing[0]
-                    if synced_email_needs_attachment_backfill(row.get("attachments")):
-                        raw = fetch_imap_rfc822(imap, uid_str)
-                        msg = email.message_from_bytes(raw)
-                        attachments = extract_attachments_from_imap_message(msg)
-                        if attachments:
-                            cache_attachments(user_id, uid_str, attachments, provider=provider)
+                failed_from = batch[0] if failed_from is None else min(failed_from, batch[0])
+                batch_failed = True
+                break
+            for uid in batch:
+                uid_str = str(uid)
+                item = fetched.get(uid)
+                if item is None:
+                    if uid not in backfill:
+                        logger.warning("IMAP fetch returned no message user=%s uid=%s", user_id, uid_str)
+                        failed_from = uid if failed_from is None else min(failed_from, uid)
                     continue
+                try:
+                    if uid in backfill:
+                        from core.email_attachments import cache_attachments
 
-                raw = fetch_imap_rfc822(imap, uid_str)
-                msg = email.message_from_bytes(raw)
-                subject = msg.get("Subject", "No Subject") or "No Subject"
-                sender = msg.get("From", "Unknown") or "Unknown"
-                received = parse_imap_message_date(msg)
-                body = extract_body_from_imap_message(msg)
-                labels = json.dumps(["UNREAD"])
-
-                db_optimizer.execute_query(
-                    """
-                    INSERT INTO synced_emails
-                    (user_id, external_id, provider, subject, sender, recipient, date, body, labels, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    ON CONFLICT DO NOTHING
-                    """,
-                    (
-                        user_id,
-                        uid_str,
-                        provider,
-                        subject,
-                        sender,
-                        settings.get("username", ""),
-                        received,
-                        body,
-                        labels,
-                    ),
-                    fetch=False,
-                )
-                emails_synced += 1
-
-                attachments = extract_attachments_from_imap_message(msg)
-                if attachments:
-                    from core.email_attachments import cache_attachments
+                        attachments = extract_attachments_from_imap_message(email.message_from_bytes(item["raw"]))
+                        if attachments:
+                            cache_attachments(user_id, uid_str, attachments, provider=provider)
+                        continue
+                    _store_imap_message(user_id, uid_str, provider, recipient, item)
+                    emails_synced += 1
+                except Exception as msg_exc:
+                    logger.warning("IMAP message sync failed user=%s uid=%s: %s", user_id, uid_str, msg_exc)
+                    if uid not in backfill:
+                        failed_from = uid if failed_from is None else min(failed_from, uid)
 
-                    cache_attachments(user_id, uid_str, attachments, provider=provider)
-            except Exception as msg_exc:
-                logger.debug("IMAP message sync skipped uid=%s: %s", uid_str, msg_exc)
-                continue
+        if uidvalidity is not None:
+            if failed_from is not None:
+                # Resume from the first UID that was not stored; later ones are already
+                # in synced_emails and are skipped on the next pass.
+                has_more = has_more or batch_failed
+                done = [u for u in uids if u < failed_from]
+                new_last = done[-1] if done else None
+            elif uids:
+                new_last = uids[-1]
+            else:
+                new_last = max(0, int(mailbox_status.get("uidnext", 1)) - 1)
+            if incremental:
+                new_last = max(new_last or 0, cursor["last_uid"])
+            if new_last is not None:
+                try:
+                    save_imap_sync_cursor(user_id, account_key, uidvalidity=uidvalidity, last_uid=new_last)
+                except Exception as cursor_exc:
+                    logger.warning("Could not save IMAP sync cursor user=%s: %s", user_id, cursor_exc)
     finally:
         try:
             imap.logout()
@@ -117,5 +293,6 @@ def sync_imap_emails(user_id: int, *, limit: int = 50, days: int = 30) -> Dict[s
         "success": True,
         "count": emails_synced,
         "provider": provider,
+        "has_more": has_more,
         "message": f"{label} sync completed ({emails_synced} new messages)",
     }
@@ -10,7 +10,7 @@ import logging
 import time
 import requests
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from core.database_optimization import db_optimizer
 
 logger = logging.getLogger(__name__)
@@ -153,8 +153,354 @@ def get_valid_outlook_token(user_id: int) -> Optional[str]:
     
     return access_token
 
+GRAPH_INBOX_MESSAGES_URL = "https://graph.microsoft.com/v1.0/me/mailFolders/inbox/messages"
+GRAPH_INBOX_DELTA_URL = f"{GRAPH_INBOX_MESSAGES_URL}/delta"
+OUTLOOK_MESSAGE_SELECT = 'id,subject,from,receivedDateTime,bodyPreview,isRead,hasAttachments,body'
+OUTLOOK_DELTA_PAGE_SIZE = 50
+OUTLOOK_WRITE_BATCH = 50
+
+
+def _outlook_delta_enabled() -> bool:
+    return os.getenv('OUTLOOK_SYNC_DELTA', 'true').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def ensure_outlook_sync_state_table() -> None:
+    db_optimizer.execute_query("""
+        CREATE TABLE IF NOT EXISTS outlook_sync_state (
+            user_id INTEGER PRIMARY KEY,
+            delta_link TEXT,
+            next_link TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """, fetch=False)
+
+
+def get_outlook_delta_state(user_id: int) -> Optional[Dict[str, Any]]:
+    """Stored Graph delta cursor: ``delta_link`` (round complete) and/or ``next_link`` (round in progress)."""
+    ensure_outlook_sync_state_table()
+    rows = db_optimizer.execute_query(
+        "SELECT delta_link, next_link FROM outlook_sync_state WHERE user_id = ?",
+        (user_id,),
+    )
+    if not rows or not (rows[0].get('delta_link') or rows[0].get('next_link')):
+        return None
+    return {'delta_link': rows[0].get('delta_link'), 'next_link': rows[0].get('next_link')}
+
+
+def save_outlook_delta_state(user_id: int, *, delta_link: Optional[str], next_link: Optional[str] = None) -> None:
+    ensure_outlook_sync_state_table()
+    db_optimizer.execute_query("""
+        INSERT INTO outlook_sync_state (user_id, delta_link, next_link, updated_at)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (user_id) DO UPDATE SET
+            delta_link = excluded.delta_link,
+            next_link = excluded.next_link,
+            updated_at = CURRENT_TIMESTAMP
+    """, (user_id, delta_link, next_link), fetch=False)
+
+
+def clear_outlook_delta_state(user_id: int) -> None:
+    ensure_outlook_sync_state_table()
+    db_optimizer.execute_query(
+        "DELETE FROM outlook_sync_state WHERE user_id = ?", (user_id,), fetch=False
+    )
+
+
+def _graph_get(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    response = requests.get(url, headers=headers, params=params, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def _outlook_automation_actions() -> Any:
+    """MinimalEmailActions for inbound mailbox AI, or None when disabled / unavailable."""
+    if os.getenv("MAILBOX_AUTOMATION_ENABLED", "").lower() not in {"1", "true", "yes"}:
+        return None
+    try:
+        from email_automation.actions import MinimalEmailActions
+        from email_automation.ai_assistant import MinimalAIEmailAssistant
+
+        return MinimalEmailActions(services={"ai_assistant": MinimalAIEmailAssistant()})
+    except Exception as oa_err:
+        logger.warning("Outlook mailbox automation init failed: %s", oa_err)
+        return None
+
+
+def _outlook_row(user_id: int, msg: Dict[str, Any]) -> Dict[str, Any]:
+    from_info = msg.get('from') or {}
+    sender_email = from_info.get('emailAddress', {}).get('address', '')
+    sender_name = from_info.get('emailAddress', {}).get('name', '')
+    body_preview = msg.get('bodyPreview', '') or ''
+    body_content = (msg.get('body') or {}).get('content', '') or ''
+    return {
+        'external_id': msg.get('id'),
+        'subject': msg.get('subject', 'No Subject'),
+        # Format sender for compatibility with existing schema
+        'sender': f"{sender_name} <{sender_email}>" if sender_name else sender_email,
+        'date': msg.get('receivedDateTime', ''),
+        'body': body_content or body_preview,
+        'preview': body_preview,
+        'is_read': bool(msg.get('isRead', False)),
+        'has_attachments': bool(msg.get('hasAttachments', False)),
+    }
+
+
+def _existing_outlook_rows(user_id: int, external_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    found: Dict[str, Dict[str, Any]] = {}
+    for start in range(0, len(external_ids), OUTLOOK_WRITE_BATCH):
+        chunk = external_ids[start:start + OUTLOOK_WRITE_BATCH]
+        placeholders = ",".join("?" for _ in chunk)
+        rows = db_optimizer.execute_query(f"""
+            SELECT id, external_id, attachments FROM synced_emails
+            WHERE user_id = ? AND provider = 'outlook' AND external_id IN ({placeholders})
+        """, (user_id, *chunk))
+        for row in rows or []:
+            found[row['external_id']] = dict(row)
+    return found
+
+
+_OUTLOOK_INSERT_ROW_SQL = "(?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)"
+
+
+def _outlook_insert_params(user_id: int, r: Dict[str, Any]) -> List[Any]:
+    return [
+        user_id,
+        r['external_id'],
+        'outlook',
+        r['subject'],
+        r['sender'],
+        '',  # recipient not available from Graph API message list
+        r['date'],
+        r['body'],
+        json.dumps(['UNREAD'] if not r['is_read'] else []),  # Labels format
+    ]
+
+
+def _insert_outlook_rows(user_id: int, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Insert new rows as one multi-row INSERT; if that fails, retry them one at a time so a
+    single bad message is logged and skipped instead of losing the page. Returns the rows
+    that were written (or already present).
+    """
+    # Insert emails (using same schema as Gmail for compatibility)
+    sql = """
+        INSERT INTO synced_emails
+        (user_id, external_id, provider, subject, sender, recipient, date, body, labels, created_at)
+        VALUES {values}
+        ON CONFLICT DO NOTHING
+    """
+    params: List[Any] = []
+    for r in chunk:
+        params.extend(_outlook_insert_params(user_id, r))
+    try:
+        db_optimizer.execute_query(
+            sql.format(values=", ".join(_OUTLOOK_INSERT_ROW_SQL for _ in chunk)), tuple(params), fetch=False
+        )
+        return chunk
+    except Exception as batch_exc:
+        if len(chunk) == 1:
+            logger.warning(f"Failed to store email {chunk[0]['external_id']}: {batch_exc}")
+            return []
+        logger.warning("Outlook batch insert of %s emails failed, retrying one by one: %s", len(chunk), batch_exc)
+
+    written: List[Dict[str, Any]] = []
+    for r in chunk:
+        try:
+            db_optimizer.execute_query(
+                sql.format(values=_OUTLOOK_INSERT_ROW_SQL), tuple(_outlook_insert_params(user_id, r)), fetch=False
+            )
+            written.append(r)
+        except Exception as row_exc:
+            logger.warning(f"Failed to store email {r['external_id']}: {row_exc}")
+    return written
+
+
+def _store_outlook_messages(
+    user_id: int,
+    messages: List[Dict[str, Any]],
+    *,
+    actions: Any,
+    owner_email: Optional[str],
+    refresh_existing: bool = False,
+) -> Tuple[int, List[str]]:
+    """
+    Write one page of Graph messages to synced_emails.
+
+    Returns how many rows were new and the external ids whose insert failed, so the
+    delta cursor can stay on the page until they are stored.
+
+    New rows go in as multi-row INSERTs; existing rows get an attachment backfill when
+    needed and, for delta pages (which only carry changed messages), their read state.
+    Attachments and the inbound pipeline run for new rows only.
+    """
+    rows = [_outlook_row(user_id, m) for m in messages if m.get('id')]
+    if not rows:
+        return 0, []
+    existing = _existing_outlook_rows(user_id, [r['external_id'] for r in rows])
+    new_rows = [r for r in rows if r['external_id'] not in existing]
+
+    written: List[Dict[str, Any]] = []
+    for start in range(0, len(new_rows), OUTLOOK_WRITE_BATCH):
+        written.extend(_insert_outlook_rows(user_id, new_rows[start:start + OUTLOOK_WRITE_BATCH]))
+    written_ids = {r['external_id'] for r in written}
+    failed_ids = [r['external_id'] for r in new_rows if r['external_id'] not in written_ids]
+    new_rows = written
+
+    if refresh_existing:
+        for is_read in (True, False):
+            ids = [r['external_id'] for r in rows if r['external_id'] in existing and r['is_read'] is is_read]
+            if not ids:
+                continue
+            placeholders = ",".join("?" for _ in ids)
+            db_optimizer.execute_query(f"""
+                UPDATE synced_emails SET labels = ?
+                WHERE user_id = ? AND provider = 'outlook' AND external_id IN ({placeholders})
+            """, (json.dumps([] if is_read else ['UNREAD']), user_id, *ids), fetch=False)
+
+    from core.email_attachments import fetch_outlook_attachments, synced_email_needs_attachment_backfill
+
+    for r in rows:
+        row = existing.get(r['external_id'])
+        if row and r['has_attachments'] and synced_email_needs_attachment_backfill(row.get('attachments')):
+            try:
+                fetch_outlook_attachments(user_id, r['external_id'], cache=True)
+            except Exception as att_exc:
+                logger.debug("Outlook attachment backfill skipped for %s: %s", r['external_id'], att_exc)
+
+    if not new_rows:
+        return 0, failed_ids
+    stored_ids = {
+        ext_id: int(row['id'])
+        for ext_id, row in _existing_outlook_rows(user_id, [r['external_id'] for r in new_rows]).items()
+    }
+    for r in new_rows:
+        email_id = r['external_id']
+        if r['has_attachments']:
+            try:
+                fetch_outlook_attachments(user_id, email_id, cache=True)
+            except Exception as att_exc:
+                logger.debug("Outlook attachment cache skipped for %s: %s", email_id, att_exc)
+        try:
+            from email_automation.pipeline import (
+                build_parsed_email_for_pipeline,
+                orchestrate_incoming,
+            )
+            from core.request_correlation import get_or_create_correlation_id
+
+            parsed_ow = build_parsed_email_for_pipeline(
+                message_id=str(email_id or ""),
+                subject=r['subject'] or "",
+                from_header=r['sender'],
+                body_text=r['body'] or "",
+                snippet=r['preview'],
+            )
+            corr_body = {"provider": "outlook", "message_id": email_id, "user_id": user_id}
+            correlation_id = get_or_create_correlation_id(None, corr_body)
+            orchestrate_incoming(
+                parsed_ow,
+                user_id=user_id,
+                actions=actions,
+                correlation_id=correlation_id,
+                synced_email_row_id=stored_ids.get(email_id),
+                external_message_id=str(email_id),
+                mailbox_owner_email=owner_email,
+                provider="outlook",
+                run_mailbox_ai=bool(actions),
+            )
+        except Exception as auto_exc:
+            logger.warning("Outlook inbound pipeline failed: %s", auto_exc)
+    return len(new_rows), failed_ids
+
+
+def _mailbox_owner_email(user_id: int) -> Optional[str]:
+    try:
+        owner_rows = db_optimizer.execute_query(
+            "SELECT email FROM users WHERE id = ? LIMIT 1", (user_id,)
+        )
+        return ((owner_rows[0].get("email") or "").strip().lower() if owner_rows else None) or None
+    except Exception:
+        return None
+
+
+def _sync_outlook_delta(
+    user_id: int,
+    headers: Dict[str, str],
+    *,
+    limit: int,
+    days: int,
+    store_page: Any,
+) -> Dict[str, Any]:
+    """
+    Walk a Graph delta round, storing each page before moving on.
+
+    The first round is filtered to ``days``; later runs replay the stored deltaLink and
+    only receive changes. When ``limit`` new-or-changed messages have been seen the
+    current nextLink is stored so the next call resumes mid-round. An expired delta
+    token (410 Gone) clears the cursor and starts a fresh round. When a row on a page
+    fails to insert the round stops and the cursor is left on that page, so the next
+    call reads it again (stored rows are skipped as existing).
+    """
+    state = get_outlook_delta_state(user_id)
+    delta_headers = {**headers, 'Prefer': f'odata.maxpagesize={OUTLOOK_DELTA_PAGE_SIZE}'}
+    url = (state or {}).get('next_link') or (state or {}).get('delta_link')
+    resumed = bool(url)
+    params: Optional[Dict[str, Any]] = None
+    if not url:
+        since_date = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        url = GRAPH_INBOX_DELTA_URL
+        params = {'$select': OUTLOOK_MESSAGE_SELECT, '$filter': f"receivedDateTime ge {since_date}"}
+
+    count = changed = removed = pages = 0
+    while True:
+        try:
+            data = _graph_get(url, delta_headers, params)
+        except requests.exceptions.HTTPError as e:
+            if resumed and e.response is not None and e.response.status_code == 410:
+                logger.info("Outlook delta token expired for user %s; starting a new round", user_id)
+                clear_outlook_delta_state(user_id)
+                return _sync_outlook_delta(user_id, headers, limit=limit, days=days, store_page=store_page)
+            raise
+        pages += 1
+        page = [m for m in data.get('value', []) if '@removed' not in m]
+        removed += len(data.get('value', [])) - len(page)
+        changed += len(page)
+        stored, failed_ids = store_page(page)
+        count += stored
+        if failed_ids:
+            logger.warning(
+                "Outlook sync kept the delta cursor for user %s; %s message(s) failed to store",
+                user_id,
+                len(failed_ids),
+            )
+            previous_delta = (state or {}).get('delta_link')
+            retry_link = url if params is None and url != previous_delta else None
+            save_outlook_delta_state(user_id, delta_link=previous_delta, next_link=retry_link)
+            return {
+                'count': count, 'changed': changed, 'removed': removed, 'pages': pages,
+                'has_more': False, 'failed': len(failed_ids),
+            }
+
+        delta_link = data.get('@odata.deltaLink')
+        next_link = data.get('@odata.nextLink')
+        if delta_link or not next_link:
+            save_outlook_delta_state(user_id, delta_link=delta_link or (state or {}).get('delta_link'))
+            return {'count': count, 'changed': changed, 'removed': removed, 'pages': pages, 'has_more': False}
+        if limit > 0 and changed >= limit:
+            save_outlook_delta_state(
+                user_id, delta_link=(state or {}).get('delta_link'), next_link=next_link
+            )
+            return {'count': count, 'changed': changed, 'removed': removed, 'pages': pages, 'has_more': True}
+        url, params = next_link, None
+
+
 def sync_outlook_emails(user_id: int, limit: int = 50, days: int = 30) -> Dict[str, Any]:
-    """Sync emails from Outlook for a user"""
+    """Sync emails from Outlook for a user.
+
+    With ``OUTLOOK_SYNC_DELTA`` (default on) the inbox is read through a Graph delta
+    query whose deltaLink is kept in ``outlook_sync_state``, so polling an unchanged
+    mailbox costs one small request. Otherwise the latest ``limit`` messages from the
+    last ``days`` are listed as before.
+    """
     try:
         access_token = get_valid_outlook_token(user_id)
         if not access_token:
@@ -163,193 +509,46 @@ def sync_outlook_emails(user_id: int, limit: int = 50, days: int = 30) -> Dict[s
                 'error': 'No valid Outlook token',
                 'count': 0
             }
-        
-        # Get messages from Microsoft Graph
-        graph_url = "https://graph.microsoft.com/v1.0/me/mailFolders/inbox/messages"
+
         headers = {
             'Authorization': f'Bearer {access_token}',
             'Content-Type': 'application/json'
         }
-        
-        # Calculate date filter
-        since_date = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        params = {
-            '$top': limit,
-            '$orderby': 'receivedDateTime desc',
-            '$filter': f"receivedDateTime ge {since_date}",
-            '$select': 'id,subject,from,receivedDateTime,bodyPreview,isRead,hasAttachments,body'
-        }
-        
-        response = requests.get(graph_url, headers=headers, params=params, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
-        messages = data.get('value', [])
-        
-        # Store emails in database
-        emails_synced = 0
-        mailbox_automation_enabled = os.getenv(
-            "MAILBOX_AUTOMATION_ENABLED", ""
-        ).lower() in {"1", "true", "yes"}
-        outlook_actions = None
-        if mailbox_automation_enabled:
-            try:
-                from email_automation.actions import MinimalEmailActions
-                from email_automation.ai_assistant import MinimalAIEmailAssistant
+        actions = _outlook_automation_actions()
+        owner_email = _mailbox_owner_email(user_id)
+        use_delta = _outlook_delta_enabled()
 
-                outlook_actions = MinimalEmailActions(
-                    services={"ai_assistant": MinimalAIEmailAssistant()}
-                )
-            except Exception as oa_err:
-                logger.warning("Outlook mailbox automation init failed: %s", oa_err)
-                mailbox_automation_enabled = False
+        def store_page(messages: List[Dict[str, Any]]) -> Tuple[int, List[str]]:
+            return _store_outlook_messages(
+                user_id, messages, actions=actions, owner_email=owner_email, refresh_existing=use_delta
+            )
+
+        if use_delta:
+            delta = _sync_outlook_delta(user_id, headers, limit=limit, days=days, store_page=store_page)
+            emails_synced = delta['count']
+        else:
+            since_date = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+            data = _graph_get(GRAPH_INBOX_MESSAGES_URL, headers, {
+                '$top': limit,
+                '$orderby': 'receivedDateTime desc',
+                '$filter': f"receivedDateTime ge {since_date}",
+                '$select': OUTLOOK_MESSAGE_SELECT,
+            })
+            emails_synced, _ = store_page(data.get('value', []))
+            delta = {'has_more': False}
 
-        for msg in messages:
-            try:
-                email_id = msg.get('id')
-                subject = msg.get('subject', 'No Subject')
-                from_info = msg.get('from', {})
-                sender_email = from_info.get('emailAddress', {}).get('address', '')
-                sender_name = from_info.get('emailAddress', {}).get('name', '')
-                received_date = msg.get('receivedDateTime', '')
-                body_preview = msg.get('bodyPreview', '')
-                is_read = msg.get('isRead', False)
-                has_attachments = msg.get('hasAttachments', False)
-                
-                # Get full body if available
-                body_content = ''
-                body_obj = msg.get('body', {})
-                if body_obj:
-                    body_content = body_obj.get('content', '')
-                
-                # Check if email already exists
-                existing = db_optimizer.execute_query("""
-                    SELECT id, attachments FROM synced_emails
-                    WHERE user_id = ? AND external_id = ? AND provider = 'outlook'
-                """, (user_id, email_id))
-                
-                if existing and len(existing) > 0:
-                    if has_attachments and email_id:
-                        from core.email_attachments import (
-                            fetch_outlook_attachments,
-                            synced_email_needs_attachment_backfill,
-                        )
-
-                        if synced_email_needs_attachment_backfill(existing[0].get("attachments")):
-                            try:
-                                fetch_outlook_attachments(user_id, email_id, cache=True)
-                            except Exception as att_exc:
-                                logger.debug(
-                                    "Outlook attachment backfill skipped for %s: %s",
-                                    email_id,
-                                    att_exc,
-                                )
-                    continue  # Skip if already synced
-                
-                # Format sender for compatibility with existing schema
-                sender = f"{sender_name} <{sender_email}>" if sender_name else sender_email
-                
-                # Insert email (using same schema as Gmail for compatibility)
-                db_optimizer.execute_query("""
-                    INSERT INTO synced_emails 
-                    (user_id, external_id, provider, subject, sender, recipient, date, body, labels, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                    ON CONFLICT DO NOTHING
-                """, (
-                    user_id, 
-                    email_id, 
-                    'outlook', 
-                    subject, 
-                    sender,
-                    '',  # recipient not available from Graph API message list
-                    received_date,
-                    body_content or body_preview,
-                    json.dumps(['UNREAD'] if not is_read else [])  # Labels format
-                ), fetch=False)
-                
-                emails_synced += 1
-
-                if has_attachments and email_id:
-                    try:
-                        from core.email_attachments import fetch_outlook_attachments
-
-                        fetch_outlook_attachments(user_id, email_id, cache=True)
-                    except Exception as att_exc:
-                        logger.debug("Outlook attachment cache skipped for %s: %s", email_id, att_exc)
-
-                try:
-                    ow_rows = db_optimizer.execute_query(
-                        "SELECT id FROM synced_emails WHERE user_id = ? AND external_id = ? AND provider = 'outlook' ORDER BY id DESC LIMIT 1",
-                        (user_id, email_id),
-                    )
-                    sid_out = int(ow_rows[0]["id"]) if ow_rows else None
-                except Exception:
-                    sid_out = None
-
-                try:
-                    owner_rows = db_optimizer.execute_query(
-                        "SELECT email FROM users WHERE id = ? LIMIT 1", (user_id,)
-                    )
-                    owner_email = (
-                        (owner_rows[0].get("email") or "").strip().lower()
-                        if owner_rows
-                        else None
-                    ) or None
-                except Exception:
-                    owner_email = None
-
-                try:
-                    from email_automation.pipeline import (
-                        build_parsed_email_for_pipeline,
-                        orchestrate_incoming,
-                    )
-                    from core.request_correlation import get_or_create_correlation_id
-
-                    body_text_out = body_content or body_preview or ""
-                    parsed_ow = build_parsed_email_for_pipeline(
-                        message_id=str(email_id or ""),
-                        subject=subject or "",
-                        from_header=sender,
-                        body_text=body_text_out,
-                        snippet=body_preview or "",
-                    )
-                    corr_body = {
-                        "provider": "outlook",
-                        "message_id": email_id,
-                        "user_id": user_id,
-                    }
-                    correlation_id = get_or_create_correlation_id(None, corr_body)
-                    orchestrate_incoming(
-                        parsed_ow,
-                        user_id=user_id,
-                        actions=outlook_actions,
-                        correlation_id=correlation_id,
-                        synced_email_row_id=sid_out,
-                        external_message_id=str(email_id),
-                        mailbox_owner_email=owner_email,
-                        provider="outlook",
-                        run_mailbox_ai=bool(
-                            mailbox_automation_enabled and outlook_actions
-                        ),
-                    )
-                except Exception as auto_exc:
-                    logger.warning("Outlook inbound pipeline failed: %s", auto_exc)
-                
-            except Exception as e:
-                logger.warning(f"Failed to store email {msg.get('id')}: {e}")
-                continue
-        
         logger.info(f"✅ Synced {emails_synced} Outlook emails for user {user_id}")
-        
+
         return {
             'success': True,
             'count': emails_synced,
+            'has_more': delta['has_more'],
+            'mode': 'delta' if use_delta else 'list',
             'message': f'Synced {emails_synced} emails'
         }
-        
+
     except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 401:
+        if e.response is not None and e.response.status_code == 401:
             logger.error(f"Outlook token expired for user {user_id}")
             return {
                 'success': False,
@@ -370,4 +569,3 @@ def sync_outlook_emails(user_id: int, limit: int = 50, days: int = 30) -> Dict[s
             'error': str(e),
             'count': 0
         }
-
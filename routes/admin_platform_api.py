@@ -7,7 +7,7 @@ from typing import Any, Dict, Optional
 
 from flask import Blueprint, g, request
 
-from core.admin_audit import list_admin_audit, record_admin_audit_from_request
+from core.admin_audit import iter_admin_audit, list_admin_audit, record_admin_audit_from_request
 from core.admin_security import (
     check_admin_rate_limit,
     destructive_admin_enabled,
@@ -49,6 +49,7 @@ from core.platform_admin import (
     summarize_capabilities,
 )
 from core.secure_sessions import get_actor_user_id, get_current_user_id, is_impersonating
+from core.streaming_export import streaming_download_response
 from core.admin_security_store import AdminSecurityStoreUnavailable
 
 logger = logging.getLogger(__name__)
@@ -1338,8 +1339,18 @@ def get_audit_log():
 @require_platform_capability("platform.audit.export")
 @require_admin_step_up("export")
 def export_audit_log():
-    """Bounded allowlisted export of the current filtered audit page (no raw metadata)."""
-    from core.admin_audit_export import EXPORT_MAX_ROWS, build_audit_export_payload
+    """
+    Bounded allowlisted export of the current filtered audit page (no raw metadata).
+
+    With ``"stream": true`` every matching row (up to ``STREAM_EXPORT_MAX_ROWS``) is
+    written as a chunked NDJSON or CSV download instead of one in-memory page.
+    """
+    from core.admin_audit_export import (
+        EXPORT_MAX_ROWS,
+        STREAM_EXPORT_MAX_ROWS,
+        build_audit_export_payload,
+        iter_audit_export_chunks,
+    )
 
     actor_id = get_current_user_id()
     if not actor_id:
@@ -1374,6 +1385,34 @@ def export_audit_log():
     if target_id and len(target_id) > 128:
         target_id = None
 
+    if str(payload.get("stream") or "").strip().lower() in ("1", "true", "yes", "on"):
+        items = iter_admin_audit(
+            max_rows=STREAM_EXPORT_MAX_ROWS,
+            actor_user_id=parsed_actor,
+            target_type=target_type,
+            target_id=target_id,
+            outcome=outcome,
+        )
+        export = iter_audit_export_chunks(items, fmt=fmt)
+        # Row count is unknown until the stream finishes, so the audit entry records the cap.
+        record_admin_audit_from_request(
+            actor_user_id=int(actor_id),
+            action="platform.audit.export",
+            target_type="audit_export",
+            target_id=export["format"],
+            outcome="success",
+            capability="platform.audit.export",
+            metadata={
+                "reason": "EXPORT_OK",
+                "code": "EXPORT_OK",
+                "streamed": True,
+                "max_rows": STREAM_EXPORT_MAX_ROWS,
+                "outcome_filter": outcome or "",
+            },
+            after={"format": export["format"], "streamed": True},
+        )
+        return streaming_download_response(export["chunks"], export["content_type"], export["filename"])
+
     result = list_admin_audit(
         limit=limit,
         offset=offset,
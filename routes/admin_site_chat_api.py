@@ -5,10 +5,12 @@ from __future__ import annotations
 import logging
 
 from flask import Blueprint, request
+from werkzeug.utils import secure_filename
 
 from company_chatbot.transcript_store import (
     build_transcript_export,
     get_transcript_session,
+    iter_transcript_export,
     list_transcript_sessions,
     record_transcript_audit,
 )
@@ -21,6 +23,7 @@ from company_chatbot.miss_review import (
 from core.api_validation import create_error_response, create_success_response, handle_api_errors
 from core.billing_api import _get_user_role, _is_admin_user
 from core.secure_sessions import get_current_user_id
+from core.streaming_export import NDJSON_MIMETYPE, streaming_download_response
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +108,18 @@ def export_site_chat_session(session_id: str):
         return create_error_response("session_id is required", 400, "MISSING_SESSION_ID")
 
     export_format = (request.args.get("format") or "text").strip().lower()
+    stream = (request.args.get("stream") or "").strip().lower() in ("1", "true", "yes", "on")
+    if export_format == "ndjson" or stream:
+        # Streamed download: messages are written as they are read instead of built in memory.
+        streamed = iter_transcript_export(session_id, export_format="ndjson" if export_format != "text" else "text")
+        if not streamed:
+            return create_error_response("Transcript session not found", 404, "SESSION_NOT_FOUND")
+        record_transcript_audit(session_id, str(user_id), "export")
+        stem = secure_filename(session_id) or "transcript"
+        if streamed["format"] == "ndjson":
+            return streaming_download_response(streamed["chunks"], NDJSON_MIMETYPE, f"{stem}.ndjson")
+        return streaming_download_response(streamed["chunks"], "text/plain; charset=utf-8", f"{stem}.txt")
+
     if export_format not in ("text", "json"):
         export_format = "text"
 
@@ -54,6 +54,14 @@ from core.workflow_documents import generate_document
 from core.tier_usage_caps import check_tier_usage_cap, record_monthly_usage
 from core.request_user_id import resolve_request_user_id
 from core.privacy_manager import privacy_manager, PrivacySettings, PrivacyConsent
+from core.streaming_export import (
+    NDJSON_MIMETYPE,
+    ZIP_MIMETYPE,
+    get_background_export,
+    start_background_export,
+    streaming_download_response,
+    streaming_json_response,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -164,6 +172,11 @@ def get_leads():
 
     sort = request.args.get('sort', default='created_at')
     direction = request.args.get('direction', default='desc')
+    page_kwargs = {}
+    cursor = (request.args.get('cursor') or '').strip()
+    if cursor:
+        # Keyset pagination: next_cursor from the previous page (same sort/direction).
+        page_kwargs['cursor'] = cursor
     result = enhanced_crm_service.get_leads_summary(
         user_id,
         filters=filters,
@@ -171,8 +184,11 @@ def get_leads():
         offset=offset,
         sort=sort,
         direction=direction,
+        **page_kwargs,
     )
     if not result.get('success'):
+        if result.get('error_code') == 'INVALID_CURSOR':
+            return create_error_response(result.get('error', 'Invalid cursor'), 400, 'INVALID_CURSOR')
         return create_error_response(result.get('error', 'Failed to retrieve leads'), 500, 'CRM_ERROR')
     
     data = result['data']
@@ -184,7 +200,9 @@ def get_leads():
             'limit': data.get('limit', limit),
             'offset': data.get('offset', offset),
             'page': (data.get('offset', offset) // data.get('limit', limit)) + 1 if data.get('limit', limit) else 1,
-            'has_more': data.get('has_more', False)
+            'has_more': data.get('has_more', False),
+            'next_cursor': data.get('next_cursor'),
+            'totals_cached': data.get('totals_cached', False),
         },
         'analytics': data.get('analytics', {}),
         'filters_applied': data.get('filters_applied', filters)
@@ -465,6 +483,7 @@ def import_leads_csv():
         'skipped_duplicate': data.get('skipped_duplicate', 0),
         'skipped_details': skipped[:50],
         'total_rows': len(leads) + len(skipped),
+        'followup_job_id': data.get('followup_job_id'),
     }
     if idem_key:
         idempotency_manager.update_key_result(idem_key, 'completed', response_data=response_body)
@@ -1069,6 +1088,7 @@ def sync_outlook():
             
             return create_success_response({
                 'emails_synced': sync_result.get('count', 0),
+                'has_more': sync_result.get('has_more', False),
                 'message': sync_result.get('message', 'Outlook sync completed')
             }, 'Outlook sync completed successfully')
         else:
@@ -1107,7 +1127,10 @@ def sync_imap():
         body = request.get_json(silent=True) or {}
         limit = int(body.get('limit', 50))
         days = int(body.get('days', 30))
-        sync_result = sync_imap_emails(user_id, limit=limit, days=days)
+        include_attachments = bool(body.get('include_attachments', False))
+        sync_result = sync_imap_emails(
+            user_id, limit=limit, days=days, include_attachments=include_attachments
+        )
 
         if sync_result.get('success'):
             provider = sync_result.get('provider', 'imap')
@@ -1125,6 +1148,7 @@ def sync_imap():
                 {
                     'emails_synced': sync_result.get('count', 0),
                     'provider': provider,
+                    'has_more': sync_result.get('has_more', False),
                     'message': sync_result.get('message', 'IMAP sync completed'),
                 },
                 'IMAP sync completed successfully',
@@ -1244,7 +1268,7 @@ def get_emails():
         from core.email_inbox_search import (
             gmail_inbox_list_query,
             sanitize_inbox_search_query,
-            synced_inbox_search_sql_and_params,
+            synced_inbox_search,
         )
 
         search_term = sanitize_inbox_search_query(
@@ -1272,38 +1296,41 @@ def get_emails():
                     label_filter_sql = " AND (labels IS NULL OR labels = '' OR labels NOT LIKE ?)"
                     label_params = ('%UNREAD%',)
 
-                search_sql, search_params = synced_inbox_search_sql_and_params(search_term)
-                label_filter_sql += search_sql
-                label_params = label_params + search_params
+                search = synced_inbox_search(search_term)
+                label_filter_sql += search.where_sql
+                label_params = label_params + search.where_params
 
                 # List without full body: SUBSTR only (less I/O + smaller payloads). Tests may mock `body` without body_preview.
                 if include_body:
                     synced_sql = """
                         SELECT COALESCE(external_id, gmail_id) as email_id, provider, subject, sender, recipient, date, body, labels, is_read, attachments
-                        FROM synced_emails
+                        FROM synced_emails""" + search.join_sql + """
                         WHERE user_id = ?""" + label_filter_sql + """
-                        ORDER BY date DESC
+                        ORDER BY """ + search.order_sql + """
                         LIMIT ? OFFSET ?
                     """
                 else:
                     synced_sql = """
                         SELECT COALESCE(external_id, gmail_id) as email_id, provider, subject, sender, recipient, date,
                                SUBSTR(COALESCE(body, ''), 1, 500) as body_preview, labels, is_read, attachments
-                        FROM synced_emails
+                        FROM synced_emails""" + search.join_sql + """
                         WHERE user_id = ?""" + label_filter_sql + """
-                        ORDER BY date DESC
+                        ORDER BY """ + search.order_sql + """
                         LIMIT ? OFFSET ?
                     """
-                synced_params = (user_id,) + label_params + (limit, offset)
+                synced_params = (
+                    search.join_params + (user_id,) + label_params + search.order_params + (limit, offset)
+                )
                 synced_emails_data = db_optimizer.execute_query(synced_sql, synced_params)
 
                 if synced_emails_data and len(synced_emails_data) > 0:
                     emails = []
                     count_sql = (
-                        "SELECT COUNT(*) as total FROM synced_emails WHERE user_id = ?" + label_filter_sql
+                        "SELECT COUNT(*) as total FROM synced_emails" + search.join_sql
+                        + " WHERE user_id = ?" + label_filter_sql
                     )
                     total_count_result = db_optimizer.execute_query(
-                        count_sql, (user_id,) + label_params
+                        count_sql, search.join_params + (user_id,) + label_params
                     )
                     total_count = total_count_result[0]['total'] if total_count_result else 0
 
@@ -2018,9 +2045,30 @@ def privacy_cleanup_route():
 @business_bp.route('/privacy/export', methods=['GET'])
 @handle_api_errors
 def privacy_export_route():
+    """
+    GDPR export. Default is the JSON envelope; ``format=ndjson`` or ``format=zip`` streams
+    the export as a chunked download, and ``mode=background`` writes it to a file instead
+    (poll ``/privacy/export/jobs/<job_id>``).
+    """
     user_id = resolve_request_user_id(request, current_user_id=get_current_user_id(), allow_query=True)
     if not user_id:
         return create_error_response("Authentication required", 401, 'AUTHENTICATION_REQUIRED')
+    export_format = (request.args.get('format') or 'json').strip().lower()
+    if export_format in ('ndjson', 'zip'):
+        stamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        filename = f"fikiri-export-{user_id}-{stamp}.{export_format}"
+        mimetype = NDJSON_MIMETYPE if export_format == 'ndjson' else ZIP_MIMETYPE
+        iter_export = privacy_manager.iter_export_ndjson if export_format == 'ndjson' else privacy_manager.iter_export_zip
+        chunks = iter_export(user_id)
+        if chunks is None:
+            return create_error_response("User not found", 404, 'USER_NOT_FOUND')
+        if (request.args.get('mode') or '').strip().lower() == 'background':
+            # The profile was read above; the rest of the generator runs on the job thread.
+            job = start_background_export(user_id, 'privacy_export', filename, mimetype, lambda: chunks)
+            response, _ = create_success_response(job, "Export started")
+            return response, 202
+        return streaming_download_response(chunks, mimetype, filename)
+
     result = privacy_manager.export_user_data(user_id)
     if not result.get('success'):
         return create_error_response(
@@ -2028,13 +2076,31 @@ def privacy_export_route():
             500,
             result.get('error_code', 'EXPORT_ERROR'),
         )
-    export_data = result.get('export_data') or {}
-    try:
-        safe = json.loads(json.dumps(export_data, default=str))
-    except (TypeError, ValueError) as e:
-        logger.warning("Privacy export JSON fallback: %s", e)
-        safe = export_data
-    return create_success_response(safe, "Export ready")
+    # Same envelope as create_success_response; leads/activities stream from iter_query.
+    return streaming_json_response({
+        'success': True,
+        'message': 'Export ready',
+        'timestamp': None,
+        'data': result.get('export_data') or {},
+    })
+
+
+@business_bp.route('/privacy/export/jobs/<job_id>', methods=['GET'])
+@handle_api_errors
+def privacy_export_job_route(job_id):
+    """Background export status; ``?download=1`` returns the finished file."""
+    user_id = resolve_request_user_id(request, current_user_id=get_current_user_id(), allow_query=True)
+    if not user_id:
+        return create_error_response("Authentication required", 401, 'AUTHENTICATION_REQUIRED')
+    job = get_background_export(job_id, user_id)
+    if not job:
+        return create_error_response("Export job not found", 404, 'EXPORT_JOB_NOT_FOUND')
+    if request.args.get('download') in ('1', 'true'):
+        if job['status'] != 'completed':
+            return create_error_response("Export is not ready", 409, 'EXPORT_NOT_READY')
+        return send_file(job['path'], mimetype=job['mimetype'], as_attachment=True, download_name=job['filename'])
+    job.pop('path', None)
+    return create_success_response(job, "Export job status")
 
 
 @business_bp.route('/privacy/delete', methods=['POST'])
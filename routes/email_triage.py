@@ -51,7 +51,10 @@ def list_triage():
 @email_triage_bp.route("/classify-unclassified", methods=["POST"])
 @handle_api_errors
 def classify_unclassified():
-    """Classify synced emails not yet in email_classifications (up to limit)."""
+    """Classify synced emails not yet in email_classifications (up to limit, max 2000).
+
+    ``use_ai`` sends rule-uncertain rows to LLM analysis (concurrent, budget-capped).
+    """
     user_id = resolve_request_user_id(request, current_user_id=get_current_user_id(), allow_query=False)
     if not user_id:
         return create_error_response("Authentication required", 401, "AUTHENTICATION_REQUIRED")
@@ -62,7 +65,8 @@ def classify_unclassified():
         limit = int(limit)
     except (TypeError, ValueError):
         limit = 50
-    result = classify_unclassified_synced(user_id, limit=limit)
+    use_ai = str(body.get("use_ai", "false")).strip().lower() in ("1", "true", "yes")
+    result = classify_unclassified_synced(user_id, limit=limit, use_ai=use_ai)
     return create_success_response(result, "Unclassified sync messages triaged")
 
 
@@ -1,6 +1,7 @@
 """HTTP routes for the first-party Fikiri marketing site chatbot."""
 
 import logging
+import re
 
 from flask import Blueprint, request
 
@@ -8,6 +9,7 @@ from company_chatbot import config
 from company_chatbot.orchestrator import handle_message, start_session
 from company_chatbot.rate_limit import check_message_limits, check_session_start_limits
 from core.api_validation import create_error_response, create_success_response, handle_api_errors
+from core.sse_stream import format_sse, sse_response
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,7 @@ _SITE_BOT_DISABLED_MESSAGE = (
 _RATE_LIMIT_MESSAGE = (
     "You're sending messages a bit too quickly. Please wait a moment and try again."
 )
+_STREAM_PIECE_RE = re.compile(r"\s*\S+\s*")
 
 config.log_site_bot_config_warnings(logger)
 
@@ -69,32 +72,25 @@ def site_chat_session_start():
     )
 
 
-@site_chatbot_bp.route("/message", methods=["POST", "OPTIONS"])
-@handle_api_errors
-def site_chat_message():
-    if request.method == "OPTIONS":
-        return "", 204
-
-    if not config.site_bot_enabled():
-        return _disabled_response()
-
+def _handle_message_request():
+    """Validate, rate-limit, run and persist one turn; returns ``(result, session_id, error)``."""
     data = request.get_json(silent=True) or {}
     session_id = (data.get("session_id") or "").strip()
     message = (data.get("message") or "").strip()
 
     if not session_id:
-        return create_error_response("session_id is required", 400, "MISSING_SESSION_ID")
+        return None, None, create_error_response("session_id is required", 400, "MISSING_SESSION_ID")
     if not message:
-        return create_error_response("message is required", 400, "MISSING_MESSAGE")
+        return None, None, create_error_response("message is required", 400, "MISSING_MESSAGE")
 
     limit = check_message_limits(_client_ip(), session_id)
     if not limit.allowed:
-        return _rate_limit_response(limit.retry_after_seconds)
+        return None, None, _rate_limit_response(limit.retry_after_seconds)
 
     try:
         result = handle_message(session_id, message)
     except KeyError:
-        return create_error_response("Invalid or expired session", 404, "SESSION_NOT_FOUND")
+        return None, None, create_error_response("Invalid or expired session", 404, "SESSION_NOT_FOUND")
 
     from company_chatbot.transcript_store import persist_message_turn
 
@@ -106,8 +102,55 @@ def site_chat_message():
         client_ip=_client_ip(),
         user_agent=(request.headers.get("User-Agent") or "").strip() or None,
     )
+    return result, session_id, None
+
+
+@site_chatbot_bp.route("/message", methods=["POST", "OPTIONS"])
+@handle_api_errors
+def site_chat_message():
+    if request.method == "OPTIONS":
+        return "", 204
+
+    if not config.site_bot_enabled():
+        return _disabled_response()
+
+    result, session_id, error = _handle_message_request()
+    if error is not None:
+        return error
 
     return create_success_response(
         {**result.to_dict(config.SCHEMA_VERSION), "session_id": session_id},
         "Site chat message processed",
     )
+
+
+@site_chatbot_bp.route("/message/stream", methods=["POST", "OPTIONS"])
+@handle_api_errors
+def site_chat_message_stream():
+    """SSE variant of /message: ``sources``, then ``token`` frames, then ``done`` (full payload).
+
+    Site bot replies are deterministic, so tokens are word-sized slices of the final reply;
+    the widget uses the same renderer as the LLM-backed public chatbot stream.
+    """
+    if request.method == "OPTIONS":
+        return "", 204
+
+    if not config.site_bot_enabled():
+        return _disabled_response()
+
+    result, session_id, error = _handle_message_request()
+    if error is not None:
+        return error
+
+    payload = {**result.to_dict(config.SCHEMA_VERSION), "session_id": session_id}
+
+    def _frames():
+        yield format_sse(
+            "sources",
+            {"sources": payload["sources"], "session_id": session_id, "schema_version": config.SCHEMA_VERSION},
+        )
+        for piece in _STREAM_PIECE_RE.findall(result.response or ""):
+            yield format_sse("token", {"content": piece})
+        yield format_sse("done", payload)
+
+    return sse_response(_frames())
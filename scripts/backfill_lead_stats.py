@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Build (or recompute) the CRM lead_stats rollup.
+
+Calls crm.lead_stats.backfill_lead_stats().
+SQLite: creates the lead_stats table and its triggers on leads and seeds it with one
+GROUP BY over leads, in a single transaction; lead list totals use SQL aggregates
+until this has run once. Re-running recomputes every row (repair).
+PostgreSQL: scripts/migrations/012_leads_search_keyset.sql creates the rollup; this
+recomputes it.
+
+Usage:
+  python3 scripts/backfill_lead_stats.py
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _load_dotenv() -> None:
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(os.path.join(ROOT, ".env"), override=False)
+    except ImportError:
+        pass
+
+
+_load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("backfill_lead_stats")
+
+
+def main() -> int:
+    from crm.lead_stats import backfill_lead_stats
+
+    logger.info("Starting lead_stats build")
+    try:
+        result = backfill_lead_stats()
+    except Exception:
+        logger.exception("lead_stats build failed")
+        return 1
+
+    if not result.get("ready"):
+        logger.error("lead_stats unavailable (leads table missing or migration 012 not applied)")
+        return 1
+    logger.info("lead_stats build finished rows=%s", result.get("rows"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Build the CRM lead list search and keyset indexes.
+
+Calls crm.lead_search_index.backfill_leads_search_index().
+SQLite: creates the (user_id, <sort>, id) keyset indexes and builds (or rebuilds) the
+leads_fts trigram table in one pass; lead search uses LIKE until this has run once.
+PostgreSQL: nothing to do; scripts/migrations/012_leads_search_keyset.sql owns both.
+
+Usage:
+  python3 scripts/backfill_leads_fts.py
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _load_dotenv() -> None:
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(os.path.join(ROOT, ".env"), override=False)
+    except ImportError:
+        pass
+
+
+_load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("backfill_leads_fts")
+
+
+def main() -> int:
+    from crm.lead_search_index import backfill_leads_search_index
+
+    logger.info("Starting leads search index build")
+    try:
+        result = backfill_leads_search_index()
+    except Exception:
+        logger.exception("leads search index build failed")
+        return 1
+
+    logger.info("leads search index build finished mode=%s rows=%s", result.get("mode"), result.get("rows"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Backfill the synced_emails full-text search index.
+
+Calls core.email_search_index.backfill_synced_emails_search_index().
+SQLite: builds (or rebuilds) the FTS5 table in one pass; inbox search uses LIKE
+until this has run once. PostgreSQL: fills search_tsv for rows written before
+scripts/migrations/011_synced_emails_fts.sql in batches; safe to stop and re-run.
+
+Usage:
+  python3 scripts/backfill_synced_emails_fts.py
+  python3 scripts/backfill_synced_emails_fts.py --batch-size 2000 --max-batches 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _load_dotenv() -> None:
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(os.path.join(ROOT, ".env"), override=False)
+    except ImportError:
+        pass
+
+
+_load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("backfill_synced_emails_fts")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Rows updated per batch on PostgreSQL (default 1000)",
+    )
+    parser.add_argument(
+        "--max-batches",
+        type=int,
+        default=None,
+        help="Stop after this many batches (default: until done)",
+    )
+    args = parser.parse_args()
+
+    from core.email_search_index import backfill_synced_emails_search_index
+
+    logger.info("Starting synced_emails FTS backfill batch_size=%s", args.batch_size)
+    try:
+        result = backfill_synced_emails_search_index(
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+        )
+    except Exception:
+        logger.exception("synced_emails FTS backfill failed")
+        return 1
+
+    logger.info(
+        "synced_emails FTS backfill finished mode=%s rows=%s batches=%s",
+        result.get("mode"),
+        result.get("rows"),
+        result.get("batches"),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
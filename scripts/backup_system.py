@@ -41,6 +41,14 @@ except ImportError:
 import time
 from typing import Dict, Any, Optional, List
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from core.sqlite_backup import (  # noqa: E402
+    restore_snapshot,
+    snapshot as sqlite_snapshot,
+    snapshot_chain,
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -61,6 +69,8 @@ class BackupManager:
         self.retention_days = int(os.getenv('BACKUP_RETENTION_DAYS', '30'))
         self.aws_s3_bucket = os.getenv('AWS_S3_BUCKET')
         self.aws_region = os.getenv('AWS_REGION', 'us-east-1')
+        self.sqlite_backup_mode = os.getenv('SQLITE_BACKUP_MODE', 'online').strip().lower()
+        self.sqlite_incremental = os.getenv('SQLITE_BACKUP_INCREMENTAL', '').strip().lower() in ('1', 'true', 'yes', 'on')
         
         # Create backup directory
         self.backup_dir.mkdir(parents=True, exist_ok=True)
@@ -80,7 +90,13 @@ class BackupManager:
         return f"{backup_type}_{timestamp}.{extension}"
     
     def backup_sqlite(self) -> Optional[str]:
-        """Backup SQLite database"""
+        """Backup SQLite database.
+
+        Default ``online`` mode snapshots the live database through the sqlite3 backup API
+        (core.sqlite_backup) and returns the snapshot manifest; with
+        ``SQLITE_BACKUP_INCREMENTAL`` only pages changed since the previous snapshot are
+        stored. ``SQLITE_BACKUP_MODE=copy`` keeps the old file copy + gzip.
+        """
         try:
             db_path = os.getenv('DATABASE_URL', 'sqlite:///data/fikiri.db')
             if not db_path.startswith('sqlite:///'):
@@ -93,6 +109,16 @@ class BackupManager:
                 logger.error(f"SQLite database file not found: {db_file}")
                 return None
             
+            if self.sqlite_backup_mode == 'online':
+                self._backup_progress_decile = -1
+                result = sqlite_snapshot(
+                    db_file,
+                    self.backup_dir,
+                    incremental=self.sqlite_incremental,
+                    progress=self._log_backup_progress,
+                )
+                return result['path']
+            
             # Create backup filename
             backup_filename = self.create_backup_filename('sqlite', 'db')
             backup_path = self.backup_dir / backup_filename
@@ -116,6 +142,22 @@ class BackupManager:
             logger.error(f"SQLite backup failed: {e}")
             return None
     
+    def _log_backup_progress(self, done: int, total: int):
+        """Log online backup progress at every 10% step."""
+        decile = done * 10 // total if total else 10
+        if decile != self._backup_progress_decile:
+            self._backup_progress_decile = decile
+            logger.info(f"SQLite online backup: {done}/{total} pages")
+    
+    def _backup_files(self, backup_path: str) -> List[str]:
+        """Files that make up one backup (snapshot manifests bring their data and page map)."""
+        if not backup_path.endswith('.manifest.json'):
+            return [backup_path]
+        with open(backup_path) as f:
+            manifest = json.load(f)
+        folder = os.path.dirname(backup_path)
+        return [os.path.join(folder, manifest['data']), os.path.join(folder, manifest['pagemap']), backup_path]
+    
     def backup_postgresql(self) -> Optional[str]:
         """Backup PostgreSQL database"""
         try:
@@ -241,8 +283,18 @@ class BackupManager:
         try:
             cutoff_date = datetime.now() - timedelta(days=self.retention_days)
             
+            # Keep every file an unexpired incremental snapshot still restores from.
+            keep = set()
+            for manifest_path in self.backup_dir.glob('*.manifest.json'):
+                if datetime.fromtimestamp(manifest_path.stat().st_mtime) >= cutoff_date:
+                    try:
+                        for member in snapshot_chain(manifest_path):
+                            keep.update(os.path.basename(p) for p in self._backup_files(str(member)))
+                    except (OSError, ValueError, KeyError) as e:
+                        logger.warning(f"Unreadable snapshot chain {manifest_path.name}: {e}")
+            
             for backup_file in self.backup_dir.glob('*'):
-                if backup_file.is_file():
+                if backup_file.is_file() and backup_file.name not in keep:
                     file_time = datetime.fromtimestamp(backup_file.stat().st_mtime)
                     if file_time < cutoff_date:
                         backup_file.unlink()
@@ -296,10 +348,11 @@ class BackupManager:
         
         # Upload to S3 if configured
         if self.s3_client:
-            for backup_type, backup_path in backup_results['backups'].items():
-                s3_key = f"backups/{backup_type}/{os.path.basename(backup_path)}"
-                if self.upload_to_s3(backup_path, s3_key):
-                    backup_results['backups'][f"{backup_type}_s3"] = s3_key
+            for backup_type, backup_path in list(backup_results['backups'].items()):
+                for file_path in self._backup_files(backup_path):
+                    s3_key = f"backups/{backup_type}/{os.path.basename(file_path)}"
+                    if self.upload_to_s3(file_path, s3_key):
+                        backup_results['backups'][f"{backup_type}_s3"] = s3_key
         
         # Cleanup old backups
         self.cleanup_old_backups()
@@ -334,6 +387,12 @@ class BackupManager:
         try:
             db_path = os.getenv('DATABASE_URL', 'sqlite:///data/fikiri.db').replace('sqlite:///', '')
             
+            if backup_path.endswith('.manifest.json'):
+                # Snapshot chain: rebuild the image (full + deltas) beside the backup, then restore it.
+                image_path = backup_path[:-len('.manifest.json')] + '.restored.db'
+                restore_snapshot(backup_path, image_path)
+                backup_path = image_path
+            
             # Decompress if needed
             if backup_path.endswith('.gz'):
                 temp_path = backup_path[:-3]  # Remove .gz
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark CRM Gmail lead sync: the old per-activity lookup loop vs the set-based
+EnhancedCRMService.sync_gmail_leads.
+
+Builds a throwaway SQLite database (full schema), seeds one user with N leads that
+each have recent ``email_received`` activities, then times both paths and counts the
+statements each issues. ``--unresolved`` adds leads stored with un-normalized emails,
+which the sync re-creates in one batch.
+
+Usage:
+  python3 scripts/benchmark_sync_gmail_leads.py
+  python3 scripts/benchmark_sync_gmail_leads.py --leads 5000 --activities-per-lead 3 --unresolved 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("benchmark_sync_gmail_leads")
+
+USER_ID = 1
+
+
+def _seed(db, leads: int, activities_per_lead: int, unresolved: int) -> None:
+    with db.transaction() as (conn, cursor):
+        cursor.execute(
+            "INSERT INTO users (id, email, name, password_hash) VALUES (?, ?, ?, ?)",
+            (USER_ID, "bench@example.test", "Bench", "x"),
+        )
+        cursor.execute(
+            "INSERT INTO gmail_tokens (user_id, access_token, access_token_enc, is_active) VALUES (?, ?, ?, 1)",
+            (USER_ID, "enc", "enc"),
+        )
+        for i in range(leads + unresolved):
+            email = f"lead{i}@example.test" if i < leads else f" Legacy{i}@Example.test "
+            cursor.execute(
+                "INSERT INTO leads (user_id, email, name, company, source, stage) VALUES (?, ?, ?, ?, 'web', 'new')",
+                (USER_ID, email, f"Lead {i}", f"Company {i % 50}"),
+            )
+            lead_id = cursor.lastrowid
+            for _ in range(activities_per_lead):
+                cursor.execute(
+                    "INSERT INTO lead_activities (lead_id, activity_type, description, timestamp) "
+                    "VALUES (?, 'email_received', 'Email received', datetime('now', '-1 day'))",
+                    (lead_id,),
+                )
+        conn.commit()
+
+
+def _legacy_sync(db, user_id: int) -> int:
+    """Reference copy of the previous loop: one lookup per aggregated activity row."""
+    ts_pred = db.sql_column_newer_than_n_days_ago("la.timestamp", 7)
+    rows = db.execute_query(
+        f"""SELECT la.lead_id, l.email, l.name, l.company, MAX(la.timestamp) AS last_activity
+           FROM lead_activities la JOIN leads l ON la.lead_id = l.id
+           WHERE l.user_id = ? AND la.activity_type = 'email_received' AND {ts_pred}
+           GROUP BY la.lead_id, l.email, l.name, l.company
+           ORDER BY last_activity DESC""",
+        (user_id,),
+    )
+    synced = 0
+    for row in rows:
+        db.execute_query("SELECT id FROM leads WHERE user_id = ? AND email = ?", (user_id, row["email"]))
+        synced += 1
+    return synced
+
+
+def _counting(db):
+    counter = {"n": 0}
+    real = db.execute_query
+
+    def execute_query(*args, **kwargs):
+        counter["n"] += 1
+        return real(*args, **kwargs)
+
+    db.execute_query = execute_query
+    return counter
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=5000, help="Leads with recent email activity (default 5000)")
+    parser.add_argument("--activities-per-lead", type=int, default=1, help="email_received rows per lead (default 1)")
+    parser.add_argument("--unresolved", type=int, default=0, help="Extra leads with un-normalized emails (default 0)")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="fikiri-bench-")
+    os.environ.pop("DATABASE_URL", None)
+    os.environ["FIKIRI_FORCE_SQLITE"] = "1"
+    os.environ["FIKIRI_SQLITE_PATH"] = os.path.join(tmpdir, "bench.db")
+    os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+    try:
+        return _run(args)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _run(args: argparse.Namespace) -> int:
+    from core.database_optimization import db_optimizer
+    from crm.service import EnhancedCRMService
+
+    _seed(db_optimizer, args.leads, args.activities_per_lead, args.unresolved)
+    counter = _counting(db_optimizer)
+
+    start = time.perf_counter()
+    legacy_rows = _legacy_sync(db_optimizer, USER_ID)
+    legacy_s = time.perf_counter() - start
+    legacy_q = counter["n"]
+
+    counter["n"] = 0
+    start = time.perf_counter()
+    result = EnhancedCRMService().sync_gmail_leads(USER_ID)
+    set_s = time.perf_counter() - start
+    if not result.get("success"):
+        logger.error("sync_gmail_leads failed: %s", result.get("error"))
+        return 1
+    created = sum(1 for lead in result["data"]["synced_leads"] if lead["action"] == "created")
+
+    print(f"leads={args.leads} activities={(args.leads + args.unresolved) * args.activities_per_lead}")
+    print(f"legacy per-row loop : {legacy_s * 1000:9.1f} ms  {legacy_q:6d} execute_query calls  ({legacy_rows} rows)")
+    print(
+        f"set-based sync      : {set_s * 1000:9.1f} ms  {counter['n']:6d} execute_query calls  "
+        f"({result['data']['count']} synced, {created} created)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
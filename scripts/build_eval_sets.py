@@ -42,12 +42,6 @@ def main():
         sys.exit(1)
 
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M-%S")
-    all_rows = db_optimizer.execute_query(
-        """SELECT id, user_id, session_id, question, answer, retrieved_doc_ids,
-                  rating, created_at, metadata, prompt_version, retriever_version
-           FROM chatbot_feedback
-           ORDER BY created_at ASC"""
-    )
 
     def row_to_record(r):
         doc_ids = r.get("retrieved_doc_ids")
@@ -76,32 +70,37 @@ def main():
             "retriever_version": r.get("retriever_version"),
         }
 
-    gold = []
-    needs_review = []
-    ambiguous = []
-
-    for r in all_rows or []:
-        rec = row_to_record(r)
-        rating = (rec.get("rating") or "").lower()
-        if rating == "correct":
-            gold.append(rec)
-        elif rating in ("somewhat_incorrect", "incorrect"):
-            needs_review.append(rec)
-        elif rating == "somewhat_correct":
-            ambiguous.append(rec)
-
-    def write_jsonl(records, name):
-        path = os.path.join(EVALS_DIR, f"{name}_{ts}.jsonl")
-        with open(path, "w", encoding="utf-8") as f:
-            for rec in records:
-                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-        print(f"  {path} ({len(records)} records)")
-        return path
-
+    # Stream feedback rows straight into the three files instead of loading the table.
+    buckets = {
+        "correct": "gold",
+        "somewhat_incorrect": "needs_review",
+        "incorrect": "needs_review",
+        "somewhat_correct": "ambiguous",
+    }
     print("Writing eval sets to", EVALS_DIR)
-    write_jsonl(gold, "gold")
-    write_jsonl(needs_review, "needs_review")
-    write_jsonl(ambiguous, "ambiguous")
+    files = {}
+    counts = {}
+    try:
+        for name in ("gold", "needs_review", "ambiguous"):
+            path = os.path.join(EVALS_DIR, f"{name}_{ts}.jsonl")
+            files[name] = (path, open(path, "w", encoding="utf-8"))
+            counts[name] = 0
+        for r in db_optimizer.iter_query(
+            """SELECT id, user_id, session_id, question, answer, retrieved_doc_ids,
+                      rating, created_at, metadata, prompt_version, retriever_version
+               FROM chatbot_feedback
+               ORDER BY created_at ASC"""
+        ):
+            rec = row_to_record(r)
+            name = buckets.get((rec.get("rating") or "").lower())
+            if name:
+                files[name][1].write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+                counts[name] += 1
+    finally:
+        for path, f in files.values():
+            f.close()
+    for name, (path, _) in files.items():
+        print(f"  {path} ({counts[name]} records)")
     print("Done.")
 
 
@@ -65,6 +65,9 @@ SKIP_FILES = frozenset(
         "core/postgres_compat.py",
         "core/database_optimization.py",
         "scripts/check_postgres_sql_patterns.py",
+        # SQLite-only by design: drives the sqlite3 backup API and PRAGMAs on the local file.
+        # Postgres deployments are backed up by the provider, not through this module.
+        "core/sqlite_backup.py",
     }
 )
 
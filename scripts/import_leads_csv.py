@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Bulk-import CRM leads from a CSV file without loading it into memory.
+
+Streams rows into crm.bulk_import.bulk_import_leads() (chunked, one transaction per
+chunk) and logs progress after every chunk. Scoring and automations run in the
+crm_lead_import durable job reported at the end. Columns: email, name (required);
+phone, company, source, stage, notes (optional; header match is case-insensitive).
+
+Usage:
+  python3 scripts/import_leads_csv.py --user-id 42 leads.csv
+  python3 scripts/import_leads_csv.py --user-id 42 --on-duplicate merge --chunk-size 1000 leads.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _load_dotenv() -> None:
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(os.path.join(ROOT, ".env"), override=False)
+    except ImportError:
+        pass
+
+
+_load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("import_leads_csv")
+
+CSV_COLUMNS = ("email", "name", "phone", "company", "source", "stage", "notes")
+
+
+def iter_csv_leads(path: str, *, default_source: str = "csv_import") -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8", errors="replace") as fh:
+        reader = csv.DictReader(fh)
+        columns = {(f or "").strip().lower(): f for f in reader.fieldnames or []}
+        for row in reader:
+            lead = {c: (row.get(columns[c]) or "").strip() or None for c in CSV_COLUMNS if c in columns}
+            if lead.get("email") and not lead.get("name"):
+                lead["name"] = lead["email"].split("@")[0]
+            lead["source"] = lead.get("source") or default_source
+            yield lead
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="CSV file to import")
+    parser.add_argument("--user-id", type=int, required=True, help="Owner of the imported leads")
+    parser.add_argument(
+        "--on-duplicate",
+        choices=("skip", "update", "merge"),
+        default="update",
+        help="What to do with leads that already exist (default update)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per transaction (default 500)")
+    args = parser.parse_args()
+
+    from crm.bulk_import import LEAD_IMPORT_CHUNK_SIZE, bulk_import_leads
+
+    def _progress(p: Dict[str, Any]) -> None:
+        logger.info(
+            "chunk %s: processed=%s created=%s updated=%s skipped=%s errors=%s",
+            p["chunks"],
+            p["processed"],
+            p["created"],
+            p["updated"],
+            p["skipped_duplicate"],
+            p["errors"],
+        )
+
+    try:
+        result = bulk_import_leads(
+            args.user_id,
+            iter_csv_leads(args.path),
+            on_duplicate=args.on_duplicate,
+            chunk_size=args.chunk_size or LEAD_IMPORT_CHUNK_SIZE,
+            progress_cb=_progress,
+            background_followup=False,
+        )
+    except Exception:
+        logger.exception("Lead import failed")
+        return 1
+
+    logger.info(
+        "Lead import finished total=%s created=%s updated=%s errors=%s followup_job=%s",
+        result["total"],
+        result["created"],
+        result["updated"],
+        len(result["errors"]),
+        result["followup_job_id"],
+    )
+    return 0 if not result["errors"] else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Create upcoming monthly event partitions and drop expired ones.
+
+Calls core.event_partitions.maintain_event_partitions() with the CleanupScheduler retention
+settings. Run it right after scripts/migrations/013_partition_event_tables.sql on Postgres; the
+hourly cleanup cycle keeps it current afterwards. On SQLite it archives rows older than the
+hot window into per-month tables.
+
+Usage:
+  python3 scripts/maintain_event_partitions.py
+  python3 scripts/maintain_event_partitions.py --time-budget-seconds 120
+
+Requires:
+  EVENT_TABLE_PARTITIONING=1
+  DATABASE_URL (production Postgres) or the local SQLite database
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _load_dotenv() -> None:
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(os.path.join(ROOT, ".env"), override=False)
+    except ImportError:
+        pass
+
+
+_load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("maintain_event_partitions")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--time-budget-seconds",
+        type=float,
+        default=None,
+        help="Stop archiving after this many seconds; a later run continues (default: no limit)",
+    )
+    args = parser.parse_args()
+
+    from core.batched_purge import purge_deadline
+    from core.cleanup_scheduler import CleanupScheduler
+    from core.event_partitions import partitioning_enabled
+
+    if not partitioning_enabled():
+        logger.error("EVENT_TABLE_PARTITIONING is not enabled; nothing to do")
+        return 1
+
+    try:
+        results = CleanupScheduler().maintain_event_partitions(
+            purge_deadline(args.time_budget_seconds) if args.time_budget_seconds is not None else None
+        )
+    except Exception:
+        logger.exception("Event partition maintenance failed")
+        return 1
+
+    print(json.dumps(results, indent=2, default=str))
+    return 0 if all(r.get("success") for r in (results or {}).values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+-- Additive: full-text search for inbox search over synced_emails (Postgres).
+-- Apply via psql / Supabase SQL editor against Postgres.
+-- SQLite uses an FTS5 external-content table created by core.email_search_index.
+--
+-- search_tsv is kept current by a BEFORE INSERT/UPDATE trigger, so every writer
+-- (Gmail upsert, IMAP and Outlook sync) is covered without code changes.
+-- Existing rows start NULL: run scripts/backfill_synced_emails_fts.py afterwards
+-- (batched UPDATEs, safe to re-run). On large tables build the index with
+-- CREATE INDEX CONCURRENTLY outside a transaction instead of the statement below.
+--
+-- Rollback (manual): scripts/migrations/rollback/011_synced_emails_fts.sql
+
+CREATE OR REPLACE FUNCTION synced_emails_search_tsv(
+    p_subject TEXT, p_sender TEXT, p_recipient TEXT, p_body TEXT
+) RETURNS tsvector
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(p_subject, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(p_sender, '') || ' ' || coalesce(p_recipient, '')), 'B')
+        || setweight(to_tsvector('simple', left(coalesce(p_body, ''), 200000)), 'C')
+$$;
+
+ALTER TABLE synced_emails ADD COLUMN IF NOT EXISTS search_tsv tsvector;
+
+CREATE OR REPLACE FUNCTION synced_emails_search_tsv_refresh() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_tsv := synced_emails_search_tsv(NEW.subject, NEW.sender, NEW.recipient, NEW.body);
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS trg_synced_emails_search_tsv ON synced_emails;
+CREATE TRIGGER trg_synced_emails_search_tsv
+    BEFORE INSERT OR UPDATE OF subject, sender, recipient, body ON synced_emails
+    FOR EACH ROW EXECUTE FUNCTION synced_emails_search_tsv_refresh();
+
+CREATE INDEX IF NOT EXISTS idx_synced_emails_search_tsv
+    ON synced_emails USING GIN (search_tsv);
@@ -0,0 +1,89 @@
+-- Additive: indexed lead search, keyset pagination and incremental totals for
+-- GET /api/crm/leads (crm.service.get_leads_summary) on Postgres.
+-- Apply via psql / Supabase SQL editor against Postgres.
+-- SQLite gets the equivalent objects from scripts/backfill_leads_fts.py and
+-- scripts/backfill_lead_stats.py.
+--
+-- 1. pg_trgm GIN indexes on the exact LOWER(COALESCE(col, '')) expressions used by the
+--    q / company LIKE filters, so '%term%' searches read the index (query text unchanged).
+-- 2. (user_id, <sort>, id) btree indexes for keyset cursors on every allowlisted sort.
+-- 3. lead_stats: per (user_id, stage, source) count, scored count and score sum of
+--    active leads (NULL scores are left out of the average, as AVG(score) does), kept
+--    current by an AFTER trigger and seeded from leads at the end of this script.
+--    get_leads_summary reads it for the unfiltered and stage-only lists.
+--
+-- On large tables create the indexes with CREATE INDEX CONCURRENTLY outside a
+-- transaction instead of the statements below.
+--
+-- Rollback (manual): scripts/migrations/rollback/012_leads_search_keyset.sql
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_leads_name_trgm
+    ON leads USING GIN (LOWER(COALESCE(name, '')) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_leads_email_trgm
+    ON leads USING GIN (LOWER(COALESCE(email, '')) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_leads_company_trgm
+    ON leads USING GIN (LOWER(COALESCE(company, '')) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_leads_phone_trgm
+    ON leads USING GIN (LOWER(COALESCE(phone, '')) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_leads_user_created_id ON leads (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_leads_user_updated_id ON leads (user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_leads_user_last_contact_id ON leads (user_id, last_contact, id);
+CREATE INDEX IF NOT EXISTS idx_leads_user_score_id ON leads (user_id, score, id);
+CREATE INDEX IF NOT EXISTS idx_leads_user_lower_name_id ON leads (user_id, LOWER(name), id);
+CREATE INDEX IF NOT EXISTS idx_leads_user_lower_email ON leads (user_id, LOWER(email));
+
+CREATE TABLE IF NOT EXISTS lead_stats (
+    user_id INTEGER NOT NULL,
+    stage TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    lead_count BIGINT NOT NULL DEFAULT 0,
+    scored_count BIGINT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, stage, source)
+);
+
+CREATE OR REPLACE FUNCTION lead_stats_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.withdrawn_at IS NULL THEN
+        UPDATE lead_stats
+        SET lead_count = lead_count - 1,
+            scored_count = scored_count - (CASE WHEN OLD.score IS NULL THEN 0 ELSE 1 END),
+            score_sum = score_sum - COALESCE(OLD.score, 0)
+        WHERE user_id = OLD.user_id AND stage = COALESCE(OLD.stage, '') AND source = COALESCE(OLD.source, '');
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.withdrawn_at IS NULL THEN
+        INSERT INTO lead_stats (user_id, stage, source, lead_count, scored_count, score_sum)
+        VALUES (NEW.user_id, COALESCE(NEW.stage, ''), COALESCE(NEW.source, ''), 1,
+                CASE WHEN NEW.score IS NULL THEN 0 ELSE 1 END, COALESCE(NEW.score, 0))
+        ON CONFLICT (user_id, stage, source) DO UPDATE SET
+            lead_count = lead_stats.lead_count + 1,
+            scored_count = lead_stats.scored_count + EXCLUDED.scored_count,
+            score_sum = lead_stats.score_sum + EXCLUDED.score_sum;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS trg_lead_stats_insert_delete ON leads;
+CREATE TRIGGER trg_lead_stats_insert_delete
+    AFTER INSERT OR DELETE ON leads
+    FOR EACH ROW EXECUTE FUNCTION lead_stats_apply();
+
+DROP TRIGGER IF EXISTS trg_lead_stats_update ON leads;
+CREATE TRIGGER trg_lead_stats_update
+    AFTER UPDATE OF user_id, stage, source, score, withdrawn_at ON leads
+    FOR EACH ROW EXECUTE FUNCTION lead_stats_apply();
+
+-- Seed under a lock so no lead write lands between the snapshot and the trigger going live.
+BEGIN;
+LOCK TABLE leads IN SHARE MODE;
+DELETE FROM lead_stats;
+INSERT INTO lead_stats (user_id, stage, source, lead_count, scored_count, score_sum)
+SELECT user_id, COALESCE(stage, ''), COALESCE(source, ''), COUNT(*), COUNT(score), COALESCE(SUM(score), 0)
+FROM leads WHERE withdrawn_at IS NULL
+GROUP BY user_id, COALESCE(stage, ''), COALESCE(source, '');
+COMMIT;
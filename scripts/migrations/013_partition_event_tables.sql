@@ -0,0 +1,103 @@
+-- Opt-in: monthly range partitions for the append-heavy event tables on Postgres.
+-- Apply via psql / Supabase SQL editor against Postgres, then set EVENT_TABLE_PARTITIONING=1
+-- so core.event_partitions keeps future partitions created and drops expired ones
+-- (CleanupScheduler, or scripts/maintain_event_partitions.py). SQLite uses per-month archive
+-- tables managed by core.event_partitions instead.
+--
+-- fikiri_partition_by_month(table, column) converts one table in place:
+-- 1. the existing table is renamed <table>_legacy and its indexes get a _legacy suffix;
+-- 2. <table> is recreated as PARTITION BY RANGE (column) with the same columns/defaults,
+--    the id sequence, the non-unique indexes and the foreign keys;
+-- 3. <table>_legacy is attached FROM (MINVALUE) TO (the month after its newest row), so no
+--    rows are copied; it is dropped as a whole once retention passes that bound;
+-- 4. <table>_default catches rows for months that have no partition yet.
+-- The parent has no primary key (it would have to include the time column): id stays
+-- sequence-generated and every monthly partition gets PRIMARY KEY (id). Unique indexes
+-- (service_usage_events.idempotency_key, product_events outcome dedupe) are per partition;
+-- writers keep their existing SELECT-before-INSERT checks for cross-month duplicates.
+--
+-- The conversion takes an ACCESS EXCLUSIVE lock and scans each table once to validate the
+-- legacy bound; run it in a maintenance window. It aborts if the time column has NULLs.
+-- Already-partitioned or missing tables are skipped, so the script can be re-run.
+--
+-- Rollback (manual): scripts/migrations/rollback/013_partition_event_tables.sql
+
+CREATE OR REPLACE FUNCTION fikiri_partition_by_month(p_table TEXT, p_column TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_legacy TEXT := p_table || '_legacy';
+    v_kind "char";
+    v_nulls BIGINT;
+    v_upper DATE;
+    v_seq TEXT;
+    r RECORD;
+BEGIN
+    SELECT c.relkind INTO v_kind
+    FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relname = p_table;
+    IF v_kind IS DISTINCT FROM 'r' THEN
+        RAISE NOTICE '% skipped (missing or already partitioned)', p_table;
+        RETURN;
+    END IF;
+
+    EXECUTE format('LOCK TABLE %I IN ACCESS EXCLUSIVE MODE', p_table);
+    EXECUTE format('SELECT COUNT(*) FROM %I WHERE %I IS NULL', p_table, p_column) INTO v_nulls;
+    IF v_nulls > 0 THEN
+        RAISE EXCEPTION '%.% has % NULL rows; backfill or delete them before partitioning',
+            p_table, p_column, v_nulls;
+    END IF;
+    EXECUTE format(
+        'SELECT (date_trunc(''month'', GREATEST(COALESCE(MAX(%I), now()), now())) + interval ''1 month'')::date FROM %I',
+        p_column, p_table
+    ) INTO v_upper;
+
+    v_seq := pg_get_serial_sequence(p_table, 'id');
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, v_legacy);
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE (%I)',
+        p_table, v_legacy, p_column
+    );
+    EXECUTE format('ALTER TABLE %I ALTER COLUMN %I SET NOT NULL', p_table, p_column);
+    IF v_seq IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', v_seq, p_table);
+    END IF;
+
+    -- Non-unique indexes move to the parent under their original names; ATTACH reuses the
+    -- renamed legacy copies instead of rebuilding them.
+    FOR r IN
+        SELECT i.indexrelid::regclass::text AS name, pg_get_indexdef(i.indexrelid) AS def
+        FROM pg_index i
+        WHERE i.indrelid = v_legacy::regclass AND NOT i.indisunique
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', r.name, left(r.name, 56) || '_legacy');
+        EXECUTE format('CREATE INDEX %I ON %I %s', r.name, p_table, substring(r.def FROM ' USING .*$'));
+    END LOOP;
+
+    FOR r IN
+        SELECT conname, pg_get_constraintdef(oid) AS def
+        FROM pg_constraint
+        WHERE conrelid = v_legacy::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s', p_table, r.conname, r.def);
+    END LOOP;
+
+    EXECUTE format(
+        'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (MINVALUE) TO (%L)',
+        p_table, v_legacy, v_upper
+    );
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', p_table || '_default', p_table);
+    RAISE NOTICE '% partitioned by %; legacy rows end before %', p_table, p_column, v_upper;
+END;
+$$;
+
+BEGIN;
+SELECT fikiri_partition_by_month('analytics_events', 'created_at');
+SELECT fikiri_partition_by_month('query_performance_log', 'timestamp');
+SELECT fikiri_partition_by_month('service_usage_events', 'created_at');
+SELECT fikiri_partition_by_month('product_events', 'occurred_at');
+SELECT fikiri_partition_by_month('ai_events', 'created_at');
+SELECT fikiri_partition_by_month('email_events', 'created_at');
+COMMIT;
@@ -0,0 +1,19 @@
+-- Additive: background export job state (core/streaming_export.py).
+-- Apply via psql / Supabase SQL editor against Postgres.
+-- SQLite tests apply the same DDL through db_optimizer (ensure_export_jobs_table).
+
+CREATE TABLE IF NOT EXISTS export_jobs (
+    job_id TEXT PRIMARY KEY,
+    owner_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    mimetype TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size_bytes BIGINT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    finished_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_export_jobs_created ON export_jobs (created_at);
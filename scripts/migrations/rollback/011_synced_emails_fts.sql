@@ -0,0 +1,8 @@
+-- Rollback for 011_synced_emails_fts.sql
+-- Inbox search falls back to LIKE once search_tsv is gone.
+
+DROP INDEX IF EXISTS idx_synced_emails_search_tsv;
+DROP TRIGGER IF EXISTS trg_synced_emails_search_tsv ON synced_emails;
+DROP FUNCTION IF EXISTS synced_emails_search_tsv_refresh();
+ALTER TABLE synced_emails DROP COLUMN IF EXISTS search_tsv;
+DROP FUNCTION IF EXISTS synced_emails_search_tsv(TEXT, TEXT, TEXT, TEXT);
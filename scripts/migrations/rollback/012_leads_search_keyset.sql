@@ -0,0 +1,20 @@
+-- Rollback for 012_leads_search_keyset.sql
+-- Lead search falls back to unindexed LIKE and totals to COUNT(*) once these are gone.
+
+DROP TRIGGER IF EXISTS trg_lead_stats_update ON leads;
+DROP TRIGGER IF EXISTS trg_lead_stats_insert_delete ON leads;
+DROP FUNCTION IF EXISTS lead_stats_apply();
+DROP TABLE IF EXISTS lead_stats;
+
+DROP INDEX IF EXISTS idx_leads_user_lower_email;
+DROP INDEX IF EXISTS idx_leads_user_lower_name_id;
+DROP INDEX IF EXISTS idx_leads_user_score_id;
+DROP INDEX IF EXISTS idx_leads_user_last_contact_id;
+DROP INDEX IF EXISTS idx_leads_user_updated_id;
+DROP INDEX IF EXISTS idx_leads_user_created_id;
+
+DROP INDEX IF EXISTS idx_leads_phone_trgm;
+DROP INDEX IF EXISTS idx_leads_company_trgm;
+DROP INDEX IF EXISTS idx_leads_email_trgm;
+DROP INDEX IF EXISTS idx_leads_name_trgm;
+-- pg_trgm is left installed; other objects may depend on it.
@@ -0,0 +1,72 @@
+-- Rollback for 013_partition_event_tables.sql
+-- Copies every partition back into one plain table per event table (full rewrite under an
+-- ACCESS EXCLUSIVE lock), restores PRIMARY KEY (id) and the unique indexes, and drops the
+-- partitions. Unset EVENT_TABLE_PARTITIONING before running it.
+
+CREATE OR REPLACE FUNCTION fikiri_unpartition_table(p_table TEXT)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_old TEXT := p_table || '_partitioned';
+    v_kind "char";
+    v_seq TEXT;
+    r RECORD;
+BEGIN
+    SELECT c.relkind INTO v_kind
+    FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relname = p_table;
+    IF v_kind IS DISTINCT FROM 'p' THEN
+        RETURN;
+    END IF;
+
+    v_seq := pg_get_serial_sequence(p_table, 'id');
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, v_old);
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS)',
+        p_table, v_old
+    );
+    EXECUTE format('INSERT INTO %I SELECT * FROM %I', p_table, v_old);
+    EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id)', p_table);
+    IF v_seq IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', v_seq, p_table);
+    END IF;
+
+    FOR r IN
+        SELECT i.indexrelid::regclass::text AS name, pg_get_indexdef(i.indexrelid) AS def
+        FROM pg_index i
+        WHERE i.indrelid = v_old::regclass
+    LOOP
+        EXECUTE format('DROP INDEX %I', r.name);
+        EXECUTE format('CREATE INDEX %I ON %I %s', r.name, p_table, substring(r.def FROM ' USING .*$'));
+    END LOOP;
+    FOR r IN
+        SELECT conname, pg_get_constraintdef(oid) AS def
+        FROM pg_constraint
+        WHERE conrelid = v_old::regclass AND contype = 'f'
+    LOOP
+        EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_old, r.conname);
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s', p_table, r.conname, r.def);
+    END LOOP;
+
+    EXECUTE format('DROP TABLE %I CASCADE', v_old);
+END;
+$$;
+
+BEGIN;
+SELECT fikiri_unpartition_table('analytics_events');
+SELECT fikiri_unpartition_table('query_performance_log');
+SELECT fikiri_unpartition_table('service_usage_events');
+SELECT fikiri_unpartition_table('product_events');
+SELECT fikiri_unpartition_table('ai_events');
+SELECT fikiri_unpartition_table('email_events');
+COMMIT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS service_usage_events_idempotency_key_key
+    ON service_usage_events (idempotency_key);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_product_events_outcome_dedupe
+    ON product_events (tenant_id, outcome_dedupe_key)
+    WHERE outcome_dedupe_key IS NOT NULL;
+
+DROP FUNCTION IF EXISTS fikiri_unpartition_table(TEXT);
+DROP FUNCTION IF EXISTS fikiri_partition_by_month(TEXT, TEXT);
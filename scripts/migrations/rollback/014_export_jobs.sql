@@ -0,0 +1,4 @@
+-- Rollback for 014_export_jobs.sql
+-- Safe only when no background export is in flight.
+
+DROP TABLE IF EXISTS export_jobs;
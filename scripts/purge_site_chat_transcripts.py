@@ -58,10 +58,17 @@ def main() -> int:
         default=500,
         help="Max sessions deleted per batch (default 500)",
     )
+    parser.add_argument(
+        "--time-budget-seconds",
+        type=float,
+        default=None,
+        help="Stop after this many seconds; a later run continues the purge (default: no limit)",
+    )
     args = parser.parse_args()
 
     from company_chatbot import config
     from company_chatbot.transcript_store import purge_expired_transcripts
+    from core.batched_purge import purge_deadline
 
     logger.info(
         "Starting site chat transcript purge dry_run=%s batch_size=%s persist=%s retention_days=%s",
@@ -75,6 +82,7 @@ def main() -> int:
         removed = purge_expired_transcripts(
             dry_run=args.dry_run,
             batch_size=args.batch_size,
+            deadline=purge_deadline(args.time_budget_seconds) if args.time_budget_seconds is not None else None,
         )
     except Exception:
         logger.exception("Site chat transcript purge failed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Rescore every CRM lead of one user (e.g. after changing LEAD_SCORING_WEIGHTS).
+
+Calls crm.bulk_import.rescore_user_leads(): leads are scored in batches with
+LeadScoringService.score_leads_batch and each batch writes its changed rows with a
+single UPDATE. Safe to re-run; unchanged scores are not rewritten.
+
+Usage:
+  python3 scripts/rescore_leads.py --user-id 42
+  python3 scripts/rescore_leads.py --user-id 42 --chunk-size 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _load_dotenv() -> None:
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv(os.path.join(ROOT, ".env"), override=False)
+    except ImportError:
+        pass
+
+
+_load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("rescore_leads")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=int, required=True, help="Owner of the leads to rescore")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Leads scored and written per batch (default LEAD_IMPORT_CHUNK_SIZE)",
+    )
+    args = parser.parse_args()
+
+    from crm.bulk_import import LEAD_IMPORT_CHUNK_SIZE, rescore_user_leads
+
+    result = rescore_user_leads(args.user_id, chunk_size=args.chunk_size or LEAD_IMPORT_CHUNK_SIZE)
+    logger.info("Rescored %s leads in %s batches", result["scored"], result["chunks"])
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
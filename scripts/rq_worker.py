@@ -72,6 +72,26 @@ def register_tasks():
     
     logger.info("✅ All tasks registered")
 
+def _release_processing_jobs(queues):
+    """Reliable queue mode: requeue jobs this worker took but did not finish."""
+    for queue in queues:
+        try:
+            released = queue.release_processing_jobs()
+            if released:
+                logger.info(f"↩️ Released {released} unfinished jobs back to {queue.queue_name}")
+        except Exception as e:
+            logger.warning(f"Could not release jobs for {queue.queue_name}: {e}")
+
+def _flush_event_sink():
+    """Write buffered event rows (core.event_sink) before the worker process exits."""
+    try:
+        from core.event_sink import flush_event_sink
+        written = flush_event_sink()
+        if written:
+            logger.info(f"✅ Flushed {written} buffered event rows")
+    except Exception as e:
+        logger.warning(f"Could not flush buffered event rows: {e}")
+
 def start_worker(queue_name: Optional[str] = None):
     """Start RQ worker for specified queue"""
     from core.redis_queues import (
@@ -106,6 +126,8 @@ def start_worker(queue_name: Optional[str] = None):
     # Handle graceful shutdown
     def signal_handler(sig, frame):
         logger.info(f"🛑 Received signal {sig}, shutting down gracefully...")
+        _release_processing_jobs(queues)
+        _flush_event_sink()
         sys.exit(0)
     
     signal.signal(signal.SIGINT, signal_handler)
@@ -139,6 +161,8 @@ def start_worker(queue_name: Optional[str] = None):
             thread.join()
     except KeyboardInterrupt:
         logger.info("🛑 Shutting down workers...")
+        _release_processing_jobs(queues)
+        _flush_event_sink()
         sys.exit(0)
 
 if __name__ == "__main__":
@@ -21,7 +21,10 @@ from core.email_triage_store import (
     list_unclassified_synced,
     upsert_classification,
 )
-from email_automation.email_triage_engine import classify_email_triage
+from email_automation.email_triage_engine import (
+    classify_email_triage,
+    classify_email_triage_batch,
+)
 from email_automation.email_workflow_state import (
     mark_classification_failed,
     mark_classified,
@@ -92,17 +95,20 @@ def triage_and_store_synced_message(
     synced_email_id: Optional[int] = None,
     headers: Optional[Dict[str, Any]] = None,
     analysis: Optional[Dict[str, Any]] = None,
+    triage: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    triage = classify_email_triage(
-        subject=subject,
-        body=body,
-        sender_email=sender_email,
-        sender_name=sender_name,
-        headers=headers,
-        user_id=user_id,
-        analysis=analysis,
-        allow_ai=analysis is None,
-    )
+    """Classify (unless ``triage`` was precomputed by a batch) and persist one message."""
+    if triage is None:
+        triage = classify_email_triage(
+            subject=subject,
+            body=body,
+            sender_email=sender_email,
+            sender_name=sender_name,
+            headers=headers,
+            user_id=user_id,
+            analysis=analysis,
+            allow_ai=analysis is None,
+        )
     upsert_classification(
         user_id,
         external_id=external_id,
@@ -166,48 +172,118 @@ def list_triage_inbox(
     return data
 
 
-def classify_unclassified_synced(user_id: int, *, limit: int = 50) -> Dict[str, Any]:
-    """Classify synced rows missing email_classifications (e.g. after failed sync triage)."""
-    rows = list_unclassified_synced(user_id, limit=limit)
+UNCLASSIFIED_PAGE_SIZE = 100
+MAX_UNCLASSIFIED_PER_RUN = 2000
+
+
+def _sender_parts(sender: str) -> tuple:
+    email_addr = sender
+    if "<" in sender and ">" in sender:
+        email_addr = sender.split("<")[1].split(">")[0].strip()
+    name = sender.split("<")[0].strip() if "<" in sender else sender
+    return email_addr, name
+
+
+def _triage_analyze_fn(use_ai: bool):
+    """Mailbox LLM analysis for batch triage, or None when AI is off/unconfigured."""
+    if not use_ai:
+        return None
+    try:
+        from email_automation.ai_assistant import MinimalAIEmailAssistant
+
+        assistant = MinimalAIEmailAssistant()
+        return assistant.analyze_incoming_email if assistant.is_enabled() else None
+    except Exception as exc:
+        logger.warning("batch triage AI unavailable: %s", exc)
+        return None
+
+
+def classify_unclassified_synced(
+    user_id: int,
+    *,
+    limit: int = 50,
+    use_ai: bool = False,
+) -> Dict[str, Any]:
+    """
+    Classify synced rows missing email_classifications (e.g. after failed sync triage).
+
+    Rows are read in id-keyset pages of ``UNCLASSIFIED_PAGE_SIZE`` (up to
+    ``MAX_UNCLASSIFIED_PER_RUN``), so rows skipped or failed on one page never stall the
+    scan of older ones, and triaged per page with ``classify_email_triage_batch``; ``use_ai`` sends uncertain
+    rows to the mailbox LLM analysis with bounded concurrency.
+    """
+    limit = max(1, min(MAX_UNCLASSIFIED_PER_RUN, int(limit or 50)))
+    analyze_fn = _triage_analyze_fn(use_ai)
     classified: List[Dict[str, Any]] = []
     scanned = 0
     skipped_existing = 0
     failed = 0
-    for row in rows:
-        scanned += 1
-        sender = row.get("sender") or ""
-        email_addr = sender
-        if "<" in sender and ">" in sender:
-            email_addr = sender.split("<")[1].split(">")[0].strip()
-        eid = str(row.get("external_id") or "")
-        prov = row.get("provider") or "gmail"
-        if not eid:
-            failed += 1
-            continue
-        if not should_classify_email(user_id, eid, prov, force=False):
-            skipped_existing += 1
-            continue
+    before_id: Optional[int] = None
+    while scanned < limit:
+        page_size = min(UNCLASSIFIED_PAGE_SIZE, limit - scanned)
+        page = list_unclassified_synced(user_id, limit=page_size, before_id=before_id)
+        if not page:
+            break
+        before_id = min(int(row["id"]) for row in page)
+        todo: List[Dict[str, Any]] = []
+        for row in page:
+            scanned += 1
+            eid = str(row.get("external_id") or "")
+            prov = row.get("provider") or "gmail"
+            if not eid:
+                failed += 1
+                continue
+            if not should_classify_email(user_id, eid, prov, force=False):
+                skipped_existing += 1
+                continue
+            todo.append(row)
+
+        batch_input = []
+        for row in todo:
+            email_addr, name = _sender_parts(row.get("sender") or "")
+            batch_input.append(
+                {
+                    "subject": row.get("subject") or "",
+                    "body": row.get("body") or "",
+                    "sender_email": email_addr,
+                    "sender_name": name,
+                }
+            )
         try:
-            triage = triage_and_store_synced_message(
-                user_id,
-                external_id=eid,
-                subject=row.get("subject") or "",
-                body=row.get("body") or "",
-                sender_email=email_addr,
-                sender_name=sender.split("<")[0].strip() if "<" in sender else sender,
-                provider=prov,
-                synced_email_id=int(row["id"]) if row.get("id") is not None else None,
+            triages = classify_email_triage_batch(
+                batch_input, user_id=user_id, allow_ai=True, analyze_fn=analyze_fn
             )
-            classified.append({"email_id": eid, "triage": triage})
         except Exception as exc:
-            failed += 1
-            logger.warning("classify_unclassified failed user=%s id=%s: %s", user_id, eid, exc)
+            logger.warning("classify_unclassified batch triage failed user=%s: %s", user_id, exc)
+            triages = [None] * len(todo)
+
+        for row, item, precomputed in zip(todo, batch_input, triages):
+            eid = str(row.get("external_id") or "")
+            prov = row.get("provider") or "gmail"
             try:
-                mark_classification_failed(
-                    user_id, eid, provider=prov, source="classify_unclassified"
+                triage = triage_and_store_synced_message(
+                    user_id,
+                    external_id=eid,
+                    subject=item["subject"],
+                    body=item["body"],
+                    sender_email=item["sender_email"],
+                    sender_name=item["sender_name"],
+                    provider=prov,
+                    synced_email_id=int(row["id"]) if row.get("id") is not None else None,
+                    triage=precomputed or None,
                 )
-            except Exception as wf_exc:
-                logger.debug("mark_classification_failed skipped: %s", wf_exc)
+                classified.append({"email_id": eid, "triage": triage})
+            except Exception as exc:
+                failed += 1
+                logger.warning("classify_unclassified failed user=%s id=%s: %s", user_id, eid, exc)
+                try:
+                    mark_classification_failed(
+                        user_id, eid, provider=prov, source="classify_unclassified"
+                    )
+                except Exception as wf_exc:
+                    logger.debug("mark_classification_failed skipped: %s", wf_exc)
+        if len(page) < page_size:
+            break
     count = len(classified)
     result = {
         "classified": classified,
@@ -92,6 +92,18 @@ def fake_redis():
     return FakeRedis()
 
 
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Real DatabaseOptimizer on a throwaway SQLite file with the full app schema.
+
+    Patch it over the module under test's ``db_optimizer``; see tests/db_test_util.py for
+    ``insert_test_user`` (foreign keys are on) and ``capture_sql`` (statement counts).
+    """
+    from tests.db_test_util import sqlite_test_optimizer
+
+    return sqlite_test_optimizer(str(tmp_path / "fikiri.db"))
+
+
 @pytest.fixture
 def mock_gmail_client():
     """Mock Gmail client for email_automation tests."""
@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
+import atexit
 import os
-from typing import Optional
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from unittest.mock import patch
 
 from core.postgres_compat import is_postgresql_dsn
 
@@ -32,3 +38,94 @@ def skip_unless_postgres(reason: str = "Postgres test DSN not configured"):
     import unittest
 
     return unittest.skipUnless(postgres_dsn_for_tests(), reason)
+
+
+_SQLITE_STATEMENT_PREFIXES = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+_sqlite_template_path: Optional[str] = None
+_sqlite_template_lock = threading.Lock()
+
+
+def _sqlite_schema_template() -> str:
+    """Bootstrap the full app schema once per process into a throwaway SQLite file."""
+    global _sqlite_template_path
+    with _sqlite_template_lock:
+        if _sqlite_template_path is None:
+            from core.database_optimization import DatabaseOptimizer
+
+            tmp_dir = tempfile.mkdtemp(prefix="fikiri_schema_")
+            atexit.register(shutil.rmtree, tmp_dir, True)
+            path = os.path.join(tmp_dir, "template.db")
+            with patch.dict(os.environ, {"FIKIRI_FORCE_SQLITE": "1"}):
+                DatabaseOptimizer(db_path=path)
+            _sqlite_template_path = path
+    return _sqlite_template_path
+
+
+def sqlite_test_optimizer(db_path: str):
+    """
+    Real ``DatabaseOptimizer`` on a fresh SQLite file at ``db_path`` with the full app schema
+    (tables, indexes, ``_run_migrations``). The bootstrap runs once per process; each call
+    copies that file, so module-level ``CREATE TABLE IF NOT EXISTS`` paths still run for real.
+    """
+    from core.database_optimization import DatabaseOptimizer
+
+    shutil.copyfile(_sqlite_schema_template(), db_path)
+    with patch.dict(os.environ, {"FIKIRI_FORCE_SQLITE": "1"}):
+        return DatabaseOptimizer(db_path=db_path)
+
+
+def use_isolated_idempotency_store(test_case) -> None:
+    """
+    Point ``core.idempotency_manager`` at a fresh SQLite file (and an empty in-process cache)
+    for the rest of ``test_case``, so completed keys stored by earlier runs against the shared
+    test database cannot replay a result instead of running the code under test.
+    """
+    from core import idempotency_manager as idem
+
+    tmp = tempfile.TemporaryDirectory()
+    test_case.addCleanup(tmp.cleanup)
+    for target in (
+        patch.object(idem, "db_optimizer", sqlite_test_optimizer(os.path.join(tmp.name, "idempotency.db"))),
+        patch.object(idem.idempotency_manager, "_local", {}),
+    ):
+        target.start()
+        test_case.addCleanup(target.stop)
+    idem.idempotency_manager._initialize_tables()
+
+
+def insert_test_user(db, user_id: int = 1, email: Optional[str] = None) -> int:
+    """users row for foreign keys (SQLite enforces them via PRAGMA foreign_keys=ON)."""
+    db.execute_query(
+        "INSERT INTO users (id, email, name, password_hash) VALUES (?, ?, ?, ?)",
+        (user_id, email or f"user{user_id}@example.test", f"User {user_id}", "x"),
+        fetch=False,
+    )
+    return user_id
+
+
+@contextmanager
+def capture_sql(db) -> Iterator[List[str]]:
+    """
+    Collect the SELECT/DML statements ``db`` (a SQLite ``DatabaseOptimizer``) runs inside the
+    block, whitespace-collapsed, via ``execute_query``, ``transaction`` and ``iter_query``
+    alike. sqlite3 reports statements with bound values expanded in place of ``?``.
+    """
+    statements: List[str] = []
+    get_connection = db.get_connection
+
+    def _trace(sql: str) -> None:
+        flat = " ".join(sql.split())
+        if flat.upper().startswith(_SQLITE_STATEMENT_PREFIXES):
+            statements.append(flat)
+
+    @contextmanager
+    def _traced(*args, **kwargs):
+        with get_connection(*args, **kwargs) as conn:
+            conn.set_trace_callback(_trace)
+            try:
+                yield conn
+            finally:
+                conn.set_trace_callback(None)
+
+    with patch.object(db, "get_connection", _traced):
+        yield statements
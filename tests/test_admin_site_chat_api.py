@@ -137,6 +137,24 @@ def test_admin_can_export_copy_friendly_transcript(client, monkeypatch):
     assert len(audits) == 1
 
 
+def test_admin_can_stream_ndjson_transcript_export(client, monkeypatch):
+    monkeypatch.setenv("FIKIRI_SITE_BOT_PERSIST_TRANSCRIPTS", "1")
+    monkeypatch.setattr("routes.admin_site_chat_api.get_current_user_id", lambda: 9)
+    monkeypatch.setattr("routes.admin_site_chat_api._is_admin_user", lambda _uid: True)
+    _seed_transcript("site_export_stream")
+
+    response = client.get("/api/admin/site-chat/sessions/site_export_stream/export?format=ndjson")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert "attachment" in response.headers["Content-Disposition"]
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[0]["type"] == "session" and lines[0]["session_id"] == "site_export_stream"
+    assert [line["role"] for line in lines[1:]] == ["user", "assistant"]
+
+    missing = client.get("/api/admin/site-chat/sessions/nope/export?stream=1")
+    assert missing.status_code == 404
+
+
 def test_owner_role_can_read_transcripts(client, monkeypatch):
     monkeypatch.setenv("FIKIRI_SITE_BOT_PERSIST_TRANSCRIPTS", "1")
     monkeypatch.setattr("routes.admin_site_chat_api.get_current_user_id", lambda: 3)
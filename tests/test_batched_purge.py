@@ -0,0 +1,114 @@
+"""Batched retention purges: key-range batches, time budget cursor and scheduler wiring."""
+
+import itertools
+import os
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from core import batched_purge, cleanup_scheduler
+from core.batched_purge import purge_in_batches
+from core.cleanup_scheduler import CleanupScheduler
+from tests.db_test_util import capture_sql, insert_test_user
+
+OLD = "2020-01-01T00:00:00"
+NEW = "2999-01-01T00:00:00"
+
+
+def _count(db, table):
+    return db.execute_query(f"SELECT COUNT(*) AS n FROM {table}")[0]["n"]
+
+
+@pytest.fixture
+def db(sqlite_db):
+    for i in range(25):
+        sqlite_db.execute_query(
+            "INSERT INTO analytics_events (event_type, created_at) VALUES ('page_view', ?)",
+            (OLD if i % 5 else NEW,),
+            fetch=False,
+        )
+    return sqlite_db
+
+
+def test_deletes_matching_rows_in_key_range_batches(db):
+    with capture_sql(db) as statements:
+        stats = purge_in_batches("analytics_events", "created_at < ?", (NEW,), batch_size=7, pause_seconds=0, db=db)
+
+    assert (stats.deleted, stats.batches, stats.complete, stats.cursor) == (20, 3, True, None)
+    assert _count(db, "analytics_events") == 5
+    deletes = [s for s in statements if s.startswith("DELETE")]
+    assert deletes == [
+        "DELETE FROM analytics_events WHERE id <= 9 AND (created_at < '2999-01-01T00:00:00')",
+        "DELETE FROM analytics_events WHERE id > 9 AND id <= 18 AND (created_at < '2999-01-01T00:00:00')",
+        "DELETE FROM analytics_events WHERE id > 18 AND id <= 25 AND (created_at < '2999-01-01T00:00:00')",
+    ]
+
+
+def test_deadline_returns_resumable_cursor(db):
+    clock = itertools.count()
+    with patch.object(batched_purge.time, "monotonic", lambda: next(clock)):
+        first = purge_in_batches(
+            "analytics_events", "created_at < ?", (NEW,), batch_size=4, pause_seconds=0, deadline=2, db=db
+        )
+    assert not first.complete and first.deleted == 4 and first.cursor == 5
+
+    with capture_sql(db) as statements:
+        rest = purge_in_batches(
+            "analytics_events", "created_at < ?", (NEW,), batch_size=4, pause_seconds=0, cursor=first.cursor, db=db
+        )
+    assert rest.complete and first.deleted + rest.deleted == 20
+    assert "id > 5" in [s for s in statements if s.startswith("SELECT")][0]
+
+
+def test_or_condition_stays_inside_key_range(db):
+    insert_test_user(db, 1)
+    for i, (expires_at, is_valid) in enumerate([(OLD, 1), (NEW, 0), (NEW, 1), (NEW, 1), (OLD, 1)]):
+        db.execute_query(
+            "INSERT INTO user_sessions (user_id, session_id, expires_at, is_valid) VALUES (1, ?, ?, ?)",
+            (f"s{i}", expires_at, is_valid),
+            fetch=False,
+        )
+    clock = itertools.count()
+    with patch.object(batched_purge.time, "monotonic", lambda: next(clock)):
+        first = purge_in_batches(
+            "user_sessions", "expires_at < ? OR is_valid = 0", (NEW,), batch_size=1, pause_seconds=0,
+            deadline=2, db=db,
+        )
+    # only id 1 is in the first range; the invalid session (id 2) must wait for its own batch
+    assert first.deleted == 1 and _count(db, "user_sessions") == 4
+
+    rest = purge_in_batches(
+        "user_sessions", "expires_at < ? OR is_valid = 0", (NEW,), batch_size=1, pause_seconds=0,
+        cursor=first.cursor, db=db,
+    )
+    assert rest.deleted == 2
+    assert [r["id"] for r in db.execute_query("SELECT id FROM user_sessions ORDER BY id")] == [3, 4]
+
+
+def test_before_delete_sees_each_range(db):
+    ranges = []
+    purge_in_batches(
+        "analytics_events", "created_at < ?", (NEW,), batch_size=10, pause_seconds=0,
+        before_delete=lambda lo, hi: ranges.append((lo, hi)), db=db,
+    )
+    assert ranges == [(None, 13), (13, 25)]
+
+
+def test_scheduler_resumes_table_across_cycles(db):
+    scheduler = CleanupScheduler()
+    scheduler.purge_batch_size = 6
+    clock = itertools.count()
+    with patch.object(cleanup_scheduler, "db_optimizer", db), patch.object(
+        batched_purge, "PURGE_PAUSE_MS", 0
+    ):
+        with patch.object(batched_purge.time, "monotonic", lambda: next(clock)):
+            first = scheduler.cleanup_old_analytics_events(deadline=2)
+        assert first["complete"] is False and first["deleted_count"] == 6
+        assert scheduler.purge_stats["analytics"]["cursor"] == 8
+
+        second = scheduler.run_manual_cleanup("analytics")["analytics"]
+    assert second["complete"] is True and second["deleted_count"] == 14
+    assert scheduler._purge_cursors["analytics"] is None
+    assert _count(db, "analytics_events") == 5
@@ -154,6 +154,26 @@ class TestBusinessRoutes(unittest.TestCase):
         _, kwargs = mock_crm.get_leads_summary.call_args
         self.assertEqual(kwargs["offset"], 25)
 
+    @patch("routes.business.get_current_user_id")
+    @patch("routes.business.enhanced_crm_service")
+    def test_get_leads_passes_cursor_and_rejects_stale_one(self, mock_crm, mock_get_user):
+        mock_get_user.return_value = 1
+        self._mock_leads_summary(mock_crm)
+        mock_crm.get_leads_summary.return_value["data"]["next_cursor"] = "next"
+
+        response = self.client.get("/api/crm/leads?cursor=abc&limit=10")
+
+        self.assertEqual(response.status_code, 200)
+        _, kwargs = mock_crm.get_leads_summary.call_args
+        self.assertEqual(kwargs["cursor"], "abc")
+        self.assertEqual(response.get_json()["data"]["pagination"]["next_cursor"], "next")
+
+        mock_crm.get_leads_summary.return_value = {
+            "success": False, "error": "Invalid or stale cursor", "error_code": "INVALID_CURSOR"
+        }
+        response = self.client.get("/api/crm/leads?cursor=stale")
+        self.assertEqual(response.status_code, 400)
+
     @patch("routes.business.get_current_user_id")
     @patch("routes.business.enhanced_crm_service")
     def test_get_leads_limit_clamps_to_current_bounds(self, mock_crm, mock_get_user):
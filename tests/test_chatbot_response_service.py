@@ -15,6 +15,7 @@ from core.chatbot_response_service import (
     ChatbotAnswerResult,
     build_chatbot_prompt,
     generate_chatbot_answer,
+    stream_chatbot_answer,
 )
 
 
@@ -122,5 +123,52 @@ class TestChatbotResponseService(unittest.TestCase):
         self.assertTrue(result.fallback_used)
 
 
+class TestStreamChatbotAnswer(unittest.TestCase):
+    _sources = [{"type": "knowledge_base", "id": "doc_1", "title": "Hours", "content": "Open 9-5", "relevance": 0.9}]
+
+    @patch("core.chatbot_response_service.LLMRouter")
+    def test_streams_tokens_then_result(self, mock_router_cls):
+        mock_router_cls.return_value.process_stream.return_value = iter([
+            {"type": "token", "content": "We are "},
+            {"type": "token", "content": "open 9-5."},
+            {"type": "done", "success": True, "validated": True, "content": "We are open 9-5.",
+             "trace_id": "trace_s", "first_token_ms": 20.0},
+        ])
+        items = list(stream_chatbot_answer("hours?", "KB: Open 9-5", self._sources, tenant_id="t1", user_id=5))
+
+        self.assertEqual(items[:2], ["We are ", "open 9-5."])
+        result = items[-1]
+        self.assertIsInstance(result, ChatbotAnswerResult)
+        self.assertEqual(result.answer, "We are open 9-5.")
+        self.assertFalse(result.fallback_used)
+        self.assertEqual(result.llm_trace_id, "trace_s")
+        self.assertTrue(result.response_metadata["llm_success"])
+        self.assertEqual(result.response_metadata["first_token_ms"], 20.0)
+        prompt = mock_router_cls.return_value.process_stream.call_args[1]["input_data"]
+        self.assertNotIn("Return JSON", prompt)
+
+    @patch("core.chatbot_response_service.LLMRouter")
+    def test_low_retrieval_confidence_skips_llm(self, mock_router_cls):
+        weak = [{"type": "knowledge_base", "id": "d", "title": "t", "content": "c", "relevance": 0.1}]
+        items = list(stream_chatbot_answer("hours?", "ctx", weak, tenant_id=None, user_id=None))
+        mock_router_cls.assert_not_called()
+        self.assertEqual(len(items), 2)
+        self.assertEqual(items[0], items[1].answer)
+        self.assertTrue(items[1].fallback_used)
+
+    @patch("core.chatbot_response_service.LLMRouter")
+    def test_llm_failure_before_tokens_streams_fallback(self, mock_router_cls):
+        mock_router_cls.return_value.process_stream.return_value = iter([
+            {"type": "done", "success": False, "content": "", "error": "boom"},
+        ])
+        cfg = ChatbotConfig(fallback_message="Custom fallback from Acme.")
+        items = list(stream_chatbot_answer(
+            "hours?", "KB", self._sources, tenant_id=None, user_id=None, chatbot_config=cfg,
+        ))
+        self.assertEqual(items[0], "Custom fallback from Acme.")
+        self.assertTrue(items[-1].fallback_used)
+        self.assertTrue(items[-1].response_metadata["llm_attempted"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,128 @@
+"""Versioned, hot-reloadable site bot corpus index."""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from company_chatbot import config
+from company_chatbot.retrieval import (
+    clear_kb_cache_for_tests,
+    kb_index_version,
+    read_index_snapshot,
+    refresh_kb_index,
+    retrieve,
+    wait_for_kb_rebuild_for_tests,
+)
+
+os.environ.setdefault("FIKIRI_SITE_BOT_TEST_MODE", "1")
+
+
+def _row(chunk_id: str, text: str, keywords):
+    return {
+        "id": chunk_id,
+        "topic": "product",
+        "source_url": "https://fikirisolutions.com",
+        "keywords": keywords,
+        "text": text,
+    }
+
+
+def _write_kb(kb_dir, rows):
+    path = kb_dir / "fikiri_kb_chunks.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+    return path
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+@pytest.fixture
+def kb_dir(tmp_path, monkeypatch):
+    shutil.copy(
+        config.project_root() / "data" / "company_chatbot" / "fikiri_capability_map.json",
+        tmp_path / "fikiri_capability_map.json",
+    )
+    _write_kb(tmp_path, [_row("kb_walrus", "Walrus tusk polishing service.", ["walrus"])])
+    monkeypatch.setenv("FIKIRI_SITE_BOT_KB_DIR", str(tmp_path))
+    clear_kb_cache_for_tests()
+    yield tmp_path
+    clear_kb_cache_for_tests()
+
+
+def _ids(query):
+    return [chunk.id for chunk in retrieve(query).chunks]
+
+
+def test_version_tracks_content_hash(kb_dir):
+    assert "kb_walrus" in _ids("walrus tusk")
+    first = kb_index_version()
+    assert first is not None and first.generation >= 1
+
+    # Touching the file without changing content keeps the same index.
+    _bump_mtime(kb_dir / "fikiri_kb_chunks.jsonl")
+    assert refresh_kb_index().generation == first.generation
+
+
+def test_refresh_picks_up_edits(kb_dir):
+    assert "kb_walrus" in _ids("walrus tusk")
+    path = _write_kb(kb_dir, [_row("kb_narwhal", "Narwhal horn detailing.", ["narwhal"])])
+    _bump_mtime(path)
+
+    version = refresh_kb_index()
+    assert version.generation >= 2
+    assert _ids("narwhal horn") == ["kb_narwhal"]
+    assert "kb_walrus" not in _ids("walrus tusk")
+
+
+def test_background_rebuild_swaps_index(kb_dir, monkeypatch):
+    monkeypatch.setenv("FIKIRI_SITE_BOT_KB_RELOAD_SECONDS", "0.0001")
+    assert "kb_walrus" in _ids("walrus tusk")
+    before = kb_index_version().generation
+
+    path = _write_kb(kb_dir, [_row("kb_narwhal", "Narwhal horn detailing.", ["narwhal"])])
+    _bump_mtime(path)
+
+    # The request that notices the change is still served from the previous index.
+    retrieve("narwhal horn")
+    wait_for_kb_rebuild_for_tests()
+    assert kb_index_version().generation > before
+    assert _ids("narwhal horn") == ["kb_narwhal"]
+
+
+def test_watch_disabled_keeps_index(kb_dir, monkeypatch):
+    monkeypatch.setenv("FIKIRI_SITE_BOT_KB_RELOAD_SECONDS", "0")
+    assert "kb_walrus" in _ids("walrus tusk")
+    path = _write_kb(kb_dir, [_row("kb_narwhal", "Narwhal horn detailing.", ["narwhal"])])
+    _bump_mtime(path)
+    assert "kb_narwhal" not in _ids("narwhal horn")
+
+
+def test_snapshot_round_trip(kb_dir, tmp_path_factory, monkeypatch):
+    snapshot = tmp_path_factory.mktemp("snap") / "kb_index.bin"
+    monkeypatch.setenv("FIKIRI_SITE_BOT_KB_INDEX_SNAPSHOT", str(snapshot))
+
+    assert "kb_walrus" in _ids("walrus tusk")
+    built = kb_index_version()
+    assert not built.from_snapshot
+    assert snapshot.is_file()
+    assert read_index_snapshot(snapshot, "not-the-hash") is None
+
+    # A fresh worker with the same KB content loads the snapshot instead of re-tokenizing.
+    clear_kb_cache_for_tests()
+    assert "kb_walrus" in _ids("walrus tusk")
+    loaded = kb_index_version()
+    assert loaded.from_snapshot
+    assert loaded.sha256 == built.sha256
+
+
+def test_corrupt_snapshot_falls_back_to_build(kb_dir, tmp_path_factory, monkeypatch):
+    snapshot = tmp_path_factory.mktemp("snap") / "kb_index.bin"
+    snapshot.write_bytes(b"garbage")
+    monkeypatch.setenv("FIKIRI_SITE_BOT_KB_INDEX_SNAPSHOT", str(snapshot))
+
+    assert "kb_walrus" in _ids("walrus tusk")
+    assert not kb_index_version().from_snapshot
@@ -286,3 +286,26 @@ def test_purge_preserves_recent_sessions(monkeypatch):
     assert removed == 1
     assert get_transcript_session("site_keep") is not None
     assert get_transcript_session("site_drop") is None
+
+
+def test_streamed_export_matches_buffered_export(monkeypatch):
+    from company_chatbot.transcript_store import build_transcript_export, iter_transcript_export
+
+    monkeypatch.setenv("FIKIRI_SITE_BOT_PERSIST_TRANSCRIPTS", "1")
+    for _ in range(3):
+        persist_message_turn(
+            session_id="site_stream_1",
+            user_message="What is Fikiri?",
+            result=_sample_result(),
+            source_page="https://fikirisolutions.com/pricing",
+            client_ip="203.0.113.50",
+            user_agent="pytest-agent/1.0",
+        )
+
+    text = iter_transcript_export("site_stream_1")
+    assert "".join(text["chunks"]) == build_transcript_export("site_stream_1")["content"]
+
+    lines = [json.loads(line) for line in "".join(iter_transcript_export("site_stream_1", "ndjson")["chunks"]).splitlines()]
+    assert lines[0]["type"] == "session" and lines[0]["session_id"] == "site_stream_1"
+    assert [line["role"] for line in lines[1:]] == ["user", "assistant"] * 3
+    assert iter_transcript_export("missing_session") is None
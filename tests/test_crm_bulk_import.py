@@ -0,0 +1,169 @@
+"""Chunked bulk lead import: set-based lookups, per-chunk transactions and the deferred follow-up."""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from crm import bulk_import
+from tests.db_test_util import capture_sql, insert_test_user
+
+
+def _leads(db):
+    return db.execute_query("SELECT id, email, name, phone, company, score, withdrawn_at FROM leads ORDER BY id")
+
+
+@pytest.fixture
+def db(sqlite_db):
+    insert_test_user(sqlite_db, 7)
+    with patch.object(bulk_import, "db_optimizer", sqlite_db), patch.object(
+        bulk_import, "schedule_lead_import_followup", return_value="job-1"
+    ) as schedule:
+        sqlite_db.schedule = schedule
+        yield sqlite_db
+
+
+def _rows(n, start=0, **extra):
+    return ({"email": f" Lead{i}@Example.test ", "name": f"Lead {i}", **extra} for i in range(start, start + n))
+
+
+def test_streams_chunks_with_one_lookup_and_insert_per_chunk(db):
+    progress = []
+    with capture_sql(db) as statements:
+        result = bulk_import.bulk_import_leads(7, _rows(5), chunk_size=2, progress_cb=progress.append)
+
+    assert result["created"] == 5 and result["total"] == 5 and result["chunks"] == 3
+    assert [p["processed"] for p in progress] == [2, 4, 5]
+    lookups = [s for s in statements if s.startswith("SELECT id, lower(email)")]
+    inserts = [s for s in statements if s.startswith("INSERT INTO leads")]
+    assert len(lookups) == 3 and len(inserts) == 3
+    assert [r["email"] for r in _leads(db)] == [f"lead{i}@example.test" for i in range(5)]
+    created_ids, updated = db.schedule.call_args.args[1:3]
+    assert created_ids == [1, 2, 3, 4, 5] and updated == []
+    assert result["followup_job_id"] == "job-1"
+
+
+def test_existing_leads_update_merge_and_skip(db):
+    bulk_import.bulk_import_leads(7, _rows(2, phone="555"))
+    db.execute_query("UPDATE leads SET withdrawn_at = '2026-01-01' WHERE id = 1", fetch=False)
+
+    merged = bulk_import.bulk_import_leads(
+        7, [{"email": "lead0@example.test", "name": "Renamed", "phone": ""}], on_duplicate="merge"
+    )
+    assert merged["updated"] == 1
+    row = _leads(db)[0]
+    assert (row["name"], row["phone"], row["withdrawn_at"]) == ("Renamed", "555", None)
+
+    overwritten = bulk_import.bulk_import_leads(7, [{"email": "LEAD1@example.test", "name": "B", "phone": None}])
+    assert overwritten["updated"] == 1
+    assert _leads(db)[1]["phone"] is None
+    updated = db.schedule.call_args.args[2]
+    assert updated == [{"id": 2, "fields": ["name", "phone"], "old_stage": "new", "old_score": 0}]
+
+    skipped = bulk_import.bulk_import_leads(7, _rows(3), on_duplicate="skip")
+    assert (skipped["created"], skipped["skipped_duplicate"]) == (1, 2)
+
+
+def test_in_file_duplicates_and_invalid_rows(db):
+    result = bulk_import.bulk_import_leads(
+        7,
+        [
+            {"email": "a@example.test", "name": "First", "company": "Acme"},
+            {"email": "A@example.test", "name": "Second", "company": ""},
+            {"email": "", "name": "No email"},
+        ],
+        on_duplicate="merge",
+    )
+    assert result["created"] == 1 and result["merged_in_file"] == 1
+    assert result["errors"] == [{"lead": {"email": "", "name": "No email"}, "error": "Missing required field: email/name"}]
+    row = db.execute_query("SELECT name, company FROM leads")[0]
+    assert (row["name"], row["company"]) == ("Second", "Acme")
+
+
+def test_skip_mode_counts_in_file_repeats_as_duplicates(db):
+    result = bulk_import.bulk_import_leads(
+        7,
+        [{"email": "a@example.test", "name": "First"}, {"email": "A@example.test", "name": "Second"}],
+        on_duplicate="skip",
+    )
+    assert (result["created"], result["skipped_duplicate"], result["merged_in_file"]) == (1, 1, 0)
+    assert db.execute_query("SELECT name FROM leads")[0]["name"] == "First"
+
+
+def test_lead_created_concurrently_is_not_reported_as_imported(db):
+    real = bulk_import._existing_leads
+
+    def _lookup_then_race(user_id, emails):
+        found = real(user_id, emails)
+        # Another writer creates lead1 between the lookup and the INSERT.
+        db.execute_query(
+            "INSERT INTO leads (user_id, email, name) VALUES (7, 'lead1@example.test', 'Other writer')", fetch=False
+        )
+        return found
+
+    with patch.object(bulk_import, "_existing_leads", side_effect=_lookup_then_race):
+        result = bulk_import.bulk_import_leads(7, _rows(3))
+    assert (result["created"], result["skipped_duplicate"]) == (2, 1)
+    created_ids = db.schedule.call_args.args[1]
+    emails = {r["id"]: r["email"] for r in _leads(db)}
+    assert sorted(emails[i] for i in created_ids) == ["lead0@example.test", "lead2@example.test"]
+    activities = db.execute_query("SELECT lead_id FROM lead_activities WHERE description = 'Lead imported'")
+    assert sorted(a["lead_id"] for a in activities) == sorted(created_ids)
+
+
+def test_failed_chunk_rolls_back_and_later_chunks_continue(db):
+    real = bulk_import._insert_values
+
+    def _boom(user_id, item):
+        if item["email"] == "lead2@example.test":
+            raise ValueError("bad row")
+        return real(user_id, item)
+
+    with patch.object(bulk_import, "_insert_values", side_effect=_boom):
+        result = bulk_import.bulk_import_leads(7, _rows(6), chunk_size=2)
+    assert result["created"] == 4
+    assert result["errors"] == [{"chunk": 2, "rows": 2, "error": "bad row"}]
+    assert len(_leads(db)) == 4
+
+
+def test_followup_scores_and_emits_events(db):
+    bulk_import.bulk_import_leads(7, _rows(2, source="referral"))
+    with patch("crm.service.db_optimizer", db), patch.object(bulk_import, "record_crm_event") as events, patch(
+        "services.automation_engine.automation_engine.execute_automation_rules"
+    ) as rules:
+        result = bulk_import.run_lead_import_followup(7, [1, 2], [])
+    assert result == {"success": True, "scored": 2, "created": 2, "updated": 0}
+    assert all(r["score"] > 0 for r in _leads(db))
+    meta = json.loads(db.execute_query("SELECT metadata FROM leads WHERE id = 1")[0]["metadata"])
+    assert "lead_quality" in meta and "score_breakdown" in meta
+    assert [c.kwargs["event_type"] for c in events.call_args_list].count("lead.created") == 2
+    assert rules.call_count == 2
+    activities = db.execute_query("SELECT description FROM lead_activities")
+    assert [a["description"] for a in activities] == ["Lead imported", "Lead imported"]
+
+
+def test_service_import_leads_delegates(db):
+    from crm.service import enhanced_crm_service
+
+    result = enhanced_crm_service.import_leads(7, list(_rows(2)), on_duplicate="bogus")
+    assert result["success"] is True
+    assert result["data"]["created"] == 2 and result["data"]["followup_job_id"] == "job-1"
+
+
+def test_rescore_user_leads_writes_changed_rows_in_one_update(db):
+    bulk_import.bulk_import_leads(7, _rows(5, source="referral"))
+    with patch("crm.service.db_optimizer", db):
+        with capture_sql(db) as statements:
+            first = bulk_import.rescore_user_leads(7, chunk_size=3)
+        updates = [s for s in statements if s.startswith("UPDATE leads SET score = CASE id")]
+        assert first == {"success": True, "scored": 5, "chunks": 2}
+        assert len(updates) == 2
+        assert all(r["score"] > 0 for r in _leads(db))
+
+        with capture_sql(db) as statements:
+            again = bulk_import.rescore_user_leads(7)
+    assert again["scored"] == 5
+    assert not any(s.startswith("UPDATE") for s in statements)
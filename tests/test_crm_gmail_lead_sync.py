@@ -0,0 +1,81 @@
+"""sync_gmail_leads: one aggregate, one resolve per chunk and a batched create for missing leads."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from crm import bulk_import
+from crm.service import EnhancedCRMService
+from tests.db_test_util import capture_sql, insert_test_user
+
+
+def _add_lead(db, email, name, company=None, activities=1):
+    with db.transaction() as (conn, cursor):
+        cursor.execute("INSERT INTO leads (user_id, email, name, company) VALUES (1, ?, ?, ?)", (email, name, company))
+        lead_id = cursor.lastrowid
+        for _ in range(activities):
+            cursor.execute("INSERT INTO lead_activities (lead_id, activity_type) VALUES (?, 'email_received')", (lead_id,))
+        conn.commit()
+
+
+def _seed(db, n):
+    for i in range(n):
+        _add_lead(db, f"Lead{i}@example.test", f"Lead {i}", activities=3)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    insert_test_user(sqlite_db, 1)
+    sqlite_db.execute_query(
+        "INSERT INTO gmail_tokens (user_id, access_token, is_active) VALUES (1, 'token', 1)", fetch=False
+    )
+    with patch("crm.service.db_optimizer", sqlite_db), patch.object(bulk_import, "db_optimizer", sqlite_db), patch.object(
+        bulk_import, "schedule_lead_import_followup", return_value=None
+    ):
+        yield sqlite_db
+
+
+@pytest.mark.parametrize("n", [3, 40])
+def test_statement_count_does_not_grow_with_activities(db, n):
+    _seed(db, n)
+    with capture_sql(db) as statements:
+        result = EnhancedCRMService().sync_gmail_leads(1)
+
+    assert result["success"] is True and result["data"]["count"] == n
+    assert {lead["action"] for lead in result["data"]["synced_leads"]} == {"updated"}
+    assert {lead["email"] for lead in result["data"]["synced_leads"]} == {f"lead{i}@example.test" for i in range(n)}
+    # token check, aggregate, one resolve chunk
+    assert len(statements) == 3
+    assert not any(s.startswith("INSERT") for s in statements)
+
+
+def test_missing_leads_are_created_in_one_batch(db):
+    _seed(db, 2)
+    # legacy rows stored before emails were normalized do not resolve by lower(email)
+    for i, email in enumerate((" Old1@Example.test ", " Old2@Example.test ")):
+        _add_lead(db, email, f"Old {i}", company="Acme")
+
+    with capture_sql(db) as statements:
+        result = EnhancedCRMService().sync_gmail_leads(1)
+
+    actions = {lead["email"]: lead["action"] for lead in result["data"]["synced_leads"]}
+    assert actions == {
+        "lead0@example.test": "updated",
+        "lead1@example.test": "updated",
+        "old1@example.test": "created",
+        "old2@example.test": "created",
+    }
+    assert sum(1 for s in statements if s.startswith("INSERT INTO leads")) == 1
+    assert sum(1 for s in statements if s.startswith("INSERT INTO lead_activities")) == 1
+    created = db.execute_query("SELECT source, stage, company FROM leads WHERE email = 'old1@example.test'")[0]
+    assert (created["source"], created["stage"], created["company"]) == ("gmail", "new", "Acme")
+
+
+def test_not_connected(db):
+    db.execute_query("DELETE FROM gmail_tokens", fetch=False)
+    with patch("crm.service.gmail_oauth_manager", None):
+        result = EnhancedCRMService().sync_gmail_leads(1)
+    assert result["error_code"] == "GMAIL_NOT_CONNECTED"
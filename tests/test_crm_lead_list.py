@@ -0,0 +1,205 @@
+"""Lead list: trigram search index, keyset cursors and lead_stats totals on SQLite."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from crm import lead_search_index, lead_stats
+from crm.service import EnhancedCRMService
+from tests.db_test_util import capture_sql, insert_test_user
+
+
+@pytest.fixture
+def db(sqlite_db):
+    db = sqlite_db
+    insert_test_user(db, 1)
+    insert_test_user(db, 2)
+    for i in range(12):
+        db.execute_query(
+            "INSERT INTO leads (user_id, email, name, company, source, stage, score, created_at, last_contact) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                1,
+                f"lead{i}@example.test",
+                f"Lead {i}",
+                "Acme Roofing" if i % 3 == 0 else "Other Co",
+                "web" if i % 2 else "referral",
+                "qualified" if i < 4 else "new",
+                i * 5,
+                f"2026-10-{i + 1:02d} 09:00:00",
+                None if i % 4 == 0 else f"2026-10-{(i % 5) + 1:02d} 12:00:00",
+            ),
+            fetch=False,
+        )
+    db.execute_query(
+        "INSERT INTO leads (user_id, email, name, stage, score) VALUES (2, 'other@example.test', 'Other', 'new', 99)",
+        fetch=False,
+    )
+    lead_search_index.reset_search_mode_cache()
+    lead_stats.reset_lead_stats_cache()
+    with patch("crm.service.db_optimizer", db), patch.object(lead_search_index, "db_optimizer", db), patch.object(
+        lead_stats, "db_optimizer", db
+    ):
+        yield db
+    lead_search_index.reset_search_mode_cache()
+    lead_stats.reset_lead_stats_cache()
+
+
+def _page(service, **kwargs):
+    result = service.get_leads_summary(1, **kwargs)
+    assert result["success"], result
+    return result["data"]
+
+
+def _walk(service, **kwargs):
+    ids, cursor = [], None
+    while True:
+        data = _page(service, cursor=cursor, **kwargs) if cursor else _page(service, **kwargs)
+        ids.extend(lead.id for lead in data["leads"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize(
+    "sort,direction",
+    [("created_at", "desc"), ("score", "asc"), ("name", "asc"), ("last_contact", "desc"), ("last_contact", "asc")],
+)
+def test_keyset_pages_match_offset_order(db, sort, direction):
+    service = EnhancedCRMService()
+    full = [lead.id for lead in _page(service, sort=sort, direction=direction, limit=50)["leads"]]
+    assert _walk(service, sort=sort, direction=direction, limit=5) == full
+    assert len(full) == 12
+
+
+def test_cursor_pages_skip_offset_and_reuse_totals(db):
+    service = EnhancedCRMService()
+    first = _page(service, filters={"q": "acme"}, limit=2)
+    assert first["total_count"] == 4 and first["totals_cached"] is False
+    with capture_sql(db) as statements:
+        second = _page(service, filters={"q": "acme"}, limit=2, cursor=first["next_cursor"])
+    assert second["totals_cached"] is True
+    assert not any("COUNT(*)" in q for q in statements)
+    page_queries = [q for q in statements if "ORDER BY" in q]
+    assert len(page_queries) == 1 and "OFFSET" in page_queries[0] and second["offset"] == 0
+    assert not set(lead.id for lead in first["leads"]) & set(lead.id for lead in second["leads"])
+
+
+def test_cursor_for_another_sort_is_rejected(db):
+    service = EnhancedCRMService()
+    cursor = _page(service, limit=2)["next_cursor"]
+    result = service.get_leads_summary(1, sort="score", cursor=cursor)
+    assert result["error_code"] == "INVALID_CURSOR"
+    assert service.get_leads_summary(1, cursor="not-base64!")["error_code"] == "INVALID_CURSOR"
+
+
+def test_search_uses_like_until_index_is_built_and_never_builds_it(db):
+    service = EnhancedCRMService()
+    with capture_sql(db) as statements:
+        assert _page(service, filters={"q": "acme roof"})["total_count"] == 4
+    assert any("LIKE" in q for q in statements)
+    assert not db.table_exists("leads_fts")
+
+    assert lead_search_index.backfill_leads_search_index() == {"mode": "fts5", "rows": 13}
+    assert lead_search_index.leads_search_mode() is None  # negative probe still cached
+    lead_search_index.reset_search_mode_cache()
+    assert lead_search_index.leads_search_mode() == "fts5"
+
+
+def test_search_uses_trigram_index_with_substring_semantics(db):
+    lead_search_index.backfill_leads_search_index()
+    service = EnhancedCRMService()
+    with capture_sql(db) as statements:
+        data = _page(service, filters={"q": "CME ROOF"})
+    assert data["total_count"] == 4
+    assert any("leads_fts MATCH" in q for q in statements)
+    assert not any("LIKE" in q for q in statements)
+
+    with capture_sql(db) as statements:
+        short = _page(service, filters={"q": "ac"})  # below trigram length -> LIKE
+    assert short["total_count"] == 4
+    assert any("LIKE" in q for q in statements)
+
+    db.execute_query("UPDATE leads SET company = 'Zenith' WHERE id = 1", fetch=False)
+    assert _page(service, filters={"q": "zenit"})["total_count"] == 1
+
+
+def test_lead_stats_are_not_built_in_the_request_path(db):
+    service = EnhancedCRMService()
+    with capture_sql(db) as statements:
+        data = _page(service, limit=3)
+    assert data["total_count"] == 12 and data["analytics"]["avg_score"] == 27.5
+    assert any("COUNT(*) as total" in q for q in statements)
+    assert not db.table_exists("lead_stats")
+
+    assert lead_stats.backfill_lead_stats() == {"ready": True, "rows": 5}
+    assert lead_stats.lead_stats_ready() is False  # negative probe still cached
+    lead_stats.reset_lead_stats_cache()
+    assert lead_stats.lead_stats_ready() is True
+
+
+def test_unfiltered_totals_come_from_lead_stats_and_track_writes(db):
+    lead_stats.backfill_lead_stats()
+    service = EnhancedCRMService()
+    with capture_sql(db) as statements:
+        data = _page(service, limit=3)
+    analytics = data["analytics"]
+    assert data["total_count"] == 12
+    assert analytics["leads_by_stage"] == {"qualified": 4, "new": 8}
+    assert analytics["leads_by_source"] == {"referral": 6, "web": 6}
+    assert analytics["avg_score"] == 27.5
+    assert not any("COUNT(*) as total" in q for q in statements)
+
+    db.execute_query("UPDATE leads SET withdrawn_at = CURRENT_TIMESTAMP WHERE id = 1", fetch=False)
+    db.execute_query("UPDATE leads SET stage = 'qualified', score = 100 WHERE id = 12", fetch=False)
+    db.execute_query("DELETE FROM leads WHERE id = 11", fetch=False)
+    db.execute_query("INSERT INTO leads (user_id, email, name, source) VALUES (1, 'n@example.test', 'N', 'web')", fetch=False)
+
+    expected = {"total": 11, "score": db.execute_query(
+        "SELECT AVG(score) AS a FROM leads WHERE user_id = 1 AND withdrawn_at IS NULL"
+    )[0]["a"]}
+    data = _page(service)
+    assert data["total_count"] == expected["total"]
+    assert data["analytics"]["avg_score"] == round(expected["score"], 1)
+    assert data["analytics"]["leads_by_stage"] == {"qualified": 4, "new": 7}
+
+    staged = _page(service, filters={"stage": "qualified"})
+    assert staged["total_count"] == 4 and staged["analytics"]["leads_by_stage"] == {"qualified": 4}
+
+
+def test_avg_score_ignores_null_scores_like_avg(db):
+    lead_stats.backfill_lead_stats()
+    service = EnhancedCRMService()
+    db.execute_query("UPDATE leads SET score = NULL WHERE id IN (2, 3)", fetch=False)
+    db.execute_query("INSERT INTO leads (user_id, email, name, score) VALUES (1, 'x@example.test', 'X', NULL)", fetch=False)
+    expected = db.execute_query("SELECT AVG(score) AS a FROM leads WHERE user_id = 1 AND withdrawn_at IS NULL")[0]["a"]
+    assert _page(service)["analytics"]["avg_score"] == round(expected, 1)
+
+    assert lead_stats.backfill_lead_stats()["ready"] is True  # recompute from leads
+    assert _page(service)["analytics"]["avg_score"] == round(expected, 1)
+    db.execute_query("UPDATE leads SET score = NULL WHERE user_id = 1", fetch=False)
+    assert _page(service)["analytics"]["avg_score"] == 0
+
+
+def test_lead_stats_without_scored_count_is_rebuilt(db):
+    db.execute_query(
+        "CREATE TABLE lead_stats (user_id INTEGER NOT NULL, stage TEXT NOT NULL DEFAULT '', "
+        "source TEXT NOT NULL DEFAULT '', lead_count INTEGER NOT NULL DEFAULT 0, "
+        "score_sum INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (user_id, stage, source))",
+        fetch=False,
+    )
+    assert lead_stats.ensure_lead_stats() is True
+    assert "scored_count" in db.list_table_columns("lead_stats")
+    assert _page(EnhancedCRMService())["analytics"]["avg_score"] == 27.5
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_keyset_pages_keep_null_scores(db, direction):
+    db.execute_query("UPDATE leads SET score = NULL WHERE id IN (2, 5, 6, 9)", fetch=False)
+    service = EnhancedCRMService()
+    full = [lead.id for lead in _page(service, sort="score", direction=direction, limit=50)["leads"]]
+    assert _walk(service, sort="score", direction=direction, limit=3) == full
+    assert len(full) == 12 and full[-4:] == [9, 6, 5, 2]
@@ -11,12 +11,20 @@ import json
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from crm.lead_stats import reset_lead_stats_cache
 from crm.service import EnhancedCRMService
 
 
 class TestCRMService(unittest.TestCase):
     def setUp(self):
         self.service = EnhancedCRMService()
+        # Summary tests assert on the LIKE / COUNT fallbacks; the index-backed paths are
+        # covered in tests/test_crm_lead_list.py.
+        for target in ('crm.service.leads_search_mode', 'crm.service.lead_stats_summary'):
+            p = patch(target, return_value=None)
+            p.start()
+            self.addCleanup(p.stop)
+        reset_lead_stats_cache()
 
     @patch('crm.service.db_optimizer')
     def test_create_lead_requires_fields(self, mock_db):
@@ -251,7 +259,7 @@ class TestCRMService(unittest.TestCase):
         self.service.get_leads_summary(1, sort='score', direction='asc')
 
         list_query = mock_db.execute_query.call_args_list[0].args[0]
-        self.assertIn('ORDER BY score ASC, id DESC', list_query)
+        self.assertIn('ORDER BY score ASC NULLS LAST, id DESC', list_query)
 
     @patch('crm.service.db_optimizer')
     def test_get_leads_summary_invalid_sort_and_direction_fall_back_safely(self, mock_db):
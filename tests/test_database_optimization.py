@@ -5,6 +5,7 @@ Unit tests for core/database_optimization.py (pure helpers: safe_json, safe_json
 import sqlite3
 import os
 import sys
+from contextlib import contextmanager
 from unittest.mock import patch
 
 import pytest
@@ -155,6 +156,69 @@ class TestDatabaseOptimizationHelpers:
         assert result == 1
 
 
+    def test_iter_query_streams_sqlite_rows_with_fetchmany(self, sqlite_db, monkeypatch):
+        # stepped() runs once per row SQLite produces, so it shows how far the cursor has read.
+        stepped = []
+        get_connection = sqlite_db.get_connection
+
+        @contextmanager
+        def _counting(*args, **kwargs):
+            with get_connection(*args, **kwargs) as conn:
+                conn.create_function("stepped", 1, lambda x: stepped.append(x) or x)
+                yield conn
+
+        monkeypatch.setattr(sqlite_db, "get_connection", _counting)
+        rows = sqlite_db.iter_query(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < ?) "
+            "SELECT stepped(x) AS x FROM n",
+            (250,),
+            batch_size=100,
+        )
+        first = next(rows)
+        # one fetchmany batch, plus the row sqlite3 steps ahead of the last one it returned
+        assert first == {"x": 1} and len(stepped) == 101
+        assert [r["x"] for r in rows] == list(range(2, 251))
+        assert stepped == list(range(1, 251))
+
+    def test_iter_query_uses_named_cursor_on_postgres(self, monkeypatch):
+        seen = {}
+
+        class _Cursor:
+            itersize = 2000
+
+            def execute(self, sql, params=None):
+                seen["sql"], seen["params"] = sql, params
+                self.rows = [{"id": i} for i in range(5)]
+
+            def fetchmany(self, size):
+                seen["itersize"] = self.itersize
+                batch, self.rows = self.rows[:size], self.rows[size:]
+                return batch
+
+            def close(self):
+                seen["closed"] = True
+
+        class _Conn:
+            def cursor(self, name=None, cursor_factory=None):
+                seen["name"] = name
+                return _Cursor()
+
+        class _Ctx:
+            def __enter__(self):
+                return _Conn()
+
+            def __exit__(self, *a):
+                return False
+
+        monkeypatch.setattr(db_optimizer, "db_type", "postgresql")
+        monkeypatch.setattr(db_optimizer, "get_connection", lambda *a, **k: _Ctx())
+        monkeypatch.setattr(db_optimizer, "_ready", False)
+        rows = list(db_optimizer.iter_query("SELECT id FROM leads WHERE user_id = ?", (7,), batch_size=2))
+        assert rows == [{"id": i} for i in range(5)]
+        assert seen["name"].startswith("fikiri_iter_")
+        assert seen["itersize"] == 2 and seen["closed"] is True
+        assert seen["sql"] == "SELECT id FROM leads WHERE user_id = %s" and seen["params"] == (7,)
+
 def test_clear_admin_audit_for_tests_soft_fails_on_persistent_lock(monkeypatch):
     from core import admin_audit
 
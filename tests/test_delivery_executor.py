@@ -0,0 +1,121 @@
+"""Delivery executor: lease claims, per-tenant rounds and concurrent executors on SQLite."""
+
+import os
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from core import appointment_reminders, delivery_executor, idempotency_manager, workflow_followups
+from core.delivery_executor import DELIVERY_KIND_FOLLOW_UPS, DeliveryExecutor, claim_due_rows
+from tests.db_test_util import insert_test_user
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+def _seed(db, user_id, n, due=True):
+    when = (NOW - timedelta(minutes=5) if due else NOW + timedelta(days=1)).isoformat()
+    for _ in range(n):
+        db.execute_query(
+            "INSERT INTO scheduled_follow_ups (user_id, follow_up_date, follow_up_type) VALUES (?, ?, 'email')",
+            (user_id, when),
+            fetch=False,
+        )
+
+
+@pytest.fixture
+def db(sqlite_db):
+    db = sqlite_db
+    for uid in range(1, 6):
+        insert_test_user(db, uid)
+    sent = []
+
+    def fake_execute(user_id, item, key):
+        sent.append((threading.current_thread().name, user_id, item["id"]))
+        db.execute_query("UPDATE scheduled_follow_ups SET status = 'sent' WHERE id = ?", (item["id"],), fetch=False)
+        return "processed"
+
+    db.sent = sent
+    with patch.object(delivery_executor, "db_optimizer", db), patch.object(
+        workflow_followups, "db_optimizer", db
+    ), patch.object(appointment_reminders, "db_optimizer", db), patch.object(
+        idempotency_manager, "db_optimizer", db
+    ), patch.object(
+        workflow_followups, "_execute_follow_up", side_effect=fake_execute
+    ):
+        idempotency_manager.idempotency_manager._initialize_tables()
+        yield db
+
+
+def _claim(db, token, limit=None, now=NOW):
+    with patch.object(delivery_executor, "datetime") as mock_dt:
+        mock_dt.utcnow.return_value = now
+        return claim_due_rows(
+            db, "scheduled_follow_ups", 1, workflow_followups.FOLLOW_UP_DUE_SQL, (NOW.isoformat(),),
+            "follow_up_date ASC, id ASC", token, limit=limit,
+        )
+
+
+def test_claims_are_disjoint_and_skip_future_rows(db):
+    _seed(db, 1, 5)
+    _seed(db, 1, 2, due=False)
+    assert _claim(db, "a", limit=3) == 3
+    assert _claim(db, "b", limit=3) == 2
+    assert _claim(db, "c") == 0
+    owners = db.execute_query("SELECT claimed_by, COUNT(*) AS n FROM scheduled_follow_ups GROUP BY claimed_by")
+    assert {r["claimed_by"]: r["n"] for r in owners} == {"a": 3, "b": 2, None: 2}
+
+
+def test_expired_lease_is_reclaimable(db):
+    _seed(db, 1, 2)
+    assert _claim(db, "crashed") == 2
+    assert _claim(db, "other", now=NOW + timedelta(seconds=60)) == 0
+    later = NOW + timedelta(seconds=delivery_executor.DELIVERY_CLAIM_LEASE_SECONDS + 1)
+    assert _claim(db, "other", now=later) == 2
+
+
+def test_rounds_give_every_tenant_a_batch(db):
+    _seed(db, 1, 10)
+    _seed(db, 2, 2)
+    result = DeliveryExecutor(max_workers=1, tenant_batch=3).run_due_deliveries(
+        now=NOW, kinds=[DELIVERY_KIND_FOLLOW_UPS]
+    )
+
+    assert result[DELIVERY_KIND_FOLLOW_UPS] == {"tenants": 2, "processed": 12, "failed": 0, "claimed": 12}
+    assert result["rounds"] == 4
+    # the small tenant is fully served in round one instead of waiting behind tenant 1's backlog
+    assert [uid for _, uid, _ in db.sent[:5]].count(2) == 2
+    assert len({row_id for _, _, row_id in db.sent}) == 12
+
+
+def test_concurrent_executors_never_double_send(db):
+    for uid in range(1, 6):
+        _seed(db, uid, 20)
+
+    def run():
+        DeliveryExecutor(max_workers=4, tenant_batch=4).run_due_deliveries(now=NOW, kinds=[DELIVERY_KIND_FOLLOW_UPS])
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=20)
+
+    ids = [row_id for _, _, row_id in db.sent]
+    assert len(ids) == 100 and len(set(ids)) == 100
+
+
+def test_calendar_wrapper_keeps_result_shape(db):
+    db.execute_query(
+        "INSERT INTO calendar_events (user_id, title, event_date) VALUES (1, 'Call', ?)",
+        ((NOW - timedelta(hours=1)).isoformat(),),
+        fetch=False,
+    )
+    with patch.object(delivery_executor, "datetime") as mock_dt:
+        mock_dt.utcnow.return_value = NOW
+        result = workflow_followups.process_due_calendar_reminders(now_iso=NOW.isoformat())
+    assert result == {"success": True, "reminded": 1}
+    assert db.execute_query("SELECT status FROM calendar_events")[0]["status"] == "reminded"
@@ -0,0 +1,124 @@
+"""Full-text inbox search over synced_emails (SQLite FTS5 path + tsquery builder)."""
+
+from unittest.mock import patch
+
+import pytest
+
+from core import email_search_index
+from core.email_inbox_search import synced_inbox_search
+from tests.db_test_util import capture_sql, insert_test_user
+
+
+def _add(db, user_id, subject, body="", sender="someone@example.test", date="2026-10-01"):
+    db.execute_query(
+        "INSERT INTO synced_emails (user_id, subject, sender, recipient, date, body) VALUES (?, ?, ?, '', ?, ?)",
+        (user_id, subject, sender, date, body),
+        fetch=False,
+    )
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    insert_test_user(sqlite_db, 1)
+    insert_test_user(sqlite_db, 2)
+    monkeypatch.delenv("SYNCED_EMAILS_FTS", raising=False)
+    email_search_index.reset_search_mode_cache()
+    with patch.object(email_search_index, "db_optimizer", sqlite_db):
+        yield sqlite_db
+    email_search_index.reset_search_mode_cache()
+
+
+def _search(db, user_id, term):
+    plan = synced_inbox_search(term)
+    sql = (
+        "SELECT subject FROM synced_emails" + plan.join_sql + " WHERE user_id = ?" + plan.where_sql
+        + " ORDER BY " + plan.order_sql
+    )
+    rows = db.execute_query(sql, plan.join_params + (user_id,) + plan.where_params + plan.order_params)
+    return plan, [r["subject"] for r in rows]
+
+
+def test_search_uses_like_until_index_is_built_and_never_builds_it(db):
+    _add(db, 1, "Quote for kitchen remodel")
+    with capture_sql(db) as statements:
+        plan, subjects = _search(db, 1, "kitchen")
+    assert plan.mode == "like" and subjects == ["Quote for kitchen remodel"]
+    assert not db.table_exists(email_search_index.FTS_TABLE)
+    assert not any("rebuild" in s for s in statements)
+
+    assert email_search_index.ensure_synced_emails_fts()
+    # The miss is cached briefly; a probe after the recheck window sees the new index.
+    assert _search(db, 1, "kitchen")[0].mode == "like"
+    with patch.object(email_search_index, "SEARCH_MODE_RECHECK_SECONDS", 0):
+        assert _search(db, 1, "kitchen")[0].mode == "fts5"
+
+
+def test_existing_rows_indexed_and_prefix_ranked(db):
+    _add(db, 1, "Quote for kitchen remodel", body="please send pricing")
+    _add(db, 1, "Lunch?", body="the kitchen remodel quote looks fine", date="2026-10-05")
+    _add(db, 1, "Unrelated", body="nothing here")
+    _add(db, 2, "Quote for kitchen remodel", body="other tenant")
+    assert email_search_index.backfill_synced_emails_search_index() == {"mode": "fts5", "rows": 4, "batches": 1}
+
+    plan, subjects = _search(db, 1, "kitch remod")
+    assert plan.mode == "fts5"
+    # Subject hit outranks a newer body-only hit.
+    assert subjects == ["Quote for kitchen remodel", "Lunch?"]
+
+
+def test_triggers_track_inserts_updates_and_deletes(db):
+    email_search_index.ensure_synced_emails_fts()
+    assert email_search_index.synced_emails_search_mode() == "fts5"
+    _add(db, 1, "Invoice 2041")
+    assert _search(db, 1, "invoice")[1] == ["Invoice 2041"]
+
+    db.execute_query("UPDATE synced_emails SET subject = 'Receipt 2041' WHERE user_id = 1", fetch=False)
+    assert _search(db, 1, "invoice")[1] == []
+    assert _search(db, 1, "receipt")[1] == ["Receipt 2041"]
+
+    db.execute_query("DELETE FROM synced_emails", fetch=False)
+    assert _search(db, 1, "receipt")[1] == []
+
+
+def test_email_address_and_quotes_are_safe(db):
+    email_search_index.ensure_synced_emails_fts()
+    _add(db, 1, "Hello", sender='"Dr. O\'Neil" <oneil@fau.edu>')
+    assert _search(db, 1, 'fau.edu')[1] == ["Hello"]
+    assert _search(db, 1, "o'neil \"dr")[1] == ["Hello"]
+    assert _search(db, 1, "-- ()")[0].mode == "like"
+
+
+def test_disabled_falls_back_to_like(db, monkeypatch):
+    email_search_index.ensure_synced_emails_fts()
+    monkeypatch.setenv("SYNCED_EMAILS_FTS", "0")
+    _add(db, 1, "Quote")
+    plan, subjects = _search(db, 1, "Quote")
+    assert plan.mode == "like"
+    assert subjects == ["Quote"]
+
+
+def test_backfill_rebuilds_sqlite_index(db):
+    email_search_index.ensure_synced_emails_fts()
+    db.execute_query("DROP TRIGGER synced_emails_fts_ai", fetch=False)
+    _add(db, 1, "Written without trigger")
+    assert _search(db, 1, "trigger")[1] == []
+
+    result = email_search_index.backfill_synced_emails_search_index()
+    assert result == {"mode": "fts5", "rows": 1, "batches": 1}
+    assert _search(db, 1, "trigger")[1] == ["Written without trigger"]
+
+
+def test_tsvector_plan_matches_unindexed_rows_by_like():
+    with patch.object(email_search_index, "synced_emails_search_mode", return_value="tsvector"):
+        plan = synced_inbox_search("Florida")
+    assert plan.mode == "tsvector"
+    assert plan.where_sql.startswith(" AND (search_tsv @@ to_tsquery('simple', ?) OR (search_tsv IS NULL AND (subject LIKE ?")
+    assert plan.where_sql.count("(") == plan.where_sql.count(")")
+    assert plan.where_params == ("'Florida':*",) + ("%Florida%",) * 4
+    assert plan.order_sql.startswith("COALESCE(ts_rank_cd(")
+
+
+def test_tsquery_prefix_terms():
+    assert email_search_index.tsquery_text("Florida atl") == "'Florida':* & 'atl':*"
+    assert email_search_index.tsquery_text("o'neil") == "'o':* & 'neil':*"
+    assert email_search_index.tsquery_text("  ") is None
@@ -3,7 +3,10 @@
 
 import os
 import sys
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -12,8 +15,13 @@ from core.ai.email_triage_taxonomy import (
     normalize_triage_category,
 )
 from core.email_triage_store import list_classified_emails, upsert_classification
-from email_automation.email_triage_engine import classify_email_triage
+from email_automation.email_triage_engine import (
+    classify_email_triage,
+    classify_email_triage_batch,
+)
+from services import email_triage_service
 from services.email_triage_service import triage_and_store_synced_message
+from tests.db_test_util import insert_test_user
 
 
 class TestEmailTriageRules(unittest.TestCase):
@@ -213,6 +221,107 @@ class TestOperationalNotificationTriage(unittest.TestCase):
         self.assertNotIn(external_id, lead_ids)
 
 
+class TestEmailTriageBatch(unittest.TestCase):
+    EMAILS = [
+        {"subject": "Weekly deals", "body": "Click unsubscribe to stop.", "headers": {"list_unsubscribe": True}},
+        {"subject": "Hello", "body": "Just checking in."},
+        {"subject": "Estimate request", "body": "We are interested in a quote.", "sender_email": "p@fau.edu"},
+        {"subject": "Hi again", "body": "Following up on last week."},
+    ]
+
+    def test_rules_only_batch_matches_single_calls(self):
+        batch = classify_email_triage_batch(self.EMAILS, allow_ai=True)
+        single = [classify_email_triage(allow_ai=True, **e) for e in self.EMAILS]
+        self.assertEqual(batch, single)
+
+    def test_only_uncertain_rows_reach_llm_with_bounded_concurrency(self):
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0, "calls": 0}
+
+        def analyze(**kwargs):
+            with lock:
+                state["active"] += 1
+                state["calls"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+            return {"intent": "pricing_request", "lead_score": 70, "confidence_score": 0.9,
+                    "classification_source": "v2_ai"}
+
+        emails = [{"subject": f"Hello {i}", "body": "Just checking in."} for i in range(12)]
+        emails.insert(0, self.EMAILS[0])
+        with patch.dict(os.environ, {"FIKIRI_TRIAGE_AI_TENANT_CONCURRENCY": "3"}), patch(
+            "email_automation.email_triage_engine._tenant_slots", {}
+        ):
+            results = classify_email_triage_batch(
+                emails, user_id=None, allow_ai=True, analyze_fn=analyze, max_concurrency=8
+            )
+        self.assertEqual(state["calls"], 12)
+        self.assertLessEqual(state["peak"], 3)
+        self.assertEqual(results[0]["category"], "newsletter_marketing")
+        self.assertTrue(all(r["classification_source"] == "v2_ai" for r in results[1:]))
+
+    def test_budget_limits_llm_calls_and_rest_use_offline_path(self):
+        calls = []
+
+        def analyze(**kwargs):
+            calls.append(kwargs["subject"])
+            return {"intent": "pricing_request", "confidence_score": 0.9, "classification_source": "v2_ai"}
+
+        class _Decision:
+            def __init__(self, allowed):
+                self.allowed = allowed
+
+        with patch("core.ai_budget_guardrails.ai_budget_guardrails") as guard:
+            guard.evaluate.side_effect = lambda uid, projected_increment=1, **kw: _Decision(projected_increment <= 1)
+            results = classify_email_triage_batch(
+                self.EMAILS, user_id=42, allow_ai=True, analyze_fn=analyze
+            )
+        self.assertEqual(len(calls), 1)
+        guard.record_ai_usage.assert_called_once_with(42, 1)
+        sources = [r["classification_source"] for r in results]
+        self.assertIn("v2_ai", sources)
+        self.assertIn("rules+fallback", sources)
+
+    def test_llm_failure_falls_back_per_row(self):
+        def analyze(**kwargs):
+            raise RuntimeError("openai down")
+
+        results = classify_email_triage_batch(
+            self.EMAILS[1:2], allow_ai=True, analyze_fn=analyze
+        )
+        self.assertEqual(results[0]["classification_source"], "rules+fallback")
+
+
+def test_classify_unclassified_pages_past_rows_left_unclassified(sqlite_db, monkeypatch):
+    user_id = insert_test_user(sqlite_db, 1)
+    for i in range(1, 6):
+        sqlite_db.execute_query(
+            "INSERT INTO synced_emails (user_id, gmail_id, external_id, provider, subject, sender, body, date) "
+            "VALUES (?, ?, ?, 'gmail', 'Hello', 'a@b.com', 'body', '2026-05-20')",
+            (user_id, f"m{i}", f"m{i}"),
+            fetch=False,
+        )
+    monkeypatch.setattr("core.email_triage_store.db_optimizer", sqlite_db)
+    monkeypatch.setattr(email_triage_service, "UNCLASSIFIED_PAGE_SIZE", 2)
+    # the newest page is already handled in workflow state, so it stays unclassified
+    monkeypatch.setattr(
+        email_triage_service, "should_classify_email", lambda uid, eid, prov, force=False: eid not in ("m4", "m5")
+    )
+    stored = []
+    monkeypatch.setattr(
+        email_triage_service,
+        "triage_and_store_synced_message",
+        lambda uid, external_id, **kw: stored.append(external_id) or {"category": "other"},
+    )
+
+    result = email_triage_service.classify_unclassified_synced(user_id, limit=50)
+
+    assert stored == ["m3", "m2", "m1"]
+    assert result["scanned"] == 5 and result["skipped_existing"] == 2
+
+
 class TestBulkActionSafety(unittest.TestCase):
     def test_destructive_requires_confirmation(self):
         from services.email_triage_service import execute_bulk_action
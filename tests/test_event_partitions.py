@@ -0,0 +1,165 @@
+"""Monthly event partitions: SQLite archives + UNION view, Postgres partition DDL, retention drops."""
+
+import os
+from datetime import datetime
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from core import event_partitions, product_analytics_ops, product_analytics_store
+from core.event_partitions import (
+    drop_expired_partitions,
+    ensure_partitions,
+    event_table_source,
+    list_partitions,
+    maintain_event_partitions,
+)
+from tests.db_test_util import insert_test_user
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+class _PgRecorder:
+    db_type = "postgresql"
+
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.statements = []
+
+    def execute_query(self, sql, params=(), fetch=True):
+        flat = " ".join(sql.split())
+        self.statements.append(flat)
+        if "relkind" in flat:
+            return [{"relkind": "p"}]
+        if "pg_inherits" in flat:
+            return [{"name": n, "bound": b} for n, b in self.partitions]
+        return 0
+
+    def table_exists(self, name):
+        return name == "service_usage_events"
+
+
+@pytest.fixture
+def db(sqlite_db, monkeypatch):
+    monkeypatch.setenv("EVENT_TABLE_PARTITIONING", "1")
+    insert_test_user(sqlite_db, 1)
+    stamps = ["2026-10-01 09:00:00", "2026-08-15T10:00:00", "2026-07-31 23:59:59", "2026-07-01 00:00:00",
+              "2026-05-02 08:00:00", "2026-10-17 11:00:00"]
+    with sqlite_db.transaction() as (conn, cursor):
+        cursor.executemany(
+            "INSERT INTO ai_events (user_id, correlation_id, event_type, created_at) VALUES (1, ?, 'x', ?)",
+            [(f"c{i}", ts) for i, ts in enumerate(stamps)],
+        )
+        conn.commit()
+    return sqlite_db
+
+
+def test_sqlite_moves_cold_rows_into_monthly_archives(db, monkeypatch):
+    monkeypatch.setattr(event_partitions, "EVENT_PARTITION_MOVE_BATCH", 1)
+    result = ensure_partitions("ai_events", hot_months=3, now=NOW, db=db)
+
+    assert result["archives"] == ["ai_events_p202607", "ai_events_p202605"]
+    assert result["moved"] == 3 and result["complete"]
+    hot = [r["created_at"] for r in db.execute_query("SELECT created_at FROM ai_events ORDER BY id")]
+    assert hot == ["2026-10-01 09:00:00", "2026-08-15T10:00:00", "2026-10-17 11:00:00"]
+    assert [p["name"] for p in list_partitions("ai_events", db=db)] == ["ai_events_p202605", "ai_events_p202607"]
+
+    view = event_table_source("ai_events", db=db)
+    assert view == "ai_events_all"
+    ids = [r["id"] for r in db.execute_query(f"SELECT id FROM {view} ORDER BY id")]
+    assert ids == [1, 2, 3, 4, 5, 6]
+
+
+def test_sqlite_view_fills_columns_added_after_archiving(db):
+    ensure_partitions("ai_events", hot_months=3, now=NOW, db=db)
+    db.execute_query("ALTER TABLE ai_events ADD COLUMN lane TEXT", fetch=False)
+    db.execute_query("UPDATE ai_events SET lane = 'api'", fetch=False)
+    drop_expired_partitions("ai_events", datetime(2026, 6, 1), db=db)
+
+    rows = db.execute_query("SELECT id, lane FROM ai_events_all ORDER BY id")
+    assert [r["id"] for r in rows] == [1, 2, 3, 4, 6]
+    assert {r["id"]: r["lane"] for r in rows}[3] is None
+    assert not db.table_exists("ai_events_p202605")
+
+
+def test_maintenance_drops_only_fully_expired_months(db):
+    results = maintain_event_partitions({"ai_events": 90}, now=NOW, db=db)
+
+    # cutoff 2026-07-20: July still has rows inside the retention window
+    assert results["ai_events"]["dropped"] == ["ai_events_p202605"]
+    assert [p["name"] for p in list_partitions("ai_events", db=db)] == ["ai_events_p202607"]
+    # tables without a retention entry are maintained but never dropped from
+    assert results["analytics_events"]["success"] and "dropped" not in results["analytics_events"]
+
+
+def test_source_is_base_table_when_disabled(db, monkeypatch):
+    ensure_partitions("ai_events", hot_months=3, now=NOW, db=db)
+    monkeypatch.delenv("EVENT_TABLE_PARTITIONING")
+    assert event_table_source("ai_events", db=db) == "ai_events"
+
+
+@pytest.fixture
+def product_events_db(sqlite_db, monkeypatch):
+    """product_events for tenants 1 and 2 in July (archived) and October (hot)."""
+    monkeypatch.setenv("EVENT_TABLE_PARTITIONING", "1")
+    monkeypatch.setattr(product_analytics_store, "db_optimizer", sqlite_db)
+    monkeypatch.setattr(product_analytics_store, "_TABLES_READY", False)
+    monkeypatch.setattr(event_partitions, "db_optimizer", sqlite_db)
+    monkeypatch.setattr("core.database_optimization.db_optimizer", sqlite_db)
+    product_analytics_store.ensure_product_analytics_tables()
+    for tenant in (1, 2):
+        for occurred_at, name in (("2026-07-03 10:00:00", "outcome.lead_captured"),
+                                  ("2026-10-15 10:00:00", "feature.used")):
+            product_analytics_store.insert_product_event(
+                tenant_id=tenant, actor_user_id=tenant, event_name=name, event_source="server",
+                properties={}, occurred_at=datetime.fromisoformat(occurred_at),
+                outcome_dedupe_key=f"{name}:{tenant}" if name.startswith("outcome.") else None,
+            )
+    ensure_partitions("product_events", hot_months=3, now=NOW, db=sqlite_db)
+    assert [p["name"] for p in list_partitions("product_events", db=sqlite_db)] == ["product_events_p202607"]
+    return sqlite_db
+
+
+def test_full_history_readers_see_archived_product_events(product_events_db):
+    assert product_analytics_store.earliest_meaningful_outcome_at(1) == "2026-07-03T10:00:00"
+    assert product_analytics_store.count_outcome_events(1, event_name="outcome.lead_captured") == 1
+    assert product_analytics_ops._outcome_exists(
+        1, event_name="outcome.lead_captured", object_type="lead", object_id="1"
+    ) is False
+    # the outcome dedupe check spans archives, so a replayed July outcome is not stored again
+    assert product_analytics_store.insert_product_event(
+        tenant_id=1, actor_user_id=1, event_name="outcome.lead_captured", event_source="server",
+        properties={}, occurred_at=NOW, outcome_dedupe_key="outcome.lead_captured:1",
+    ) is None
+
+
+def test_delete_tenant_analytics_clears_archived_partitions(product_events_db):
+    assert product_analytics_store.delete_tenant_analytics(1) == {"success": True}
+
+    rows = product_events_db.execute_query("SELECT tenant_id, occurred_at FROM product_events_all ORDER BY id")
+    assert {r["tenant_id"] for r in rows} == {2}
+    assert len(rows) == 2
+    assert product_analytics_store.count_outcome_events(1, event_name="outcome.lead_captured") == 0
+
+
+def test_postgres_creates_missing_months_with_leaf_unique_index():
+    pg = _PgRecorder([
+        ("service_usage_events_legacy", "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00')"),
+        ("service_usage_events_p202611", "FOR VALUES FROM ('2026-11-01 00:00:00') TO ('2026-12-01 00:00:00')"),
+        ("service_usage_events_default", "DEFAULT"),
+    ])
+    result = ensure_partitions("service_usage_events", months_ahead=2, now=NOW, db=pg)
+
+    assert result["created"] == ["service_usage_events_p202612"]
+    ddl = [s for s in pg.statements if s.startswith("CREATE")]
+    assert ddl == [
+        "CREATE TABLE IF NOT EXISTS service_usage_events_p202612 PARTITION OF service_usage_events "
+        "(PRIMARY KEY (id)) FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_service_usage_events_p202612_0 "
+        "ON service_usage_events_p202612 (idempotency_key)",
+    ]
+
+    dropped = drop_expired_partitions("service_usage_events", datetime(2026, 12, 5), db=pg)
+    assert dropped == ["service_usage_events_legacy", "service_usage_events_p202611"]
+    assert pg.statements[-1] == "DROP TABLE IF EXISTS service_usage_events_p202611"
@@ -0,0 +1,111 @@
+"""Write-behind event sink: batched multi-row inserts, overflow policies and shutdown flush."""
+
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from core import event_sink
+from core.event_sink import EventSink, enqueue_event_row
+from email_automation.email_event_log import record_email_event
+from tests.db_test_util import capture_sql, insert_test_user
+
+
+@pytest.fixture
+def db(sqlite_db):
+    for user_id in (1, 2, 7):
+        insert_test_user(sqlite_db, user_id)
+    return sqlite_db
+
+
+def _event_types(db, table):
+    return [r["event_type"] for r in db.execute_query(f"SELECT event_type FROM {table} ORDER BY id")]
+
+
+_CRM_COLUMNS = ("user_id", "event_type", "entity_type", "entity_id")
+
+
+def test_rows_are_written_as_grouped_multi_row_inserts(db):
+    sink = EventSink(flush_ms=10_000, batch_size=100, db=db)
+    with patch.object(sink, "_ensure_thread"):
+        for i in range(120):
+            sink.submit("ai_events", ("user_id", "event_type"), (1, f"ai.requested.{i}"))
+        sink.submit("crm_events", _CRM_COLUMNS, (1, "lead.updated", "lead", 1))
+
+    with patch.object(event_sink, "_MAX_PARAMS_PER_STATEMENT", 100), capture_sql(db) as statements:
+        assert sink.flush() == 121
+    assert len(_event_types(db, "ai_events")) == 120 and _event_types(db, "crm_events") == ["lead.updated"]
+    # 100 + 20 ai rows (50 rows per statement at 2 params each) and one crm_events insert
+    inserts = [q for q in statements if q.startswith("INSERT")]
+    assert len(inserts) == 4
+    assert inserts[0].count("(1, 'ai.requested.") == 50
+    assert sink.stats["written"] == 121 and sink.stats["batches"] == 2
+
+
+def test_background_thread_flushes_on_interval(db):
+    sink = EventSink(flush_ms=20, db=db)
+    with capture_sql(db) as statements:
+        for i in range(5):
+            sink.submit("crm_events", _CRM_COLUMNS, (1, "lead.created", "lead", i))
+        for _ in range(200):
+            if len(_event_types(db, "crm_events")) == 5:
+                break
+            time.sleep(0.01)
+        assert len(_event_types(db, "crm_events")) == 5
+        assert sink.shutdown() == 0
+    assert len([q for q in statements if q.startswith("INSERT")]) == 1
+
+
+def test_drop_policy_counts_rows_when_queue_full(db):
+    sink = EventSink(max_queue=2, overflow="drop", db=db)
+    with patch.object(sink, "_ensure_thread"):
+        results = [sink.submit("ai_events", ("event_type",), (f"e{i}",)) for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert sink.stats["dropped"] == 3 and sink.pending() == 2
+
+
+def test_block_policy_waits_for_room(db):
+    sink = EventSink(max_queue=1, overflow="block", block_timeout_ms=2000, flush_ms=10_000, db=db)
+    with patch.object(sink, "_ensure_thread"):
+        sink.submit("ai_events", ("event_type",), ("first",))
+        threading.Timer(0.05, sink.flush).start()
+        assert sink.submit("ai_events", ("event_type",), ("second",)) is True
+    sink.flush()
+    assert _event_types(db, "ai_events") == ["first", "second"]
+    assert sink.stats["dropped"] == 0
+
+
+def test_bad_row_falls_back_to_row_by_row(db):
+    sink = EventSink(flush_ms=10_000, db=db)
+    with patch.object(sink, "_ensure_thread"):
+        sink.submit("crm_events", _CRM_COLUMNS, (1, "ok.1", "lead", 1))
+        sink.submit("crm_events", _CRM_COLUMNS, (None, "violates.not_null", "lead", 2))
+        sink.submit("crm_events", _CRM_COLUMNS, (99, "violates.foreign_key", "lead", 3))
+        sink.submit("crm_events", _CRM_COLUMNS, (2, "ok.2", "lead", 4))
+    assert sink.flush() == 2
+    assert _event_types(db, "crm_events") == ["ok.1", "ok.2"]
+    assert sink.stats["failed"] == 2
+
+
+def test_record_email_event_uses_sink_only_when_enabled(db, monkeypatch):
+    sink = EventSink(flush_ms=10_000, db=db)
+    monkeypatch.setattr(event_sink, "_sink", sink)
+    with patch("email_automation.email_event_log.db_optimizer") as inline_db, patch.object(sink, "_ensure_thread"):
+        monkeypatch.delenv("EVENT_WRITE_BEHIND", raising=False)
+        assert enqueue_event_row("ai_events", ("event_type",), ("x",)) is False
+        record_email_event(7, "email.parsed", provider="gmail", status="applied")
+        assert inline_db.execute_query.call_count == 1
+
+        monkeypatch.setenv("EVENT_WRITE_BEHIND", "1")
+        record_email_event(7, "email.parsed", provider="gmail", payload={"a": 1}, status="applied")
+        assert inline_db.execute_query.call_count == 1 and sink.pending() == 1
+
+    assert event_sink.flush_event_sink() == 1
+    rows = db.execute_query("SELECT user_id, event_type, provider, payload_json FROM email_events")
+    assert [dict(r) for r in rows] == [
+        {"user_id": 7, "event_type": "email.parsed", "provider": "gmail", "payload_json": '{"a":1}'}
+    ]
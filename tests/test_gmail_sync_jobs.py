@@ -491,5 +491,340 @@ class TestEmailBodyExtraction(unittest.TestCase):
         self.assertEqual(body, 'text')
 
 
+class _FakeHttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = MagicMock(status=status)
+
+
+class _FakeGmailService:
+    """Minimal stand-in for the Gmail API: history, profile, list and get."""
+
+    def __init__(self, history_pages=None, history_error=None, profile_history_id="900",
+                 listed_ids=None, failing_ids=()):
+        self.history_pages = list(history_pages or [])
+        self.failing_ids = set(failing_ids)
+        self.history_error = history_error
+        self.profile_history_id = profile_history_id
+        self.listed_ids = list(listed_ids or [])
+        self.history_calls = []
+        self.list_calls = []
+        self.fetched_ids = []
+        self.minimal_ids = []
+
+    def users(self):
+        return self
+
+    def _request(self, fn):
+        request = MagicMock()
+        request.execute.side_effect = fn
+        return request
+
+    def history(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def getProfile(self, userId):
+        return self._request(lambda: {"historyId": self.profile_history_id})
+
+    def list(self, **params):
+        if "startHistoryId" in params:
+            self.history_calls.append(params)
+
+            def _history():
+                if self.history_error is not None:
+                    raise self.history_error
+                return self.history_pages.pop(0)
+
+            return self._request(_history)
+        self.list_calls.append(params)
+        return self._request(lambda: {"messages": [{"id": mid} for mid in self.listed_ids]})
+
+    def get(self, userId, id, format):
+        (self.fetched_ids if format == "full" else self.minimal_ids).append(id)
+
+        def _get():
+            if id in self.failing_ids:
+                raise _FakeHttpError(500)
+            return {"id": id, "labelIds": ["INBOX"], "payload": {"headers": []}}
+
+        return self._request(_get)
+
+
+class TestGmailIncrementalHistorySync(unittest.TestCase):
+    def _manager(self):
+        manager = GmailSyncJobManager.__new__(GmailSyncJobManager)
+        manager.sync_page_size = 100
+        manager.gmail_fetch_mode = "serial"
+        return manager
+
+    def _cursor_rows(self, history_id="500", lookback_days=90):
+        return [{"metadata": json.dumps({"history_id": history_id, "lookback_days": lookback_days})}]
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_history_cursor_fetches_only_added_and_relabelled_messages(self, mock_db):
+        mock_db.execute_query.return_value = self._cursor_rows()
+        service = _FakeGmailService(history_pages=[
+            {
+                "history": [
+                    {"id": "501", "messagesAdded": [{"message": {"id": "new-1"}}]},
+                    {"id": "502", "labelsRemoved": [{"message": {"id": "old-1", "labelIds": ["INBOX"]}}]},
+                ],
+                "nextPageToken": "h2",
+            },
+            {
+                "history": [
+                    {"id": "503", "labelsAdded": [{"message": {"id": "new-1", "labelIds": ["INBOX", "STARRED"]}}]},
+                ],
+                "historyId": "510",
+            },
+        ])
+
+        result = self._manager()._get_sync_batch(service, 3, lookback_days=90, max_messages=50)
+
+        self.assertEqual(result["sync_type"], "incremental")
+        self.assertEqual(service.fetched_ids, ["new-1"])
+        self.assertEqual(result["label_changes"], {"old-1": ["INBOX"]})
+        self.assertEqual(result["history_id"], "510")
+        self.assertEqual(service.list_calls, [])
+        self.assertEqual(service.history_calls[0]["startHistoryId"], "500")
+        self.assertEqual(service.history_calls[1]["pageToken"], "h2")
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_cap_stops_at_last_consumed_record(self, mock_db):
+        mock_db.execute_query.return_value = self._cursor_rows()
+        service = _FakeGmailService(history_pages=[{
+            "history": [
+                {"id": "601", "messagesAdded": [{"message": {"id": "a"}}]},
+                {"id": "602", "messagesAdded": [{"message": {"id": "b"}}]},
+            ],
+            "historyId": "650",
+        }])
+
+        result = self._manager()._get_sync_batch(service, 3, lookback_days=90, max_messages=1)
+
+        self.assertEqual(service.fetched_ids, ["a"])
+        self.assertEqual(result["history_id"], "601")
+        self.assertTrue(result["has_more"])
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_expired_cursor_falls_back_to_bounded_full_sync(self, mock_db):
+        mock_db.execute_query.return_value = self._cursor_rows()
+        service = _FakeGmailService(history_error=_FakeHttpError(404), listed_ids=["x1", "x2"])
+
+        result = self._manager()._get_sync_batch(service, 3, lookback_days=90, max_messages=5)
+
+        self.assertEqual(result["sync_type"], "full_fallback")
+        self.assertEqual(service.fetched_ids, ["x1", "x2"])
+        self.assertEqual(service.list_calls[0]["maxResults"], 5)
+        self.assertEqual(result["history_id"], "900")
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_other_history_errors_propagate(self, mock_db):
+        mock_db.execute_query.return_value = self._cursor_rows()
+        service = _FakeGmailService(history_error=_FakeHttpError(500))
+        with self.assertRaises(_FakeHttpError):
+            self._manager()._get_sync_batch(service, 3, lookback_days=90, max_messages=5)
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_wider_lookback_or_full_resync_skips_history(self, mock_db):
+        mock_db.execute_query.return_value = self._cursor_rows(lookback_days=90)
+        manager = self._manager()
+        for kwargs in ({"lookback_days": 365}, {"lookback_days": 90, "full_resync": True}):
+            service = _FakeGmailService(listed_ids=["m1"])
+            result = manager._get_sync_batch(service, 3, max_messages=5, **kwargs)
+            self.assertEqual(result["sync_type"], "full")
+            self.assertEqual(service.history_calls, [])
+            self.assertEqual(result["history_id"], "900")
+
+    @patch.dict(os.environ, {"MAILBOX_AUTOMATION_ENABLED": "false"}, clear=False)
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_failed_fetch_in_history_page_is_kept_for_retry(self, mock_db):
+        mock_db.execute_query.return_value = self._cursor_rows()
+        manager = self._manager()
+        manager.sync_days = 90
+        manager.sync_max_messages = 50
+        service = _FakeGmailService(
+            history_pages=[{
+                "history": [
+                    {"id": "701", "messagesAdded": [{"message": {"id": "ok-1"}}]},
+                    {"id": "702", "messagesAdded": [{"message": {"id": "bad-1"}}]},
+                ],
+                "historyId": "710",
+            }],
+            failing_ids={"bad-1"},
+        )
+
+        with patch.object(manager, "_store_email", return_value=1) as mock_store, patch.object(
+            manager, "_extract_contacts", return_value=[]
+        ), patch("email_automation.email_event_log.record_email_event"), patch.object(
+            manager, "_triage_synced_message"
+        ), patch.object(manager, "_run_inbound_pipeline"):
+            result = manager._sync_emails(service, user_id=3, job_id="job-h", job_meta={})
+
+        self.assertEqual(service.fetched_ids, ["ok-1", "bad-1"])
+        self.assertEqual([c.args[1]["id"] for c in mock_store.call_args_list], ["ok-1"])
+        self.assertEqual(result["history_id"], "710")
+        self.assertEqual(result["pending_retry_ids"], {"bad-1": 1})
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_pending_retry_ids_are_fetched_by_next_history_sync(self, mock_db):
+        rows = [{"metadata": json.dumps({
+            "history_id": "710", "lookback_days": 90, "pending_retry_ids": {"bad-1": 1},
+        })}]
+        mock_db.execute_query.return_value = rows
+        manager = self._manager()
+        service = _FakeGmailService(history_pages=[{"history": [], "historyId": "720"}])
+
+        result = manager._get_sync_batch(service, 3, lookback_days=90, max_messages=50)
+
+        self.assertEqual(service.fetched_ids, ["bad-1"])
+        self.assertEqual(manager._next_retry_ids(3, result, {"bad-1"}), {})
+        self.assertEqual(manager._next_retry_ids(3, result, set()), {"bad-1": 2})
+        manager.max_message_retries = 1
+        self.assertEqual(manager._next_retry_ids(3, result, set()), {})
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_label_changes_update_stored_rows(self, mock_db):
+        mock_db.bind_boolean_column.side_effect = lambda value: value
+        updated = self._manager()._apply_gmail_label_changes(3, {"old-1": ["INBOX", "UNREAD"]})
+        self.assertEqual(updated, 1)
+        sql, params = mock_db.execute_query.call_args.args
+        self.assertIn("UPDATE synced_emails SET labels = ?, is_read = ?", sql)
+        self.assertEqual(params, (json.dumps(["INBOX", "UNREAD"]), 0, 3, "old-1"))
+
+
+class TestGmailKnownMessageProbe(unittest.TestCase):
+    def _manager(self):
+        manager = GmailSyncJobManager.__new__(GmailSyncJobManager)
+        manager.sync_page_size = 100
+        manager.gmail_fetch_mode = "serial"
+        manager.incremental_sync = False
+        return manager
+
+    @staticmethod
+    def _db_with_known(mock_db, known_ids):
+        probes = []
+
+        def execute_query(sql, params=None, fetch=True):
+            if "external_id IN" in sql:
+                probes.append(params)
+                return [{"external_id": mid} for mid in params[1:] if mid in known_ids]
+            return []
+
+        mock_db.execute_query.side_effect = execute_query
+        return probes
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_known_ids_get_minimal_label_refresh_only(self, mock_db):
+        probes = self._db_with_known(mock_db, {"m1", "m3"})
+        service = _FakeGmailService(listed_ids=["m1", "m2", "m3"])
+
+        result = self._manager()._get_sync_batch(service, 3, lookback_days=90, max_messages=10)
+
+        self.assertEqual(len(probes), 1)
+        self.assertEqual(probes[0], (3, "m1", "m2", "m3"))
+        self.assertEqual(service.fetched_ids, ["m2"])
+        self.assertEqual(service.minimal_ids, ["m1", "m3"])
+        self.assertEqual(result["label_changes"], {"m1": ["INBOX"], "m3": ["INBOX"]})
+        self.assertEqual(result["skipped_known"], 2)
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_full_resync_refetches_everything(self, mock_db):
+        probes = self._db_with_known(mock_db, {"m1"})
+        service = _FakeGmailService(listed_ids=["m1", "m2"])
+
+        self._manager()._get_sync_batch(
+            service, 3, lookback_days=90, max_messages=10, full_resync=True
+        )
+
+        self.assertEqual(probes, [])
+        self.assertEqual(service.fetched_ids, ["m1", "m2"])
+
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_probe_is_chunked(self, mock_db):
+        probes = self._db_with_known(mock_db, set())
+        ids = [f"id{i}" for i in range(1200)]
+
+        known = self._manager()._known_synced_message_ids(3, ids)
+
+        self.assertEqual(known, set())
+        self.assertEqual([len(p) - 1 for p in probes], [500, 500, 200])
+
+
+class TestGmailSyncPipeline(unittest.TestCase):
+    @patch.dict(os.environ, {"MAILBOX_AUTOMATION_ENABLED": "false"}, clear=False)
+    @patch("email_automation.gmail_sync_jobs.db_optimizer")
+    def test_pipeline_fetches_in_chunks_and_parses_each_message_once(self, mock_db):
+        manager = GmailSyncJobManager.__new__(GmailSyncJobManager)
+        manager.sync_days = 7
+        manager.sync_max_messages = 10
+        manager.progress_update_every = 2
+        manager.fetch_chunk_size = 2
+        manager.triage_workers = 2
+        mock_db.execute_query.return_value = []
+        fetch_calls = []
+
+        def fetch(service, ids):
+            fetch_calls.append(list(ids))
+            return [{"id": mid, "payload": {"headers": []}} for mid in ids]
+
+        parser = MagicMock()
+        parser.parse_message.side_effect = lambda message: {"message_id": message["id"]}
+        parser.get_sender.return_value = "Lead <lead@example.com>"
+        parser.get_subject.return_value = "Quote"
+        parser.get_body_text.return_value = "body"
+
+        with patch.object(
+            manager,
+            "_get_sync_batch",
+            return_value={
+                "messages": [{"id": "m0", "payload": {"headers": []}}],
+                "pending_ids": ["m1", "m2", "m3"],
+                "has_more": False,
+            },
+        ), patch.object(manager, "_fetch_full_gmail_messages", side_effect=fetch), patch.object(
+            manager, "_store_email", return_value=1
+        ), patch.object(manager, "_extract_contacts", return_value=[]), patch.object(
+            manager, "_calculate_lead_score", return_value=0
+        ), patch(
+            "email_automation.parser.MinimalEmailParser", return_value=parser
+        ), patch("email_automation.email_event_log.record_email_event"), patch(
+            "email_automation.email_workflow_state.should_classify_email", return_value=True
+        ), patch(
+            "services.email_triage_service.triage_and_store_synced_message"
+        ) as mock_triage, patch(
+            "email_automation.pipeline.orchestrate_incoming", return_value={"success": True}
+        ) as mock_orch:
+            result = manager._sync_emails(
+                MagicMock(), user_id=3, job_id="job-pipe", job_meta={"lookback_days": 7}
+            )
+
+        self.assertEqual(fetch_calls, [["m1", "m2"], ["m3"]])
+        self.assertEqual(result["emails_synced"], 4)
+        self.assertEqual(parser.parse_message.call_count, 4)
+        self.assertEqual(mock_triage.call_count, 4)
+        self.assertEqual(
+            sorted(call.args[0]["message_id"] for call in mock_orch.call_args_list),
+            ["m0", "m1", "m2", "m3"],
+        )
+        stages = result["pipeline"]["stages"]
+        self.assertEqual(set(stages), {"fetch", "store", "triage", "automations"})
+        self.assertEqual(stages["triage"]["workers"], 2)
+        self.assertEqual(stages["automations"]["items"], 4)
+
+        progress_updates = [
+            call
+            for call in mock_db.execute_query.call_args_list
+            if "SET progress = ?, emails_synced = ?" in str(call.args[0])
+        ]
+        self.assertEqual([call.args[1][1] for call in progress_updates], [1, 2, 4])
+        progress_meta = json.loads(progress_updates[-1].args[1][2])
+        self.assertEqual(progress_meta["lookback_days"], 7)
+        self.assertIn("store", progress_meta["pipeline"]["stages"])
+
+
 if __name__ == '__main__':
     unittest.main()
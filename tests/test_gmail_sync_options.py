@@ -10,6 +10,7 @@ from core.gmail_sync_options import (
     parse_lookback_days,
     parse_sync_params_from_body,
     lookback_presets_for_api,
+    sync_params_to_job_metadata,
 )
 
 
@@ -38,6 +39,11 @@ class TestGmailSyncOptions(unittest.TestCase):
         self.assertEqual(params.lookback_days, 365)
         self.assertEqual(params.page_token, "tok123")
 
+    def test_full_resync_flag_reaches_job_metadata(self):
+        params = parse_sync_params_from_body({"full_resync": True})
+        self.assertTrue(sync_params_to_job_metadata(params)["full_resync"])
+        self.assertNotIn("full_resync", sync_params_to_job_metadata(parse_sync_params_from_body({})))
+
     def test_lookback_presets_for_api(self):
         presets = lookback_presets_for_api()
         self.assertEqual(len(presets), 5)
@@ -8,11 +8,14 @@ import unittest
 import os
 import sys
 import json
+import tempfile
 from unittest.mock import patch, MagicMock
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault("FLASK_ENV", "test")
 
+from tests.db_test_util import capture_sql, insert_test_user, sqlite_test_optimizer
+
 
 class TestIdempotencyManager(unittest.TestCase):
     def setUp(self):
@@ -78,5 +81,97 @@ class TestIdempotencyManager(unittest.TestCase):
         self.assertEqual(result["response_data"], {"id": 1})
 
 
+class TestIdempotencyBulk(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = sqlite_test_optimizer(os.path.join(tmp.name, "fikiri.db"))
+        insert_test_user(self.db, 1)
+        patcher = patch("core.idempotency_manager.db_optimizer", self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        from core.idempotency_manager import IdempotencyManager
+
+        self.manager = IdempotencyManager()
+        self.manager.redis_client = None
+
+    def test_check_keys_bulk_is_one_query_and_does_not_cache_misses(self):
+        self.manager.store_key("done", "op")
+        self.manager.update_key_result("done", "completed", {"ok": True})
+
+        keys = ["done"] + [f"k{i}" for i in range(50)]
+        with capture_sql(self.db) as statements:
+            result = self.manager.check_keys_bulk(keys)
+        self.assertEqual(result["done"]["status"], "completed")
+        self.assertEqual(result["done"]["response_data"], {"ok": True})
+        self.assertIsNone(result["k7"])
+        self.assertEqual(len(statements), 1)
+
+        with capture_sql(self.db) as statements:
+            self.assertEqual(self.manager.check_keys_bulk(["done"])["done"]["status"], "completed")
+            self.assertIsNone(self.manager.check_key("k7"))
+        self.assertEqual(len(statements), 1)  # "done" from memory, the miss goes back to the table
+
+    def test_key_stored_by_another_worker_is_seen_right_after_a_miss(self):
+        from core.idempotency_manager import IdempotencyManager
+
+        other = IdempotencyManager()
+        other.redis_client = None
+        self.assertIsNone(self.manager.check_key("k7"))
+        self.assertEqual(self.manager.check_keys_bulk(["k7"]), {"k7": None})
+
+        other.store_key("k7", "op")
+        self.assertEqual(self.manager.check_key("k7")["status"], "pending")
+        self.assertEqual(self.manager.check_keys_bulk(["k7"])["k7"]["status"], "pending")
+
+    def test_check_key_falls_back_to_table_on_redis_miss(self):
+        self.manager.store_key("abc", "op")
+        self.manager.update_key_result("abc", "completed", {"id": 1})
+        redis_client = MagicMock()
+        redis_client.get.return_value = None
+        self.manager.redis_client = redis_client
+        self.manager._local_forget("abc")
+
+        result = self.manager.check_key("abc")
+        self.assertEqual(result["status"], "completed")
+        self.assertEqual(result["response_data"], {"id": 1})
+        redis_client.setex.assert_called_once()
+        name, ttl, payload = redis_client.setex.call_args.args
+        self.assertEqual(name, "fikiri:idempotency:abc")
+        self.assertGreater(ttl, 0)
+        self.assertEqual(json.loads(payload)["status"], "completed")
+
+    def test_claim_keys_bulk_skips_completed_and_reclaims_failed(self):
+        for key, status in (("done", "completed"), ("broken", "failed")):
+            self.manager.store_key(key, "op")
+            self.manager.update_key_result(key, status)
+
+        with capture_sql(self.db) as statements:
+            claimed = self.manager.claim_keys_bulk("op", {"done": None, "broken": None, "new": {"id": 3}}, user_id=1)
+        self.assertEqual(claimed, {"broken", "new"})
+        self.assertEqual(len(statements), 1)
+        rows = {r["key_hash"]: r for r in self.db.execute_query("SELECT key_hash, status, request_data FROM idempotency_keys")}
+        self.assertEqual(rows["done"]["status"], "completed")
+        self.assertEqual(rows["broken"]["status"], "pending")
+        self.assertEqual(json.loads(rows["new"]["request_data"]), {"id": 3})
+
+    def test_redis_tier_uses_one_mget_and_one_pipeline(self):
+        redis_client = MagicMock()
+        redis_client.mget.return_value = [json.dumps({"key": "a", "status": "completed"}), None, None]
+        self.manager.redis_client = redis_client
+        self.manager.store_key("b", "op")
+        self.manager.update_key_result("b", "failed")
+        redis_client.reset_mock()
+        redis_client.mget.return_value = [json.dumps({"key": "a", "status": "completed"}), None, None]
+
+        result = self.manager.check_keys_bulk(["a", "b", "c"])
+        self.assertEqual(result["a"]["status"], "completed")
+        self.assertEqual(result["b"]["status"], "failed")
+        self.assertIsNone(result["c"])
+        redis_client.mget.assert_called_once()
+        redis_client.get.assert_not_called()
+        self.assertEqual(redis_client.pipeline.return_value.setex.call_count, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,191 @@
+"""IMAP sync against the in-process stub: UID cursors, UIDVALIDITY resets and batched fetch."""
+
+import os
+from datetime import datetime, timezone
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import format_datetime
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from core.imap_mail_helpers import connect_imap, fetch_imap_uid_batch, imap_uid_set
+from integrations.imap import imap_sync
+from integrations.imap.imap_stub import ImapStubServer
+from tests.db_test_util import insert_test_user
+
+IMAP_BIG = imap_sync.IMAP_BODY_BYTES_CAP * 2
+
+
+def _message(subject, *, attachment_bytes=0):
+    msg = MIMEMultipart()
+    msg["Subject"] = subject
+    msg["From"] = "lead@example.test"
+    msg["Date"] = format_datetime(datetime.now(timezone.utc))
+    msg.attach(MIMEText(f"Body of {subject}", "plain"))
+    if attachment_bytes:
+        part = MIMEApplication(b"x" * attachment_bytes, _subtype="pdf")
+        part.add_header("Content-Disposition", "attachment", filename="quote.pdf")
+        msg.attach(part)
+    return msg.as_bytes().replace(b"\n", b"\r\n")
+
+
+@pytest.fixture
+def env(sqlite_db):
+    db = sqlite_db
+    insert_test_user(db, 7)
+    with ImapStubServer() as server:
+        with patch.object(imap_sync, "db_optimizer", db), patch.object(
+            imap_sync, "get_user_imap_settings", return_value=server.settings()
+        ), patch("core.email_attachments.cache_attachments") as cached:
+            yield server, db, cached
+
+
+def _fetch_commands(server):
+    return [c for c in server.commands if c.upper().startswith("UID FETCH")]
+
+
+def test_uid_set_compacts_ranges():
+    assert imap_uid_set([9, 1, 2, 3, 7, 10]) == "1:3,7,9:10"
+
+
+def test_batch_fetch_caps_body_and_marks_incomplete():
+    with ImapStubServer() as server:
+        small = server.add_message(_message("small"))
+        big = server.add_message(_message("big", attachment_bytes=50_000))
+        imap = connect_imap(server.settings())
+        try:
+            fetched = fetch_imap_uid_batch(imap, [small, big], body_bytes_cap=4096)
+        finally:
+            imap.logout()
+    assert fetched[small]["complete"] is True
+    assert fetched[big]["complete"] is False
+    assert len(fetched[big]["raw"]) < fetched[big]["size"]
+    assert b"Subject: big" in fetched[big]["raw"]
+
+
+def test_first_sync_then_incremental_only_fetches_new_uids(env):
+    server, db, _ = env
+    for i in range(3):
+        server.add_message(_message(f"m{i}"))
+
+    first = imap_sync.sync_imap_emails(7, limit=50)
+    assert first["success"] and first["count"] == 3
+    assert len(_fetch_commands(server)) == 1  # one batched round trip
+    cursor = imap_sync.get_imap_sync_cursor(7, imap_sync.imap_account_key(server.settings()))
+    assert cursor == {"uidvalidity": 1, "last_uid": 3}
+
+    server.add_message(_message("m3"))
+    server.commands.clear()
+    second = imap_sync.sync_imap_emails(7, limit=50)
+    assert second["count"] == 1
+    assert any(c.upper().startswith("UID SEARCH UID 4:*") for c in server.commands)
+    assert _fetch_commands(server)[0].split()[2] == "4"
+
+    server.commands.clear()
+    third = imap_sync.sync_imap_emails(7, limit=50)
+    assert third["count"] == 0
+    assert _fetch_commands(server) == []
+
+
+def test_large_attachment_not_downloaded_by_default(env):
+    server, db, cached = env
+    server.add_message(_message("quote", attachment_bytes=IMAP_BIG))
+
+    result = imap_sync.sync_imap_emails(7)
+    assert result["count"] == 1
+    assert server.literal_bytes_sent < IMAP_BIG
+    cached.assert_not_called()
+    row = db.execute_query("SELECT subject, body FROM synced_emails")[0]
+    assert row["subject"] == "quote"
+    assert "Body of quote" in row["body"]
+
+
+def test_include_attachments_fetches_full_message(env):
+    server, db, cached = env
+    server.add_message(_message("quote", attachment_bytes=IMAP_BIG))
+
+    imap_sync.sync_imap_emails(7, include_attachments=True)
+    assert server.literal_bytes_sent > IMAP_BIG
+    cached.assert_called_once()
+
+
+def test_uidvalidity_change_discards_cursor(env):
+    server, db, _ = env
+    server.add_message(_message("old"))
+    imap_sync.sync_imap_emails(7)
+
+    server.reset_mailbox(uidvalidity=2)
+    server.add_message(_message("moved"), uid=5)
+    server.add_message(_message("new"))
+    server.commands.clear()
+    result = imap_sync.sync_imap_emails(7)
+
+    assert any("SINCE" in c.upper() for c in server.commands)
+    assert not any("UID 2:*" in c.upper() for c in server.commands)
+    assert result["count"] == 2
+    cursor = imap_sync.get_imap_sync_cursor(7, imap_sync.imap_account_key(server.settings()))
+    assert cursor == {"uidvalidity": 2, "last_uid": 6}
+
+
+def test_limit_pages_forward_from_cursor(env):
+    server, db, _ = env
+    server.add_message(_message("seed"))
+    imap_sync.sync_imap_emails(7)
+    for i in range(5):
+        server.add_message(_message(f"n{i}"))
+
+    page = imap_sync.sync_imap_emails(7, limit=2)
+    assert page["count"] == 2 and page["has_more"] is True
+    subjects = [r["subject"] for r in db.execute_query("SELECT subject FROM synced_emails ORDER BY id")]
+    assert subjects == ["seed", "n0", "n1"]
+
+    rest = imap_sync.sync_imap_emails(7, limit=10)
+    assert rest["count"] == 3 and rest["has_more"] is False
+
+
+
+def test_cursor_stays_below_first_uid_that_failed_to_store(env, caplog):
+    server, db, _ = env
+    for i in range(4):
+        server.add_message(_message(f"m{i}"))
+    real_store = imap_sync._store_imap_message
+
+    def flaky_store(user_id, uid_str, *args):
+        if uid_str == "2":
+            raise RuntimeError("disk full")
+        return real_store(user_id, uid_str, *args)
+
+    with patch.object(imap_sync, "_store_imap_message", side_effect=flaky_store):
+        first = imap_sync.sync_imap_emails(7)
+    assert first["count"] == 3
+    assert "IMAP message sync failed user=7 uid=2" in caplog.text
+    account = imap_sync.imap_account_key(server.settings())
+    assert imap_sync.get_imap_sync_cursor(7, account)["last_uid"] == 1
+
+    server.commands.clear()
+    second = imap_sync.sync_imap_emails(7)
+    assert second["count"] == 1
+    assert _fetch_commands(server)[0].split()[2] == "2"
+    assert imap_sync.get_imap_sync_cursor(7, account)["last_uid"] == 4
+
+
+def test_cursor_stays_below_uid_missing_from_fetch(env):
+    server, db, _ = env
+    for i in range(3):
+        server.add_message(_message(f"m{i}"))
+    real_fetch = imap_sync.fetch_imap_uid_batch
+
+    def drop_uid_2(imap, uids, **kwargs):
+        fetched = real_fetch(imap, uids, **kwargs)
+        fetched.pop(2, None)
+        return fetched
+
+    with patch.object(imap_sync, "fetch_imap_uid_batch", side_effect=drop_uid_2):
+        result = imap_sync.sync_imap_emails(7)
+    assert result["count"] == 2 and result["has_more"] is False
+    cursor = imap_sync.get_imap_sync_cursor(7, imap_sync.imap_account_key(server.settings()))
+    assert cursor["last_uid"] == 1
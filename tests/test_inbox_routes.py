@@ -174,9 +174,11 @@ class TestInboxRoutes(unittest.TestCase):
 
         mock_db.execute_query.side_effect = fake_query
 
-        response = self.client.get(
-            '/api/email/messages?use_synced=true&q=Florida+Atlantic'
-        )
+        # No full-text index available -> LIKE fallback.
+        with patch('core.email_search_index.synced_emails_search_mode', return_value=None):
+            response = self.client.get(
+                '/api/email/messages?use_synced=true&q=Florida+Atlantic'
+            )
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
         self.assertTrue(data.get('success'))
@@ -185,6 +187,20 @@ class TestInboxRoutes(unittest.TestCase):
         self.assertIn('LIKE', list_sql)
         self.assertIn('%Florida Atlantic%', list_params)
 
+        captured.clear()
+        with patch('core.email_search_index.synced_emails_search_mode', return_value='fts5'):
+            response = self.client.get(
+                '/api/email/messages?use_synced=true&q=Florida+Atlantic'
+            )
+        self.assertEqual(response.status_code, 200)
+        list_sql, list_params = captured[0]
+        self.assertIn('MATCH ?', list_sql)
+        self.assertIn('fts.fts_rank', list_sql)
+        self.assertEqual(list_params[:2], ('"Florida"* "Atlantic"*', 1))
+        count_sql, count_params = captured[1]
+        self.assertIn('MATCH ?', count_sql)
+        self.assertEqual(count_params[:2], ('"Florida"* "Atlantic"*', 1))
+
 
 if __name__ == '__main__':
     unittest.main()
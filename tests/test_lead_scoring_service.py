@@ -2,6 +2,7 @@
 
 import os
 import unittest
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
 from core.lead_scoring_service import LeadScoringService, DEFAULT_WEIGHTS
@@ -69,6 +70,31 @@ class TestLeadScoringService(unittest.TestCase):
         self.assertAlmostEqual(sum(svc.weights.values()), 1.0, places=6)
         self.assertEqual(svc.weights, DEFAULT_WEIGHTS)
 
+    def test_batch_matches_single_lead_scoring(self):
+        svc = LeadScoringService()
+        now = datetime(2026, 10, 18, 12, 0, 0)
+        leads, counts, lasts = [], [], []
+        for i in range(60):
+            leads.append(
+                {
+                    "source": ["referral", "gmail", "manual", None][i % 4],
+                    "email": ["a@gmail.com", "b@school.edu", "c@acme.io", "bad"][i % 4],
+                    "company": "Acme" if i % 3 else None,
+                    "stage": ["new", "qualified", "booked", "unknown"][i % 4],
+                    "notes": ["demo pricing", "crm workflow", "not interested", ""][i % 4],
+                    "metadata": '{"subject": "proposal"}' if i % 5 == 0 else None,
+                    "created_at": None if i % 7 == 0 else (now - timedelta(hours=i * 17)).isoformat(),
+                }
+            )
+            counts.append(i % 9)
+            lasts.append(None if i % 4 == 0 else now - timedelta(hours=i * 5))
+
+        batch = svc.score_leads_batch(leads, counts, lasts, now=now)
+        for lead, count, last, result in zip(leads, counts, lasts, batch):
+            single = svc.score_lead(lead, count, last, now=now)
+            self.assertEqual((result.score, result.quality, result.breakdown), (single.score, single.quality, single.breakdown))
+        self.assertEqual(svc.score_leads_batch([]), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,175 @@
+"""
+Unit tests for LLMClient.acall_llm, the shared async runtime, and the local stub provider.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FLASK_ENV", "test")
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+os.environ.setdefault("FIKIRI_AI_EVENT_LOG", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ai.llm_async import get_async_llm_runtime, reset_async_llm_runtime_for_tests
+from core.ai.llm_client import LLMClient
+from core.ai.llm_router import LLMRouter
+from core.ai.llm_stub import stub_provider
+from core.ai.model_policy import FALLBACK_LLM_MODEL
+from core.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setenv("FIKIRI_LLM_PROVIDER", "stub")
+    monkeypatch.setenv("FIKIRI_LLM_MAX_IN_FLIGHT", "4")
+    monkeypatch.setenv("FIKIRI_LLM_TENANT_MAX_IN_FLIGHT", "2")
+    reset_async_llm_runtime_for_tests()
+    stub_provider.reset()
+    yield stub_provider
+    stub_provider.reset()
+    reset_async_llm_runtime_for_tests()
+
+
+def test_stub_provider_enables_client_in_test_mode(stub):
+    client = LLMClient()
+    assert client.is_enabled()
+    result = client.call_llm(model="gpt-4o-mini", prompt="ping")
+    assert result["success"] is True
+    assert result["content"] == "[stub:gpt-4o-mini] ping"
+    assert result["tokens_used"] > 0
+
+
+def test_acall_llm_returns_call_llm_shape(stub):
+    client = LLMClient()
+    result = asyncio.run(client.acall_llm(model="gpt-4o-mini", prompt="hello async"))
+    assert result["success"] is True
+    assert result["content"].endswith("hello async")
+    assert set(["tokens_used", "cost_usd", "latency_ms", "trace_id", "error"]) <= set(result)
+
+
+def test_per_tenant_and_global_in_flight_caps(stub):
+    stub.queue_latencies(*([0.05] * 12))
+    client = LLMClient()
+
+    async def _burst():
+        calls = [client.acall_llm(model="m", prompt=f"t1-{i}", tenant_id="t1") for i in range(6)]
+        calls += [client.acall_llm(model="m", prompt=f"t{i}", tenant_id=f"t{i}") for i in range(2, 8)]
+        return await asyncio.gather(*calls)
+
+    results = asyncio.run(_burst())
+    assert all(r["success"] for r in results)
+    assert stub.peak_in_flight <= 4
+    assert get_async_llm_runtime().stats()["in_flight"] == 0
+
+
+def test_tenant_cap_limits_single_tenant(stub):
+    stub.queue_latencies(*([0.05] * 6))
+    client = LLMClient()
+
+    async def _burst():
+        return await asyncio.gather(
+            *[client.acall_llm(model="m", prompt=str(i), tenant_id=42) for i in range(6)]
+        )
+
+    asyncio.run(_burst())
+    assert stub.peak_in_flight <= 2
+
+
+def test_hedge_wins_when_primary_is_slow(stub):
+    stub.queue_latencies(1.0, 0.0)
+    client = LLMClient()
+    result = client.call_llm_hedged(model="m", prompt="hedge me", hedge_after_ms=50)
+    assert result["success"] is True
+    assert result["hedged"] is True and result["hedge_won"] is True
+    assert result["latency_ms"] < 900
+    assert len(stub.calls) == 2
+
+
+def test_no_hedge_when_primary_is_fast(stub):
+    client = LLMClient()
+    result = client.call_llm_hedged(model="m", prompt="fast", hedge_after_ms=500)
+    assert result["success"] is True
+    assert "hedged" not in result
+    assert len(stub.calls) == 1
+
+
+def test_hedge_covers_failed_primary(stub):
+    attempts = []
+
+    def responder(model, messages):
+        attempts.append(model)
+        if len(attempts) == 1:
+            raise RuntimeError("502 upstream")
+        return "recovered"
+
+    stub.responder = responder
+    result = LLMClient().call_llm_hedged(model="m", prompt="x", hedge_after_ms=200)
+    assert result["success"] is True
+    assert result["content"] == "recovered"
+
+
+def test_router_low_latency_uses_hedged_path(stub, monkeypatch):
+    monkeypatch.setenv("FIKIRI_LLM_HEDGE_AFTER_MS", "250")
+    router = LLMRouter()
+    assert router.choose_model("general", None, "low")["hedge_after_ms"] == 250.0
+    with patch.object(router.client, "call_llm", wraps=router.client.call_llm) as sync_call:
+        result = router.process("quick answer please", intent="general", latency_requirement="low")
+    assert result["success"] is True
+    sync_call.assert_not_called()
+    assert len(stub.calls) == 1
+
+
+def _open_breaker():
+    breaker = CircuitBreaker("openai-test", failure_threshold=2, timeout_seconds=60, fail_open=False)
+    return breaker, patch("core.ai.llm_client.get_circuit_breaker", return_value=breaker)
+
+
+def test_async_path_feeds_and_honours_the_circuit_breaker(stub):
+    def responder(model, messages):
+        raise RuntimeError("502 upstream")
+
+    stub.responder = responder
+    breaker, patched = _open_breaker()
+    with patched:
+        failed = LLMClient().call_llm_hedged(model="m", prompt="x", hedge_after_ms=500)
+        assert failed["success"] is False and len(stub.calls) == 2
+        assert breaker.get_status()["state"] == "open"
+
+        result = asyncio.run(LLMClient().acall_llm(model="m", prompt="again"))
+    assert result["error_type"] == "circuit_breaker_open"
+    assert len(stub.calls) == 2
+
+
+def test_model_error_reaches_fallback_with_a_single_attempt(stub):
+    def responder(model, messages):
+        if model != FALLBACK_LLM_MODEL:
+            raise RuntimeError(f"The model {model} does not exist or is invalid")
+        return "from fallback"
+
+    stub.responder = responder
+    result = LLMClient().call_llm_hedged(model="retired-model", prompt="x", hedge_after_ms=500)
+    assert result["success"] is True and result["content"] == "from fallback"
+    assert result["model"] == FALLBACK_LLM_MODEL
+    assert [c["model"] for c in stub.calls] == ["retired-model", FALLBACK_LLM_MODEL]
+
+
+def test_hedged_usage_includes_a_losing_leg_that_answered(stub):
+    client = LLMClient()
+    deadline = []
+
+    async def both_answer_together(**call):
+        loop = asyncio.get_running_loop()
+        if not deadline:
+            deadline.append(loop.time() + 0.1)
+        await asyncio.sleep(deadline[0] - loop.time())
+        return client._llm_result(True, "ok", 100, call["model"], call["trace_id"], call["start_time"])
+
+    with patch.object(client, "_acall_attempts", side_effect=both_answer_together):
+        result = client.call_llm_hedged(model="gpt-4o-mini", prompt="x", hedge_after_ms=20)
+    assert result["hedged"] is True
+    assert result["tokens_used"] == 200
+    assert result["cost_usd"] == client._calculate_cost("gpt-4o-mini", 100) * 2
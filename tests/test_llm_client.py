@@ -4,7 +4,8 @@ Unit tests for core/ai/llm_client.py (LLMClient).
 
 import os
 import sys
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 os.environ.setdefault("FLASK_ENV", "test")
 os.environ.setdefault("FIKIRI_TEST_MODE", "1")
@@ -68,3 +69,69 @@ class TestLLMClient:
         cost = client._calculate_cost("unknown-model", 100)
         assert isinstance(cost, float)
         assert cost >= 0
+
+
+def _chunk(text=None, total_tokens=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text is not None else []
+    usage = SimpleNamespace(total_tokens=total_tokens) if total_tokens else None
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def _enabled_client(create):
+    client = LLMClient(api_key=None)
+    client.enabled = True
+    client.client = MagicMock()
+    client.client.chat.completions.create.side_effect = create
+    return client
+
+
+class TestLLMClientStream:
+    def test_stream_when_not_enabled_yields_single_done(self):
+        frames = list(LLMClient(api_key=None).stream_llm(model="gpt-4o-mini", prompt="Hi"))
+        assert len(frames) == 1
+        assert frames[0]["type"] == "done"
+        assert frames[0]["success"] is False
+        assert frames[0]["first_token_ms"] is None
+
+    def test_stream_yields_tokens_then_done_with_usage(self):
+        def create(**kwargs):
+            assert kwargs["stream"] is True
+            return iter([_chunk("Hello"), _chunk(" there"), _chunk(None, total_tokens=42)])
+
+        frames = list(_enabled_client(create).stream_llm(model="gpt-4o-mini", prompt="Hi"))
+        assert [f["content"] for f in frames if f["type"] == "token"] == ["Hello", " there"]
+        done = frames[-1]
+        assert done["type"] == "done" and done["success"] is True
+        assert done["content"] == "Hello there"
+        assert done["tokens_used"] == 42
+        assert done["cost_usd"] > 0
+        assert done["first_token_ms"] is not None
+
+    @patch("core.ai.llm_client.time.sleep")
+    def test_stream_retries_before_first_token(self, _sleep):
+        calls = []
+
+        def create(**kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("connection reset")
+            return iter([_chunk("ok")])
+
+        frames = list(_enabled_client(create).stream_llm(model="gpt-4o-mini", prompt="Hi"))
+        assert len(calls) == 2
+        assert frames[-1]["success"] is True
+        assert frames[-1]["tokens_used"] > 0  # estimated when no usage frame
+
+    @patch("core.ai.llm_client.time.sleep")
+    def test_stream_does_not_retry_after_tokens_sent(self, _sleep):
+        def broken():
+            yield _chunk("partial")
+            raise RuntimeError("stream dropped")
+
+        client = _enabled_client(lambda **kwargs: broken())
+        frames = list(client.stream_llm(model="gpt-4o-mini", prompt="Hi"))
+        assert client.client.chat.completions.create.call_count == 1
+        done = frames[-1]
+        assert done["success"] is False
+        assert done["content"] == "partial"
+        assert done["error_type"] == "stream_interrupted"
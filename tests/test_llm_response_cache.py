@@ -0,0 +1,150 @@
+"""
+Unit tests for core/ai/response_cache.py and its use in LLMRouter.process.
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FLASK_ENV", "test")
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+os.environ.setdefault("FIKIRI_AI_EVENT_LOG", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ai.llm_router import LLMRouter
+from core.ai.response_cache import (
+    INTENT_CACHE_TTL_SECONDS,
+    LLMResponseCache,
+    MemoryResponseCacheBackend,
+    build_cache_key,
+    get_response_cache_stats,
+    reset_response_cache_for_tests,
+)
+
+CLASSIFY_JSON = '{"intent": "lead_inquiry", "confidence": 0.9, "urgency": "high", "suggested_action": "reply"}'
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setenv("FIKIRI_LLM_RESPONSE_CACHE", "1")
+    instance = LLMResponseCache(backend=MemoryResponseCacheBackend(max_entries=50))
+    reset_response_cache_for_tests(instance)
+    yield instance
+    reset_response_cache_for_tests()
+
+
+def _llm_ok(content=CLASSIFY_JSON):
+    return {
+        "success": True,
+        "content": content,
+        "tokens_used": 120,
+        "cost_usd": 0.0004,
+        "latency_ms": 850.0,
+    }
+
+
+class TestCacheKey:
+    def test_whitespace_and_unicode_width_share_key(self):
+        a = build_cache_key(scope="t:1", model="m", intent="classification", prompt="Hello   world\n")
+        b = build_cache_key(scope="t:1", model="m", intent="classification", prompt="Ｈello world")
+        assert a == b
+
+    def test_scope_model_and_schema_isolate_keys(self):
+        base = dict(scope="t:1", model="m", intent="classification", prompt="hi")
+        key = build_cache_key(**base)
+        assert key != build_cache_key(**{**base, "scope": "t:2"})
+        assert key != build_cache_key(**{**base, "model": "other"})
+        assert key != build_cache_key(**base, output_schema={"type": "object"})
+
+
+class TestLLMResponseCache:
+    def test_disabled_intent_and_flag_return_none(self, cache, monkeypatch):
+        monkeypatch.setitem(INTENT_CACHE_TTL_SECONDS, "general", 0)
+        assert cache.lookup(model="m", intent="general", prompt="hi") is None
+        monkeypatch.setenv("FIKIRI_LLM_RESPONSE_CACHE", "0")
+        assert cache.lookup(model="m", intent="classification", prompt="hi") is None
+
+    def test_memory_backend_expires_and_evicts(self):
+        backend = MemoryResponseCacheBackend(max_entries=10)
+        for i in range(12):
+            backend.set(f"k{i}", {"content": str(i)}, 60)
+        assert backend.get("k0") is None
+        assert backend.get("k11") == {"content": "11"}
+        backend.set("gone", {"content": "x"}, -1)
+        assert backend.get("gone") is None
+
+    def test_semantic_lookup_hits_near_duplicate(self, monkeypatch):
+        monkeypatch.setenv("FIKIRI_LLM_RESPONSE_CACHE", "1")
+        monkeypatch.setenv("FIKIRI_LLM_CACHE_SEMANTIC", "1")
+        vectors = {"classify: can you quote 3 rooms": [1.0, 0.0, 0.01], "classify: could you quote 3 rooms": [1.0, 0.0, 0.0]}
+        cache = LLMResponseCache(backend=MemoryResponseCacheBackend(), embed_fn=lambda text: vectors.get(text, [0.0, 1.0, 0.0]))
+        ctx = {"tenant_id": 7}
+
+        miss = cache.lookup(model="m", intent="classification", prompt="classify: can you quote 3 rooms", context=ctx)
+        assert not miss.hit
+        cache.store(miss, model="m", intent="classification", content="A", tokens_used=10,
+                    cost_usd=0.01, latency_ms=500, validated=True, context=ctx)
+
+        near = cache.lookup(model="m", intent="classification", prompt="classify: could you quote 3 rooms", context=ctx)
+        assert near.hit and near.match == "semantic"
+        assert near.entry["content"] == "A"
+
+        other_tenant = cache.lookup(model="m", intent="classification", prompt="classify: could you quote 3 rooms",
+                                    context={"tenant_id": 8})
+        assert not other_tenant.hit
+
+        # Replies never reuse a near-duplicate answer.
+        reply = cache.lookup(model="m", intent="email_reply", prompt="classify: could you quote 3 rooms", context=ctx)
+        assert not reply.hit and reply.embedding is None
+
+
+class TestRouterIntegration:
+    @patch("core.ai.llm_router.record_ai_event")
+    @patch("core.ai.llm_router.LLMClient")
+    def test_second_identical_call_skips_llm(self, mock_client_class, mock_record, cache):
+        mock_client_class.return_value.call_llm.return_value = _llm_ok()
+        router = LLMRouter()
+
+        first = router.process("Classify: need a quote", intent="classification", context={"tenant_id": 3})
+        second = router.process("Classify:   need a quote ", intent="classification", context={"tenant_id": 3})
+
+        assert mock_client_class.return_value.call_llm.call_count == 1
+        assert second["success"] and second["cached"] is True
+        assert second["content"] == first["content"]
+        assert second["cost_usd"] == 0.0
+
+        generated = [c.kwargs["payload"] for c in mock_record.call_args_list if c.args[0] == "ai.response.generated"]
+        assert generated[0]["cache"] == {"status": "miss", "stored": True}
+        assert generated[1]["cache"]["status"] == "hit"
+        assert generated[1]["cache"]["match"] == "exact"
+        assert generated[1]["cache"]["cost_saved_usd"] == pytest.approx(0.0004)
+
+        stats = get_response_cache_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["cost_saved_usd"] == pytest.approx(0.0004)
+
+    @patch("core.ai.llm_router.record_ai_event")
+    @patch("core.ai.llm_router.LLMClient")
+    def test_tenants_do_not_share_entries(self, mock_client_class, _mock_record, cache):
+        mock_client_class.return_value.call_llm.return_value = _llm_ok()
+        router = LLMRouter()
+        router.process("Classify: need a quote", intent="classification", context={"tenant_id": 1})
+        result = router.process("Classify: need a quote", intent="classification", context={"tenant_id": 2})
+        assert mock_client_class.return_value.call_llm.call_count == 2
+        assert "cached" not in result
+
+    @patch("core.ai.llm_router.record_ai_event")
+    @patch("core.ai.llm_router.LLMClient")
+    def test_failed_or_invalid_results_are_not_cached(self, mock_client_class, _mock_record, cache):
+        client = mock_client_class.return_value
+        client.call_llm.return_value = {"success": False, "error": "boom", "latency_ms": 5}
+        router = LLMRouter()
+        router.process("Classify: hi", intent="classification")
+        client.call_llm.return_value = _llm_ok("not json at all")
+        schema = {"intent": {"type": str, "required": True}}
+        router.process("Classify: hi", intent="classification", output_schema=schema)
+        router.process("Classify: hi", intent="classification", output_schema=schema)
+        assert client.call_llm.call_count == 3
+        assert get_response_cache_stats()["stores"] == 0
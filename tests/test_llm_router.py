@@ -199,3 +199,39 @@ class TestLLMRouterProcess:
         result = router.process("Hello", intent="general")
         assert result["success"] is True and result["validated"] is True
         assert "correlation_id" in result and result["correlation_id"]
+
+
+class TestLLMRouterProcessStream:
+    @patch("core.ai.llm_router.record_ai_event")
+    def test_process_stream_yields_tokens_and_records_cost(self, mock_record):
+        router = LLMRouter(api_key=None)
+        router.client = MagicMock()
+        router.client.stream_llm.return_value = iter([
+            {"type": "token", "content": "Hi"},
+            {"type": "token", "content": " there"},
+            {"type": "done", "success": True, "content": "Hi there", "tokens_used": 12,
+             "cost_usd": 0.0002, "latency_ms": 80, "first_token_ms": 15},
+        ])
+        frames = list(router.process_stream("Hello", intent="chatbot_response", context={"source": "t"}))
+
+        assert [f["content"] for f in frames if f["type"] == "token"] == ["Hi", " there"]
+        done = frames[-1]
+        assert done["success"] is True and done["content"] == "Hi there"
+        assert done["first_token_ms"] == 15 and done["correlation_id"]
+        event_types = [c.args[0] for c in mock_record.call_args_list]
+        assert event_types == ["ai.requested", "ai.response.generated"]
+        generated = mock_record.call_args_list[-1].kwargs["payload"]
+        assert generated["model"]["cost_usd"] == 0.0002
+        assert generated["model"]["first_token_ms"] == 15
+
+    @patch("core.ai.llm_router.record_ai_event")
+    def test_process_stream_failure_records_failed_event(self, mock_record):
+        router = LLMRouter(api_key=None)
+        router.client = MagicMock()
+        router.client.stream_llm.return_value = iter([
+            {"type": "done", "success": False, "content": "", "error": "API error", "latency_ms": 5},
+        ])
+        frames = list(router.process_stream("Hello", intent="general"))
+        assert len(frames) == 1
+        assert frames[0]["success"] is False and frames[0]["error"] == "API error"
+        assert mock_record.call_args_list[-1].args[0] == "ai.response.failed"
@@ -0,0 +1,207 @@
+"""Pooled SMTP transport against a local stub SMTP server (plain TCP, AUTH PLAIN, no TLS)."""
+
+import os
+import socket
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from core import mail_transport
+from core.mail_transport import SmtpConnectionPool
+
+
+class _StubSmtpHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.sockets.append(self.request)
+        self.wfile.write(b"220 stub ESMTP\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode().strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-stub\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif verb == "AUTH":
+                with server.lock:
+                    server.logins += 1
+                self.wfile.write(b"235 2.7.0 Authentication successful\r\n")
+            elif verb == "RCPT":
+                if "reject" in cmd.lower():
+                    self.wfile.write(b"550 5.1.1 No such user\r\n")
+                else:
+                    self.wfile.write(b"250 OK\r\n")
+            elif verb == "DATA":
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                body = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    body.append(data)
+                with server.lock:
+                    server.messages.append(b"".join(body).decode())
+                self.wfile.write(b"250 OK queued\r\n")
+            elif verb in ("MAIL", "NOOP", "RSET"):
+                self.wfile.write(b"250 OK\r\n")
+            elif verb == "QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"502 Command not implemented\r\n")
+
+
+class _StubSmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StubSmtpHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.logins = 0
+        self.messages = []
+        self.sockets = []
+
+    def drop_all(self):
+        """Simulate the provider closing idle sessions."""
+        with self.lock:
+            for sock in self.sockets:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self.sockets = []
+
+
+@pytest.fixture
+def smtp_server():
+    server = _StubSmtpServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    mail_transport.close_smtp_pools()
+    server.shutdown()
+    server.server_close()
+
+
+def _pool(server, **kwargs):
+    return SmtpConnectionPool("127.0.0.1", server.server_address[1], "user", "secret", starttls=False, **kwargs)
+
+
+def _msg(to, subject="Hello"):
+    msg = EmailMessage()
+    msg["From"] = "noreply@fikiri.test"
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg.set_content("body")
+    return msg
+
+
+def test_batch_uses_one_authenticated_session(smtp_server):
+    pool = _pool(smtp_server)
+    results = pool.send_batch([_msg(f"user{i}@real.test", f"n{i}") for i in range(20)])
+    for i in range(5):
+        pool.send(_msg("again@real.test", f"single{i}"))
+    pool.close()
+
+    assert results == [(True, None)] * 20
+    assert len(smtp_server.messages) == 25
+    assert (smtp_server.connections, smtp_server.logins, pool.connects) == (1, 1, 1)
+
+
+def test_dropped_session_is_replaced_without_losing_or_duplicating(smtp_server):
+    pool = _pool(smtp_server)
+    pool.send(_msg("a@real.test", "first"))
+    smtp_server.drop_all()
+    time.sleep(0.05)
+    pool.send(_msg("b@real.test", "second"))
+
+    assert len(smtp_server.messages) == 2 and "second" in smtp_server.messages[1]
+    assert pool.connects == 2
+
+
+def test_idle_session_is_checked_with_noop(smtp_server):
+    pool = _pool(smtp_server)
+    pool.send(_msg("a@real.test"))
+    smtp_server.drop_all()
+    time.sleep(0.05)
+    with patch.object(mail_transport, "SMTP_KEEPALIVE_SECONDS", 0):
+        with pool.connection() as conn:
+            assert conn.smtp.noop()[0] == 250
+    assert pool.connects == 2
+
+
+def test_refused_recipient_does_not_abort_batch(smtp_server):
+    pool = _pool(smtp_server)
+    results = pool.send_batch([_msg("ok1@real.test"), _msg("reject@real.test"), _msg("ok2@real.test")])
+    assert [ok for ok, _ in results] == [True, False, True]
+    assert "No such user" in results[1][1]
+    assert len(smtp_server.messages) == 2 and smtp_server.connections == 1
+
+
+def test_unreachable_server_fails_batch_once(smtp_server):
+    port = smtp_server.server_address[1]
+    smtp_server.shutdown()
+    smtp_server.server_close()
+    pool = SmtpConnectionPool("127.0.0.1", port, starttls=False, timeout=2)
+    results = pool.send_batch([_msg("a@real.test"), _msg("b@real.test")])
+    assert [ok for ok, _ in results] == [False, False]
+
+
+def test_provider_throughput_limit(smtp_server):
+    pool = _pool(smtp_server, max_per_second=50)
+    start = time.monotonic()
+    pool.send_batch([_msg(f"u{i}@real.test") for i in range(10)])
+    assert time.monotonic() - start >= 0.17
+
+
+def test_transactional_sends_share_pooled_session(smtp_server, monkeypatch):
+    from core.mail_delivery import send_plain_text_transactional
+
+    monkeypatch.delenv("SENDGRID_API_KEY", raising=False)
+    monkeypatch.setenv("SMTP_SERVER", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(smtp_server.server_address[1]))
+    monkeypatch.delenv("SMTP_USERNAME", raising=False)
+    monkeypatch.delenv("SMTP_PASSWORD", raising=False)
+
+    for i in range(3):
+        assert send_plain_text_transactional(f"to{i}@real.test", "Hi", "Body")["channel"] == "smtp"
+    assert len(smtp_server.messages) == 3 and smtp_server.connections == 1
+
+
+def test_email_job_batch_outcomes(smtp_server):
+    from email_automation.jobs import EmailJobManager
+
+    manager = EmailJobManager.__new__(EmailJobManager)
+    manager.smtp_username = "user"
+    manager.smtp_password = "secret"
+    manager.from_email = "noreply@fikiri.test"
+    manager.from_name = "Fikiri"
+    manager._smtp_pool = lambda: pool  # EmailJobManager always asks for STARTTLS, which the stub does not speak
+    pool = _pool(smtp_server)
+    jobs = [
+        {"id": "1", "recipient": "a@realco.com", "subject": "A", "template": "default", "data": "{}"},
+        {"id": "2", "recipient": "x@example.com", "subject": "B", "template": "default", "data": "{}"},
+        {"id": "3", "recipient": "reject@realco.com", "subject": "C", "template": "default", "data": "{}"},
+        {"id": "4", "recipient": "d@realco.com", "subject": "D", "template": "default", "data": "{}"},
+    ]
+    settled = []  # (job index, messages the server had received when the outcome arrived)
+    outcomes = manager._send_jobs_batch(
+        jobs, on_outcome=lambda idx, outcome: settled.append((idx, len(smtp_server.messages)))
+    )
+
+    assert settled == [(1, 0), (0, 1), (2, 1), (3, 2)]  # each recorded right after its own send
+    assert outcomes[0] == outcomes[3] == (True, True, None)
+    assert outcomes[1] == (True, False, None)  # reserved domain never reaches SMTP
+    assert outcomes[2][0] is False and outcomes[2][1] is True
+    assert len(smtp_server.messages) == 2 and smtp_server.connections == 1
@@ -11,6 +11,7 @@ os.environ.setdefault("FLASK_ENV", "test")
 
 from email_automation import pipeline
 from email_automation.actions import MinimalEmailActions
+from tests.db_test_util import use_isolated_idempotency_store
 
 
 def _parsed_message():
@@ -91,6 +92,7 @@ class TestMailboxReplyUsesAnalysis(unittest.TestCase):
             captured["analysis"] = pe.get("_analysis")
             return {"success": True, "action": "auto_reply", "details": {"reply_generation_mode": "reused_suggested_reply"}}
 
+        use_isolated_idempotency_store(self)
         actions = MinimalEmailActions()
         actions._auto_reply = _capture_auto_reply
         actions.process_email(parsed, action_type="auto_reply", user_id=7)
@@ -0,0 +1,71 @@
+"""MinimalMLScoring.batch_score_leads: vectorized scoring matches calculate_lead_score."""
+
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+os.environ.setdefault("FIKIRI_VECTOR_EMBEDDINGS", "hash")
+
+from core.ml_scoring import MinimalMLScoring
+from core.vector_search import MinimalVectorSearch
+
+
+def _scorer(services=None):
+    scorer = MinimalMLScoring(services=services or {})
+    scorer.redis_client = None
+    scorer.db_optimizer = MagicMock()
+    scorer._ml_models_initialized = True
+    scorer.scoring_model = None
+    scorer.model_type = "rule_based"
+    return scorer
+
+
+def _leads(n):
+    contents = ["urgent budget proposal", "hello", "interested in a quote " * 10, "doc 3 purchase contract"]
+    subjects = ["Help needed", "", "Re: hi", "Question about pricing"]
+    stamps = [None, "2026-10-18T10:00:00+00:00", "2026-10-11T03:00:00+00:00", "not a date"]
+    emails = ["a@gmail.com", "b@school.edu", "c@agency.gov", "bad"]
+    return [
+        {
+            "email": emails[i % 4],
+            "contact_count": i % 6,
+            "last_email": {"content": contents[i % 4], "subject": subjects[(i // 4) % 4], "timestamp": stamps[i % 3]},
+        }
+        for i in range(n)
+    ]
+
+
+def _key(lead):
+    return lead["email"], lead["contact_count"], lead["last_email"]["content"], lead["last_email"]["subject"]
+
+
+@pytest.mark.parametrize("with_vectors", [False, True])
+def test_vectorized_batch_matches_per_lead_scores(with_vectors):
+    services = {}
+    if with_vectors:
+        vs = MinimalVectorSearch(vector_db_path=":memory:")
+        for i in range(20):
+            vs.add_document(f"doc {i} purchase contract", {"lead_value": "high" if i % 4 == 0 else "low"})
+        services["vector_search"] = vs
+    scorer = _scorer(services)
+    leads = _leads(48)
+
+    batch = scorer.batch_score_leads(leads)
+    for lead in leads:
+        single = scorer.calculate_lead_score(lead["last_email"], lead)
+        match = next(b for b in batch if _key(b) == _key(lead))
+        assert match["ml_score"] == single["total_score"]
+        assert match["priority"] == single["priority"]
+        assert match["confidence"] == single["confidence"]
+    assert [b["ml_score"] for b in batch] == sorted((b["ml_score"] for b in batch), reverse=True)
+
+
+def test_batch_logs_scores_with_one_insert_and_falls_back_on_error():
+    scorer = _scorer()
+    scorer.batch_score_leads(_leads(10))
+    inserts = [c for c in scorer.db_optimizer.execute_query.call_args_list if "ml_scoring_log" in c.args[0]]
+    assert len(inserts) == 1 and len(inserts[0].args[1]) == 80
+
+    scorer._batch_score_leads_vectorized = MagicMock(side_effect=ValueError("shape"))
+    assert len(scorer.batch_score_leads(_leads(3))) == 3
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Outlook delta-query sync against recorded Microsoft Graph responses."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+os.environ.setdefault("FLASK_ENV", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from integrations.outlook import outlook_sync
+from tests.db_test_util import capture_sql, insert_test_user, sqlite_test_optimizer
+
+DELTA_1 = "https://graph.microsoft.com/v1.0/me/mailFolders/inbox/messages/delta?$deltatoken=t1"
+DELTA_2 = "https://graph.microsoft.com/v1.0/me/mailFolders/inbox/messages/delta?$deltatoken=t2"
+NEXT_1 = "https://graph.microsoft.com/v1.0/me/mailFolders/inbox/messages/delta?$skiptoken=s1"
+
+
+def _msg(mid, *, is_read=False, subject=None):
+    return {
+        "id": mid,
+        "subject": subject or f"Subject {mid}",
+        "from": {"emailAddress": {"address": f"{mid}@example.test", "name": "Lead"}},
+        "receivedDateTime": "2026-10-01T10:00:00Z",
+        "bodyPreview": "preview",
+        "isRead": is_read,
+        "hasAttachments": False,
+        "body": {"content": f"Body {mid}"},
+    }
+
+
+class _FakeGraph:
+    """Serves recorded Graph pages keyed by URL; each URL may hold a queue of responses."""
+
+    def __init__(self, responses):
+        self.responses = {url: list(pages) for url, pages in responses.items()}
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.calls.append({"url": url, "params": params, "headers": headers})
+        queue = self.responses.get(url)
+        if not queue:
+            raise AssertionError(f"unexpected Graph request {url}")
+        status, body = queue.pop(0) if len(queue) > 1 else queue[0]
+        response = MagicMock(status_code=status)
+        response.json.return_value = body
+        if status >= 400:
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+        return response
+
+
+class TestOutlookDeltaSync(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = sqlite_test_optimizer(os.path.join(tmp.name, "fikiri.db"))
+        insert_test_user(self.db, 5)
+        self.patches = [
+            patch.object(outlook_sync, "db_optimizer", self.db),
+            patch.object(outlook_sync, "get_valid_outlook_token", return_value="token"),
+            patch("email_automation.pipeline.orchestrate_incoming"),
+            patch("core.email_attachments.fetch_outlook_attachments"),
+            patch.dict(os.environ, {"OUTLOOK_SYNC_DELTA": "1", "MAILBOX_AUTOMATION_ENABLED": ""}),
+        ]
+        for p in self.patches:
+            p.start()
+        self.graph = None
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+
+    def _sync(self, responses, **kwargs):
+        self.graph = _FakeGraph(responses)
+        with patch.object(outlook_sync.requests, "get", self.graph.get), capture_sql(self.db) as statements:
+            result = outlook_sync.sync_outlook_emails(5, **kwargs)
+        self.writes = [s for s in statements if not s.startswith("SELECT")]
+        return result
+
+    def _subjects(self):
+        return [
+            (r["external_id"], json.loads(r["labels"]))
+            for r in self.db.execute_query("SELECT external_id, labels FROM synced_emails ORDER BY id")
+        ]
+
+    def test_initial_round_follows_next_links_and_stores_delta_link(self):
+        result = self._sync(
+            {
+                outlook_sync.GRAPH_INBOX_DELTA_URL: [
+                    (200, {"value": [_msg("a"), _msg("b")], "@odata.nextLink": NEXT_1})
+                ],
+                NEXT_1: [(200, {"value": [_msg("c")], "@odata.deltaLink": DELTA_1})],
+            }
+        )
+        self.assertTrue(result["success"])
+        self.assertEqual(result["count"], 3)
+        self.assertEqual(result["mode"], "delta")
+        first = self.graph.calls[0]
+        self.assertEqual(first["params"]["$select"], outlook_sync.OUTLOOK_MESSAGE_SELECT)
+        self.assertIn("receivedDateTime ge", first["params"]["$filter"])
+        self.assertIn("odata.maxpagesize", first["headers"]["Prefer"])
+        self.assertIsNone(self.graph.calls[1]["params"])
+        self.assertEqual(outlook_sync.get_outlook_delta_state(5), {"delta_link": DELTA_1, "next_link": None})
+        inserts = [w for w in self.writes if w.startswith("INSERT INTO synced_emails")]
+        self.assertEqual(len(inserts), 2)  # one multi-row insert per page
+
+    def test_unchanged_mailbox_costs_one_request(self):
+        outlook_sync.save_outlook_delta_state(5, delta_link=DELTA_1)
+        result = self._sync({DELTA_1: [(200, {"value": [], "@odata.deltaLink": DELTA_2})]})
+        self.assertEqual(result["count"], 0)
+        self.assertEqual(len(self.graph.calls), 1)
+        self.assertEqual(outlook_sync.get_outlook_delta_state(5)["delta_link"], DELTA_2)
+        self.assertFalse(any(w.startswith("INSERT INTO synced_emails") for w in self.writes))
+
+    def test_changes_update_read_state_and_skip_removed(self):
+        outlook_sync.save_outlook_delta_state(5, delta_link=DELTA_1)
+        self._sync({DELTA_1: [(200, {"value": [_msg("a")], "@odata.deltaLink": DELTA_2})]})
+        result = self._sync(
+            {
+                DELTA_2: [
+                    (
+                        200,
+                        {
+                            "value": [_msg("a", is_read=True), _msg("d"), {"id": "x", "@removed": {"reason": "deleted"}}],
+                            "@odata.deltaLink": DELTA_1,
+                        },
+                    )
+                ]
+            }
+        )
+        self.assertEqual(result["count"], 1)
+        self.assertEqual(self._subjects(), [("a", []), ("d", ["UNREAD"])])
+
+    def test_limit_stores_next_link_and_resumes(self):
+        pages = {
+            outlook_sync.GRAPH_INBOX_DELTA_URL: [
+                (200, {"value": [_msg("a"), _msg("b")], "@odata.nextLink": NEXT_1})
+            ],
+            NEXT_1: [(200, {"value": [_msg("c")], "@odata.deltaLink": DELTA_1})],
+        }
+        first = self._sync(pages, limit=2)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(outlook_sync.get_outlook_delta_state(5)["next_link"], NEXT_1)
+
+        second = self._sync(pages, limit=2)
+        self.assertEqual(second["count"], 1)
+        self.assertFalse(second["has_more"])
+        self.assertEqual([c["url"] for c in self.graph.calls], [NEXT_1])
+        self.assertEqual(outlook_sync.get_outlook_delta_state(5), {"delta_link": DELTA_1, "next_link": None})
+
+    def test_expired_delta_token_restarts_round(self):
+        outlook_sync.save_outlook_delta_state(5, delta_link=DELTA_1)
+        result = self._sync(
+            {
+                DELTA_1: [(410, {"error": {"code": "SyncStateNotFound"}})],
+                outlook_sync.GRAPH_INBOX_DELTA_URL: [(200, {"value": [_msg("a")], "@odata.deltaLink": DELTA_2})],
+            }
+        )
+        self.assertTrue(result["success"])
+        self.assertEqual(result["count"], 1)
+        self.assertEqual(outlook_sync.get_outlook_delta_state(5)["delta_link"], DELTA_2)
+
+    def test_bad_message_is_skipped_without_losing_the_page(self):
+        bad = {**_msg("bad"), "receivedDateTime": {"unexpected": "shape"}}
+        with self.assertLogs(outlook_sync.logger, "WARNING") as logs:
+            result = self._sync(
+                {outlook_sync.GRAPH_INBOX_DELTA_URL: [(200, {"value": [_msg("a"), bad, _msg("c")], "@odata.deltaLink": DELTA_1})]}
+            )
+        self.assertEqual(result["count"], 2)
+        self.assertEqual([ext for ext, _ in self._subjects()], ["a", "c"])
+        self.assertTrue(any("retrying one by one" in line for line in logs.output))
+        self.assertTrue(any("Failed to store email bad" in line for line in logs.output))
+        self.assertIsNone(outlook_sync.get_outlook_delta_state(5))  # first round replays
+
+    def test_failed_insert_keeps_the_previous_delta_link(self):
+        outlook_sync.save_outlook_delta_state(5, delta_link=DELTA_1)
+        bad = {**_msg("bad"), "receivedDateTime": {"unexpected": "shape"}}
+        result = self._sync({DELTA_1: [(200, {"value": [_msg("a"), bad], "@odata.deltaLink": DELTA_2})]})
+        self.assertEqual(result["count"], 1)
+        self.assertEqual(outlook_sync.get_outlook_delta_state(5), {"delta_link": DELTA_1, "next_link": None})
+
+        fixed = self._sync({DELTA_1: [(200, {"value": [_msg("a"), _msg("bad")], "@odata.deltaLink": DELTA_2})]})
+        self.assertEqual(fixed["count"], 1)
+        self.assertEqual([ext for ext, _ in self._subjects()], ["a", "bad"])
+        self.assertEqual(outlook_sync.get_outlook_delta_state(5)["delta_link"], DELTA_2)
+
+    def test_failed_insert_mid_round_resumes_at_that_page(self):
+        bad = {**_msg("bad"), "receivedDateTime": {"unexpected": "shape"}}
+        self._sync(
+            {
+                outlook_sync.GRAPH_INBOX_DELTA_URL: [(200, {"value": [_msg("a")], "@odata.nextLink": NEXT_1})],
+                NEXT_1: [(200, {"value": [bad], "@odata.deltaLink": DELTA_1})],
+            }
+        )
+        self.assertEqual(outlook_sync.get_outlook_delta_state(5), {"delta_link": None, "next_link": NEXT_1})
+
+    def test_list_mode_when_delta_disabled(self):
+        with patch.dict(os.environ, {"OUTLOOK_SYNC_DELTA": "0"}):
+            result = self._sync(
+                {outlook_sync.GRAPH_INBOX_MESSAGES_URL: [(200, {"value": [_msg("a"), _msg("b")]})]}
+            )
+        self.assertEqual(result["count"], 2)
+        self.assertEqual(result["mode"], "list")
+        self.assertEqual(self.graph.calls[0]["params"]["$top"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
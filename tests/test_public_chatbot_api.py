@@ -805,5 +805,84 @@ class TestPublicChatbotAPI(unittest.TestCase):
         self.assertNotIn("fail@example.com", extra_blob)
 
 
+    @patch('core.chatbot_usage_tracking.check_plan_access')
+    @patch('core.chatbot_retrieval.get_feature_flags')
+    @patch('core.chatbot_response_service.LLMRouter')
+    @patch('core.chatbot_retrieval.get_vector_search')
+    @patch('core.public_chatbot_api.api_key_manager.validate_api_key')
+    @patch('core.public_chatbot_api.api_key_manager.check_rate_limit')
+    @patch('core.public_chatbot_api.api_key_manager.record_usage')
+    @patch('core.chatbot_retrieval.faq_system.search_faqs')
+    @patch('core.chatbot_retrieval.knowledge_base.search')
+    @patch('core.public_chatbot_api.context_system.start_conversation')
+    def test_11_query_stream_emits_sources_tokens_done(self, mock_start_conv, mock_kb_search,
+                                                       mock_faq_search, mock_record, mock_rate_limit,
+                                                       mock_validate, mock_vector_search, mock_llm_router,
+                                                       mock_flags, mock_plan):
+        """Streamed query sends sources first, then tokens, then the final metadata frame"""
+        mock_validate.return_value = self.mock_api_key_info
+        mock_rate_limit.return_value = {'allowed': True, 'remaining': 60, 'limit': 60}
+        mock_flags.return_value.is_enabled.return_value = False
+        mock_plan.return_value = {"plan": "starter", "allow_llm": True}
+        mock_vector_search.return_value.search_similar.return_value = []
+        mock_faq_result = Mock()
+        mock_faq_result.success = True
+        mock_faq_result.matches = []
+        mock_faq_search.return_value = mock_faq_result
+        mock_doc = Mock()
+        mock_doc.id = "doc_1"
+        mock_doc.title = "Hours"
+        mock_doc.content = "We are open 9am-5pm."
+        mock_kb_entry = Mock()
+        mock_kb_entry.document = mock_doc
+        mock_kb_entry.relevance_score = 0.9
+        mock_kb_result = Mock()
+        mock_kb_result.success = True
+        mock_kb_result.results = [mock_kb_entry]
+        mock_kb_search.return_value = mock_kb_result
+        mock_conversation = Mock()
+        mock_conversation.conversation_id = "conv_stream"
+        mock_start_conv.return_value = mock_conversation
+
+        mock_llm = Mock()
+        mock_llm.process_stream.return_value = iter([
+            {"type": "token", "content": "We are "},
+            {"type": "token", "content": "open 9-5."},
+            {"type": "done", "success": True, "validated": True, "content": "We are open 9-5.",
+             "trace_id": "trace_stream", "first_token_ms": 12.0},
+        ])
+        mock_llm_router.return_value = mock_llm
+
+        response = self.client.post('/api/public/chatbot/query/stream',
+                                    json={'query': 'What are your hours?'},
+                                    headers={'X-API-Key': 'fik_test_key'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        frames = []
+        for block in response.get_data(as_text=True).strip().split("\n\n"):
+            event, data = block.split("\n", 1)
+            frames.append((event[len("event: "):], json.loads(data[len("data: "):])))
+        self.assertEqual([e for e, _ in frames], ["sources", "token", "token", "done"])
+        self.assertEqual(frames[0][1]["retrieved_doc_ids"], ["doc_1"])
+        done = frames[-1][1]
+        self.assertTrue(done["success"])
+        self.assertTrue(done["response"].startswith("We are open 9-5."))
+        self.assertEqual(done["conversation_id"], "conv_stream")
+        mock_llm.process.assert_not_called()
+        mock_record.assert_called_once()
+
+    @patch('core.public_chatbot_api.api_key_manager.validate_api_key')
+    @patch('core.public_chatbot_api.api_key_manager.check_rate_limit')
+    def test_11b_query_stream_missing_query_is_json_400(self, mock_rate_limit, mock_validate):
+        mock_validate.return_value = self.mock_api_key_info
+        mock_rate_limit.return_value = {'allowed': True, 'remaining': 60, 'limit': 60}
+        response = self.client.post('/api/public/chatbot/query/stream',
+                                    json={'query': '  '},
+                                    headers={'X-API-Key': 'fik_test_key'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(json.loads(response.data)['success'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -475,6 +475,125 @@ class TestRedisQueues:
         assert "boom" in queue.fail_job.call_args[0][1]
 
 
+class TestReliableRedisQueue:
+    """Reliable mode of core/redis_queues.RedisQueue: BLMOVE + inflight deadlines + hash job state."""
+
+    def _queue(self, jobs=None):
+        from core.redis_queues import RedisQueue
+
+        q = RedisQueue.__new__(RedisQueue)
+        q.queue_name = "test:queue"
+        q.job_prefix = "fikiri:job:"
+        q.result_prefix = "fikiri:result:"
+        q._registered_tasks = {}
+        q.reliable = True
+        q.visibility_timeout = 60
+        q.processing_list = "test:queue:processing:w1"
+        q._last_reap = time.time()
+        q.redis_client = MagicMock()
+        q.redis_client.ping.return_value = True
+        q._hashes = {f"{q.job_prefix}{j.id}": self._hash(j) for j in (jobs or [])}
+        q.redis_client.hgetall.side_effect = lambda key: dict(q._hashes.get(key, {}))
+        q.pipe = MagicMock()
+        q.redis_client.pipeline.return_value = q.pipe
+        return q
+
+    def _hash(self, job):
+        from core.redis_queues import _job_hash_fields
+
+        return _job_hash_fields(job)
+
+    def _job(self, **kwargs):
+        from core.redis_queues import Job, JobStatus
+
+        fields = dict(id="job-r1", task="process_gmail_sync", args={"job_id": "g1"},
+                      status=JobStatus.PENDING, created_at=1000.0, max_retries=3)
+        fields.update(kwargs)
+        return Job(**fields)
+
+    def test_job_hash_round_trip(self):
+        from core.redis_queues import JobStatus, _job_from_hash
+
+        job = self._job(result={"ok": True}, dead_letter=True)
+        back = _job_from_hash(self._hash(job))
+        assert back == job and back.status is JobStatus.PENDING and back.started_at is None
+
+    def test_delayed_promotion_is_one_script_call(self):
+        from core.redis_queues import _PROMOTE_DELAYED_LUA
+
+        q = self._queue()
+        q.reliable = False
+        q.redis_client.rpop.return_value = None
+        assert q.dequeue_job() is None
+        q.redis_client.register_script.assert_called_once_with(_PROMOTE_DELAYED_LUA)
+        script = q.redis_client.register_script.return_value
+        assert script.call_args.kwargs["keys"] == ["test:queue:delayed", "test:queue:pending"]
+        q.redis_client.zrangebyscore.assert_not_called()
+
+    def test_dequeue_moves_job_into_processing_list_with_deadline(self):
+        from core.redis_queues import JobStatus
+
+        q = self._queue([self._job()])
+        blocking = MagicMock()
+        blocking.blmove.return_value = "job-r1"
+        q._blocking_redis_client = blocking
+        blocking.ping.return_value = True
+
+        with patch("core.redis_queues.time.time", return_value=2000.0):
+            job = q.dequeue_job(timeout=5)
+
+        blocking.blmove.assert_called_once_with(
+            "test:queue:pending", "test:queue:processing:w1", 5, "RIGHT", "LEFT"
+        )
+        q.redis_client.zadd.assert_called_once_with("test:queue:inflight", {"job-r1": 2060.0})
+        assert job.status is JobStatus.PROCESSING and job.args == {"job_id": "g1"}
+        q.pipe.hset.assert_called_once_with(
+            "fikiri:job:job-r1", mapping={"status": "processing", "started_at": "2000.0"}
+        )
+        q.pipe.hincrby.assert_called_once_with("fikiri:job:job-r1", "deliveries", 1)
+        # heartbeat outlives the job's visibility deadline by one reap interval
+        q.pipe.set.assert_called_once_with("test:queue:processing:w1:alive", 1, ex=90)
+        q.redis_client.setex.assert_not_called()
+
+    def test_complete_acks_and_updates_only_changed_fields(self):
+        q = self._queue([self._job()])
+        assert q.complete_job("job-r1", {"success": True}) is True
+
+        mapping = q.pipe.hset.call_args.kwargs["mapping"]
+        assert set(mapping) == {"status", "completed_at", "result"} and mapping["status"] == "completed"
+        q.pipe.lrem.assert_called_once_with("test:queue:processing:w1", 0, "job-r1")
+        q.pipe.zrem.assert_called_once_with("test:queue:inflight", "job-r1")
+        q.pipe.execute.assert_called_once()
+
+    def test_fail_schedules_retry_in_same_transaction_as_ack(self):
+        q = self._queue([self._job()])
+        with patch("core.redis_queues.time.time", return_value=1000), patch(
+            "core.redis_queues.random.randint", return_value=0
+        ):
+            assert q.fail_job("job-r1", "temporary") is True
+
+        calls = [c[0] for c in q.pipe.method_calls]
+        assert calls == ["hset", "expire", "lrem", "zrem", "zadd", "execute"]
+        q.pipe.zadd.assert_called_once_with("test:queue:delayed", {"job-r1": 1030})
+        assert q.pipe.hset.call_args.kwargs["mapping"]["status"] == "retrying"
+        q.redis_client.zadd.assert_not_called()
+
+    def test_enqueue_creates_hash_and_queues_atomically(self):
+        from core.redis_queues import _ENQUEUE_LUA
+
+        q = self._queue()
+        script = q.redis_client.register_script.return_value
+        script.return_value = 1
+        assert q.enqueue_job("send_email", {"to": "a@realco.com"}, job_id="j-9", delay=0) == "j-9"
+
+        q.redis_client.register_script.assert_called_once_with(_ENQUEUE_LUA)
+        kwargs = script.call_args.kwargs
+        assert kwargs["keys"] == ["fikiri:job:j-9", "test:queue:pending", "test:queue:delayed"]
+        fields = dict(zip(kwargs["args"][2::2], kwargs["args"][3::2]))
+        assert kwargs["args"][1] == 0 and fields["status"] == "pending" and fields["task"] == "send_email"
+        q.redis_client.set.assert_not_called()
+
+
 class TestRedisMonitor:
     """Tests for core/redis_monitor.py"""
 
@@ -0,0 +1,114 @@
+"""Reliable RedisQueue reaper against a real Redis: crashed workers' processing lists are reclaimed.
+
+The Lua scripts cannot be exercised with MagicMock clients, so this module needs a real server:
+
+  FIKIRI_REDIS_QUEUE_TEST_URL=redis://localhost:6379/15   (the default)
+
+It is skipped when that server does not answer PING. Every key lives under a random prefix
+and is deleted afterwards.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import uuid
+
+import pytest
+
+REQUIRED_URL_ENV = "FIKIRI_REDIS_QUEUE_TEST_URL"
+
+
+def _redis_url() -> str:
+    return (os.environ.get(REQUIRED_URL_ENV) or "redis://localhost:6379/15").strip()
+
+
+def _client():
+    try:
+        import redis
+    except ImportError:
+        return None
+    try:
+        client = redis.Redis.from_url(_redis_url(), decode_responses=True, socket_timeout=1)
+        client.ping()
+        return client
+    except Exception:
+        return None
+
+
+_REDIS = _client()
+
+pytestmark = pytest.mark.skipif(
+    _REDIS is None,
+    reason=f"No Redis answering at {REQUIRED_URL_ENV} ({_redis_url()})",
+)
+
+
+@pytest.fixture
+def namespace():
+    ns = f"fikiri-test:{uuid.uuid4().hex[:12]}"
+    yield ns
+    keys = list(_REDIS.scan_iter(f"{ns}:*"))
+    if keys:
+        _REDIS.delete(*keys)
+
+
+def _worker(namespace: str, name: str):
+    from core.redis_queues import RedisQueue
+
+    q = RedisQueue.__new__(RedisQueue)
+    q.queue_name = f"{namespace}:queue"
+    q.job_prefix = f"{namespace}:job:"
+    q.result_prefix = f"{namespace}:result:"
+    q._registered_tasks = {}
+    q._blocking_redis_client = None
+    q.reliable = True
+    q.visibility_timeout = 60
+    q.worker_id = name
+    q.processing_list = f"{q.queue_name}:processing:{name}"
+    q._last_reap = 0.0
+    q.redis_client = _REDIS
+    return q
+
+
+def test_crashed_workers_list_is_requeued_and_unregistered(namespace):
+    crashed, survivor = _worker(namespace, "w1"), _worker(namespace, "w2")
+    job_id = crashed.enqueue_job("send_email", {"to": "a@realco.com"}, job_id="j-1")
+    assert crashed.dequeue_job().id == job_id
+    registry = f"{crashed.queue_name}:processing_lists"
+    assert _REDIS.sismember(registry, crashed.processing_list)
+
+    _REDIS.delete(crashed.heartbeat_key)  # its heartbeat TTL ran out
+    assert survivor.requeue_expired_jobs() == 1
+
+    assert _REDIS.lrange(f"{crashed.queue_name}:pending", 0, -1) == [job_id]
+    assert not _REDIS.exists(crashed.processing_list)
+    assert not _REDIS.sismember(registry, crashed.processing_list)
+    assert _REDIS.zscore(f"{crashed.queue_name}:inflight", job_id) is None
+    assert _REDIS.hget(f"{crashed.job_prefix}{job_id}", "reclaimed") == "1"
+
+    survivor._last_reap = time.time()
+    assert survivor.dequeue_job().id == job_id
+
+
+def test_live_workers_list_is_kept(namespace):
+    worker, reaper = _worker(namespace, "w1"), _worker(namespace, "w2")
+    worker.enqueue_job("send_email", {}, job_id="j-1")
+    assert worker.dequeue_job().id == "j-1"
+
+    assert reaper.requeue_expired_jobs() == 0
+    assert _REDIS.lrange(worker.processing_list, 0, -1) == ["j-1"]
+    assert _REDIS.sismember(f"{worker.queue_name}:processing_lists", worker.processing_list)
+    assert _REDIS.ttl(worker.heartbeat_key) > worker.visibility_timeout
+
+
+def test_idle_crashed_worker_does_not_stay_registered(namespace):
+    idle, reaper = _worker(namespace, "w1"), _worker(namespace, "w2")
+    assert idle.dequeue_job() is None
+    registry = f"{idle.queue_name}:processing_lists"
+    assert _REDIS.smembers(registry) == {idle.processing_list}
+
+    _REDIS.delete(idle.heartbeat_key)
+    reaper._last_reap = time.time()
+    assert reaper.requeue_expired_jobs() == 0
+    assert _REDIS.smembers(registry) == set()
@@ -192,3 +192,35 @@ def test_site_chat_succeeds_when_transcript_write_fails(client, monkeypatch):
     )
     assert data["schema_version"] == "v1"
     assert data["response"]
+
+
+def _sse_frames(response):
+    frames = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        frames.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return frames
+
+
+def test_message_stream_emits_sources_tokens_done(client):
+    start = _data(client.post("/api/site/chat/session/start"))
+    response = client.post(
+        "/api/site/chat/message/stream",
+        json={"session_id": start["session_id"], "message": "Do you offer a free trial?"},
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    frames = _sse_frames(response)
+    events = [event for event, _ in frames]
+    assert events[0] == "sources" and events[-1] == "done"
+    assert "token" in events
+    done = frames[-1][1]
+    streamed = "".join(data["content"] for event, data in frames if event == "token")
+    assert streamed == done["response"]
+    assert done["session_id"] == start["session_id"]
+
+
+def test_message_stream_validation_errors_are_json(client):
+    response = client.post("/api/site/chat/message/stream", json={})
+    assert response.status_code == 400
+    assert response.mimetype == "application/json"
@@ -0,0 +1,97 @@
+"""Online SQLite backups: stepped backup API copy, page-diff incremental snapshots and restore."""
+
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from core import sqlite_backup
+from core.sqlite_backup import online_backup, restore_snapshot, snapshot
+
+
+@pytest.fixture
+def live_db(tmp_path):
+    path = tmp_path / "live.db"
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE leads (id INTEGER PRIMARY KEY, email TEXT, notes TEXT)")
+    conn.executemany(
+        "INSERT INTO leads (email, notes) VALUES (?, ?)",
+        [(f"lead{i}@realco.com", "x" * 200) for i in range(3000)],
+    )
+    conn.commit()
+    yield path, conn
+    conn.close()
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT id, email, notes FROM leads ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_online_backup_steps_with_progress_while_writer_commits(live_db, tmp_path):
+    path, _ = live_db
+    progress = []
+    stop = threading.Event()
+
+    def writer():
+        conn = sqlite3.connect(path, timeout=5)
+        while not stop.is_set():
+            conn.execute("INSERT INTO leads (email, notes) VALUES ('late@realco.com', 'y')")
+            conn.commit()
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        result = online_backup(
+            str(path), str(tmp_path / "copy.db"), pages_per_step=20, sleep_seconds=0.001,
+            progress=lambda done, total: progress.append((done, total)),
+        )
+    finally:
+        stop.set()
+        thread.join()
+
+    assert result["steps"] > 1 and progress[-1][0] == progress[-1][1]
+    copy = sqlite3.connect(tmp_path / "copy.db")
+    assert copy.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    assert copy.execute("SELECT COUNT(*) FROM leads WHERE email LIKE 'lead%'").fetchone()[0] == 3000
+    copy.close()
+
+
+def test_incremental_snapshot_stores_only_changed_pages(live_db, tmp_path):
+    path, conn = live_db
+    backups = tmp_path / "backups"
+    full = snapshot(str(path), backups)
+    assert full["type"] == "full" and full["pages_written"] == full["page_count"]
+
+    conn.execute("UPDATE leads SET notes = 'changed' WHERE id = 10")
+    conn.execute("INSERT INTO leads (email, notes) VALUES ('new@realco.com', 'n')")
+    conn.commit()
+    delta = snapshot(str(path), backups)
+
+    assert delta["type"] == "delta" and delta["base"].startswith("sqlite_")
+    assert delta["pages_written"] < delta["page_count"] // 10
+    assert delta["compressed_bytes"] < full["compressed_bytes"] // 5
+
+    restored = tmp_path / "restored.db"
+    result = restore_snapshot(delta["path"], str(restored))
+    assert len(result["restored_from"]) == 2
+    assert _rows(restored) == _rows(path)
+
+
+def test_chain_restarts_with_full_snapshot(live_db, tmp_path):
+    path, conn = live_db
+    backups = tmp_path / "backups"
+    with patch.object(sqlite_backup, "SQLITE_BACKUP_FULL_EVERY", 2):
+        kinds = []
+        for i in range(4):
+            conn.execute("UPDATE leads SET email = ? WHERE id = 1", (f"v{i}@realco.com",))
+            conn.commit()
+            kinds.append(snapshot(str(path), backups)["type"])
+    assert kinds == ["full", "delta", "delta", "full"]
+    assert snapshot(str(path), backups, incremental=False)["type"] == "full"
@@ -0,0 +1,179 @@
+"""Streamed exports: chunk helpers, GDPR NDJSON/zip, audit CSV parity and background jobs."""
+
+import io
+import json
+import os
+import time
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+os.environ.setdefault("FIKIRI_TEST_MODE", "1")
+
+from core import privacy_manager as privacy_module
+from core import streaming_export
+from core.admin_audit_export import build_audit_export_payload, iter_audit_export_chunks
+from core.privacy_manager import PrivacyManager
+from core.streaming_export import iter_csv, iter_zip, start_background_export, streaming_download_response
+from tests.db_test_util import insert_test_user
+
+
+@pytest.fixture
+def manager(sqlite_db):
+    db = sqlite_db
+    insert_test_user(db, 7, "owner@realco.com")
+    insert_test_user(db, 8)
+    for i in range(1, 26):
+        db.execute_query(
+            "INSERT INTO leads (id, user_id, email, name) VALUES (?, 7, ?, ?)", (i, f"lead{i}@realco.com", f"Lead {i}"),
+            fetch=False,
+        )
+        db.execute_query("INSERT INTO lead_activities (lead_id, activity_type) VALUES (?, 'note')", (i,), fetch=False)
+    db.execute_query("INSERT INTO leads (id, user_id, email, name) VALUES (99, 8, 'other@realco.com', 'Other')", fetch=False)
+
+    real_iter_query = db.iter_query
+    db.streamed = []
+
+    def iter_query(sql, params=None, batch_size=None):
+        db.streamed.append(" ".join(sql.split()))
+        return real_iter_query(sql, params, batch_size=10)
+
+    mgr = PrivacyManager.__new__(PrivacyManager)
+    with patch.object(privacy_module, "db_optimizer", db), patch.object(db, "iter_query", iter_query), patch.object(
+        PrivacyManager, "get_privacy_settings", return_value=None
+    ), patch.object(PrivacyManager, "get_privacy_consents", return_value=[]):
+        mgr.db = db
+        yield mgr
+
+
+def test_iter_csv_emits_header_then_rows():
+    chunks = list(iter_csv(({"a": i, "b": "x,y", "extra": 1} for i in range(3)), ["a", "b"]))
+    assert chunks[0] == "a,b\r\n"
+    assert chunks[1:] == ['0,"x,y"\r\n', '1,"x,y"\r\n', '2,"x,y"\r\n']
+
+
+def test_iter_zip_streams_readable_archive():
+    members = [("a.ndjson", (f"{i}\n" for i in range(5000))), ("b.txt", ["hello"])]
+    data = b"".join(iter_zip(members))
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.namelist() == ["a.ndjson", "b.txt"]
+        assert zf.read("a.ndjson").decode().splitlines()[-1] == "4999"
+        assert zf.read("b.txt") == b"hello"
+
+
+def test_privacy_ndjson_export_streams_in_batches(manager):
+    lines = [json.loads(line) for line in manager.iter_export_ndjson(7)]
+
+    assert lines[0]["table"] == "export" and lines[0]["record"]["user_id"] == 7
+    tables = [line["table"] for line in lines[1:]]
+    assert tables == ["user_profile"] + ["leads"] * 25 + ["activities"] * 25
+    assert all(line["record"]["user_id"] == 7 for line in lines if line["table"] == "leads")
+    assert [sql.split(" FROM ")[1].split()[0] for sql in manager.db.streamed] == ["leads", "lead_activities"]
+    assert manager.iter_export_ndjson(404) is None
+
+
+def test_privacy_zip_export_has_one_member_per_table(manager):
+    data = b"".join(manager.iter_export_zip(7))
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.namelist() == ["export.json", "user_profile.ndjson", "leads.ndjson", "activities.ndjson"]
+        leads = [json.loads(line) for line in zf.read("leads.ndjson").decode().splitlines()]
+    assert [lead["id"] for lead in leads] == list(range(1, 26))
+
+
+def test_streamed_audit_csv_matches_buffered_export():
+    items = [
+        {"created_at": "2026-10-18T12:00:00", "action": "platform.audit.export", "outcome": "success",
+         "actor_user_id": 3, "metadata": {"reason": "EXPORT_OK"}, "ip_address": "203.0.113.9"},
+        {"created_at": "2026-10-18T12:01:00", "action": "tenant.suspend", "target_id": 12},
+    ]
+    streamed = iter_audit_export_chunks(iter(items), fmt="csv")
+    assert "".join(streamed["chunks"]) == build_audit_export_payload(items, fmt="csv")["body"]
+
+    ndjson = iter_audit_export_chunks(iter(items), fmt="json")
+    rows = [json.loads(line) for line in "".join(ndjson["chunks"]).splitlines()]
+    assert ndjson["format"] == "ndjson" and "ip_address" not in rows[0]
+
+
+def test_download_response_is_chunked_attachment():
+    app = Flask(__name__)
+    with app.test_request_context():
+        response = streaming_download_response(iter(["a\n", "b\n"]), "application/x-ndjson", "x.ndjson")
+        assert response.is_streamed
+        assert response.headers["Content-Disposition"] == 'attachment; filename="x.ndjson"'
+        assert b"".join(response.response) == b"a\nb\n"
+
+
+def test_json_response_streams_generators_as_arrays():
+    app = Flask(__name__)
+    with app.test_request_context():
+        response = streaming_export.streaming_json_response({"data": {"rows": ({"n": i} for i in range(3))}})
+        assert response.is_streamed and response.mimetype == "application/json"
+        assert json.loads(b"".join(response.response)) == {"data": {"rows": [{"n": 0}, {"n": 1}, {"n": 2}]}}
+
+
+def _wait_for_export(job_id, owner_id):
+    for _ in range(200):
+        status = streaming_export.get_background_export(job_id, owner_id)
+        if status["status"] in ("completed", "failed"):
+            return status
+        time.sleep(0.01)
+    return status
+
+
+def test_background_export_writes_file_for_owner_only(sqlite_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming_export, "db_optimizer", sqlite_db)
+    monkeypatch.setattr(streaming_export, "EXPORT_DIR", str(tmp_path))
+    job = start_background_export(7, "privacy_export", "e.ndjson", "application/x-ndjson", lambda: iter(["x\n"] * 3))
+    assert "path" not in job
+    row = sqlite_db.execute_query("SELECT owner_id, kind FROM export_jobs WHERE job_id = ?", (job["job_id"],))
+    assert dict(row[0]) == {"owner_id": "7", "kind": "privacy_export"}
+
+    status = _wait_for_export(job["job_id"], 7)
+    assert status["status"] == "completed" and status["size_bytes"] == 6
+    with open(status["path"]) as fh:
+        assert fh.read() == "x\nx\nx\n"
+    assert streaming_export.get_background_export(job["job_id"], 8) is None
+
+
+def test_json_export_streams_lead_rows_into_the_writer(manager):
+    result = manager.export_user_data(7)
+    export = result["export_data"]
+    assert not isinstance(export["leads"], list) and not isinstance(export["activities"], list)
+
+    chunks = streaming_export.iter_json({"success": True, "data": export})
+    head = "".join(next(chunks) for _ in range(6))
+    assert head == '{"success":true,"data":{"user_profile":'  # nothing read ahead
+    doc = json.loads(head + "".join(chunks))
+    assert [lead["id"] for lead in doc["data"]["leads"]] == list(range(1, 26))
+    assert len(doc["data"]["activities"]) == 25 and doc["data"]["consents"] == []
+
+
+def test_background_export_failure_is_recorded(sqlite_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming_export, "db_optimizer", sqlite_db)
+    monkeypatch.setattr(streaming_export, "EXPORT_DIR", str(tmp_path))
+
+    def broken():
+        yield "x\n"
+        raise RuntimeError("db gone")
+
+    job = start_background_export(7, "privacy_export", "e.ndjson", "application/x-ndjson", broken)
+    status = _wait_for_export(job["job_id"], 7)
+    assert status["status"] == "failed" and status["error"] == "Export generation failed"
+    assert not list(tmp_path.glob("*e.ndjson*"))
+
+
+def test_background_privacy_export_for_unknown_user_is_404(monkeypatch):
+    from routes import business
+
+    app = Flask(__name__)
+    app.register_blueprint(business.business_bp)
+    started = []
+    monkeypatch.setattr(business, "get_current_user_id", lambda: 404)
+    monkeypatch.setattr(business.privacy_manager, "iter_export_ndjson", lambda user_id: None)
+    monkeypatch.setattr(business, "start_background_export", lambda *args: started.append(args))
+
+    response = app.test_client().get("/api/privacy/export?format=ndjson&mode=background")
+    assert response.status_code == 404
+    assert started == []
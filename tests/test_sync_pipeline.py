@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Tests for the staged sync executor (email_automation.sync_pipeline)."""
+
+import threading
+import time
+import unittest
+
+from email_automation.sync_pipeline import PipelineStage, StagedPipeline
+
+
+class TestStagedPipeline(unittest.TestCase):
+    def test_items_flow_through_all_stages(self):
+        seen = []
+        lock = threading.Lock()
+
+        def sink(item):
+            with lock:
+                seen.append(item)
+
+        pipeline = StagedPipeline(
+            [
+                PipelineStage("double", lambda x: x * 2),
+                PipelineStage("slow", lambda x: (time.sleep(0.001), x + 1)[1], workers=4),
+                PipelineStage("sink", sink),
+            ],
+            queue_size=3,
+        )
+        stats = pipeline.run(range(40))
+
+        self.assertEqual(sorted(seen), [x * 2 + 1 for x in range(40)])
+        self.assertEqual(stats["stages"]["fetch"]["items"], 40)
+        self.assertEqual(stats["stages"]["slow"]["workers"], 4)
+        for name in ("double", "slow", "sink"):
+            self.assertEqual(stats["stages"][name]["items"], 40)
+            self.assertGreaterEqual(stats["stages"][name]["items_per_second"], 0)
+
+    def test_handler_error_drops_item_and_keeps_going(self):
+        out = []
+
+        def flaky(x):
+            if x == 3:
+                raise RuntimeError("bad message")
+            return x
+
+        stats = StagedPipeline(
+            [PipelineStage("flaky", flaky), PipelineStage("sink", out.append)]
+        ).run(range(6))
+
+        self.assertEqual(out, [0, 1, 2, 4, 5])
+        self.assertEqual(stats["stages"]["flaky"]["errors"], 1)
+
+    def test_source_error_is_raised_after_drain(self):
+        out = []
+
+        def source():
+            yield 1
+            yield 2
+            raise ValueError("gmail fetch failed")
+
+        with self.assertRaises(ValueError):
+            StagedPipeline([PipelineStage("sink", out.append)]).run(source())
+        self.assertEqual(out, [1, 2])
+
+    def test_bounded_queue_limits_read_ahead(self):
+        produced = []
+        max_ahead = []
+
+        def source():
+            for i in range(30):
+                produced.append(i)
+                yield i
+
+        def slow_sink(item):
+            time.sleep(0.002)
+            max_ahead.append(len(produced) - (item + 1))
+
+        StagedPipeline([PipelineStage("sink", slow_sink)], queue_size=2).run(source())
+
+        # queue (2) + the item the source is holding while blocked on put().
+        self.assertLessEqual(max(max_ahead), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,6 +12,8 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault("FLASK_ENV", "test")
 
+from tests.db_test_util import use_isolated_idempotency_store
+
 
 class TestWebhookIntakeService(unittest.TestCase):
     def setUp(self):
@@ -21,6 +23,7 @@ class TestWebhookIntakeService(unittest.TestCase):
             cfg = WebhookConfig(secret_key="secret", allowed_origins=["*"], enable_verification=True)
             self.service = WebhookIntakeService(cfg)
             self._tenant_id = 99
+        use_isolated_idempotency_store(self)
 
     def test_verify_webhook_signature_valid_and_invalid(self):
         payload = '{"event":"test"}'
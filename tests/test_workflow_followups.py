@@ -17,6 +17,10 @@ from core.workflow_followups import (
 )
 
 
+def _claim_all(operation_type, keys, *args, **kwargs):
+    return set(keys)
+
+
 class TestScheduleFollowUp:
     @patch("core.workflow_followups.db_optimizer")
     def test_schedule_follow_up_invalid_type_returns_error(self, mock_db):
@@ -168,8 +172,7 @@ class TestExecuteDueFollowUps:
     def test_sms_follow_up_blocked_without_consent(
         self, mock_db, mock_idem, mock_safety, mock_send_sms
     ):
-        mock_idem.check_key.return_value = None
-        mock_idem.store_key = MagicMock()
+        mock_idem.claim_keys_bulk.side_effect = _claim_all
         mock_idem.update_key_result = MagicMock()
         mock_safety.check_rate_limits.return_value = {"allowed": True}
         mock_safety.log_automation_action = MagicMock()
@@ -209,8 +212,7 @@ class TestExecuteDueFollowUps:
     def test_sms_follow_up_sends_when_consent_true(
         self, mock_db, mock_idem, mock_safety, mock_send_sms
     ):
-        mock_idem.check_key.return_value = None
-        mock_idem.store_key = MagicMock()
+        mock_idem.claim_keys_bulk.side_effect = _claim_all
         mock_idem.update_key_result = MagicMock()
         mock_safety.check_rate_limits.return_value = {"allowed": True}
         mock_safety.log_automation_action = MagicMock()
@@ -252,8 +254,7 @@ class TestExecuteDueFollowUps:
     def test_email_follow_up_skips_noreply_without_gmail_send(
         self, mock_db, mock_idem, mock_safety, mock_send_email
     ):
-        mock_idem.check_key.return_value = None
-        mock_idem.store_key = MagicMock()
+        mock_idem.claim_keys_bulk.side_effect = _claim_all
         mock_idem.update_key_result = MagicMock()
         mock_safety.check_rate_limits.return_value = {"allowed": True}
         mock_safety.log_automation_action = MagicMock()
@@ -299,8 +300,7 @@ class TestExecuteDueFollowUps:
     def test_email_follow_up_skips_example_com(
         self, mock_db, mock_idem, mock_safety, mock_send_email
     ):
-        mock_idem.check_key.return_value = None
-        mock_idem.store_key = MagicMock()
+        mock_idem.claim_keys_bulk.side_effect = _claim_all
         mock_idem.update_key_result = MagicMock()
         mock_safety.log_automation_action = MagicMock()
 
@@ -335,8 +335,7 @@ class TestExecuteDueFollowUps:
     def test_email_follow_up_sends_valid_recipient(
         self, mock_db, mock_idem, mock_safety, mock_crm, mock_send_email
     ):
-        mock_idem.check_key.return_value = None
-        mock_idem.store_key = MagicMock()
+        mock_idem.claim_keys_bulk.side_effect = _claim_all
         mock_idem.update_key_result = MagicMock()
         mock_safety.check_rate_limits.return_value = {"allowed": True}
         mock_safety.log_automation_action = MagicMock()
@@ -384,8 +383,7 @@ class TestExecuteDueFollowUps:
     def test_skipped_follow_up_not_retried_on_second_run(
         self, mock_db, mock_idem, mock_safety, mock_send_email
     ):
-        mock_idem.check_key.return_value = {"status": "completed", "result": {"skipped": True}}
-        mock_idem.store_key = MagicMock()
+        mock_idem.claim_keys_bulk.return_value = set()  # key already completed
         mock_safety.log_automation_action = MagicMock()
 
         def q_side(sql, params=None, fetch=True, **kwargs):
@@ -416,8 +414,7 @@ class TestExecuteDueFollowUps:
     def test_scheduler_continues_after_skipped_recipient(
         self, mock_db, mock_idem, mock_safety, mock_send_email
     ):
-        mock_idem.check_key.return_value = None
-        mock_idem.store_key = MagicMock()
+        mock_idem.claim_keys_bulk.side_effect = _claim_all
         mock_idem.update_key_result = MagicMock()
         mock_safety.check_rate_limits.return_value = {"allowed": True}
         mock_safety.log_automation_action = MagicMock()